@@ -3,11 +3,20 @@
 import subprocess
 import sys
 import os
+import tempfile
 import json
 import re
+import time
 import logging
+from functools import lru_cache
 from typing import Optional, List, Dict, Any, Tuple, Final
 from dotenv import load_dotenv
+from .tracing import span, traced
+from .metrics import get_metrics
+from . import cassette
+from .resources import spawn, get_limits, describe_usage
+from .artifacts import open_artifact, store_artifact
+from .search_index import SearchIndex
 from .data_types import (
     AgentPromptRequest,
     AgentPromptResponse,
@@ -37,8 +46,12 @@ def get_model_for_slash_command(slash_command: str, default: str = "sonnet") ->
     return SLASH_COMMAND_MODEL_MAP.get(slash_command, default)
 
 
+@lru_cache(maxsize=1)
 def check_claude_installed() -> Optional[str]:
-    """Check if Claude Code CLI is installed. Return error message if not."""
+    """Check if Claude Code CLI is installed. Return error message if not.
+
+    Cached so batch runs don't spawn `claude --version` once per agent.
+    """
     try:
         result = subprocess.run(
             [CLAUDE_PATH, "--version"], capture_output=True, text=True
@@ -53,7 +66,7 @@ def check_claude_installed() -> Optional[str]:
 def parse_jsonl_output(output_file: str) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
     """Parse JSONL output file and return all messages and the result message."""
     try:
-        with open(output_file, "r") as f:
+        with open_artifact(output_file) as f:
             messages = [json.loads(line) for line in f if line.strip()]
 
             result_message = None
@@ -69,7 +82,11 @@ def parse_jsonl_output(output_file: str) -> Tuple[List[Dict[str, Any]], Optional
 
 
 def convert_jsonl_to_json(jsonl_file: str) -> str:
-    """Convert JSONL file to JSON array file."""
+    """Convert JSONL file to JSON array file.
+
+    Not written by default any more; this generates the view on demand
+    (manage_artifacts.py view). The JSONL may already be compressed.
+    """
     json_file = jsonl_file.replace(".jsonl", ".json")
     messages, _ = parse_jsonl_output(jsonl_file)
 
@@ -80,6 +97,59 @@ def convert_jsonl_to_json(jsonl_file: str) -> str:
     return json_file
 
 
+def record_agent_metrics(
+    request: AgentPromptRequest,
+    duration: float,
+    success: bool,
+    result_message: Optional[Dict[str, Any]],
+) -> None:
+    """Record duration, outcome, tokens and cost of one Claude Code run."""
+    metrics = get_metrics()
+    first_word = request.prompt.split(maxsplit=1)[0] if request.prompt.strip() else ""
+    slash_command = first_word if first_word.startswith("/") else "prompt"
+    labels = {"slash_command": slash_command, "model": request.model}
+
+    metrics.observe("adws_agent_duration_seconds", duration, **labels)
+    metrics.inc("adws_agent_runs_total", outcome="success" if success else "failure", **labels)
+
+    if not result_message:
+        return
+    usage = result_message.get("usage") or {}
+    for field, token_type in (
+        ("input_tokens", "input"),
+        ("output_tokens", "output"),
+        ("cache_read_input_tokens", "cache_read"),
+        ("cache_creation_input_tokens", "cache_creation"),
+    ):
+        if usage.get(field):
+            metrics.inc("adws_agent_tokens_total", usage[field], model=request.model, type=token_type)
+    if result_message.get("total_cost_usd"):
+        metrics.inc("adws_agent_cost_usd_total", result_message["total_cost_usd"], model=request.model)
+
+
+def record_first_edit(
+    request: AgentPromptRequest,
+    watch: Any,
+    duration: float,
+    success: bool,
+    result_message: Optional[Dict[str, Any]],
+) -> None:
+    """Record time to first edit of an /implement run, with and without a context pack."""
+    from .context_pack import record_context_run
+    pack = "on" if request.context_pack else "off"
+    if watch.first_edit_seconds is not None:
+        get_metrics().observe("adws_agent_first_edit_seconds", watch.first_edit_seconds,
+                              model=request.model, context_pack=pack)
+    usage = (result_message or {}).get("usage") or {}
+    tokens = sum(usage.get(field) or 0 for field in (
+        "input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"))
+    if tokens:
+        get_metrics().inc("adws_implement_tokens_total", tokens, model=request.model, context_pack=pack)
+    words = request.prompt.split(maxsplit=2)
+    record_context_run(request.adw_id, request.agent_name, words[1] if len(words) > 1 else None,
+                       request.model, request.context_pack, watch, duration, success, result_message)
+
+
 def get_claude_env() -> Dict[str, str]:
     """Get only the required environment variables for Claude Code execution."""
     from .utils import get_safe_subprocess_env
@@ -95,24 +165,50 @@ def save_prompt(prompt: str, adw_id: str, agent_name: str = "implementor") -> No
     slash_command = match.group(1)
     command_name = slash_command[1:]
 
-    from .utils import get_project_root
+    from .utils import get_project_root, atomic_write
     project_root = get_project_root()
     prompt_dir = os.path.join(project_root, "agents", adw_id, agent_name, "prompts")
     os.makedirs(prompt_dir, exist_ok=True)
 
     prompt_file = os.path.join(prompt_dir, f"{command_name}.txt")
-    with open(prompt_file, "w") as f:
-        f.write(prompt)
+    # Replaced, not rewritten: a stored prompt is shared with other runs
+    atomic_write(prompt_file, prompt)
+    store_artifact(prompt_file, compress=False)
 
     print(f"Saved prompt to: {prompt_file}")
 
 
+def index_transcript(output_file: str) -> None:
+    """Add a finished transcript to the search index (never fails the run)."""
+    try:
+        with span("search.index") as attrs:
+            index = SearchIndex()
+            try:
+                attrs["entries"] = index.index_file(output_file)
+            finally:
+                index.close()
+    except Exception as e:
+        print(f"Warning: Could not index {output_file}: {e}", file=sys.stderr)
+
+
+@traced("prompt_claude_code")
 def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
     """Execute Claude Code with the given prompt configuration."""
 
-    error_msg = check_claude_installed()
-    if error_msg:
-        return AgentPromptResponse(output=error_msg, success=False, session_id=None)
+    mode = cassette.get_cassette_mode()
+    replaying = mode == "replay" or (
+        mode == "auto" and cassette.has_cassette(request.prompt, request.model)
+    )
+
+    if replaying:
+        if not cassette.has_cassette(request.prompt, request.model):
+            error_msg = (f"Error: No cassette to replay for this prompt "
+                         f"(expected at {cassette.cassette_path(request.prompt, request.model)})")
+            return AgentPromptResponse(output=error_msg, success=False, session_id=None)
+    else:
+        error_msg = check_claude_installed()
+        if error_msg:
+            return AgentPromptResponse(output=error_msg, success=False, session_id=None)
 
     save_prompt(request.prompt, request.adw_id, request.agent_name)
 
@@ -131,17 +227,67 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
 
     env = get_claude_env()
 
+    # Time to first edit is measured for /implement runs (a replay has no timing)
+    watch = None
+    if request.prompt.startswith("/implement") and not replaying:
+        from .context_pack import FirstEditWatch
+        watch = FirstEditWatch(request.output_file)
+
     try:
-        with open(request.output_file, "w") as f:
-            result = subprocess.run(
-                cmd, stdout=f, stderr=subprocess.PIPE, text=True, env=env
-            )
+        started = time.monotonic()
+        usage = None
+        if watch:
+            watch.start()
+        with span("claude_subprocess", agent=request.agent_name, model=request.model) as attrs:
+            if replaying:
+                attrs["cassette"] = "replay"
+                returncode, stderr = cassette.replay(request.prompt, request.model, request.output_file)
+            elif mode in ("record", "auto"):
+                attrs["cassette"] = "record"
+                returncode, stderr, usage = cassette.record(
+                    cmd, env, request.output_file, request.prompt, request.model, request.agent_name,
+                    cwd=request.cwd,
+                )
+            else:
+                # stderr goes to a file: wait4() reaps the child, so nothing may block on a pipe
+                with open(request.output_file, "w") as f, tempfile.TemporaryFile(mode="w+") as err:
+                    usage = spawn(cmd, "claude", limits=get_limits(), stdout=f, stderr=err,
+                                  text=True, env=env, cwd=request.cwd).wait()
+                    err.seek(0)
+                    stderr = err.read()
+                returncode = usage.exit_code
+            if watch:
+                watch.stop()
+                attrs["first_edit_seconds"] = watch.first_edit_seconds
+            if usage:
+                attrs.update(usage.model_dump(exclude={"command", "exit_code"}))
+                print(f"Resources: {describe_usage(usage)}")
+            attrs["returncode"] = returncode
+        duration = time.monotonic() - started
+
+        if usage and usage.limit_exceeded:
+            record_agent_metrics(request, duration, False, None)
+            error_msg = f"Claude Code stopped by a resource limit: {describe_usage(usage)}"
+            print(error_msg, file=sys.stderr)
+            return AgentPromptResponse(output=error_msg, success=False, session_id=None,
+                                       resource_usage=usage)
 
-        if result.returncode == 0:
+        if returncode == 0:
             print(f"Output saved to: {request.output_file}")
 
-            messages, result_message = parse_jsonl_output(request.output_file)
-            json_file = convert_jsonl_to_json(request.output_file)
+            with span("convert_jsonl"):
+                messages, result_message = parse_jsonl_output(request.output_file)
+
+            # Without a result message the raw output is returned as a success
+            success = not result_message or (
+                not result_message.get("is_error", False)
+                and result_message.get("subtype") != "error_during_execution"
+            )
+            record_agent_metrics(request, duration, success, result_message)
+            first_edit = None
+            if watch:
+                first_edit = watch.first_edit_seconds
+                record_first_edit(request, watch, duration, success, result_message)
 
             if result_message:
                 session_id = result_message.get("session_id")
@@ -151,23 +297,29 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
                 if subtype == "error_during_execution":
                     error_msg = "Error during execution: Agent encountered an error"
                     return AgentPromptResponse(
-                        output=error_msg, success=False, session_id=session_id
+                        output=error_msg, success=False, session_id=session_id,
+                        resource_usage=usage
                     )
 
                 result_text = result_message.get("result", "")
                 return AgentPromptResponse(
-                    output=result_text, success=not is_error, session_id=session_id
+                    output=result_text, success=not is_error, session_id=session_id,
+                    resource_usage=usage, cost_usd=result_message.get("total_cost_usd"),
+                    first_edit_seconds=first_edit
                 )
             else:
-                with open(request.output_file, "r") as f:
+                with open_artifact(request.output_file) as f:
                     raw_output = f.read()
                 return AgentPromptResponse(
-                    output=raw_output, success=True, session_id=None
+                    output=raw_output, success=True, session_id=None, resource_usage=usage,
+                    first_edit_seconds=first_edit
                 )
         else:
-            error_msg = f"Claude Code error: {result.stderr}"
+            record_agent_metrics(request, duration, False, None)
+            error_msg = f"Claude Code error: {stderr}"
             print(error_msg, file=sys.stderr)
-            return AgentPromptResponse(output=error_msg, success=False, session_id=None)
+            return AgentPromptResponse(output=error_msg, success=False, session_id=None,
+                                       resource_usage=usage)
 
     except subprocess.TimeoutExpired:
         error_msg = "Error: Claude Code command timed out after 5 minutes"
@@ -177,20 +329,44 @@ def prompt_claude_code(request: AgentPromptRequest) -> AgentPromptResponse:
         error_msg = f"Error executing Claude Code: {e}"
         print(error_msg, file=sys.stderr)
         return AgentPromptResponse(output=error_msg, success=False, session_id=None)
-
-
+    finally:
+        if watch and watch.is_alive():
+            watch.stop()
+        # The transcript is complete once Claude Code has exited
+        try:
+            with span("artifacts.store"):
+                store_artifact(request.output_file)
+        except OSError as e:
+            print(f"Warning: Could not store {request.output_file}: {e}", file=sys.stderr)
+        index_transcript(request.output_file)
+
+
+@traced("execute_template")
 def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
-    """Execute a Claude Code template with slash command and arguments."""
-    # Override model based on slash command mapping
-    if request.slash_command in SLASH_COMMAND_MODEL_MAP:
-        mapped_model = SLASH_COMMAND_MODEL_MAP[request.slash_command]
-        request = request.model_copy(update={"model": mapped_model})
-    else:
-        request = request.model_copy(update={"model": "sonnet"})
+    """Execute a Claude Code template with slash command and arguments.
+
+    The caller's model wins; without one the slash command's default from
+    SLASH_COMMAND_MODEL_MAP is used (see routing.py for /implement).
+    """
+    if request.model is None:
+        request = request.model_copy(
+            update={"model": get_model_for_slash_command(request.slash_command)}
+        )
 
     # Construct prompt from slash command and args
     prompt = f"{request.slash_command} {' '.join(request.args)}"
 
+    # The files and symbols the plan names, read ahead (see context_pack.py)
+    context_key = None
+    if request.slash_command == "/implement":
+        from .context_pack import context_pack_enabled, packs_for_args
+        if context_pack_enabled():
+            with span("context_pack") as attrs:
+                context_key, pack = packs_for_args(request.args, request.cwd)
+                attrs.update(key=(context_key or "")[:12], bytes=len(pack.encode("utf-8")))
+            if pack:
+                prompt = f"{prompt}\n\n{pack}"
+
     from .utils import get_project_root
     project_root = get_project_root()
     output_dir = os.path.join(
@@ -207,6 +383,8 @@ def execute_template(request: AgentTemplateRequest) -> AgentPromptResponse:
         model=request.model,
         dangerously_skip_permissions=True,
         output_file=output_file,
+        cwd=request.cwd,
+        context_pack=context_key,
     )
 
     return prompt_claude_code(prompt_request)
@@ -0,0 +1,325 @@
+"""Compressed, deduplicated storage of run artifacts under agents/.
+
+Claude Code transcripts (raw_output.jsonl) are large and repetitive, and
+prompts repeat across retries and phase re-runs. Once an artifact is
+finished it is stored once, by the SHA-256 of its content, under
+agents/objects/, and the path in the run directory becomes a hard link to
+that object:
+
+    agents/objects/3f/3f9a...c1.gz                   gzip-compressed transcript
+    agents/<adw_id>/implementor/raw_output.jsonl.gz  hard link to it
+    agents/<adw_id>/implementor/prompts/implement.txt  hard link (not compressed)
+
+Hard links keep every run directory self-contained (copy it, zcat it,
+delete it) while identical content takes space once. An object whose link
+count has dropped to 1 is referenced by no run and is removed by gc().
+
+Readers go through open_artifact(), which opens path or path + ".gz"
+(whichever exists), so code written for the plain files keeps working.
+Transcripts stay plain while Claude Code writes them, so they can be
+followed live, and are compressed when the run ends. A stored file is
+shared with other runs: replace it (atomic_write), never write into it.
+
+ADWS_ARTIFACT_COMPRESSION=off keeps plain files and skips the object
+store. manage_artifacts.py compacts older runs and applies retention.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, IO, List, Optional
+
+from .utils import get_project_root
+
+COMPRESSED_SUFFIX = ".gz"
+
+# zlib level 6: close to level 9 on JSONL at a fraction of the CPU time
+COMPRESS_LEVEL = 6
+
+# Run directories are named by ADW ID (8 hex characters); everything else
+# under agents/ (queue, metrics, cassettes, objects, ...) is left alone
+RUN_DIR_PATTERN = re.compile(r"^[0-9a-f]{8}$")
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def compression_enabled() -> bool:
+    """Whether finished artifacts are compressed and deduplicated."""
+    return os.getenv("ADWS_ARTIFACT_COMPRESSION", "gzip").strip().lower() != "off"
+
+
+def get_agents_dir() -> str:
+    return os.path.join(get_project_root(), "agents")
+
+
+def get_objects_dir() -> str:
+    return os.path.join(get_agents_dir(), "objects")
+
+
+def resolve_artifact(path: str) -> Optional[str]:
+    """The file holding an artifact: path itself or its compressed form."""
+    if os.path.exists(path):
+        return path
+    if os.path.exists(path + COMPRESSED_SUFFIX):
+        return path + COMPRESSED_SUFFIX
+    return None
+
+
+def open_artifact(path: str, binary: bool = False) -> IO:
+    """Open an artifact for reading, whether or not it has been compressed."""
+    actual = resolve_artifact(path)
+    if actual is None:
+        raise FileNotFoundError(f"Artifact not found: {path}")
+    opener = gzip.open if actual.endswith(COMPRESSED_SUFFIX) else open
+    if binary:
+        return opener(actual, "rb")
+    return opener(actual, "rt", encoding="utf-8")
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _writer_id() -> str:
+    """Unique per process and thread (batch runs store artifacts from threads)."""
+    return f"{os.getpid()}.{threading.get_ident()}"
+
+
+def _write_object(source: str, object_path: str, compress: bool) -> None:
+    """Create an object from source (atomically, so concurrent writers are safe)."""
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    tmp_path = f"{object_path}.{_writer_id()}.tmp"
+    with open(source, "rb") as src, open(tmp_path, "wb") as raw:
+        if compress:
+            # mtime=0 and no file name: identical content gives identical objects
+            with gzip.GzipFile(filename="", mode="wb", fileobj=raw,
+                               compresslevel=COMPRESS_LEVEL, mtime=0) as dst:
+                shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+        else:
+            shutil.copyfileobj(src, raw, _CHUNK_SIZE)
+        raw.flush()
+        os.fsync(raw.fileno())
+    # Keep the source's mtime so retention still sees when the run happened
+    st = os.stat(source)
+    os.utime(tmp_path, (st.st_atime, st.st_mtime))
+    os.replace(tmp_path, object_path)
+
+
+def _link(object_path: str, dest: str) -> None:
+    """Point dest at object_path, replacing dest atomically."""
+    tmp_path = f"{dest}.{_writer_id()}.link"
+    try:
+        os.link(object_path, tmp_path)
+    except OSError:
+        # No hard links here (other filesystem, some network mounts): keep a copy
+        shutil.copyfile(object_path, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def _prepend_stored(path: str) -> None:
+    """Put the content of path + ".gz" in front of path (a log appended to after compaction)."""
+    tmp_path = f"{path}.{_writer_id()}.tmp"
+    with open(tmp_path, "wb") as out:
+        with gzip.open(path + COMPRESSED_SUFFIX, "rb") as old:
+            shutil.copyfileobj(old, out, _CHUNK_SIZE)
+        with open(path, "rb") as new:
+            shutil.copyfileobj(new, out, _CHUNK_SIZE)
+    os.replace(tmp_path, path)
+
+
+def store_artifact(path: str, compress: bool = True, append: bool = False) -> str:
+    """Move a finished artifact into the object store.
+
+    Args:
+        path: Plain file that will not be written again
+        compress: Store gzip-compressed as path + ".gz" (transcripts, logs)
+            or as-is at path (small files such as prompts)
+        append: path continues an earlier stored path + ".gz" (logs of a
+            resumed run) instead of replacing it (a transcript)
+
+    Returns:
+        The path now holding the artifact (unchanged when compression is off)
+    """
+    if not compression_enabled() or not os.path.exists(path):
+        return path
+    if compress and append and os.path.exists(path + COMPRESSED_SUFFIX):
+        _prepend_stored(path)
+    digest = _sha256(path)
+    suffix = COMPRESSED_SUFFIX if compress else ""
+    object_path = os.path.join(get_objects_dir(), digest[:2], digest + suffix)
+    if not os.path.exists(object_path):
+        _write_object(path, object_path, compress)
+
+    dest = path + suffix
+    _link(object_path, dest)
+    if compress:
+        os.remove(path)
+    return dest
+
+
+def is_stored(path: str) -> bool:
+    """Whether a file is already a link into the object store."""
+    try:
+        return os.stat(path).st_nlink > 1
+    except OSError:
+        return False
+
+
+def run_dirs() -> List[str]:
+    """Run directories under agents/, oldest first."""
+    agents_dir = get_agents_dir()
+    if not os.path.isdir(agents_dir):
+        return []
+    dirs = [
+        os.path.join(agents_dir, name) for name in os.listdir(agents_dir)
+        if RUN_DIR_PATTERN.match(name) and os.path.isdir(os.path.join(agents_dir, name))
+    ]
+    return sorted(dirs, key=last_modified)
+
+
+def last_modified(directory: str) -> float:
+    """Newest mtime of any file in a directory tree."""
+    newest = os.path.getmtime(directory)
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+            except OSError:
+                continue
+    return newest
+
+
+def disk_usage(directory: str) -> int:
+    """Bytes used by a directory tree, counting each hard-linked file once."""
+    seen = set()
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            total += st.st_blocks * 512 if hasattr(st, "st_blocks") else st.st_size
+    return total
+
+
+def _is_json_view(directory: str, name: str) -> bool:
+    """A pretty-printed .json copy of a transcript that can be regenerated."""
+    if not name.endswith(".json"):
+        return False
+    return resolve_artifact(os.path.join(directory, name[:-len(".json")] + ".jsonl")) is not None
+
+
+def compact_run(run_dir: str, dry_run: bool = False) -> Dict[str, int]:
+    """Compress and deduplicate the finished artifacts of one run.
+
+    - raw_output*.jsonl and *.log are compressed into the object store
+    - prompts/*.txt are deduplicated (kept uncompressed)
+    - .json views of transcripts are deleted (regenerated on demand)
+    Journals, state and spans are left alone.
+
+    Returns counts of compressed, deduplicated and deleted files and the
+    bytes freed.
+    """
+    stats = {"compressed": 0, "deduplicated": 0, "deleted": 0, "bytes_freed": 0}
+    for root, _, files in os.walk(run_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name.endswith((".tmp", ".link")) or is_stored(path):
+                continue
+            size = os.path.getsize(path)
+            if _is_json_view(root, name):
+                stats["deleted"] += 1
+                stats["bytes_freed"] += size
+                if not dry_run:
+                    os.remove(path)
+            elif (name.startswith("raw_output") and name.endswith(".jsonl")) or name.endswith(".log"):
+                stats["compressed"] += 1
+                if not dry_run:
+                    stored = store_artifact(path, append=name.endswith(".log"))
+                    stats["bytes_freed"] += max(size - os.path.getsize(stored), 0)
+            elif os.path.basename(root) == "prompts" and name.endswith(".txt"):
+                stats["deduplicated"] += 1
+                if not dry_run:
+                    store_artifact(path, compress=False)
+    return stats
+
+
+def compact(older_than_hours: float = 1.0, dry_run: bool = False) -> Dict[str, int]:
+    """Compact every run not modified within older_than_hours."""
+    cutoff = time.time() - older_than_hours * 3600
+    totals = {"runs": 0, "compressed": 0, "deduplicated": 0, "deleted": 0, "bytes_freed": 0}
+    for run_dir in run_dirs():
+        if last_modified(run_dir) > cutoff:
+            continue
+        stats = compact_run(run_dir, dry_run=dry_run)
+        totals["runs"] += 1
+        for key, value in stats.items():
+            totals[key] += value
+    return totals
+
+
+def prune(
+    keep_days: Optional[float] = None,
+    keep_runs: Optional[int] = None,
+    dry_run: bool = False,
+) -> List[str]:
+    """Delete run directories beyond the retention policy.
+
+    A run is deleted when it is older than keep_days AND not among the
+    keep_runs most recent runs (each criterion is skipped when None).
+
+    Returns the deleted (or, with dry_run, deletable) directories.
+    """
+    if keep_days is None and keep_runs is None:
+        return []
+    dirs = run_dirs()
+    protected = set(dirs[-keep_runs:]) if keep_runs else set()
+    cutoff = time.time() - keep_days * 86400 if keep_days is not None else None
+
+    deleted = []
+    for run_dir in dirs:
+        if run_dir in protected:
+            continue
+        if cutoff is not None and last_modified(run_dir) > cutoff:
+            continue
+        deleted.append(run_dir)
+        if not dry_run:
+            shutil.rmtree(run_dir, ignore_errors=True)
+    return deleted
+
+
+def gc(dry_run: bool = False) -> Dict[str, int]:
+    """Remove objects no run links to any more."""
+    stats = {"objects": 0, "removed": 0, "bytes_freed": 0}
+    stale = time.time() - 3600
+    objects_dir = get_objects_dir()
+    if not os.path.isdir(objects_dir):
+        return stats
+    for root, _, files in os.walk(objects_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            stats["objects"] += 1
+            # Temp files of a writer that crashed over an hour ago are garbage too
+            if name.endswith(".tmp"):
+                unreferenced = st.st_mtime < stale
+            else:
+                unreferenced = st.st_nlink == 1
+            if unreferenced:
+                stats["removed"] += 1
+                stats["bytes_freed"] += st.st_size
+                if not dry_run:
+                    os.remove(path)
+    return stats
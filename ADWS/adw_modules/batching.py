@@ -0,0 +1,175 @@
+"""Micro-task batching: several small plans in one /implement session.
+
+For a tiny plan, starting Claude Code (CLI start, loading context, finding
+its way around the project) takes about as long as the work itself. The
+phase scheduler groups ready, independent plans that fit BATCH_LIMITS into
+one session and attributes the outcome back to each plan:
+
+- the agent ends with a "<task_id>: done|failed" line per plan
+- each plan's validation commands run separately after the session
+- the session's duration and cost are split by plan size
+
+Every plan keeps its own ADW ID, state and tracker entry. Plans that fail
+in the batch (all of them, if the session itself fails) are retried one at
+a time through routing.implement_plan, with the usual escalation.
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .agent import execute_template
+from .data_types import AgentPromptResponse, AgentTemplateRequest
+from .durations import plan_features, record_run
+from .metrics import get_metrics
+from .routing import MODEL_LADDER, implement_plan, route_plan
+from .state import ADWState
+from .validation import run_validation
+
+# Largest plan that is batched with others (06_01, 06_07 and 05_02 fit)
+BATCH_LIMITS: Dict[str, int] = {"total_steps": 6, "plan_bytes": 10000}
+
+# Plans per session when batching is switched on without a size
+DEFAULT_BATCH_SIZE = 4
+
+# "05_05: done" lines the agent ends a batched session with
+REPORT_PATTERN = re.compile(r"^\W*(\d{2}_\d{2})\W*:\s*(done|failed)\b", re.IGNORECASE | re.MULTILINE)
+
+
+def get_batch_size() -> int:
+    """Plans per /implement session (ADWS_BATCH_SIZE; 0, 1 or invalid disables batching)."""
+    try:
+        return int(os.getenv("ADWS_BATCH_SIZE", "0") or 0)
+    except ValueError:
+        return 0
+
+
+def is_small_plan(task: Dict[str, Any]) -> bool:
+    """True if the plan fits BATCH_LIMITS (task: parse_plan_metadata dict with plan_file)."""
+    features = plan_features(task["plan_file"], task)
+    return all(features.get(name, 0) <= limit for name, limit in BATCH_LIMITS.items())
+
+
+def select_batch(
+    first: Dict[str, Any],
+    candidates: Iterable[Dict[str, Any]],
+    completed: Iterable[str],
+    dep_map: Dict[str, List[str]],
+    size: int,
+) -> List[Dict[str, Any]]:
+    """first plus later small plans that are ready now, up to size plans.
+
+    A candidate is ready when all its dependencies (from the map and the
+    plan) are completed, which also keeps plans that depend on each other
+    out of the same batch.
+    """
+    batch = [first]
+    if size < 2 or not is_small_plan(first):
+        return batch
+    completed = set(completed)
+    for task in candidates:
+        if len(batch) >= size:
+            break
+        if task["task_id"] == first["task_id"] or not is_small_plan(task):
+            continue
+        deps = set(dep_map.get(task["task_id"], [])) | set(task.get("depends_on", []))
+        if deps <= completed:
+            batch.append(task)
+    return batch
+
+
+def batch_instructions(task_ids: List[str]) -> str:
+    """Trailing /implement argument telling the agent how to report per plan."""
+    example = ", ".join(f"`{tid}: done`" for tid in task_ids[:2])
+    return (f"-- These are {len(task_ids)} independent plans; implement them one after another. "
+            f"End with one line per plan saying whether it is finished, e.g. {example} "
+            f"(or `<task_id>: failed`).")
+
+
+def parse_batch_report(output: str, task_ids: List[str]) -> Dict[str, str]:
+    """Outcome per task ID reported by the agent (the last line for a task wins)."""
+    outcomes: Dict[str, str] = {}
+    for task_id, outcome in REPORT_PATTERN.findall(output or ""):
+        if task_id in task_ids:
+            outcomes[task_id] = outcome.lower()
+    return outcomes
+
+
+def implement_batch(
+    batch_id: str,
+    tasks: List[Dict[str, Any]],
+    states: Dict[str, ADWState],
+    loggers: Dict[str, logging.Logger],
+    logger: logging.Logger,
+    model: Optional[str] = None,
+    validate: bool = True,
+) -> Dict[str, AgentPromptResponse]:
+    """Implement several plans in one session; returns a response per task ID.
+
+    The session runs on the strongest model any of the plans is routed to,
+    under agents/{batch_id}/batch_implementor/. A plan reported as failed,
+    or whose validation fails, is retried on its own.
+    """
+    task_ids = [t["task_id"] for t in tasks]
+    decisions = {t["task_id"]: route_plan(t["task_id"], t["plan_file"], t, model=model) for t in tasks}
+    batch_model = max((d.model for d in decisions.values()), key=MODEL_LADDER.index)
+    logger.info(f"Executing /implement on {batch_model} for {len(tasks)} plans: {', '.join(task_ids)}")
+    for task_id in task_ids:
+        states[task_id].update(batch_session=batch_id, model=batch_model)
+        states[task_id].save("batch_started")
+
+    request = AgentTemplateRequest(
+        agent_name="batch_implementor",
+        slash_command="/implement",
+        args=[t["plan_file"] for t in tasks] + [batch_instructions(task_ids)],
+        adw_id=batch_id,
+        model=batch_model,
+    )
+    started = time.monotonic()
+    response = execute_template(request)
+    duration = time.monotonic() - started
+    reported = parse_batch_report(response.output, task_ids) if response.success else {}
+
+    # Duration and cost are split by plan size
+    sizes = {t["task_id"]: max(plan_features(t["plan_file"], t).get("plan_bytes", 0), 1) for t in tasks}
+    total_size = sum(sizes.values())
+
+    results: Dict[str, AgentPromptResponse] = {}
+    retry: List[Dict[str, Any]] = []
+    for task in tasks:
+        task_id, state = task["task_id"], states[task_id]
+        share = sizes[task_id] / total_size
+        if response.resource_usage:
+            state.add_resource_usage("batch_implementor", response.resource_usage.model_dump())
+
+        outcome = "completed" if response.success and reported.get(task_id) != "failed" else "failed"
+        commands = (task.get("validation_commands") or []) if validate else []
+        if outcome == "completed" and commands:
+            loggers[task_id].info(f"Running {len(commands)} validation command(s) for {task_id}...")
+            validation = run_validation(commands)
+            state.update(validation_results=[])
+            for result in validation:
+                state.add_validation_result(**result.model_dump())
+            if not all(r.passed for r in validation):
+                outcome = "validation_failed"
+
+        record_run(task_id, task["plan_file"], task, batch_model, duration * share, outcome, state.adw_id)
+        get_metrics().inc("adws_batch_plans_total", model=batch_model, outcome=outcome)
+        state.save("batch_finished")
+        if outcome == "completed":
+            cost = response.cost_usd * share if response.cost_usd is not None else None
+            results[task_id] = response.model_copy(update={"cost_usd": cost})
+            loggers[task_id].info(f"{task_id} completed in batch {batch_id}")
+        else:
+            retry.append(task)
+
+    for task in retry:
+        task_id = task["task_id"]
+        loggers[task_id].warning(f"{task_id} did not complete in batch {batch_id}; retrying on its own")
+        results[task_id], _ = implement_plan(
+            states[task_id].adw_id, task["plan_file"], task_id, task, states[task_id],
+            loggers[task_id], model=model, validate=validate,
+        )
+    return results
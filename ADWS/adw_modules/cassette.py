@@ -0,0 +1,243 @@
+"""Record/replay cassettes for Claude Code runs.
+
+With ADWS_CASSETTE_MODE=record, every Claude Code run is streamed through
+a recorder that keeps the stream-json transcript with per-line timing, the
+exit code, stderr and the git diff the agent left in the working tree.
+With ADWS_CASSETTE_MODE=replay the recorded transcript is fed back instead
+of starting Claude Code, so parsers, schedulers and state handling can be
+exercised deterministically; whole phases replay in seconds.
+
+Modes (ADWS_CASSETTE_MODE):
+    off     run Claude Code normally (default)
+    record  run Claude Code and record a cassette (replacing any existing one)
+    replay  replay the cassette; a missing cassette fails the run
+    auto    replay when a cassette exists, record otherwise
+
+Cassettes are keyed by model and prompt, so the same /implement of the
+same plan maps to the same cassette across ADW IDs. Each is a directory
+under ADWS_CASSETTE_DIR (default agents/cassettes):
+
+    <key>/cassette.json   prompt, model, exit code, stderr, timing
+    <key>/stream.jsonl    the transcript, byte for byte
+    <key>/changes.patch   git diff of the changes made during the run
+
+Replay speed is ADWS_CASSETTE_SPEED: 1 replays with the original timing,
+10 ten times faster, 0 (default) as fast as possible. Set
+ADWS_CASSETTE_APPLY_DIFF=1 to also apply the recorded diff on replay.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_types import ResourceUsage
+from .resources import spawn, get_limits
+from .utils import get_project_root, atomic_write
+
+CASSETTE_MODES = ("off", "record", "replay", "auto")
+
+CASSETTE_VERSION = 1
+
+# ADWS's own output (logs, state, cassettes) is not part of an agent's changes
+DIFF_PATHSPEC = ["--", ".", ":(exclude)agents"]
+
+
+def get_cassette_mode() -> str:
+    """Configured cassette mode (unknown values count as off)."""
+    mode = os.getenv("ADWS_CASSETTE_MODE", "off").strip().lower()
+    return mode if mode in CASSETTE_MODES else "off"
+
+
+def get_cassette_dir() -> str:
+    """Cassette directory (override with ADWS_CASSETTE_DIR)."""
+    return os.getenv("ADWS_CASSETTE_DIR", os.path.join(get_project_root(), "agents", "cassettes"))
+
+
+def get_replay_speed() -> float:
+    """Replay speed factor; 0 means no delays."""
+    try:
+        return max(float(os.getenv("ADWS_CASSETTE_SPEED", "0")), 0.0)
+    except ValueError:
+        return 0.0
+
+
+def cassette_key(prompt: str, model: str) -> str:
+    """Cassette key for a prompt run with a model."""
+    return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+def cassette_path(prompt: str, model: str) -> str:
+    """Directory of the cassette for a prompt and model."""
+    return os.path.join(get_cassette_dir(), cassette_key(prompt, model))
+
+
+def has_cassette(prompt: str, model: str) -> bool:
+    """Whether a complete cassette exists for a prompt and model."""
+    return os.path.exists(os.path.join(cassette_path(prompt, model), "cassette.json"))
+
+
+def _git(args: List[str], cwd: str) -> Optional[str]:
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def _untracked_files(cwd: str) -> List[str]:
+    output = _git(["ls-files", "--others", "--exclude-standard", *DIFF_PATHSPEC], cwd)
+    return output.splitlines() if output else []
+
+
+def snapshot_worktree(cwd: str) -> Dict[str, Any]:
+    """Capture the working tree before a run so its own changes can be diffed.
+
+    `git stash create` records tracked changes as a commit without touching
+    the working tree or the stash list; it prints nothing when the tree is clean.
+    """
+    head = (_git(["rev-parse", "HEAD"], cwd) or "").strip() or None
+    stash = (_git(["stash", "create"], cwd) or "").strip() or None
+    return {"head": head, "base": stash or head, "untracked": set(_untracked_files(cwd))}
+
+
+def diff_since(snapshot: Dict[str, Any], cwd: str) -> str:
+    """Git diff of the changes made since snapshot_worktree(), including new files."""
+    if not snapshot["base"]:
+        return ""
+    patch = _git(["diff", "--binary", snapshot["base"], *DIFF_PATHSPEC], cwd) or ""
+    for path in _untracked_files(cwd):
+        if path in snapshot["untracked"]:
+            continue
+        # --no-index exits 1 when the files differ, which they always do here
+        result = subprocess.run(
+            ["git", "diff", "--binary", "--no-index", "/dev/null", path],
+            cwd=cwd, capture_output=True, text=True,
+        )
+        patch += result.stdout
+    return patch
+
+
+def record(
+    cmd: List[str],
+    env: Dict[str, str],
+    output_file: str,
+    prompt: str,
+    model: str,
+    agent_name: str,
+    cwd: Optional[str] = None,
+) -> Tuple[int, str, ResourceUsage]:
+    """Run Claude Code, stream its output to output_file and record a cassette.
+
+    Returns (returncode, stderr, resource usage) like the unrecorded run.
+    Claude Code runs in cwd (default: inherited); the diff is taken there,
+    or in the project root.
+    """
+    repo_dir = cwd or get_project_root()
+    snapshot = snapshot_worktree(repo_dir)
+    final_dir = cassette_path(prompt, model)
+    os.makedirs(os.path.dirname(final_dir), exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(final_dir)}.", dir=os.path.dirname(final_dir))
+
+    try:
+        offsets = []
+        started = time.monotonic()
+        with tempfile.TemporaryFile(mode="w+") as stderr_file, \
+                open(output_file, "w") as out, \
+                open(os.path.join(work_dir, "stream.jsonl"), "w") as tape:
+            # stderr goes to a file so a chatty stderr can't block the stdout pipe
+            child = spawn(cmd, "claude", limits=get_limits(), stdout=subprocess.PIPE,
+                          stderr=stderr_file, text=True, env=env, cwd=cwd)
+            for line in child.process.stdout:
+                offsets.append(round(time.monotonic() - started, 3))
+                out.write(line)
+                tape.write(line)
+            child.process.stdout.close()
+            usage = child.wait()
+            returncode = usage.exit_code
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+        duration = time.monotonic() - started
+
+        patch = diff_since(snapshot, repo_dir)
+        with open(os.path.join(work_dir, "changes.patch"), "w") as f:
+            f.write(patch)
+        atomic_write(os.path.join(work_dir, "cassette.json"), json.dumps({
+            "version": CASSETTE_VERSION,
+            "key": cassette_key(prompt, model),
+            "prompt": prompt,
+            "model": model,
+            "agent_name": agent_name,
+            "returncode": returncode,
+            "stderr": stderr,
+            "duration": duration,
+            "offsets": offsets,
+            "git_head": snapshot["head"],
+            "changed_files": sum(1 for line in patch.splitlines() if line.startswith("diff --git ")),
+            "recorded_at": datetime.now().isoformat(),
+        }, indent=2))
+
+        # Swap the finished cassette in so readers never see a half-written one
+        if os.path.exists(final_dir):
+            shutil.rmtree(final_dir)
+        os.rename(work_dir, final_dir)
+    except BaseException:
+        # Interrupted or failed: leave no half-written cassette behind
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    print(f"Recorded cassette: {final_dir}")
+    return returncode, stderr, usage
+
+
+def replay(prompt: str, model: str, output_file: str) -> Tuple[int, str]:
+    """Write a recorded transcript to output_file at the configured speed.
+
+    Returns the recorded (returncode, stderr). Raises FileNotFoundError if
+    there is no cassette for the prompt and model.
+    """
+    directory = cassette_path(prompt, model)
+    with open(os.path.join(directory, "cassette.json"), "r") as f:
+        meta = json.load(f)
+
+    speed = get_replay_speed()
+    offsets = meta.get("offsets") or []
+    started = time.monotonic()
+    with open(os.path.join(directory, "stream.jsonl"), "r") as tape, open(output_file, "w") as out:
+        for i, line in enumerate(tape):
+            if speed and i < len(offsets):
+                delay = offsets[i] / speed - (time.monotonic() - started)
+                if delay > 0:
+                    out.flush()
+                    time.sleep(delay)
+            out.write(line)
+    if speed and meta.get("duration"):
+        remaining = meta["duration"] / speed - (time.monotonic() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    if os.getenv("ADWS_CASSETTE_APPLY_DIFF") == "1":
+        apply_changes(directory)
+
+    print(f"Replayed cassette: {directory}")
+    return meta["returncode"], meta.get("stderr", "")
+
+
+def apply_changes(directory: str) -> bool:
+    """Apply a cassette's recorded diff to the working tree."""
+    patch_file = os.path.join(directory, "changes.patch")
+    if not os.path.exists(patch_file) or os.path.getsize(patch_file) == 0:
+        return True
+    result = subprocess.run(
+        ["git", "apply", "--binary", "--whitespace=nowarn", patch_file],
+        cwd=get_project_root(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(f"Warning: Could not apply cassette diff: {result.stderr.strip()}", file=sys.stderr)
+        return False
+    return True
@@ -0,0 +1,420 @@
+"""Context packs: what a plan names, read ahead for the /implement agent.
+
+/implement only receives the plan's path, so an agent spends its first
+minutes finding the files the plan already names. With ADWS_CONTEXT_PACK=1
+(--context-pack on run_task.py, run_phase.py and run_pipeline.py),
+execute_template() appends a pack built from the plan to every /implement
+prompt:
+
+- files the plan names (paths, plus relative and @/ imports): short files
+  whole, longer ones as their first lines and signatures (exports,
+  functions, classes, types, SQL objects); files it will create are listed
+- where the symbols it mentions (`backticked` names, imported names) are
+  defined in the project
+- tests next to the named files (Foo.test.ts, test_foo.py, ...) with the
+  names of their test cases
+
+A pack is capped at CONTEXT_PACK_MAX_BYTES and cached under
+agents/context/<sha256>.md, keyed by the plan, the files it names and the
+HEAD commit, so resumed runs and escalations reuse it.
+
+Every /implement run, with or without a pack, records its time to first
+edit (the first Edit / Write tool call, seen while the transcript is
+written), the tool calls before it, tokens and cost in the context_runs
+table of the duration history; context_report.py compares the two.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .durations import get_history_path
+from .live import TranscriptTail
+from .plan_steps import IMPORT_ALIASES, IMPORT_PATTERN, split_plan, step_files
+from .routing import FILE_PATTERN
+from .utils import atomic_write, get_project_root
+
+# Size limit of one pack; sections that don't fit are left out
+CONTEXT_PACK_MAX_BYTES = 24000
+
+# Files up to this many lines go into the pack whole
+EXCERPT_LINES = 80
+
+# Lines from the top of a longer file (imports, module docstring)
+HEAD_LINES = 15
+
+# Signature lines per longer file
+MAX_SIGNATURES = 40
+
+# Symbols looked up per plan, and definitions shown per symbol
+MAX_SYMBOLS = 20
+MAX_DEFINITIONS = 2
+
+# Test names shown per related test file
+MAX_TEST_NAMES = 15
+
+# Tool calls that count as the agent's first edit
+EDIT_TOOLS = {"Edit", "MultiEdit", "Write", "NotebookEdit"}
+
+SIGNATURE = re.compile(
+    r"^\s*(?:export\s|(?:async\s+)?function\s|(?:abstract\s+)?class\s|interface\s|type\s+\w+|enum\s"
+    r"|(?:async\s+)?def\s|create\s|alter\s)",
+    re.IGNORECASE,
+)
+BACKTICK_SYMBOL = re.compile(r"`([A-Za-z_$][\w$]{2,})(?:\(\))?`")
+IMPORT_NAMES = re.compile(r"import\s+(?:type\s+)?\{([^}]*)\}\s*from")
+TEST_NAME = re.compile(r"""^\s*(?:(?:describe|it|test|Deno\.test)\s*\(\s*['"`]([^'"`]+)|def\s+(test_\w+))""")
+
+# Words in backticks that are not project symbols
+COMMON_WORDS = {
+    "true", "false", "null", "undefined", "None", "True", "False", "string", "number", "boolean",
+    "async", "await", "return", "const", "function", "class", "interface", "type", "export",
+    "import", "select", "insert", "update", "delete", "from", "where", "npm", "npx", "deno",
+    "supabase", "python", "bash", "json", "yaml", "text", "uuid", "jsonb", "timestamptz",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS context_runs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    adw_id        TEXT,
+    agent_name    TEXT,
+    plan_file     TEXT,
+    model         TEXT,
+    context_pack  TEXT,
+    pack_bytes    INTEGER NOT NULL DEFAULT 0,
+    first_edit_seconds REAL,
+    tool_calls_before_edit INTEGER NOT NULL DEFAULT 0,
+    duration      REAL NOT NULL,
+    success       INTEGER NOT NULL,
+    input_tokens  INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+    cost_usd      REAL,
+    recorded_at   REAL
+);
+"""
+
+
+def context_pack_enabled() -> bool:
+    """True when /implement prompts carry a context pack (ADWS_CONTEXT_PACK)."""
+    return os.getenv("ADWS_CONTEXT_PACK") == "1"
+
+
+def get_context_dir() -> str:
+    """Directory of cached packs: agents/context/."""
+    return os.path.join(get_project_root(), "agents", "context")
+
+
+def _git(args: List[str], cwd: str) -> Optional[str]:
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def extract_references(content: str) -> Tuple[List[str], List[str]]:
+    """(project paths, symbol names) a plan mentions, in order of appearance."""
+    preamble, steps = split_plan(content)
+    paths = list(dict.fromkeys(FILE_PATTERN.findall(preamble)))
+    for spec in IMPORT_PATTERN.findall(preamble):
+        alias = next((a for a in IMPORT_ALIASES if spec.startswith(a)), None)
+        if alias:
+            paths.append(IMPORT_ALIASES[alias] + spec[len(alias):])
+    for step in steps:
+        paths.extend(step_files(step))
+
+    symbols = []
+    for names in IMPORT_NAMES.findall(content):
+        for name in names.split(","):
+            name = name.strip().split(" as ")[0].replace("type ", "").strip()
+            if name:
+                symbols.append(name)
+    symbols.extend(BACKTICK_SYMBOL.findall(content))
+    symbols = [s for s in dict.fromkeys(symbols) if s not in COMMON_WORDS]
+    return list(dict.fromkeys(paths)), symbols[:MAX_SYMBOLS]
+
+
+def _resolve(path: str, root: str) -> Optional[str]:
+    """Project-relative path of a named file; imports often leave out the extension."""
+    if os.path.isfile(os.path.join(root, path)):
+        return path
+    for ext in (".ts", ".tsx", ".vue", ".js", "/index.ts"):
+        if os.path.isfile(os.path.join(root, path + ext)):
+            return path + ext
+    return None
+
+
+def excerpt(text: str) -> str:
+    """The whole file if it is short, else its first lines and signatures with line numbers."""
+    lines = text.splitlines()
+    if len(lines) <= EXCERPT_LINES:
+        return text.rstrip()
+    signatures = [f"{n:>5}: {line.rstrip()}" for n, line in enumerate(lines, 1)
+                  if n > HEAD_LINES and SIGNATURE.match(line)][:MAX_SIGNATURES]
+    return "\n".join(
+        [line.rstrip() for line in lines[:HEAD_LINES]]
+        + [f"... ({len(lines)} lines; signatures below)"] + signatures
+    )
+
+
+def find_definitions(symbols: List[str], root: str) -> Dict[str, List[str]]:
+    """'path:line: definition' for each symbol defined in the project."""
+    if not symbols:
+        return {}
+    names = "|".join(re.escape(s) for s in symbols)
+    pattern = (r"^\s*(export\s+)?(default\s+)?(declare\s+)?(async\s+)?"
+               rf"(function|class|interface|type|enum|const|let|def)\s+({names})\b")
+    output = _git(["grep", "-n", "-I", "-E", pattern, "--", ".", ":(exclude)*.md",
+                   ":(exclude)agents"], root) or ""
+    definitions: Dict[str, List[str]] = {}
+    for line in output.splitlines():
+        path, _, rest = line.partition(":")
+        number, _, code = rest.partition(":")
+        match = re.search(rf"\b({names})\b", code)
+        if match and len(definitions.setdefault(match.group(1), [])) < MAX_DEFINITIONS:
+            definitions[match.group(1)].append(f"{path}:{number}: {code.strip()[:200]}")
+    return definitions
+
+
+def find_tests(paths: List[str], root: str) -> Dict[str, List[str]]:
+    """Test files next to the named files, with the names of their test cases."""
+    tracked = (_git(["ls-files"], root) or "").splitlines()
+    stems = {os.path.splitext(os.path.basename(p))[0] for p in paths}
+    tests: Dict[str, List[str]] = {}
+    for name in tracked:
+        base = os.path.basename(name)
+        if name in paths or not any(
+            base.startswith((f"{stem}.test.", f"{stem}.spec.", f"{stem}_test.", f"test_{stem}.py"))
+            for stem in stems
+        ):
+            continue
+        text = _read(os.path.join(root, name)) or ""
+        found = [m.group(1) or m.group(2) for m in map(TEST_NAME.match, text.splitlines()) if m]
+        tests[name] = found[:MAX_TEST_NAMES]
+    return tests
+
+
+def pack_key(plan_text: str, paths: List[str], root: str) -> str:
+    """Cache key: the plan, the content of the files it names and the HEAD commit."""
+    digest = hashlib.sha256(plan_text.encode("utf-8"))
+    digest.update((_git(["rev-parse", "HEAD"], root) or "").encode())
+    for path in sorted(paths):
+        resolved = _resolve(path, root)
+        content = _read(os.path.join(root, resolved)) if resolved else None
+        digest.update(f"\0{path}\0".encode("utf-8"))
+        digest.update(content.encode("utf-8") if content is not None else b"-")
+    return digest.hexdigest()
+
+
+def build_context_pack(plan_file: str, plan_text: str, root: str) -> str:
+    """Markdown pack for one plan, at most CONTEXT_PACK_MAX_BYTES."""
+    paths, symbols = extract_references(plan_text)
+    existing = {p: r for p in paths for r in [_resolve(p, root)] if r}
+    new_files = [p for p in paths if p not in existing]
+
+    sections, whole = [], set()
+    for resolved in dict.fromkeys(existing.values()):
+        text = _read(os.path.join(root, resolved))
+        if text is not None:
+            sections.append(f"### {resolved}\n```\n{excerpt(text)}\n```")
+            if len(text.splitlines()) <= EXCERPT_LINES:
+                whole.add(resolved)
+    # Definitions in files shown whole are already in the pack
+    definitions = {name: kept for name, found in find_definitions(symbols, root).items()
+                   for kept in [[d for d in found if d.split(":", 1)[0] not in whole]] if kept}
+    if definitions:
+        sections.append("### Symbols\n" + "\n".join(
+            f"- `{name}`: " + "; ".join(f"`{d}`" for d in found) for name, found in definitions.items()))
+    tests = find_tests(list(existing.values()), root)
+    if tests:
+        sections.append("### Related tests\n" + "\n".join(
+            f"- {name}" + (": " + ", ".join(found) if found else "") for name, found in tests.items()))
+    if new_files:
+        sections.append("### Files the plan creates (not in the tree yet)\n"
+                        + "\n".join(f"- {p}" for p in new_files))
+
+    header = (f"## Context pack for {os.path.basename(plan_file)}\n"
+              f"Read ahead by ADWS from the files and symbols the plan names, as of this run's "
+              f"tree. Use it instead of searching for them; read a file in full only when you "
+              f"need more than is shown.\n")
+    pack, left_out = header, 0
+    for section in sections:
+        if len(pack.encode("utf-8")) + len(section.encode("utf-8")) + 2 > CONTEXT_PACK_MAX_BYTES:
+            left_out += 1
+            continue
+        pack += "\n" + section + "\n"
+    if left_out:
+        pack += f"\n({left_out} section(s) left out to keep the pack small)\n"
+    return pack
+
+
+def get_context_pack(plan_file: str, root: Optional[str] = None) -> Tuple[str, str]:
+    """(cache key, pack) for a plan, built once per key under agents/context/."""
+    root = root or get_project_root()
+    with open(plan_file, "r", encoding="utf-8") as f:
+        plan_text = f.read()
+    key = pack_key(plan_text, extract_references(plan_text)[0], root)
+    path = os.path.join(get_context_dir(), f"{key}.md")
+    cached = _read(path)
+    if cached is not None:
+        return key, cached
+    pack = build_context_pack(plan_file, plan_text, root)
+    os.makedirs(get_context_dir(), exist_ok=True)
+    atomic_write(path, pack)
+    return key, pack
+
+
+def packs_for_args(args: List[str], cwd: Optional[str] = None) -> Tuple[Optional[str], str]:
+    """(key, packs) for the plan files among /implement arguments; (None, '') without any.
+
+    Plans are read from the project root, the files they name from cwd (a
+    worktree) when given. Several plans (a batch) share one combined key.
+    """
+    keys, packs = [], []
+    for arg in args:
+        plan_file = arg if os.path.isabs(arg) else os.path.join(get_project_root(), arg)
+        if not arg.endswith(".md") or not os.path.isfile(plan_file):
+            continue
+        key, pack = get_context_pack(plan_file, cwd)
+        keys.append(key)
+        packs.append(pack)
+    if not keys:
+        return None, ""
+    return (keys[0] if len(keys) == 1
+            else hashlib.sha256("".join(keys).encode()).hexdigest()), "\n".join(packs)
+
+
+class FirstEditWatch(threading.Thread):
+    """Notes when an agent makes its first edit, from its transcript as it is written."""
+
+    def __init__(self, output_file: str, poll_seconds: float = 0.25):
+        super().__init__(daemon=True)
+        self.output_file = output_file
+        self.poll_seconds = poll_seconds
+        self.tail = TranscriptTail(output_file)
+        # A plain transcript already there is an earlier run's until this run rewrites it
+        self.stale = self._identity()
+        self.started = time.monotonic()
+        self.stopped = threading.Event()
+        self.first_edit_seconds: Optional[float] = None
+        self.tool_calls_before_edit = 0
+
+    def run(self) -> None:
+        while self.first_edit_seconds is None and not self.stopped.is_set():
+            self._read()
+            self.stopped.wait(self.poll_seconds)
+
+    def _identity(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.output_file)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _read(self) -> None:
+        # A compressed transcript is an earlier run's; this run writes the plain file
+        current = self._identity()
+        if current is None:
+            return
+        if self.stale is not None:
+            inode, size, mtime = self.stale
+            if current[0] == inode and current[1] >= size and current[2] == mtime:
+                return
+            # Recreated, truncated or rewritten: everything in it is this run's
+            self.stale = None
+        for line in self.tail.read_lines():
+            if b'"tool_use"' not in line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("type") != "assistant":
+                continue
+            for block in (message.get("message") or {}).get("content") or []:
+                if not isinstance(block, dict) or block.get("type") != "tool_use":
+                    continue
+                if block.get("name") in EDIT_TOOLS:
+                    self.first_edit_seconds = round(time.monotonic() - self.started, 3)
+                    return
+                self.tool_calls_before_edit += 1
+
+    def stop(self) -> None:
+        """Stop watching; lines written since the last poll are still read."""
+        self.stopped.set()
+        self.join()
+        if self.first_edit_seconds is None:
+            self._read()
+
+
+def record_context_run(
+    adw_id: str,
+    agent_name: str,
+    plan_file: Optional[str],
+    model: str,
+    context_key: Optional[str],
+    watch: FirstEditWatch,
+    duration: float,
+    success: bool,
+    result_message: Optional[Dict[str, Any]],
+) -> None:
+    """Log one /implement run for context_report.py; best-effort like the duration history."""
+    usage = (result_message or {}).get("usage") or {}
+    pack_bytes = 0
+    if context_key:
+        try:
+            pack_bytes = os.path.getsize(os.path.join(get_context_dir(), f"{context_key}.md"))
+        except OSError:
+            pass
+    try:
+        os.makedirs(os.path.dirname(get_history_path()), exist_ok=True)
+        conn = sqlite3.connect(get_history_path(), timeout=30, isolation_level=None)
+        try:
+            conn.executescript(SCHEMA)
+            conn.execute(
+                """INSERT INTO context_runs
+                   (adw_id, agent_name, plan_file, model, context_pack, pack_bytes,
+                    first_edit_seconds, tool_calls_before_edit, duration, success, input_tokens,
+                    output_tokens, cache_read_tokens, cache_creation_tokens, cost_usd, recorded_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (adw_id, agent_name, plan_file, model, context_key, pack_bytes,
+                 watch.first_edit_seconds, watch.tool_calls_before_edit, duration, int(success),
+                 usage.get("input_tokens") or 0, usage.get("output_tokens") or 0,
+                 usage.get("cache_read_input_tokens") or 0, usage.get("cache_creation_input_tokens") or 0,
+                 (result_message or {}).get("total_cost_usd"), time.time()),
+            )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: Could not record context run: {e}")
+
+
+def context_runs(since: Optional[float] = None) -> List[sqlite3.Row]:
+    """Logged /implement runs, oldest first."""
+    if not os.path.exists(get_history_path()):
+        return []
+    conn = sqlite3.connect(get_history_path(), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.executescript(SCHEMA)
+        return conn.execute(
+            "SELECT * FROM context_runs WHERE recorded_at >= ? ORDER BY id", (since or 0,)
+        ).fetchall()
+    finally:
+        conn.close()
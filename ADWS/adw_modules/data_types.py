@@ -1,7 +1,7 @@
 """Data types for SecureDealAI ADW system."""
 
 from datetime import datetime
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict, Any
 from pydantic import BaseModel, Field
 
 # Task status states
@@ -61,6 +61,24 @@ class GitHubIssue(BaseModel):
         populate_by_name = True
 
 
+class GitHubApiResponse(BaseModel):
+    """Raw GitHub REST API response (used for conditional polling)."""
+
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+
+    @property
+    def etag(self) -> Optional[str]:
+        """ETag header to send back as If-None-Match on the next request."""
+        return self.headers.get("etag")
+
+    @property
+    def not_modified(self) -> bool:
+        """True when the server answered 304 Not Modified."""
+        return self.status == 304
+
+
 # ============================================================================
 # ADW Types
 # ============================================================================
@@ -75,6 +93,9 @@ SlashCommand = Literal[
     "/feature",
 ]
 
+# Claude models, cheapest first (see routing.MODEL_LADDER)
+ModelName = Literal["haiku", "sonnet", "opus"]
+
 
 class AgentPromptRequest(BaseModel):
     """Claude Code agent prompt configuration."""
@@ -82,9 +103,33 @@ class AgentPromptRequest(BaseModel):
     prompt: str
     adw_id: str
     agent_name: str = "implementor"
-    model: Literal["sonnet", "opus"] = "sonnet"
+    model: ModelName = "sonnet"
     dangerously_skip_permissions: bool = False
     output_file: str
+    cwd: Optional[str] = None  # working directory of Claude Code (default: inherited)
+    context_pack: Optional[str] = None  # cache key of the context pack in the prompt
+
+
+class ResourceUsage(BaseModel):
+    """Resources consumed by one child process (and its descendants)."""
+
+    command: str
+    exit_code: int
+    wall_seconds: float
+    user_cpu_seconds: float = 0.0
+    sys_cpu_seconds: float = 0.0
+    max_rss_mb: float = 0.0
+    block_input: int = 0  # ru_inblock: filesystem reads (512-byte blocks)
+    block_output: int = 0  # ru_oublock: filesystem writes
+    limit_exceeded: Optional[Literal["rss", "cpu", "wall"]] = None
+
+
+class ResourceLimits(BaseModel):
+    """Limits after which a child process is killed (None = unlimited)."""
+
+    max_rss_mb: Optional[float] = None
+    max_cpu_seconds: Optional[float] = None
+    max_wall_seconds: Optional[float] = None
 
 
 class AgentPromptResponse(BaseModel):
@@ -93,6 +138,9 @@ class AgentPromptResponse(BaseModel):
     output: str
     success: bool
     session_id: Optional[str] = None
+    resource_usage: Optional[ResourceUsage] = None
+    cost_usd: Optional[float] = None
+    first_edit_seconds: Optional[float] = None  # /implement runs: time to the first Edit / Write
 
 
 class AgentTemplateRequest(BaseModel):
@@ -102,7 +150,80 @@ class AgentTemplateRequest(BaseModel):
     slash_command: SlashCommand
     args: List[str]
     adw_id: str
-    model: Literal["sonnet", "opus"] = "sonnet"
+    model: Optional[ModelName] = None  # None: the slash command's default model
+    cwd: Optional[str] = None  # working directory of Claude Code (default: inherited)
+
+
+class WatchJob(BaseModel):
+    """A run_issue job dispatched by the issue watcher."""
+
+    issue_url: str
+    issue_number: int
+    repo_path: str
+    plan_file: str
+    comment_id: Optional[str] = None
+    requested_by: Optional[str] = None
+
+
+class DurationEstimate(BaseModel):
+    """Predicted duration of a task or phase, in seconds."""
+
+    seconds: float
+    low: float
+    high: float
+    confidence: Literal["high", "medium", "low", "none"]
+    basis: str  # task_history, step_rate or default
+    samples: int = 0
+
+
+class RoutingDecision(BaseModel):
+    """The model picked for one /implement attempt, and why."""
+
+    model: ModelName
+    reason: Literal["pinned", "static", "complexity", "history", "explore", "escalation"]
+    attempt: int = 1
+    tier: ModelName  # model the plan's size alone points to
+    features: Dict[str, int] = Field(default_factory=dict)
+    success_rate: Optional[float] = None  # of similar plans on this model
+    samples: int = 0
+    decision_id: Optional[int] = None  # row in the routing table
+
+
+class PlanStep(BaseModel):
+    """One "### Step N" section of a plan, for step-level parallelism."""
+
+    number: int
+    title: str
+    body: str
+    files: List[str] = Field(default_factory=list)  # project paths the step mentions
+    depends_on: List[int] = Field(default_factory=list)  # step numbers
+
+
+class PipelineStage(BaseModel):
+    """One stage of run_pipeline.py (see pipeline.py)."""
+
+    name: str  # implement, validate, commit or pull_request
+    slash_command: SlashCommand
+    agent_name: str
+    concurrency: int = 1  # tasks in this stage at a time
+    model: Optional[ModelName] = None  # None: routed (/implement) or the slash command's default
+    on_failure: Optional[str] = None  # stage a failed task goes back to; None fails the task
+
+
+class SearchHit(BaseModel):
+    """One full-text search match in a transcript or log."""
+
+    adw_id: str
+    task_id: Optional[str] = None
+    agent: str
+    model: Optional[str] = None
+    kind: Literal["text", "tool_use", "tool_result", "error", "result", "log"]
+    ts: float
+    path: str  # transcript or log, relative to the project root (without .gz)
+    offset: int  # byte offset of the line in the uncompressed file
+    length: int
+    snippet: str
+    rank: float
 
 
 class ValidationResult(BaseModel):
@@ -117,7 +238,8 @@ class ValidationResult(BaseModel):
 class ADWStateData(BaseModel):
     """Persistent state for SecureDealAI ADW workflow.
 
-    Stored in agents/{adw_id}/adw_state.json
+    Journaled in agents/{adw_id}/adw_state.events.jsonl, with a derived
+    view in agents/{adw_id}/adw_state.json
     """
 
     adw_id: str
@@ -140,3 +262,28 @@ class ADWStateData(BaseModel):
     dependencies: List[str] = Field(default_factory=list)
     dependencies_met: bool = True
     error_message: Optional[str] = None
+
+    # Batch run this workflow belongs to (run_issue.py --manifest/--label)
+    batch_id: Optional[str] = None
+
+    # GitHub API usage for this run (see rate_limit.GitHubScheduler.get_usage)
+    github_quota: Optional[Dict[str, Any]] = None
+
+    # Model of the last /implement attempt (see routing.ModelRouter)
+    model: Optional[str] = None
+
+    # ADW ID of the batched /implement session the plan ran in (see batching.py)
+    batch_session: Optional[str] = None
+
+    # Snapshot of the tree this task is validating, for dependents to speculate on
+    speculation_base: Optional[str] = None
+
+    # This task's speculative run: base, patch, status, parent, cost_usd (see speculation.py)
+    speculation: Optional[Dict[str, Any]] = None
+
+    # Stage and branch of this task in run_pipeline.py (see pipeline.py)
+    pipeline_stage: Optional[str] = None
+    branch: Optional[str] = None
+
+    # Resource usage of child processes by agent name (see ResourceUsage)
+    resource_usage: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
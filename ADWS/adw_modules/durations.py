@@ -0,0 +1,239 @@
+"""Task duration history and ETA prediction for SecureDealAI ADW workflows.
+
+Every finished run_task.py / run_issue.py run is recorded in
+agents/history/durations.db with the plan's features (step count, plan
+size, validation commands) and the model used. The predictor estimates a
+task from, in order of preference:
+
+1. task_history: earlier runs of the same task with the same model
+2. step_rate: seconds per plan step across all runs of the model
+3. default: DEFAULT_SECONDS_PER_STEP, with wide bounds
+"""
+
+import os
+import sqlite3
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from .data_types import DurationEstimate
+from .utils import get_project_root
+
+# Seconds per plan step assumed before any history exists
+DEFAULT_SECONDS_PER_STEP = 180.0
+
+# Runs needed before a step-rate estimate counts as medium confidence
+MIN_RUNS_FOR_MEDIUM = 5
+
+# Own runs needed before a task-history estimate counts as high confidence
+MIN_RUNS_FOR_HIGH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_key      TEXT NOT NULL,
+    plan_file     TEXT,
+    model         TEXT,
+    total_steps   INTEGER NOT NULL DEFAULT 0,
+    plan_bytes    INTEGER NOT NULL DEFAULT 0,
+    validation_commands INTEGER NOT NULL DEFAULT 0,
+    duration      REAL NOT NULL,
+    status        TEXT NOT NULL,
+    adw_id        TEXT,
+    finished_at   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_task ON runs(task_key, model);
+"""
+
+
+def get_history_path() -> str:
+    """Get the duration history path (override with ADWS_HISTORY_DB)."""
+    return os.getenv(
+        "ADWS_HISTORY_DB",
+        os.path.join(get_project_root(), "agents", "history", "durations.db"),
+    )
+
+
+def task_key(task_id: Optional[str], plan_file: str) -> str:
+    """History key: the task ID, or the plan path for ad-hoc plans."""
+    return task_id or plan_file
+
+
+def plan_features(plan_file: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Features of a plan used for prediction."""
+    path = plan_file if os.path.isabs(plan_file) else os.path.join(get_project_root(), plan_file)
+    try:
+        plan_bytes = os.path.getsize(path)
+    except OSError:
+        plan_bytes = 0
+    metadata = metadata or {}
+    return {
+        "total_steps": int(metadata.get("total_steps") or 0),
+        "plan_bytes": plan_bytes,
+        "validation_commands": len(metadata.get("validation_commands") or []),
+    }
+
+
+def _spread(values: List[float]) -> tuple:
+    """(low, high) bounds: quartiles with enough samples, else min/max."""
+    if len(values) >= 4:
+        q = statistics.quantiles(values, n=4)
+        return q[0], q[2]
+    return min(values), max(values)
+
+
+class DurationHistory:
+    """SQLite-backed record of task durations with a simple predictor."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or get_history_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def record(
+        self,
+        key: str,
+        plan_file: str,
+        model: str,
+        duration: float,
+        status: str,
+        features: Dict[str, int],
+        adw_id: Optional[str] = None,
+    ) -> None:
+        """Record a finished run."""
+        self.conn.execute(
+            """INSERT INTO runs
+               (task_key, plan_file, model, total_steps, plan_bytes, validation_commands,
+                duration, status, adw_id, finished_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                key,
+                plan_file,
+                model,
+                features.get("total_steps", 0),
+                features.get("plan_bytes", 0),
+                features.get("validation_commands", 0),
+                duration,
+                status,
+                adw_id,
+                time.time(),
+            ),
+        )
+
+    def estimate(self, key: str, features: Dict[str, int], model: str) -> DurationEstimate:
+        """Predict the duration of one task."""
+        own = [
+            r["duration"] for r in self.conn.execute(
+                "SELECT duration FROM runs WHERE task_key = ? AND model = ? AND status = 'completed'",
+                (key, model),
+            )
+        ]
+        if own:
+            low, high = _spread(own)
+            return DurationEstimate(
+                seconds=statistics.median(own),
+                low=low,
+                high=high,
+                confidence="high" if len(own) >= MIN_RUNS_FOR_HIGH else "medium",
+                basis="task_history",
+                samples=len(own),
+            )
+
+        steps = max(features.get("total_steps", 0), 1)
+        rates = [
+            r["duration"] / max(r["total_steps"], 1) for r in self.conn.execute(
+                "SELECT duration, total_steps FROM runs WHERE model = ? AND status = 'completed'",
+                (model,),
+            )
+        ]
+        if rates:
+            low, high = _spread(rates)
+            return DurationEstimate(
+                seconds=statistics.median(rates) * steps,
+                low=low * steps,
+                high=high * steps,
+                confidence="medium" if len(rates) >= MIN_RUNS_FOR_MEDIUM else "low",
+                basis="step_rate",
+                samples=len(rates),
+            )
+
+        seconds = DEFAULT_SECONDS_PER_STEP * steps
+        return DurationEstimate(
+            seconds=seconds, low=seconds / 2, high=seconds * 2, confidence="none", basis="default"
+        )
+
+
+def combine_estimates(estimates: List[DurationEstimate]) -> DurationEstimate:
+    """Estimate for tasks run one after another (the weakest confidence wins)."""
+    order = ["none", "low", "medium", "high"]
+    if not estimates:
+        return DurationEstimate(seconds=0, low=0, high=0, confidence="none", basis="default")
+    return DurationEstimate(
+        seconds=sum(e.seconds for e in estimates),
+        low=sum(e.low for e in estimates),
+        high=sum(e.high for e in estimates),
+        confidence=min((e.confidence for e in estimates), key=order.index),
+        basis="sum",
+        samples=sum(e.samples for e in estimates),
+    )
+
+
+def format_duration(seconds: float) -> str:
+    """Human-readable duration (e.g. 1h 05m, 12m, 40s)."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+def format_eta(estimate: DurationEstimate) -> str:
+    """One-line ETA, e.g. '~25m (15m-40m, medium confidence)'."""
+    return (f"~{format_duration(estimate.seconds)} "
+            f"({format_duration(estimate.low)}-{format_duration(estimate.high)}, "
+            f"{estimate.confidence} confidence)")
+
+
+def record_run(
+    task_id: Optional[str],
+    plan_file: str,
+    metadata: Optional[Dict[str, Any]],
+    model: str,
+    duration: float,
+    status: str,
+    adw_id: Optional[str] = None,
+) -> None:
+    """Record a finished run; history is best-effort and never fails a task."""
+    try:
+        history = DurationHistory()
+        try:
+            history.record(task_key(task_id, plan_file), plan_file, model, duration, status,
+                           plan_features(plan_file, metadata), adw_id=adw_id)
+        finally:
+            history.close()
+    except sqlite3.Error as e:
+        print(f"Warning: Could not record duration history: {e}")
+
+
+def estimate_plan(
+    task_id: Optional[str],
+    plan_file: str,
+    metadata: Optional[Dict[str, Any]],
+    model: str,
+    history: Optional[DurationHistory] = None,
+) -> DurationEstimate:
+    """Estimate one plan's duration (opens the history if none is given)."""
+    own = history is None
+    history = history or DurationHistory()
+    try:
+        return history.estimate(task_key(task_id, plan_file), plan_features(plan_file, metadata), model)
+    finally:
+        if own:
+            history.close()
@@ -10,13 +10,43 @@ import sys
 import os
 import json
 import re
-from typing import Optional, List, Tuple
-
-from .data_types import GitHubIssue, GitHubComment, GitHubLabel, GitHubUser
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, List, Tuple, Dict, Any
+
+from .rate_limit import get_scheduler, rate_limit_retry_after
+from .tracing import span
+from .metrics import get_metrics
+from .resources import run_accounted
+from .data_types import (
+    GitHubIssue,
+    GitHubComment,
+    GitHubLabel,
+    GitHubUser,
+    GitHubApiResponse,
+)
 
 # Bot identifier to filter out own comments and prevent loops
 ADWS_BOT_IDENTIFIER = "[ADWS-BOT]"
 
+# Comment keyword that requests a run, e.g. "/adw docs/implementation/05_01_VERIFY_ACCESS_CODE.md"
+ADWS_TRIGGER_KEYWORD = "/adw"
+
+# GitHub CLI path (can point at a local stand-in executable)
+GH_PATH = os.getenv("ADWS_GH_PATH", "gh")
+
+# Optional REST base URL; when set, gh_api() talks HTTP directly (e.g. to a local fake API)
+GITHUB_API_URL = os.getenv("ADWS_GITHUB_API_URL")
+
+# Retries after a primary/secondary rate-limit error before giving up on a call
+MAX_RATE_LIMIT_RETRIES = 3
+
+# Fields requested for issue views/lists (matches GitHubIssue)
+ISSUE_JSON_FIELDS = "number,title,body,state,author,assignees,labels,comments,createdAt,updatedAt,url"
+
 
 def get_github_env() -> Optional[dict]:
     """Get environment with GitHub token set up.
@@ -35,11 +65,12 @@ def get_github_env() -> Optional[dict]:
     }
 
 
+@lru_cache(maxsize=1)
 def check_gh_installed() -> bool:
-    """Check if GitHub CLI is installed."""
+    """Check if GitHub CLI is installed (cached for the process lifetime)."""
     try:
         subprocess.run(
-            ["gh", "--version"],
+            [GH_PATH, "--version"],
             capture_output=True,
             text=True,
             check=True
@@ -54,7 +85,7 @@ def check_gh_authenticated() -> bool:
     try:
         env = get_github_env()
         result = subprocess.run(
-            ["gh", "auth", "status"],
+            [GH_PATH, "auth", "status"],
             capture_output=True,
             text=True,
             env=env
@@ -64,6 +95,59 @@ def check_gh_authenticated() -> bool:
         return False
 
 
+def run_gh(
+    args: List[str],
+    write: bool = False,
+    check: bool = False,
+    retry: bool = True
+) -> subprocess.CompletedProcess:
+    """Run a gh CLI command through the shared rate-limit scheduler.
+
+    Args:
+        args: gh arguments (without the executable)
+        write: True for state-changing calls (comments, labels); these are
+            prioritized over reads when quota is tight
+        check: Raise CalledProcessError on a non-zero exit code
+        retry: Retry after rate-limit errors detected in gh's stderr
+
+    Returns:
+        The completed process of the last attempt
+    """
+    scheduler = get_scheduler()
+    metrics = get_metrics()
+    cmd = [GH_PATH, *args]
+    command = " ".join(args[:2])
+
+    with span("github.gh", command=command, write=write) as attrs:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            with span("github.rate_limit_wait"):
+                scheduler.acquire(write=write)
+            started = time.monotonic()
+            result, _ = run_accounted(cmd, "gh", capture_output=True, text=True, env=get_github_env())
+            metrics.observe("adws_github_request_duration_seconds", time.monotonic() - started,
+                            command=command)
+            attrs["attempts"] = attempt + 1
+            attrs["returncode"] = result.returncode
+            if result.returncode == 0:
+                break
+
+            limited = rate_limit_retry_after(text=result.stderr) is not None
+            metrics.inc("adws_github_errors_total", command=command,
+                        kind="rate_limited" if limited else "failed")
+            retry_after = rate_limit_retry_after(text=result.stderr) if retry else None
+            if retry_after is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            print(f"GitHub rate limit hit, retrying in {retry_after:.0f}s", file=sys.stderr)
+            scheduler.record_limited(retry_after)
+            scheduler.count("retries")
+
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, cmd, output=result.stdout, stderr=result.stderr
+        )
+    return result
+
+
 def parse_issue_url(url: str) -> Tuple[str, int]:
     """Parse GitHub issue URL to extract repo path and issue number.
 
@@ -121,22 +205,14 @@ def fetch_issue(issue_number: int, repo_path: str) -> Optional[GitHubIssue]:
               file=sys.stderr)
         return None
 
-    cmd = [
-        "gh", "issue", "view", str(issue_number),
+    args = [
+        "issue", "view", str(issue_number),
         "-R", repo_path,
-        "--json", "number,title,body,state,author,assignees,labels,comments,createdAt,updatedAt,url"
+        "--json", ISSUE_JSON_FIELDS
     ]
 
-    env = get_github_env()
-
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            env=env,
-            check=True
-        )
+        result = run_gh(args, check=True)
         issue_data = json.loads(result.stdout)
         return GitHubIssue(**issue_data)
     except subprocess.CalledProcessError as e:
@@ -148,6 +224,65 @@ def fetch_issue(issue_number: int, repo_path: str) -> Optional[GitHubIssue]:
         return None
 
 
+def fetch_issues_by_label(label: str, repo_path: str, limit: int = 100) -> List[GitHubIssue]:
+    """Fetch all open issues with a label in a single gh call.
+
+    Args:
+        label: Label to filter on
+        repo_path: Repository path (owner/repo)
+        limit: Maximum number of issues
+
+    Returns:
+        List of GitHubIssue models (empty if the fetch fails)
+    """
+    if not check_gh_installed():
+        print("Warning: GitHub CLI (gh) not installed. Issue tracking disabled.",
+              file=sys.stderr)
+        return []
+
+    args = [
+        "issue", "list",
+        "-R", repo_path,
+        "--label", label,
+        "--state", "open",
+        "--limit", str(limit),
+        "--json", ISSUE_JSON_FIELDS
+    ]
+
+    try:
+        result = run_gh(args, check=True)
+        return [GitHubIssue(**item) for item in json.loads(result.stdout)]
+    except subprocess.CalledProcessError as e:
+        print(f"Warning: Could not list issues for label '{label}': {e.stderr}",
+              file=sys.stderr)
+        return []
+    except (json.JSONDecodeError, Exception) as e:
+        print(f"Warning: Error parsing issue list: {e}", file=sys.stderr)
+        return []
+
+
+def parse_plan_from_comment(keyword: str, body: str) -> Optional[str]:
+    """Extract the plan file path that follows the trigger keyword."""
+    match = re.search(rf"{re.escape(keyword)}\s+(\S+\.md)\b", body)
+    return match.group(1) if match else None
+
+
+def find_plan_reference(issue: GitHubIssue) -> Optional[str]:
+    """Find the plan file an issue refers to.
+
+    Looks for a trigger comment ("/adw <plan>.md") first, then for the first
+    docs/ or specs/ markdown path mentioned in the issue body.
+    """
+    trigger = find_keyword_in_comments(ADWS_TRIGGER_KEYWORD, issue)
+    if trigger:
+        plan_file = parse_plan_from_comment(ADWS_TRIGGER_KEYWORD, trigger.body)
+        if plan_file:
+            return plan_file
+
+    match = re.search(r"\b((?:docs|specs)/[\w./-]+\.md)\b", issue.body or "")
+    return match.group(1) if match else None
+
+
 def post_issue_comment(issue_number: int, repo_path: str, comment: str) -> bool:
     """Post a comment to a GitHub issue.
 
@@ -167,16 +302,14 @@ def post_issue_comment(issue_number: int, repo_path: str, comment: str) -> bool:
     # Prepend bot identifier
     full_comment = f"{ADWS_BOT_IDENTIFIER}\n\n{comment}"
 
-    cmd = [
-        "gh", "issue", "comment", str(issue_number),
+    args = [
+        "issue", "comment", str(issue_number),
         "-R", repo_path,
         "--body", full_comment
     ]
 
-    env = get_github_env()
-
     try:
-        subprocess.run(cmd, capture_output=True, text=True, env=env, check=True)
+        run_gh(args, write=True, check=True)
         print(f"Posted comment to issue #{issue_number}")
         return True
     except subprocess.CalledProcessError as e:
@@ -197,16 +330,15 @@ def mark_issue_in_progress(issue_number: int, repo_path: str) -> bool:
     if not check_gh_installed():
         return False
 
-    env = get_github_env()
     success = False
 
     # Add "in-progress" label
-    label_cmd = [
-        "gh", "issue", "edit", str(issue_number),
+    label_args = [
+        "issue", "edit", str(issue_number),
         "-R", repo_path,
         "--add-label", "in-progress"
     ]
-    result = subprocess.run(label_cmd, capture_output=True, text=True, env=env)
+    result = run_gh(label_args, write=True)
     if result.returncode == 0:
         print(f"Added 'in-progress' label to issue #{issue_number}")
         success = True
@@ -215,12 +347,12 @@ def mark_issue_in_progress(issue_number: int, repo_path: str) -> bool:
               file=sys.stderr)
 
     # Assign to self
-    assign_cmd = [
-        "gh", "issue", "edit", str(issue_number),
+    assign_args = [
+        "issue", "edit", str(issue_number),
         "-R", repo_path,
         "--add-assignee", "@me"
     ]
-    result = subprocess.run(assign_cmd, capture_output=True, text=True, env=env)
+    result = run_gh(assign_args, write=True)
     if result.returncode == 0:
         print(f"Assigned issue #{issue_number} to self")
         success = True
@@ -248,22 +380,21 @@ def update_issue_labels(
     if not check_gh_installed():
         return False
 
-    env = get_github_env()
-    cmd = ["gh", "issue", "edit", str(issue_number), "-R", repo_path]
+    args = ["issue", "edit", str(issue_number), "-R", repo_path]
 
     if add_labels:
         for label in add_labels:
-            cmd.extend(["--add-label", label])
+            args.extend(["--add-label", label])
 
     if remove_labels:
         for label in remove_labels:
-            cmd.extend(["--remove-label", label])
+            args.extend(["--remove-label", label])
 
-    if len(cmd) == 5:  # No labels to change
+    if len(args) == 4:  # No labels to change
         return True
 
     try:
-        subprocess.run(cmd, capture_output=True, text=True, env=env, check=True)
+        run_gh(args, write=True, check=True)
         return True
     except subprocess.CalledProcessError:
         return False
@@ -282,31 +413,174 @@ def close_issue(issue_number: int, repo_path: str) -> bool:
     if not check_gh_installed():
         return False
 
-    cmd = ["gh", "issue", "close", str(issue_number), "-R", repo_path]
-    env = get_github_env()
+    args = ["issue", "close", str(issue_number), "-R", repo_path]
 
     try:
-        subprocess.run(cmd, capture_output=True, text=True, env=env, check=True)
+        run_gh(args, write=True, check=True)
         return True
     except subprocess.CalledProcessError:
         return False
 
 
+# ============================================================================
+# REST API Helpers
+# ============================================================================
+
+
+def _parse_included_response(stdout: str, stderr: str) -> GitHubApiResponse:
+    """Parse `gh api --include` output into status, headers and JSON body."""
+    text = stdout.replace("\r\n", "\n")
+    head, _, body_text = text.partition("\n\n")
+    lines = head.split("\n") if head else []
+
+    status = 0
+    headers: Dict[str, str] = {}
+    if lines and lines[0].startswith("HTTP/"):
+        parts = lines[0].split()
+        if len(parts) > 1 and parts[1].isdigit():
+            status = int(parts[1])
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if sep:
+                headers[key.strip().lower()] = value.strip()
+    else:
+        # gh may print nothing on stdout for 304 / errors
+        body_text = text
+        match = re.search(r"HTTP (\d{3})", stderr or "")
+        if match:
+            status = int(match.group(1))
+
+    body: Any = None
+    if body_text.strip():
+        try:
+            body = json.loads(body_text)
+        except json.JSONDecodeError:
+            body = body_text
+    return GitHubApiResponse(status=status, headers=headers, body=body)
+
+
+def _http_api(path: str, method: str, etag: Optional[str]) -> GitHubApiResponse:
+    """Call the REST API directly at GITHUB_API_URL (used for local fakes)."""
+    url = f"{GITHUB_API_URL.rstrip('/')}/{path.lstrip('/')}"
+    request = urllib.request.Request(url, method=method)
+    request.add_header("Accept", "application/vnd.github+json")
+    if etag:
+        request.add_header("If-None-Match", etag)
+    github_pat = os.getenv("GITHUB_PAT")
+    if github_pat:
+        request.add_header("Authorization", f"Bearer {github_pat}")
+
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            status = response.status
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            raw = response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        status = e.code
+        headers = {k.lower(): v for k, v in e.headers.items()}
+        raw = e.read().decode("utf-8") if status != 304 else ""
+
+    body: Any = None
+    if raw.strip():
+        try:
+            body = json.loads(raw)
+        except json.JSONDecodeError:
+            body = raw
+    return GitHubApiResponse(status=status, headers=headers, body=body)
+
+
+def gh_api(path: str, method: str = "GET", etag: Optional[str] = None) -> Optional[GitHubApiResponse]:
+    """Call a GitHub REST endpoint, optionally as a conditional request.
+
+    Conditional requests (If-None-Match) answered with 304 do not count
+    against the primary rate limit, which keeps polling cheap.
+
+    Args:
+        path: API path relative to the REST root (e.g. repos/o/r/issues/1/comments)
+        method: HTTP method
+        etag: ETag from a previous response for the same path
+
+    Returns:
+        GitHubApiResponse, or None if the API is unreachable
+    """
+    write = method.upper() != "GET"
+    scheduler = get_scheduler()
+
+    if not GITHUB_API_URL and not check_gh_installed():
+        return None
+
+    args = ["api", "--include", "-X", method, path]
+    if etag:
+        args.extend(["-H", f"If-None-Match: {etag}"])
+
+    response: Optional[GitHubApiResponse] = None
+    with span("github.api", method=method, path=path, conditional=bool(etag)) as attrs:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            if GITHUB_API_URL:
+                with span("github.rate_limit_wait"):
+                    scheduler.acquire(write=write)
+                started = time.monotonic()
+                try:
+                    response = _http_api(path, method, etag)
+                except (urllib.error.URLError, OSError) as e:
+                    get_metrics().inc("adws_github_errors_total", command="api", kind="unreachable")
+                    print(f"Warning: GitHub API request failed: {e}", file=sys.stderr)
+                    return None
+                get_metrics().observe("adws_github_request_duration_seconds",
+                                      time.monotonic() - started, command="api")
+                if response.status >= 400:
+                    get_metrics().inc("adws_github_errors_total", command="api",
+                                      kind=f"http_{response.status}")
+            else:
+                try:
+                    # Rate limits are detected below from status + headers
+                    result = run_gh(args, write=write, retry=False)
+                except FileNotFoundError:
+                    return None
+                response = _parse_included_response(result.stdout, result.stderr)
+
+            attrs["status"] = response.status
+            scheduler.record_headers(response.headers)
+            body_text = response.body if isinstance(response.body, str) else json.dumps(response.body or "")
+            retry_after = rate_limit_retry_after(response.status, response.headers, body_text)
+            if retry_after is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                break
+            print(f"GitHub rate limit hit, retrying in {retry_after:.0f}s", file=sys.stderr)
+            scheduler.record_limited(retry_after)
+            scheduler.count("retries")
+
+    return response
+
+
+def comment_from_api(data: Dict[str, Any]) -> GitHubComment:
+    """Convert a REST API comment payload into a GitHubComment."""
+    user = data.get("user") or {}
+    return GitHubComment(
+        id=str(data["id"]),
+        author=GitHubUser(login=user.get("login", "unknown")),
+        body=data.get("body") or "",
+        createdAt=data["created_at"],
+        updatedAt=data.get("updated_at"),
+    )
+
+
 # ============================================================================
 # Comment Generation Helpers
 # ============================================================================
 
 
-def generate_start_comment(plan_file: str, adw_id: str) -> str:
+def generate_start_comment(plan_file: str, adw_id: str, eta: Optional[str] = None) -> str:
     """Generate comment for when work starts.
 
     Args:
         plan_file: Path to the implementation plan
         adw_id: Workflow identifier
+        eta: Estimated duration (durations.format_eta), if known
 
     Returns:
         Formatted markdown comment
     """
+    eta_row = f"\n| **ETA** | {eta} |" if eta else ""
     return f"""## ADWS Started
 
 Working on this issue using plan: `{plan_file}`
@@ -314,7 +588,7 @@ Working on this issue using plan: `{plan_file}`
 | Field | Value |
 |-------|-------|
 | **ADW ID** | `{adw_id}` |
-| **Status** | In Progress |
+| **Status** | In Progress |{eta_row}
 
 _Updates will be posted when complete._"""
 
@@ -405,29 +679,32 @@ Implementation failed for: `{plan_file}`
 ```"""
 
 
-def find_keyword_in_comments(keyword: str, issue: GitHubIssue) -> Optional[GitHubComment]:
+def find_keyword_in_comments(
+    keyword: str,
+    issue: GitHubIssue,
+    after: Optional[datetime] = None
+) -> Optional[GitHubComment]:
     """Find the latest comment containing a specific keyword.
 
     Args:
         keyword: The keyword to search for
         issue: The GitHub issue with comments
+        after: Only consider comments created after this time (watcher cursor)
 
     Returns:
         The latest matching comment, or None
     """
-    # Sort comments by created_at (newest first)
-    sorted_comments = sorted(
-        issue.comments,
-        key=lambda c: c.created_at,
-        reverse=True
-    )
+    # Single pass instead of sorting every comment on each call
+    latest: Optional[GitHubComment] = None
+    for comment in issue.comments:
+        if after and comment.created_at <= after:
+            continue
 
-    for comment in sorted_comments:
         # Skip bot comments to prevent loops
         if ADWS_BOT_IDENTIFIER in comment.body:
             continue
 
-        if keyword in comment.body:
-            return comment
+        if keyword in comment.body and (latest is None or comment.created_at > latest.created_at):
+            latest = comment
 
-    return None
+    return latest
@@ -0,0 +1,467 @@
+"""Live view of active ADW runs (dashboard.py).
+
+RunTracker follows every in-progress run under agents/ and keeps, per
+run, what its Claude Code agent is doing: the tool call in flight, plan
+step N of M, tokens, cost and elapsed time.
+
+It never re-reads a file. Each transcript (raw_output.jsonl, plain while
+the agent runs) is tailed from the byte offset reached last time, and only
+when inotify reports that it changed; on systems without inotify the
+tracker falls back to comparing file sizes. Tool results, which make up
+most of a transcript, are recognised without being parsed as JSON. A run
+leaves the view shortly after its state says it has finished.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import re
+import select
+import struct
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .artifacts import COMPRESSED_SUFFIX, RUN_DIR_PATTERN, get_agents_dir, open_artifact, resolve_artifact
+from .state import ADWState
+
+TRANSCRIPT_NAME = "raw_output.jsonl"
+
+# Runs without any activity for this long are shown as stalled
+STALL_SECONDS = 300
+
+# Finished runs stay on screen this long
+FINISHED_LINGER_SECONDS = 30
+
+# In-progress runs untouched for this long are assumed dead and not followed
+ABANDONED_SECONDS = 6 * 3600
+
+# USD per million tokens (input, output, cache read, cache write). Only used
+# for the running estimate; the result message reports the actual cost.
+MODEL_PRICES = {
+    "opus": (5.0, 25.0, 0.50, 6.25),
+    "sonnet": (3.0, 15.0, 0.30, 3.75),
+    "haiku": (1.0, 5.0, 0.10, 1.25),
+}
+
+STEP_PATTERN = re.compile(r"\bStep\s+(\d+)\b", re.IGNORECASE)
+
+# Tool results ("type":"user" lines) are recognised from their first bytes
+_USER_PREFIXES = (b'{"type":"user"', b'{"type": "user"')
+
+
+class Inotify:
+    """Minimal inotify(7) binding through ctypes (Linux only)."""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_IGNORED = 0x8000
+
+    DIR_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.paths: Dict[int, str] = {}
+        self.watches: Dict[str, int] = {}
+
+    def watch(self, directory: str) -> None:
+        """Watch a directory for created, changed, moved and deleted entries."""
+        if directory in self.watches:
+            return
+        wd = self._add_watch(self.fd, os.fsencode(directory), self.DIR_MASK)
+        if wd < 0:
+            return
+        self.paths[wd] = directory
+        self.watches[directory] = wd
+
+    def unwatch(self, directory: str) -> None:
+        wd = self.watches.pop(directory, None)
+        if wd is not None:
+            self.paths.pop(wd, None)
+            self._rm_watch(self.fd, wd)
+
+    def read(self, timeout: float) -> List[str]:
+        """Paths changed within timeout seconds (empty if none)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, pos)
+            name = data[pos + self._EVENT.size:pos + self._EVENT.size + length].rstrip(b"\0")
+            pos += self._EVENT.size + length
+            directory = self.paths.get(wd)
+            if directory is None:
+                continue
+            if mask & self.IN_IGNORED:
+                # The directory itself is gone
+                self.paths.pop(wd, None)
+                self.watches.pop(directory, None)
+                continue
+            changed.append(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class TranscriptTail:
+    """Reads a growing transcript from where the last read stopped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.partial = b""
+        # Set once the transcript has been compressed: nothing more to read
+        self.complete = False
+
+    def read_lines(self) -> List[bytes]:
+        """Complete lines appended since the last call."""
+        if self.complete:
+            return []
+        actual = resolve_artifact(self.path)
+        if actual is None:
+            return []
+        try:
+            with open_artifact(actual, binary=True) as f:
+                if actual.endswith(COMPRESSED_SUFFIX):
+                    # Stored when Claude Code exited; read the lines written since the last pass
+                    self.complete = True
+                elif os.fstat(f.fileno()).st_size < self.offset:
+                    # Rewritten from scratch (a resumed run)
+                    self.offset, self.partial = 0, b""
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return []
+        self.offset += len(data)
+        data = self.partial + data
+        lines = data.split(b"\n")
+        self.partial = lines.pop()
+        return [line for line in lines if line.strip()]
+
+
+class LiveRun:
+    """What one run's agent is doing, updated from its transcript."""
+
+    def __init__(self, adw_id: str, run_dir: str):
+        self.adw_id = adw_id
+        self.run_dir = run_dir
+        self.task_id: Optional[str] = None
+        self.label = adw_id
+        self.status = "pending"
+        self.total_steps = 0
+        self.started = os.path.getmtime(run_dir)
+        self.finished_at: Optional[float] = None
+        self.agent: Optional[str] = None
+        self.model: Optional[str] = None
+        self.step = 0
+        self.tool: Optional[str] = None
+        self.tool_calls = 0
+        self.tokens = {"input": 0, "output": 0, "cache_read": 0, "cache_creation": 0}
+        self.cost: Optional[float] = None
+        self.last_activity = self.started
+        self.tails: Dict[str, TranscriptTail] = {}
+        self.state_mtime = 0.0
+
+    def _state_mtime(self) -> float:
+        mtime = 0.0
+        for name in (ADWState.STATE_FILENAME, "adw_state.events.jsonl"):
+            try:
+                mtime = max(mtime, os.path.getmtime(os.path.join(self.run_dir, name)))
+            except OSError:
+                continue
+        return mtime
+
+    def state_changed(self) -> bool:
+        """Whether the state journal or view changed since load_state()."""
+        return self._state_mtime() != self.state_mtime
+
+    def load_state(self) -> None:
+        self.state_mtime = self._state_mtime()
+        state = ADWState.load(self.adw_id)
+        if not state:
+            return
+        self.task_id = state.get("task_id")
+        issue = state.get("issue_number")
+        self.label = self.task_id or (f"#{issue}" if issue else self.adw_id)
+        self.total_steps = state.get("total_steps") or 0
+        status = state.get("status") or "pending"
+        if status != self.status and status in ("completed", "failed"):
+            self.finished_at = time.time()
+        self.status = status
+        started_at = state.get("started_at")
+        if started_at:
+            try:
+                self.started = datetime.fromisoformat(str(started_at)).timestamp()
+            except ValueError:
+                pass
+
+    def feed(self, agent: str, line: bytes) -> None:
+        """Update from one transcript line."""
+        self.agent = agent
+        self.last_activity = time.time()
+        if line.startswith(_USER_PREFIXES):
+            # A tool result: the call in flight has returned
+            self.tool = None
+            return
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return
+        kind = message.get("type")
+        if kind == "system" and message.get("model"):
+            self.model = message["model"]
+        elif kind == "assistant":
+            body = message.get("message") or {}
+            self.model = body.get("model") or self.model
+            self._add_usage(body.get("usage") or {})
+            for block in body.get("content") or []:
+                if not isinstance(block, dict):
+                    continue
+                if block.get("type") == "tool_use":
+                    self.tool_calls += 1
+                    self.tool = describe_tool(block.get("name", ""), block.get("input") or {})
+                elif block.get("type") == "text":
+                    for match in STEP_PATTERN.finditer(block.get("text", "")):
+                        step = int(match.group(1))
+                        if not self.total_steps or step <= self.total_steps:
+                            self.step = max(self.step, step)
+        elif kind == "result":
+            self.tool = None
+            if message.get("total_cost_usd") is not None:
+                self.cost = message["total_cost_usd"]
+
+    def _add_usage(self, usage: Dict[str, Any]) -> None:
+        for field, key in (
+            ("input_tokens", "input"),
+            ("output_tokens", "output"),
+            ("cache_read_input_tokens", "cache_read"),
+            ("cache_creation_input_tokens", "cache_creation"),
+        ):
+            self.tokens[key] += usage.get(field) or 0
+
+    def estimated_cost(self) -> Optional[float]:
+        """Reported cost, or an estimate from the tokens so far."""
+        if self.cost is not None:
+            return self.cost
+        family = next((name for name in MODEL_PRICES if name in (self.model or "")), None)
+        if not family:
+            return None
+        prices = MODEL_PRICES[family]
+        t = self.tokens
+        return (t["input"] * prices[0] + t["output"] * prices[1]
+                + t["cache_read"] * prices[2] + t["cache_creation"] * prices[3]) / 1_000_000
+
+    def phase(self, now: float) -> str:
+        if self.status in ("completed", "failed"):
+            return self.status
+        if now - self.last_activity > STALL_SECONDS:
+            return "stalled"
+        if self.tool:
+            return "tool"
+        return "thinking" if self.tails else "starting"
+
+
+def describe_tool(name: str, tool_input: Dict[str, Any]) -> str:
+    """Short description of a tool call, e.g. 'Bash: deno test' or 'Edit src/app.ts'."""
+    if name == "Bash" and tool_input.get("command"):
+        return f"Bash: {tool_input['command'].splitlines()[0]}"
+    for key in ("file_path", "path", "pattern", "url", "description"):
+        if tool_input.get(key):
+            return f"{name} {tool_input[key]}"
+    return name
+
+
+class RunTracker:
+    """Follows every in-progress run under agents/."""
+
+    def __init__(self, use_inotify: bool = True):
+        self.agents_dir = get_agents_dir()
+        self.runs: Dict[str, LiveRun] = {}
+        self.inotify: Optional[Inotify] = None
+        if use_inotify:
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError):
+                # Not Linux (or no inotify): poll sizes instead
+                self.inotify = None
+        self.mode = "inotify" if self.inotify else "poll"
+        self._last_scan = 0.0
+
+    def close(self) -> None:
+        if self.inotify:
+            self.inotify.close()
+
+    def visible(self) -> List[LiveRun]:
+        """Runs in progress plus recently finished ones, oldest first."""
+        runs = [run for run in self.runs.values() if run.status == "in_progress" or run.finished_at]
+        return sorted(runs, key=lambda run: run.started)
+
+    def scan(self) -> None:
+        """Pick up new runs and agents (the full directory walk, done rarely)."""
+        self._last_scan = time.time()
+        if not os.path.isdir(self.agents_dir):
+            return
+        if self.inotify:
+            self.inotify.watch(self.agents_dir)
+        cutoff = time.time() - ABANDONED_SECONDS
+        for name in os.listdir(self.agents_dir):
+            if name in self.runs or not RUN_DIR_PATTERN.match(name):
+                continue
+            run_dir = os.path.join(self.agents_dir, name)
+            try:
+                if os.path.getmtime(run_dir) < cutoff:
+                    continue
+            except OSError:
+                continue
+            run = LiveRun(name, run_dir)
+            run.load_state()
+            if run.status != "in_progress":
+                continue
+            self.runs[name] = run
+            if self.inotify:
+                self.inotify.watch(run_dir)
+        for run in self.runs.values():
+            self._discover_agents(run)
+
+    def _discover_agents(self, run: LiveRun) -> None:
+        try:
+            entries = os.listdir(run.run_dir)
+        except OSError:
+            return
+        for agent in entries:
+            agent_dir = os.path.join(run.run_dir, agent)
+            if not os.path.isdir(agent_dir):
+                continue
+            if self.inotify:
+                self.inotify.watch(agent_dir)
+            path = os.path.join(agent_dir, TRANSCRIPT_NAME)
+            if path not in run.tails and os.path.exists(path):
+                run.tails[path] = TranscriptTail(path)
+                self._read(run, path)
+
+    def _read(self, run: LiveRun, path: str) -> bool:
+        tail = run.tails[path]
+        agent = os.path.basename(os.path.dirname(path))
+        lines = tail.read_lines()
+        for line in lines:
+            run.feed(agent, line)
+        return bool(lines)
+
+    def _run_for(self, path: str) -> Optional[LiveRun]:
+        rel = os.path.relpath(path, self.agents_dir).split(os.sep)
+        return self.runs.get(rel[0]) if rel and rel[0] != ".." else None
+
+    def update(self, timeout: float) -> bool:
+        """Wait up to timeout for activity and apply it. Returns whether anything changed."""
+        changed = False
+        if self.inotify:
+            paths = self.inotify.read(timeout)
+            for path in paths:
+                changed |= self._handle(path)
+            # New run directories are announced by inotify; a rescan catches
+            # anything created before the watches were in place
+            if time.time() - self._last_scan > 30:
+                self.scan()
+        else:
+            time.sleep(timeout)
+            if time.time() - self._last_scan > 2:
+                self.scan()
+            for run in list(self.runs.values()):
+                for path, tail in list(run.tails.items()):
+                    try:
+                        size = os.path.getsize(path)
+                    except OSError:
+                        size = -1
+                    if size != tail.offset and not tail.complete:
+                        changed |= self._read(run, path)
+                if run.state_changed():
+                    before = run.status
+                    run.load_state()
+                    changed |= run.status != before
+
+        now = time.time()
+        for adw_id, run in list(self.runs.items()):
+            if run.finished_at and now - run.finished_at > FINISHED_LINGER_SECONDS:
+                self._evict(adw_id)
+                changed = True
+            elif not os.path.isdir(run.run_dir):
+                changed |= self._evict(adw_id)
+        return changed
+
+    def _evict(self, adw_id: str) -> bool:
+        """Stop following a run. Returns whether it was on screen."""
+        run = self.runs.pop(adw_id)
+        if self.inotify:
+            self.inotify.unwatch(run.run_dir)
+            for path in run.tails:
+                self.inotify.unwatch(os.path.dirname(path))
+        return run.status == "in_progress" or bool(run.finished_at)
+
+    def _handle(self, path: str) -> bool:
+        """Apply one inotify event."""
+        if os.path.dirname(path) == self.agents_dir:
+            name = os.path.basename(path)
+            if name in self.runs and not os.path.isdir(path):
+                # Run directory deleted (or moved away)
+                return self._evict(name)
+            if RUN_DIR_PATTERN.match(name) and name not in self.runs and os.path.isdir(path):
+                # Followed from the start; shown once its state says in_progress
+                run = LiveRun(name, path)
+                self.runs[name] = run
+                self.inotify.watch(path)
+                run.load_state()
+                if run.status in ("completed", "failed"):
+                    # Already over: it was never in progress while followed
+                    self._evict(name)
+                    return False
+                self._discover_agents(run)
+                return run.status == "in_progress"
+            return False
+
+        run = self._run_for(path)
+        if not run:
+            return False
+        name = os.path.basename(path)
+        if os.path.dirname(path) == run.run_dir:
+            if name.startswith("adw_state"):
+                before = (run.status, run.label)
+                run.load_state()
+                if run.status in ("completed", "failed") and before[0] not in ("in_progress", run.status):
+                    # Finished without ever being shown as in progress
+                    self._evict(run.adw_id)
+                    return False
+                return (run.status, run.label) != before
+            if os.path.isdir(path):
+                self._discover_agents(run)
+                return True
+            return False
+        if name in (TRANSCRIPT_NAME, TRANSCRIPT_NAME + COMPRESSED_SUFFIX):
+            path = os.path.join(os.path.dirname(path), TRANSCRIPT_NAME)
+            if path not in run.tails:
+                if not resolve_artifact(path):
+                    return False
+                run.tails[path] = TranscriptTail(path)
+            return self._read(run, path)
+        return False
@@ -0,0 +1,263 @@
+"""Prometheus metrics for SecureDealAI ADW workflows.
+
+Each process counts into an in-memory registry and periodically (and at
+exit) merges its deltas into agents/metrics/metrics.json under a file lock,
+so counters and histograms add up across every run_task / run_phase /
+worker process on the host. The merged totals are exported:
+
+- as a node_exporter textfile-collector file, when ADWS_METRICS_TEXTFILE_DIR
+  is set (written atomically to <dir>/adws.prom), and/or
+- on a local HTTP endpoint (serve_metrics()), for daemon-style processes
+  such as watch_issues.py and run_worker.py --forever.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils import get_project_root, file_lock, atomic_write
+
+# Histogram buckets in seconds, from a tracker write to a long agent run
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Histograms measured in other units than seconds
+METRIC_BUCKETS = {
+    "adws_subprocess_peak_rss_megabytes": (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384),
+}
+
+# Seconds between merges of a process's deltas into the shared totals
+FLUSH_INTERVAL_SECONDS = 15.0
+
+TEXTFILE_NAME = "adws.prom"
+
+METRIC_HELP = {
+    "adws_agent_duration_seconds": ("histogram", "Claude Code run duration"),
+    "adws_agent_runs_total": ("counter", "Claude Code runs by outcome"),
+    "adws_agent_tokens_total": ("counter", "Tokens reported by Claude Code"),
+    "adws_agent_cost_usd_total": ("counter", "Cost in USD reported by Claude Code"),
+    "adws_agent_first_edit_seconds": ("histogram", "Time from /implement start to the agent's first edit"),
+    "adws_implement_tokens_total": ("counter", "Tokens of /implement runs, with and without a context pack"),
+    "adws_subprocess_spawns_total": ("counter", "Subprocesses started by ADWS"),
+    "adws_github_request_duration_seconds": ("histogram", "GitHub call latency"),
+    "adws_github_errors_total": ("counter", "Failed or rate-limited GitHub calls"),
+    "adws_tracker_write_duration_seconds": ("histogram", "Locked tracker rewrite duration"),
+    "adws_queue_tasks": ("gauge", "Tasks in the run_worker.py queue by status"),
+    "adws_subprocess_cpu_seconds_total": ("counter", "CPU time of child processes (user / sys)"),
+    "adws_subprocess_peak_rss_megabytes": ("histogram", "Peak resident memory of child processes"),
+    "adws_subprocess_block_io_total": ("counter", "Block I/O operations of child processes"),
+    "adws_subprocess_limit_kills_total": ("counter", "Child processes killed for exceeding a limit"),
+    "adws_routing_attempts_total": ("counter", "/implement attempts by routed model and outcome"),
+    "adws_batch_plans_total": ("counter", "Plans implemented in batched sessions by outcome"),
+    "adws_speculations_total": ("counter", "Speculative runs of dependent tasks by outcome"),
+    "adws_pipeline_stages_total": ("counter", "run_pipeline.py stage runs by outcome"),
+    "adws_pipeline_stage_seconds": ("histogram", "run_pipeline.py stage duration"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def get_buckets(name: str) -> Tuple[float, ...]:
+    """Bucket bounds of a histogram."""
+    return METRIC_BUCKETS.get(name, DEFAULT_BUCKETS)
+
+
+def get_metrics_path() -> str:
+    """Path of the shared metric totals."""
+    return os.path.join(get_project_root(), "agents", "metrics", "metrics.json")
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+class MetricsRegistry:
+    """Per-process counters and histograms, merged into shared totals on flush."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_metrics_path()
+        self.lock_path = self.path + ".lock"
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Dict[str, Any]]] = {}
+        self._last_flush = time.monotonic()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Add to a counter."""
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0.0) + value
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record a histogram observation (seconds unless METRIC_BUCKETS says otherwise)."""
+        buckets = get_buckets(name)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            hist = series.setdefault(key, {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+                    break
+            hist["sum"] += value
+            hist["count"] += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS:
+            self.flush()
+
+    def _read_totals(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"counters": {}, "histograms": {}}
+
+    def flush(self) -> Dict[str, Any]:
+        """Merge this process's deltas into the shared totals and export them.
+
+        Returns the merged totals.
+        """
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+            self._last_flush = time.monotonic()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with file_lock(self.lock_path):
+            totals = self._read_totals()
+            if counters or histograms:
+                for name, series in counters.items():
+                    stored = totals["counters"].setdefault(name, {})
+                    for key, value in series.items():
+                        k = json.dumps(key)
+                        stored[k] = stored.get(k, 0.0) + value
+                for name, series in histograms.items():
+                    stored = totals["histograms"].setdefault(name, {})
+                    for key, hist in series.items():
+                        k = json.dumps(key)
+                        current = stored.setdefault(
+                            k, {"buckets": [0] * len(get_buckets(name)), "sum": 0.0, "count": 0}
+                        )
+                        current["buckets"] = [a + b for a, b in zip(current["buckets"], hist["buckets"])]
+                        current["sum"] += hist["sum"]
+                        current["count"] += hist["count"]
+                atomic_write(self.path, json.dumps(totals))
+
+        textfile_dir = os.getenv("ADWS_METRICS_TEXTFILE_DIR")
+        if textfile_dir:
+            os.makedirs(textfile_dir, exist_ok=True)
+            # node_exporter may read at any time, so the file must be replaced atomically
+            atomic_write(os.path.join(textfile_dir, TEXTFILE_NAME), render_prometheus(totals))
+        return totals
+
+
+def _format_labels(key: List[List[str]], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [tuple(p) for p in key] + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _queue_gauges() -> Dict[str, int]:
+    # Read-only: exporting metrics must not create, migrate or re-journal the queue
+    from .task_queue import get_queue_path
+    path = get_queue_path()
+    if not os.path.exists(path):
+        return {}
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5)
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+    return {status: n for status, n in rows}
+
+
+def render_prometheus(totals: Dict[str, Any]) -> str:
+    """Render merged totals (plus live gauges) in the Prometheus text format."""
+    lines = []
+
+    def header(name: str) -> None:
+        kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for name in sorted(totals.get("counters", {})):
+        header(name)
+        for k, value in sorted(totals["counters"][name].items()):
+            lines.append(f"{name}{_format_labels(json.loads(k))} {value:g}")
+
+    for name in sorted(totals.get("histograms", {})):
+        header(name)
+        for k, hist in sorted(totals["histograms"][name].items()):
+            key = json.loads(k)
+            cumulative = 0
+            for bound, count in zip(get_buckets(name), hist["buckets"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist['count']}")
+            lines.append(f"{name}_sum{_format_labels(key)} {hist['sum']:g}")
+            lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+
+    try:
+        queue_counts = _queue_gauges()
+    except Exception:
+        queue_counts = {}
+    if queue_counts:
+        header("adws_queue_tasks")
+        for status in ("pending", "claimed", "completed", "failed"):
+            lines.append(f'adws_queue_tasks{{status="{status}"}} {queue_counts.get(status, 0)}')
+
+    return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry (flushed at exit)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+            atexit.register(_registry.flush)
+        return _registry
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics on a background thread; each scrape flushes and renders."""
+    registry = get_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus(registry.flush()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,124 @@
+"""Phase run journal for SecureDealAI ADW workflows.
+
+run_phase.py appends one JSON line per event to
+agents/{phase_adw_id}/phase_journal.jsonl: the scheduled task order, each
+task start (with its ADW ID and PID) and each outcome. Every line is
+fsynced, so after a crash the journal says exactly which tasks finished,
+which were in flight and which never started. `run_phase.py --recover`
+replays it instead of re-deriving everything from the tracker.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .utils import get_project_root
+
+PHASE_JOURNAL_FILENAME = "phase_journal.jsonl"
+
+# Task outcomes that need no further work on recovery
+FINISHED_STATUSES = ("completed",)
+
+
+def get_phase_journal_path(phase_adw_id: str) -> str:
+    """Get the journal path for a phase run."""
+    return os.path.join(get_project_root(), "agents", phase_adw_id, PHASE_JOURNAL_FILENAME)
+
+
+def pid_alive(pid: Optional[int]) -> bool:
+    """True if a process with this PID is still running."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PhaseJournal:
+    """Append-only record of one run_phase.py run."""
+
+    def __init__(self, phase_adw_id: str):
+        self.phase_adw_id = phase_adw_id
+        self.path = get_phase_journal_path(phase_adw_id)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def record(self, event: str, **fields: Any) -> None:
+        """Append an event and fsync it."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        entry = {"ts": datetime.now().isoformat(), "event": event, **fields}
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def scheduled(self, phase: int, order: List[str], options: Dict[str, Any]) -> None:
+        self.record("scheduled", phase=phase, order=order, options=options)
+
+    def task_started(self, task_id: str, adw_id: str, pid: int) -> None:
+        self.record("task_started", task_id=task_id, adw_id=adw_id, pid=pid)
+
+    def task_finished(self, task_id: str, status: str, adw_id: Optional[str] = None,
+                      reason: Optional[str] = None, usage: Optional[Dict[str, Any]] = None) -> None:
+        self.record("task_finished", task_id=task_id, status=status, adw_id=adw_id, reason=reason,
+                    usage=usage)
+
+    def phase_finished(self, successful: int, failed: int) -> None:
+        self.record("phase_finished", successful=successful, failed=failed)
+
+    def replay(self) -> Dict[str, Any]:
+        """Rebuild the run from the journal.
+
+        Returns a dict with phase, order, options, finished (bool), runs
+        (count of scheduled/recovered runs) and tasks: {task_id: {status,
+        adw_id, pid, reason}} where status is "running" for tasks that were
+        in flight when the journal ends. A torn last line is ignored.
+        """
+        run: Dict[str, Any] = {
+            "phase": None,
+            "order": [],
+            "options": {},
+            "finished": False,
+            "runs": 0,
+            "tasks": {},
+        }
+        if not self.exists():
+            return run
+
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                event = entry.get("event")
+                if event == "scheduled":
+                    run["phase"] = entry["phase"]
+                    run["order"] = entry["order"]
+                    run["options"] = entry.get("options", {})
+                    run["runs"] += 1
+                elif event == "recovered":
+                    run["finished"] = False
+                    run["runs"] += 1
+                elif event == "task_started":
+                    run["tasks"][entry["task_id"]] = {
+                        "status": "running",
+                        "adw_id": entry["adw_id"],
+                        "pid": entry["pid"],
+                        "reason": None,
+                    }
+                elif event == "task_finished":
+                    task = run["tasks"].setdefault(entry["task_id"], {"pid": None})
+                    task["status"] = entry["status"]
+                    task["adw_id"] = entry.get("adw_id") or task.get("adw_id")
+                    task["reason"] = entry.get("reason")
+                elif event == "phase_finished":
+                    run["finished"] = True
+
+        return run
@@ -0,0 +1,400 @@
+"""Stage pipeline: tasks flow through /implement → validate → /commit → /pull_request.
+
+run_pipeline.py moves the tasks of a phase through STAGES. Every task works
+in its own git worktree on its own branch (adws/<task_id>-<adw_id>), so
+tasks can be in different stages at once: one validating while another
+implements. Each stage has its own concurrency limit and model:
+
+- implement: /implement on the routed model (the stage's model pins it)
+- validate: the plan's validation commands in the worktree; /validate for
+  plans that have none
+- commit: /commit; the stage fails if it leaves anything uncommitted
+- pull_request: /pull_request for the task's branch
+
+A failed stage sends the task back to the stage's on_failure (validate and
+commit go back to implement, pull_request tries again), with the failure
+passed to the agent; back in implement, the task moves one model up. After
+MAX_RETURNS returns the task fails.
+
+A task starts once the tasks it depends on have landed, i.e. passed the
+commit stage (or the last of implement/validate if there is no commit
+stage, in which case ADWS commits the changes itself). It starts from their
+branch (several are merged), or from the base ref if none is in the run.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .agent import execute_template
+from .data_types import AgentPromptResponse, AgentTemplateRequest, PipelineStage
+from .durations import record_run
+from .metrics import get_metrics
+from .routing import escalate, route_plan
+from .state import ADWState
+from .tracing import span
+from .tracker import get_tracker_writer
+from .utils import get_project_root, make_adw_id, setup_logger
+from .validation import run_validation
+from .worktrees import (
+    branch_name,
+    commit_all,
+    create_worktree,
+    diff_stats,
+    merge_refs,
+    remove_worktree,
+    resolve_ref,
+)
+
+STAGES: List[PipelineStage] = [
+    PipelineStage(name="implement", slash_command="/implement", agent_name="implementor",
+                  concurrency=2),
+    PipelineStage(name="validate", slash_command="/validate", agent_name="validator",
+                  concurrency=2, on_failure="implement"),
+    PipelineStage(name="commit", slash_command="/commit", agent_name="committer",
+                  concurrency=1, on_failure="implement"),
+    PipelineStage(name="pull_request", slash_command="/pull_request", agent_name="pr_creator",
+                  concurrency=1, on_failure="pull_request"),
+]
+
+# Times a task may be sent back to an earlier stage before it fails
+MAX_RETURNS = 2
+
+# Characters of a stage's failure passed on to the stage the task goes back to
+FEEDBACK_CHARS = 1500
+
+
+def parse_stage_values(spec: Optional[str], cast: Callable[[str], Any] = str) -> Dict[str, Any]:
+    """'implement=3,validate=2' -> {'implement': 3, 'validate': 2}."""
+    values: Dict[str, Any] = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected STAGE=VALUE, got {item!r}")
+        values[name.strip()] = cast(value.strip())
+    return values
+
+
+def configure_stages(
+    names: Optional[List[str]] = None,
+    concurrency: Optional[Dict[str, int]] = None,
+    models: Optional[Dict[str, str]] = None,
+) -> List[PipelineStage]:
+    """STAGES limited to names (in pipeline order), with concurrency and models overridden."""
+    known = [s.name for s in STAGES]
+    names = names or known
+    for name in [*names, *(concurrency or {}), *(models or {})]:
+        if name not in known:
+            raise ValueError(f"Unknown stage {name!r} (stages: {', '.join(known)})")
+    if "implement" not in names:
+        raise ValueError("The implement stage can't be left out")
+    stages = []
+    for stage in STAGES:
+        if stage.name not in names:
+            continue
+        update: Dict[str, Any] = {}
+        if stage.name in (concurrency or {}):
+            update["concurrency"] = max(1, concurrency[stage.name])
+        if stage.name in (models or {}):
+            update["model"] = models[stage.name]
+        if stage.on_failure not in names:
+            update["on_failure"] = None
+        stages.append(stage.model_copy(update=update))
+    return stages
+
+
+def task_deps(task: Dict[str, Any], dep_map: Dict[str, List[str]]) -> List[str]:
+    """Dependencies from the map plus those declared in the plan."""
+    return sorted(set(dep_map.get(task["task_id"], [])) | set(task.get("depends_on", [])))
+
+
+def task_waves(tasks: List[Dict[str, Any]], dep_map: Dict[str, List[str]]) -> List[List[str]]:
+    """Task IDs grouped by depth within the run: each wave only needs the waves before it."""
+    ids = {t["task_id"] for t in tasks}
+    depth: Dict[str, int] = {}
+    remaining = list(tasks)
+    while remaining:
+        ready = [t for t in remaining if all(d in depth for d in task_deps(t, dep_map) if d in ids)]
+        if not ready:
+            break  # a cycle; those tasks never start
+        for task in ready:
+            in_run = [depth[d] for d in task_deps(task, dep_map) if d in ids]
+            depth[task["task_id"]] = 1 + max(in_run, default=0)
+            remaining.remove(task)
+    waves: List[List[str]] = [[] for _ in range(max(depth.values(), default=0))]
+    for task_id, level in sorted(depth.items()):
+        waves[level - 1].append(task_id)
+    return waves
+
+
+class TaskRun:
+    """One task on its way through the pipeline."""
+
+    def __init__(self, task: Dict[str, Any], adw_id: str):
+        self.task = task
+        self.task_id: str = task["task_id"]
+        self.adw_id = adw_id
+        self.state = ADWState(adw_id)
+        self.logger = setup_logger(adw_id, "run_pipeline")
+        self.branch = f"adws/{self.task_id}-{adw_id}"
+        self.base_branch: Optional[str] = None
+        self.worktree: Optional[str] = None
+        self.model: Optional[str] = None
+        self.pinned = False
+        self.visits: Dict[str, int] = {}
+        self.returns = 0
+        self.feedback: Optional[str] = None
+        self.implement_seconds = 0.0
+        self.landed = False
+
+    def agent_name(self, stage: PipelineStage) -> str:
+        """implementor for the first visit, implementor_2 for the second, ..."""
+        visits = self.visits.get(stage.name, 1)
+        return stage.agent_name if visits == 1 else f"{stage.agent_name}_{visits}"
+
+    def execute(self, stage: PipelineStage, args: List[str], model: Optional[str]) -> AgentPromptResponse:
+        """Run the stage's slash command in the task's worktree."""
+        name = self.agent_name(stage)
+        response = execute_template(AgentTemplateRequest(
+            agent_name=name,
+            slash_command=stage.slash_command,
+            args=args,
+            adw_id=self.adw_id,
+            model=model,
+            cwd=self.worktree,
+        ))
+        if response.resource_usage:
+            self.state.add_resource_usage(name, response.resource_usage.model_dump())
+        return response
+
+
+class Pipeline:
+    """Runs tasks through stages; run() returns {task_id: completed | failed | skipped}."""
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        tasks: List[Dict[str, Any]],
+        dep_map: Dict[str, List[str]],
+        completed: List[str],
+        logger: logging.Logger,
+        base: str = "HEAD",
+        issue: Optional[int] = None,
+    ):
+        self.stages = stages
+        self.tasks = tasks
+        self.dep_map = dep_map
+        self.completed = set(completed)
+        self.logger = logger
+        self.repo = get_project_root()
+        self.base = resolve_ref(base, self.repo)
+        self.base_branch = branch_name(base, self.repo)
+        self.issue = issue
+        self.landing = "commit" if any(s.name == "commit" for s in stages) else \
+            [s.name for s in stages if s.name in ("implement", "validate")][-1]
+        self.runs: Dict[str, TaskRun] = {}
+        self.results: Dict[str, str] = {}
+
+    # Scheduling
+
+    def run(self) -> Dict[str, str]:
+        queues: Dict[str, List[TaskRun]] = {s.name: [] for s in self.stages}
+        running: Dict[Any, Tuple[PipelineStage, TaskRun]] = {}
+        with ThreadPoolExecutor(max_workers=sum(s.concurrency for s in self.stages)) as pool:
+            while True:
+                queues["implement"].extend(self._admit())
+                for stage in self.stages:
+                    busy = sum(1 for s, _ in running.values() if s.name == stage.name)
+                    while queues[stage.name] and busy < stage.concurrency:
+                        task_run = queues[stage.name].pop(0)
+                        running[pool.submit(self._run_stage, stage, task_run)] = (stage, task_run)
+                        busy += 1
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, task_run = running.pop(future)
+                    try:
+                        success, output = future.result()
+                    except Exception as e:
+                        success, output = False, f"{type(e).__name__}: {e}"
+                    target = self._advance(stage, task_run, success, output)
+                    if target:
+                        queues[target].append(task_run)
+        for task in self.tasks:
+            self.results.setdefault(task["task_id"], "skipped")
+        return self.results
+
+    def _admit(self) -> List[TaskRun]:
+        """Start the tasks whose dependencies have landed; skip those that never will."""
+        ids = {t["task_id"] for t in self.tasks}
+        started = []
+        for task in self.tasks:
+            task_id = task["task_id"]
+            if task_id in self.runs or task_id in self.results:
+                continue
+            deps = task_deps(task, self.dep_map)
+            missing = [d for d in deps if d not in ids and d not in self.completed]
+            blocked = [d for d in deps if d in ids and self.results.get(d) in ("failed", "skipped")
+                       and not (d in self.runs and self.runs[d].landed)]
+            if missing or blocked:
+                self.results[task_id] = "skipped"
+                self.logger.warning(f"Skipping {task_id}: dependencies not met: {missing + blocked}")
+                continue
+            in_run = [d for d in deps if d in ids]
+            if all(d in self.runs and self.runs[d].landed for d in in_run):
+                task_run = self._start(task, [self.runs[d] for d in in_run])
+                if task_run:
+                    started.append(task_run)
+        return started
+
+    def _start(self, task: Dict[str, Any], parents: List[TaskRun]) -> Optional[TaskRun]:
+        """Create the task's state and worktree (on its parents' branches, merged)."""
+        task_run = TaskRun(task, make_adw_id())
+        self.runs[task_run.task_id] = task_run
+        start = parents[0].branch if parents else self.base
+        task_run.base_branch = parents[0].branch if len(parents) == 1 else self.base_branch
+        task_run.worktree = create_worktree(f"{task_run.adw_id}-pipeline", start, self.repo,
+                                            branch=task_run.branch)
+        task_run.state.update(
+            task_id=task_run.task_id,
+            task_name=task["task_name"],
+            phase=task["phase"],
+            plan_file=task["plan_file"],
+            issue_number=self.issue,
+            total_steps=task["total_steps"],
+            dependencies=task["depends_on"],
+            branch=task_run.branch,
+        )
+        task_run.state.set_status("in_progress")
+        task_run.state.save("init")
+        self.logger.info(f"Starting {task_run.task_id} (ADW ID {task_run.adw_id}) on {task_run.branch}")
+
+        if len(parents) > 1:
+            error = merge_refs(task_run.worktree, [p.branch for p in parents[1:]])
+            if error:
+                self._finish(task_run, "failed", f"Dependency branches do not merge: {error}")
+                return None
+        return task_run
+
+    def _advance(self, stage: PipelineStage, task_run: TaskRun, success: bool, output: str) -> Optional[str]:
+        """Stage the task goes to next (None when it is done)."""
+        get_metrics().inc("adws_pipeline_stages_total", stage=stage.name,
+                          outcome="completed" if success else "failed")
+        if success:
+            task_run.logger.info(f"{stage.name} passed")
+            if stage.name == self.landing:
+                if self.landing != "commit":
+                    commit_all(task_run.worktree, f"{task_run.task_id}: {task_run.task['task_name']}")
+                task_run.landed = True
+            names = [s.name for s in self.stages]
+            index = names.index(stage.name)
+            if index + 1 < len(names):
+                task_run.feedback = None
+                return names[index + 1]
+            self._finish(task_run, "completed")
+            return None
+
+        task_run.logger.warning(f"{stage.name} failed: {output[:500]}")
+        if not stage.on_failure or task_run.returns >= MAX_RETURNS:
+            self._finish(task_run, "failed", output)
+            return None
+        task_run.returns += 1
+        task_run.feedback = f"The {stage.name} stage failed: {output[-FEEDBACK_CHARS:]}"
+        if stage.on_failure == "implement" and not task_run.pinned:
+            task_run.model = escalate(task_run.model) or task_run.model
+        self.logger.info(f"{task_run.task_id}: {stage.name} failed; back to {stage.on_failure}")
+        return stage.on_failure
+
+    def _finish(self, task_run: TaskRun, status: str, error: Optional[str] = None) -> None:
+        self.results[task_run.task_id] = status
+        if status == "completed":
+            if not get_tracker_writer().update(task_run.task_id, "completed"):
+                task_run.logger.warning(f"Could not update tracker for task {task_run.task_id}")
+        else:
+            task_run.state.update(error_message=(error or "")[:1000])
+        task_run.state.set_status(status)
+        task_run.state.save(status)
+        if task_run.worktree:
+            remove_worktree(task_run.worktree, self.repo)
+        self.logger.info(f"{task_run.task_id} {status}" + (f" ({task_run.branch})" if task_run.landed else ""))
+
+    # Stages (run in the pool)
+
+    def _run_stage(self, stage: PipelineStage, task_run: TaskRun) -> Tuple[bool, str]:
+        task_run.visits[stage.name] = task_run.visits.get(stage.name, 0) + 1
+        task_run.state.update(pipeline_stage=stage.name)
+        task_run.state.save(f"{stage.name}_started")
+        started = time.monotonic()
+        with span("pipeline_stage", stage=stage.name, task_id=task_run.task_id,
+                  adw_id=task_run.adw_id) as attrs:
+            success, output = getattr(self, f"_{stage.name}")(stage, task_run)
+            attrs["success"] = success
+        get_metrics().observe("adws_pipeline_stage_seconds", time.monotonic() - started, stage=stage.name)
+        return success, output
+
+    def _implement(self, stage: PipelineStage, task_run: TaskRun) -> Tuple[bool, str]:
+        task = task_run.task
+        if task_run.model is None:
+            decision = route_plan(task_run.task_id, task["plan_file"], task, model=stage.model)
+            task_run.model, task_run.pinned = decision.model, decision.reason in ("pinned", "static")
+        task_run.logger.info(f"Executing /implement on {task_run.model} in {task_run.worktree}")
+        args = [task["plan_file"]] + ([f"-- {task_run.feedback}"] if task_run.feedback else [])
+        started = time.monotonic()
+        response = task_run.execute(stage, args, task_run.model)
+        task_run.implement_seconds = time.monotonic() - started
+        task_run.state.update(model=task_run.model)
+        if not response.success or not any(s.name == "validate" for s in self.stages):
+            record_run(task_run.task_id, task["plan_file"], task, task_run.model,
+                       task_run.implement_seconds, "completed" if response.success else "failed",
+                       task_run.adw_id)
+        return response.success, response.output
+
+    def _validate(self, stage: PipelineStage, task_run: TaskRun) -> Tuple[bool, str]:
+        task = task_run.task
+        commands = task.get("validation_commands") or []
+        if commands:
+            task_run.logger.info(f"Running {len(commands)} validation command(s)...")
+            results = run_validation(commands, cwd=task_run.worktree)
+            task_run.state.update(validation_results=[])
+            for result in results:
+                task_run.state.add_validation_result(**result.model_dump())
+            failed = next((r for r in results if not r.passed), None)
+            success = failed is None
+            output = "" if success else f"{failed.command}\n{failed.error or failed.output or ''}".rstrip()
+        else:
+            # No commands in the plan: the agent checks the work against it
+            response = task_run.execute(stage, [task["plan_file"]], stage.model)
+            success, output = response.success, response.output
+        record_run(task_run.task_id, task["plan_file"], task, task_run.model, task_run.implement_seconds,
+                   "completed" if success else "validation_failed", task_run.adw_id)
+        return success, output
+
+    def _commit(self, stage: PipelineStage, task_run: TaskRun) -> Tuple[bool, str]:
+        before = resolve_ref("HEAD", task_run.worktree)
+        context = f"{task_run.task_id}: {task_run.task['task_name']}"
+        if task_run.feedback:
+            context += f" -- {task_run.feedback}"
+        response = task_run.execute(stage, [context], stage.model)
+        if not response.success:
+            return False, response.output
+        if resolve_ref("HEAD", task_run.worktree) == before:
+            return False, "/commit made no commit"
+        left = diff_stats(task_run.worktree)["files_changed"]
+        if left:
+            return False, f"/commit left {left} file(s) uncommitted"
+        return True, response.output
+
+    def _pull_request(self, stage: PipelineStage, task_run: TaskRun) -> Tuple[bool, str]:
+        task = task_run.task
+        plan = os.path.relpath(task["plan_file"], self.repo)
+        context = (f"{task_run.task_id}: {task['task_name']} (plan {plan}; branch {task_run.branch}, "
+                   f"based on {task_run.base_branch})")
+        if self.issue:
+            context += f", part of #{self.issue}"
+        if task_run.feedback:
+            context += f" -- {task_run.feedback}"
+        response = task_run.execute(stage, [context], stage.model)
+        return response.success, response.output
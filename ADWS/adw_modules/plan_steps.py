@@ -0,0 +1,313 @@
+"""Step-level parallelism: the independent steps of one plan at the same time.
+
+The "### Step N" sections of a large plan often touch unrelated files (a
+migration and a frontend type, say). With --parallel-steps the plan is
+split into steps and their dependencies are inferred:
+
+- a step depends on an earlier step that mentions one of the same files
+  (paths, plus relative and @/ imports resolved against the step's own file)
+- a step that names "Step N" or "the previous step" depends on it
+- a step that mentions no files at all (mkdir, deploy, run migrations) is a
+  barrier: it waits for every earlier step, and every later step waits for it
+
+Each step runs as its own /implement sub-agent in an isolated worktree
+(worktrees.py), started from a snapshot of the project tree plus the steps
+merged so far, so a run takes about as long as its longest chain of steps.
+Finished steps are merged into an integration worktree; when all are in,
+the combined change is applied to the project tree and the plan's
+validation commands run there. A step that fails or doesn't merge stops the
+steps still running and fails the attempt with the project tree untouched;
+failed validation puts the changed files back as they were. run_task.py
+then falls back to implementing the whole plan in one session.
+"""
+
+import logging
+import os
+import posixpath
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agent import execute_template
+from .data_types import AgentPromptResponse, AgentTemplateRequest, PlanStep
+from .durations import record_run
+from .resources import StopGroup
+from .routing import FILE_PATTERN, describe_decision, route_plan
+from .state import ADWState
+from .tracing import span
+from .utils import atomic_write, get_project_root
+from .validation import run_validation
+from .worktrees import (
+    apply_patch,
+    changed_paths,
+    changes_since,
+    commit_all,
+    create_worktree,
+    remove_worktree,
+    resolve_ref,
+    restore_paths,
+    snapshot_commit,
+)
+
+# Sub-agents at a time when --parallel-steps is given without a number
+DEFAULT_STEP_PARALLEL = 3
+
+STEP_HEADING = re.compile(r"^###\s*Step\s*(\d+)\s*:?\s*(.*)$", re.MULTILINE)
+SECTION_HEADING = re.compile(r"^##\s", re.MULTILINE)
+
+# import ... from './types.ts', import Foo from '@/components/Foo.vue'
+IMPORT_PATTERN = re.compile(r"""(?:from|import)\s*\(?\s*['"]((?:\.{1,2}|@)/[^'"]+)['"]""")
+IMPORT_ALIASES = {"@/": "apps/web/src/"}
+
+STEP_REFERENCE = re.compile(r"\bsteps?\s+(\d+)\b", re.IGNORECASE)
+PREVIOUS_STEP = re.compile(r"\b(?:previous|last) step\b", re.IGNORECASE)
+
+
+def get_step_parallel() -> int:
+    """Step sub-agents at a time (ADWS_PARALLEL_STEPS; 0 or invalid runs plans in one session)."""
+    try:
+        return int(os.getenv("ADWS_PARALLEL_STEPS", "0") or 0)
+    except ValueError:
+        return 0
+
+
+def split_plan(content: str) -> Tuple[str, List[PlanStep]]:
+    """(text before the first step, steps); a step ends at the next step or ## section."""
+    matches = list(STEP_HEADING.finditer(content))
+    if not matches:
+        return content, []
+    steps = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        section = SECTION_HEADING.search(content, match.end(), end)
+        if section:
+            end = section.start()
+        steps.append(PlanStep(
+            number=int(match.group(1)),
+            title=match.group(2).strip(),
+            body=content[match.start():end].rstrip(),
+        ))
+    return content[:matches[0].start()], steps
+
+
+def _stem(path: str) -> str:
+    # Imports often leave out the extension
+    return os.path.splitext(path)[0]
+
+
+def step_files(step: PlanStep) -> List[str]:
+    """Project paths a step mentions, with its relative and aliased imports resolved."""
+    files = set(FILE_PATTERN.findall(step.body))
+    own = FILE_PATTERN.search(step.body)
+    for spec in IMPORT_PATTERN.findall(step.body):
+        alias = next((a for a in IMPORT_ALIASES if spec.startswith(a)), None)
+        if alias:
+            files.add(IMPORT_ALIASES[alias] + spec[len(alias):])
+        elif own:
+            files.add(posixpath.normpath(posixpath.join(posixpath.dirname(own.group(1)), spec)))
+    return sorted(files)
+
+
+def infer_dependencies(steps: List[PlanStep]) -> List[PlanStep]:
+    """Steps with files and depends_on filled in (see the module docstring)."""
+    result: List[PlanStep] = []
+    for step in steps:
+        files = step_files(step)
+        stems = {_stem(f) for f in files}
+        earlier = {s.number for s in result}
+        deps = set()
+        for other in result:
+            if not files or not other.files or stems & {_stem(f) for f in other.files}:
+                deps.add(other.number)
+        text = step.body.split("\n", 1)[1] if "\n" in step.body else ""
+        deps.update(int(n) for n in STEP_REFERENCE.findall(text) if int(n) in earlier)
+        if result and PREVIOUS_STEP.search(text):
+            deps.add(result[-1].number)
+        result.append(step.model_copy(update={"files": files, "depends_on": sorted(deps)}))
+    return result
+
+
+def step_waves(steps: List[PlanStep]) -> List[List[int]]:
+    """Step numbers grouped by depth: each wave only needs the waves before it."""
+    depth: Dict[int, int] = {}
+    for step in steps:
+        depth[step.number] = 1 + max((depth[d] for d in step.depends_on if d in depth), default=0)
+    waves: List[List[int]] = [[] for _ in range(max(depth.values(), default=0))]
+    for number, level in depth.items():
+        waves[level - 1].append(number)
+    return waves
+
+
+def describe_waves(waves: List[List[int]]) -> str:
+    """e.g. '1 → 2,4,6 → 3,5 → 7'."""
+    return " → ".join(",".join(str(n) for n in wave) for wave in waves)
+
+
+def write_step_plan(adw_id: str, preamble: str, step: PlanStep, total: int, merged: List[int]) -> str:
+    """Plan file holding only one step, under agents/{adw_id}/steps/."""
+    done = f" Steps {', '.join(map(str, sorted(merged)))} are already in this tree." if merged else ""
+    content = (
+        f"{preamble.rstrip()}\n\n"
+        f"> **ADWS**: this copy of the plan holds only Step {step.number} of {total}; other steps are "
+        f"implemented by other agents at the same time.{done} Implement just this step, and leave "
+        f"deployment and validation to the orchestrator.\n\n"
+        f"{step.body}\n"
+    )
+    path = os.path.join(get_project_root(), "agents", adw_id, "steps", f"step_{step.number}.md")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, content)
+    return path
+
+
+def run_step(
+    adw_id: str,
+    preamble: str,
+    step: PlanStep,
+    total: int,
+    merged: List[int],
+    base: str,
+    model: str,
+    group: Optional[StopGroup] = None,
+) -> Tuple[AgentPromptResponse, str]:
+    """Implement one step in its own worktree from base; returns (response, patch).
+
+    The agent belongs to group, so a failing sibling step can stop it.
+    """
+    name = f"step_{step.number}"
+    plan = write_step_plan(adw_id, preamble, step, total, merged)
+    worktree = create_worktree(f"{adw_id}-{name}", base)
+    try:
+        with span("plan_step", step=step.number, model=model) as attrs, (group or StopGroup()).member():
+            response = execute_template(AgentTemplateRequest(
+                agent_name=name,
+                slash_command="/implement",
+                args=[plan],
+                adw_id=adw_id,
+                model=model,
+                cwd=worktree,
+            ))
+            patch = changes_since(worktree, base) if response.success else ""
+            attrs["success"] = response.success
+        return response, patch
+    finally:
+        remove_worktree(worktree)
+
+
+def implement_steps(
+    adw_id: str,
+    plan_file: str,
+    task_id: Optional[str],
+    metadata: Dict[str, Any],
+    state: ADWState,
+    logger: logging.Logger,
+    model: Optional[str] = None,
+    parallel: int = DEFAULT_STEP_PARALLEL,
+    validate: bool = True,
+) -> Optional[AgentPromptResponse]:
+    """Implement a plan step by step, independent steps in parallel.
+
+    Returns None when the plan has no independent steps (nothing to gain),
+    else a response that is unsuccessful if a step failed, the steps did not
+    merge, or validation failed.
+    """
+    with open(plan_file, "r", encoding="utf-8") as f:
+        preamble, steps = split_plan(f.read())
+    steps = infer_dependencies(steps)
+    waves = step_waves(steps)
+    if len(waves) == len(steps):
+        logger.info("No independent steps in the plan; implementing it in one session")
+        return None
+
+    decision = route_plan(task_id, plan_file, metadata, model=model)
+    logger.info(f"Implementing {len(steps)} steps on {describe_decision(decision)}, "
+                f"up to {parallel} at a time: {describe_waves(waves)}")
+    repo = get_project_root()
+    started = time.monotonic()
+    base = snapshot_commit(repo)
+    integration = create_worktree(f"{adw_id}-steps", base, repo)
+    merged: List[int] = []
+    failure: Optional[str] = None
+    applied: List[str] = []
+    cost = 0.0
+    group = StopGroup()
+
+    def collect(step: PlanStep, response: AgentPromptResponse) -> None:
+        nonlocal cost
+        if response.resource_usage:
+            state.add_resource_usage(f"step_{step.number}", response.resource_usage.model_dump())
+        cost += response.cost_usd or 0.0
+
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            pending, running = list(steps), {}
+            while (pending or running) and not failure:
+                head = resolve_ref("HEAD", integration)
+                for step in [s for s in pending if set(s.depends_on) <= set(merged)][:parallel - len(running)]:
+                    pending.remove(step)
+                    running[pool.submit(run_step, adw_id, preamble, step, len(steps), list(merged),
+                                        head, decision.model, group)] = step
+                if not running:
+                    failure = f"Steps {[s.number for s in pending]} can never start"
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    response, patch = future.result()
+                    collect(step, response)
+                    if failure:
+                        continue
+                    if not response.success:
+                        failure = f"Step {step.number} failed: {response.output[:500]}"
+                        continue
+                    error = apply_patch(integration, patch, three_way=True)
+                    if error:
+                        failure = f"Step {step.number} does not merge with steps {merged}: {error}"
+                        continue
+                    commit_all(integration, f"Step {step.number}: {step.title}")
+                    merged.append(step.number)
+                    logger.info(f"Step {step.number} merged ({len(merged)}/{len(steps)})")
+            if failure and running:
+                logger.warning(f"{failure}; stopping {len(running)} running step(s)")
+                group.stop()
+        # Stopped steps still count what they used
+        for future, step in running.items():
+            collect(step, future.result()[0])
+        if not failure:
+            applied = changed_paths(integration, base)
+            error = apply_patch(repo, changes_since(integration, base))
+            if error:
+                failure = f"Merged steps do not apply to the project tree: {error}"
+                applied = []
+    finally:
+        remove_worktree(integration, repo)
+
+    outcome = "failed" if failure else "completed"
+    commands = (metadata.get("validation_commands") or []) if validate else []
+    if not failure and commands:
+        from .speculation import publish_base
+        publish_base(state, logger)
+        logger.info(f"Running {len(commands)} validation command(s)...")
+        results = run_validation(commands)
+        state.update(validation_results=[])
+        for result in results:
+            state.add_validation_result(**result.model_dump())
+        failed = next((r for r in results if not r.passed), None)
+        if failed:
+            outcome = "validation_failed"
+            failure = f"Validation failed: {failed.command}\n{failed.error or failed.output or ''}".rstrip()
+            # The fallback starts from the tree as it was before the steps
+            restore_paths(repo, base, applied)
+            logger.info(f"Restored {len(applied)} file(s) changed by the steps")
+
+    duration = time.monotonic() - started
+    record_run(task_id, plan_file, metadata, decision.model, duration, outcome, adw_id)
+    state.update(model=decision.model)
+    if failure:
+        logger.warning(failure)
+    return AgentPromptResponse(
+        output=failure or f"Implemented {len(steps)} steps ({describe_waves(waves)})",
+        success=not failure,
+        session_id=None,
+        cost_usd=cost,
+    )
@@ -0,0 +1,207 @@
+"""Profiling of the orchestrator process for SecureDealAI ADW workflows.
+
+`--profile` on run_task.py, run_phase.py, run_issue.py and run_pipeline.py
+profiles the Python process itself (plan parsing, state, tracker,
+transcript handling, waiting on children), not the Claude Code agent it
+starts. Two modes (--profile-mode):
+
+- sample (default): a background thread snapshots every thread's stack
+  every SAMPLE_INTERVAL_SECONDS. Wall-clock, so time spent waiting on a
+  child shows up as such; the overhead is a few microseconds per sample,
+  low enough to leave on.
+- cprofile: deterministic cProfile of the main thread; exact call counts,
+  but it slows Python-heavy code noticeably.
+
+At exit the profile is saved under agents/<adw_id>/profile/ (the run
+directory of the process's first setup_logger call) and a top-N summary
+is printed:
+
+    <name>.folded  collapsed stacks (flamegraph.pl, speedscope)    [sample]
+    <name>.pstats  pstats dump (snakeviz, python -m pstats)       [cprofile]
+    <name>.txt     the printed summary
+"""
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .tracing import get_default_log_dir
+from .utils import get_project_root
+
+PROFILE_MODES = ("sample", "cprofile")
+
+# Seconds between stack samples (100 Hz)
+SAMPLE_INTERVAL_SECONDS = 0.01
+
+DEFAULT_TOP = 20
+
+Frame = Tuple[str, int, str]
+
+
+def _frame_label(frame: Frame) -> str:
+    filename, lineno, name = frame
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler running on a daemon thread."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sampler_cpu = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="adws-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            cpu = time.thread_time()
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[(names.get(ident, str(ident)), tuple(stack))] += 1
+            self.samples += 1
+            self.sampler_cpu += time.thread_time() - cpu
+
+    def folded(self) -> str:
+        """Collapsed stacks, one 'thread;outer;...;inner count' line per stack."""
+        lines = []
+        for (thread, stack), count in self.stacks.most_common():
+            labels = [thread] + [_frame_label(f).replace(";", ":") for f in stack]
+            lines.append(f"{';'.join(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, top: int, wall: float) -> str:
+        """Top functions by self and total samples."""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        stack_samples = sum(self.stacks.values())
+        for (_, stack), count in self.stacks.items():
+            if not stack:
+                continue
+            self_counts[stack[-1]] += count
+            for frame in set(stack):
+                total_counts[frame] += count
+
+        lines = [
+            f"Sampling profile: {self.samples} samples over {wall:.1f}s "
+            f"({stack_samples} thread stacks, every {self.interval * 1000:.0f}ms)",
+            f"Sampler overhead: {self.sampler_cpu * 1000:.0f}ms CPU "
+            f"({self.sampler_cpu / wall * 100 if wall else 0:.2f}% of wall time)",
+            "",
+            f"{'self%':>6} {'total%':>7}  function",
+        ]
+        for frame, count in self_counts.most_common(top):
+            lines.append(f"{count / stack_samples * 100:6.1f} {total_counts[frame] / stack_samples * 100:7.1f}  "
+                         f"{_frame_label(frame)}")
+        return "\n".join(lines)
+
+
+class Profiler:
+    """Profiles this process from start() until exit and reports at exit."""
+
+    def __init__(self, mode: str = "sample", name: str = "profile", top: int = DEFAULT_TOP):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.name = name
+        self.top = top
+        self.started = 0.0
+        self._sampler: Optional[SamplingProfiler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._done = False
+
+    def start(self) -> "Profiler":
+        self.started = time.monotonic()
+        if self.mode == "sample":
+            self._sampler = SamplingProfiler()
+            self._sampler.start()
+        else:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        atexit.register(self.finish)
+        return self
+
+    def output_dir(self) -> str:
+        """agents/<adw_id>/profile, or agents/profile before any run directory exists."""
+        log_dir = get_default_log_dir()
+        if log_dir:
+            return os.path.join(os.path.dirname(log_dir), "profile")
+        return os.path.join(get_project_root(), "agents", "profile")
+
+    def finish(self) -> Optional[Dict[str, str]]:
+        """Stop profiling, write the profile files and print the summary.
+
+        Returns the written paths by kind; safe to call more than once.
+        """
+        if self._done:
+            return None
+        self._done = True
+        wall = time.monotonic() - self.started
+
+        directory = self.output_dir()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.name}_{os.getpid()}")
+        paths: Dict[str, str] = {}
+
+        if self._sampler:
+            self._sampler.stop()
+            summary = self._sampler.summary(self.top, wall)
+            paths["folded"] = base + ".folded"
+            with open(paths["folded"], "w") as f:
+                f.write(self._sampler.folded())
+        else:
+            self._cprofile.disable()
+            paths["pstats"] = base + ".pstats"
+            self._cprofile.dump_stats(paths["pstats"])
+            buffer = io.StringIO()
+            stats = pstats.Stats(self._cprofile, stream=buffer)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            summary = f"cProfile: {wall:.1f}s wall\n" + _trim_pstats(buffer.getvalue())
+
+        paths["summary"] = base + ".txt"
+        with open(paths["summary"], "w") as f:
+            f.write(summary + "\n")
+
+        print(f"\n{'=' * 60}\nPROFILE ({self.mode}, top {self.top})\n{'=' * 60}")
+        print(summary)
+        print(f"\nProfile saved to: {directory}")
+        return paths
+
+
+def _trim_pstats(text: str) -> str:
+    """Drop pstats' blank preamble lines."""
+    lines: List[str] = [line.rstrip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line.strip())
+
+
+def start_profiling(mode: Optional[str], name: str, top: int = DEFAULT_TOP) -> Optional[Profiler]:
+    """Start profiling this process if mode is set (the --profile value)."""
+    if not mode:
+        return None
+    return Profiler(mode, name, top).start()
@@ -0,0 +1,249 @@
+"""Rate-limit-aware scheduler for GitHub calls.
+
+Every gh CLI / REST call goes through a token bucket that is shared by all
+ADWS processes on the host (state lives in agents/github_quota/). The
+scheduler tracks GitHub's primary quota from X-RateLimit-* headers, backs
+off on secondary-limit errors, and keeps a reserve of tokens so that
+state-changing calls (comments, labels) are not starved by reads.
+"""
+
+import json
+import os
+import re
+import time
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+from .utils import get_project_root, file_lock, atomic_write
+
+# Sustained request rate across all processes (GitHub recommends ~1 write/sec)
+DEFAULT_RATE_PER_SECOND = float(os.getenv("ADWS_GITHUB_RATE", "1.0"))
+DEFAULT_BURST = int(os.getenv("ADWS_GITHUB_BURST", "5"))
+
+# Tokens held back for writes; reads only run when more than this is available
+WRITE_RESERVE_TOKENS = 2
+
+# Below this primary quota, reads wait for the reset window; writes still go through
+READ_QUOTA_FLOOR = 50
+
+# Default backoff for secondary limits without a Retry-After header (GitHub docs: >= 60s)
+SECONDARY_LIMIT_BACKOFF = 60.0
+
+# Longest single wait we are willing to do for a read before giving up on the window
+MAX_WAIT_SECONDS = 900.0
+
+_RATE_LIMIT_PATTERN = re.compile(
+    r"(rate limit|abuse detection|HTTP 429)", re.IGNORECASE
+)
+
+
+def rate_limit_retry_after(
+    status: Optional[int] = None,
+    headers: Optional[Dict[str, str]] = None,
+    text: str = "",
+) -> Optional[float]:
+    """Return seconds to wait if a response indicates a rate limit, else None.
+
+    Handles primary limits (403/429 with X-RateLimit-Remaining: 0),
+    secondary limits (Retry-After or "secondary rate limit" message) and
+    gh CLI error text where headers are not available.
+    """
+    headers = headers or {}
+    if status is None:
+        limited = bool(_RATE_LIMIT_PATTERN.search(text or ""))
+    else:
+        limited = status in (403, 429) and bool(
+            headers.get("x-ratelimit-remaining") == "0"
+            or "retry-after" in headers
+            or _RATE_LIMIT_PATTERN.search(text or "")
+        )
+    if not limited:
+        return None
+
+    if "retry-after" in headers:
+        try:
+            return max(1.0, float(headers["retry-after"]))
+        except ValueError:
+            pass
+    if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+        try:
+            return max(1.0, float(headers["x-ratelimit-reset"]) - time.time())
+        except ValueError:
+            pass
+    return SECONDARY_LIMIT_BACKOFF
+
+
+def _empty_usage() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "reads": 0,
+        "writes": 0,
+        "rate_limited": 0,
+        "retries": 0,
+        "wait_seconds": 0.0,
+        "quota_remaining": None,
+        "quota_limit": None,
+        "quota_reset": None,
+    }
+
+
+class GitHubScheduler:
+    """Token bucket shared across processes via a locked JSON state file.
+
+    Args:
+        rate: Tokens added per second
+        burst: Bucket capacity
+        state_dir: Directory for the shared bucket state (default: agents/github_quota)
+    """
+
+    STATE_FILENAME = "bucket.json"
+    LOCK_FILENAME = "bucket.lock"
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        state_dir: Optional[str] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.state_dir = state_dir or os.path.join(get_project_root(), "agents", "github_quota")
+        self.state_path = os.path.join(self.state_dir, self.STATE_FILENAME)
+        self.lock_path = os.path.join(self.state_dir, self.LOCK_FILENAME)
+        self._thread_lock = threading.Lock()
+
+        # Per-process usage, exposed in ADW state
+        self.usage: Dict[str, Any] = _empty_usage()
+        # Usage of the calls made by one thread (track_usage)
+        self._local = threading.local()
+
+    def count(self, key: str, value: float = 1) -> None:
+        """Add to a usage counter, for the process and the thread's tracked usage."""
+        for usage in (self.usage, getattr(self._local, "usage", None)):
+            if usage is not None:
+                usage[key] = round(usage[key] + value, 3)
+
+    @contextmanager
+    def track_usage(self) -> Iterator[Dict[str, Any]]:
+        """Collect the usage of the calls this thread makes inside the block.
+
+        run_issue.py batches run several issues in one process; each issue
+        stores only its own calls, not the process total.
+        """
+        previous = getattr(self._local, "usage", None)
+        self._local.usage = _empty_usage()
+        try:
+            yield self._local.usage
+        finally:
+            self._local.usage = previous
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {"tokens": float(self.burst), "updated": time.time()}
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        atomic_write(self.state_path, json.dumps(state))
+
+    def _try_acquire(self, write: bool) -> float:
+        """Take a token if allowed; return 0 on success or seconds to wait."""
+        with self._thread_lock, file_lock(self.lock_path):
+            state = self._read_state()
+            now = time.time()
+
+            elapsed = max(0.0, now - state.get("updated", now))
+            tokens = min(float(self.burst), state.get("tokens", self.burst) + elapsed * self.rate)
+            state["tokens"] = tokens
+            state["updated"] = now
+
+            blocked_until = state.get("blocked_until", 0)
+            if blocked_until > now:
+                self._write_state(state)
+                return blocked_until - now
+
+            if not write:
+                remaining = state.get("remaining")
+                reset = state.get("reset", 0)
+                if remaining is not None and remaining <= READ_QUOTA_FLOOR and reset > now:
+                    self._write_state(state)
+                    return min(reset - now, MAX_WAIT_SECONDS)
+
+            needed = 1.0 if write else 1.0 + WRITE_RESERVE_TOKENS
+            if tokens >= needed:
+                state["tokens"] = tokens - 1.0
+                self._write_state(state)
+                return 0.0
+
+            self._write_state(state)
+            return (needed - tokens) / self.rate
+
+    def acquire(self, write: bool = False) -> float:
+        """Block until a call may proceed. Returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(write)
+            if wait <= 0:
+                break
+            wait = min(wait, MAX_WAIT_SECONDS)
+            time.sleep(wait)
+            waited += wait
+
+        self.count("calls")
+        self.count("writes" if write else "reads")
+        self.count("wait_seconds", waited)
+        return waited
+
+    def record_headers(self, headers: Dict[str, str]) -> None:
+        """Update shared quota from X-RateLimit-* response headers."""
+        if "x-ratelimit-remaining" not in headers:
+            return
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            limit = int(headers.get("x-ratelimit-limit", 0)) or None
+            reset = float(headers.get("x-ratelimit-reset", 0)) or None
+        except ValueError:
+            return
+
+        for usage in (self.usage, getattr(self._local, "usage", None)):
+            if usage is not None:
+                usage.update(quota_remaining=remaining, quota_limit=limit, quota_reset=reset)
+
+        with self._thread_lock, file_lock(self.lock_path):
+            state = self._read_state()
+            state["remaining"] = remaining
+            state["limit"] = limit
+            state["reset"] = reset
+            self._write_state(state)
+
+    def record_limited(self, retry_after: float) -> None:
+        """Block all processes for retry_after seconds after a rate-limit error."""
+        self.count("rate_limited")
+        with self._thread_lock, file_lock(self.lock_path):
+            state = self._read_state()
+            state["blocked_until"] = max(state.get("blocked_until", 0), time.time() + retry_after)
+            self._write_state(state)
+
+    def get_usage(self) -> Dict[str, Any]:
+        """Return this process's GitHub usage for storing in ADW state."""
+        return dict(self.usage)
+
+
+_scheduler: Optional[GitHubScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> GitHubScheduler:
+    """Return the process-wide GitHub scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = GitHubScheduler()
+        return _scheduler
+
+
+def get_github_usage() -> Dict[str, Any]:
+    """Shortcut for get_scheduler().get_usage()."""
+    return get_scheduler().get_usage()
@@ -0,0 +1,332 @@
+"""Resource accounting and limits for child processes of ADW workflows.
+
+Every child the orchestrator starts (Claude Code, gh, run_task.py,
+run_issue.py) goes through spawn(). Its wait() reaps the child with
+os.wait4(), which returns the rusage of the child and the descendants it
+waited for: user/sys CPU, peak RSS and block I/O. Usage is returned as a
+ResourceUsage, counted in metrics, and stored in state by the callers.
+
+Optional limits (ResourceLimits, or ADWS_LIMIT_RSS_MB /
+ADWS_LIMIT_CPU_SECONDS / ADWS_LIMIT_WALL_SECONDS) are enforced by a
+watchdog thread that sums RSS and CPU over the child's process tree from
+/proc and kills the tree once a limit is crossed, so a runaway agent fails
+fast instead of swapping the host. Without /proc only the wall-clock
+limit is enforced.
+
+Children started inside a StopGroup (threads that work on one job, such as
+the step sub-agents of a plan) can be stopped together with group.stop().
+"""
+
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .data_types import ResourceLimits, ResourceUsage
+from .metrics import get_metrics
+
+# Seconds between watchdog checks of a limited child
+WATCHDOG_INTERVAL_SECONDS = 1.0
+
+# Seconds between SIGTERM and SIGKILL when a limit is exceeded
+KILL_GRACE_SECONDS = 5.0
+
+LIMIT_ENV = {
+    "max_rss_mb": "ADWS_LIMIT_RSS_MB",
+    "max_cpu_seconds": "ADWS_LIMIT_CPU_SECONDS",
+    "max_wall_seconds": "ADWS_LIMIT_WALL_SECONDS",
+}
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# The StopGroup of the current thread, if any
+_local = threading.local()
+
+
+def get_limits() -> ResourceLimits:
+    """Limits configured through the environment (unset or invalid = unlimited)."""
+    values: Dict[str, Optional[float]] = {}
+    for field, env_var in LIMIT_ENV.items():
+        try:
+            value = float(os.getenv(env_var, ""))
+            values[field] = value if value > 0 else None
+        except ValueError:
+            values[field] = None
+    return ResourceLimits(**values)
+
+
+def set_limits_env(
+    max_rss_mb: Optional[float] = None,
+    max_cpu_seconds: Optional[float] = None,
+    max_wall_seconds: Optional[float] = None,
+) -> None:
+    """Apply CLI limits to this process and every child that inherits its environment."""
+    for field, value in (("max_rss_mb", max_rss_mb), ("max_cpu_seconds", max_cpu_seconds),
+                         ("max_wall_seconds", max_wall_seconds)):
+        if value:
+            os.environ[LIMIT_ENV[field]] = str(value)
+
+
+def _process_tree(root: int) -> List[int]:
+    """PIDs of root and all its descendants (Linux /proc)."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields resume after the last ')'
+        fields = stat[stat.rfind(b")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    tree, todo = [], [root]
+    while todo:
+        pid = todo.pop()
+        tree.append(pid)
+        todo.extend(children.get(pid, []))
+    return tree
+
+
+def _tree_usage(root: int) -> Dict[str, float]:
+    """Current RSS (MB) and CPU seconds summed over a process tree."""
+    rss_pages, cpu_ticks = 0, 0
+    for pid in _process_tree(root):
+        try:
+            with open(f"/proc/{pid}/statm", "r") as f:
+                rss_pages += int(f.read().split()[1])
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read()
+            fields = stat[stat.rfind(b")") + 2:].split()
+            # utime, stime, cutime, cstime (fields 14-17 of stat)
+            cpu_ticks += sum(int(v) for v in fields[11:15])
+        except (OSError, IndexError, ValueError):
+            continue
+    return {"rss_mb": rss_pages * _PAGE_SIZE / 1024 ** 2, "cpu_seconds": cpu_ticks / _CLOCK_TICKS}
+
+
+def _signal_tree(root: int, sig: int) -> None:
+    try:
+        pids = _process_tree(root) if os.path.isdir("/proc") else [root]
+    except OSError:
+        pids = [root]
+    for pid in reversed(pids):
+        try:
+            os.kill(pid, sig)
+        except (ProcessLookupError, PermissionError):
+            continue
+
+
+class _Watchdog(threading.Thread):
+    """Kills a child's process tree once it crosses a limit."""
+
+    def __init__(self, pid: int, limits: ResourceLimits, started: float):
+        super().__init__(name=f"adws-watchdog-{pid}", daemon=True)
+        self.pid = pid
+        self.limits = limits
+        self.started = started
+        self.exceeded: Optional[str] = None
+        self.stopped = threading.Event()
+        self.has_proc = os.path.isdir("/proc")
+
+    def _check(self) -> Optional[str]:
+        limits = self.limits
+        if limits.max_wall_seconds and time.monotonic() - self.started > limits.max_wall_seconds:
+            return "wall"
+        if self.has_proc and (limits.max_rss_mb or limits.max_cpu_seconds):
+            usage = _tree_usage(self.pid)
+            if limits.max_rss_mb and usage["rss_mb"] > limits.max_rss_mb:
+                return "rss"
+            if limits.max_cpu_seconds and usage["cpu_seconds"] > limits.max_cpu_seconds:
+                return "cpu"
+        return None
+
+    def run(self) -> None:
+        while not self.stopped.wait(WATCHDOG_INTERVAL_SECONDS):
+            exceeded = self._check()
+            if not exceeded:
+                continue
+            self.exceeded = exceeded
+            _signal_tree(self.pid, signal.SIGTERM)
+            if not self.stopped.wait(KILL_GRACE_SECONDS):
+                _signal_tree(self.pid, signal.SIGKILL)
+            return
+
+
+class AccountedProcess:
+    """A started child process whose resources are collected when it is reaped."""
+
+    def __init__(self, process: subprocess.Popen, command: str, limits: Optional[ResourceLimits]):
+        self.process = process
+        self.command = command
+        self.started = time.monotonic()
+        self.watchdog: Optional[_Watchdog] = None
+        if limits and (limits.max_rss_mb or limits.max_cpu_seconds or limits.max_wall_seconds):
+            self.watchdog = _Watchdog(process.pid, limits, self.started)
+            self.watchdog.start()
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def wait(self) -> ResourceUsage:
+        """Reap the child and return (and record) what it consumed.
+
+        Callers must not also wait() / poll() on the Popen object while this
+        runs; terminate() and kill() are fine.
+        """
+        if hasattr(os, "wait4"):
+            _, status, rusage = os.wait4(self.process.pid, 0)
+            # Tell Popen the child is gone so it never waits on the reused PID
+            self.process.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            self.process.wait()
+            rusage = None
+        wall = time.monotonic() - self.started
+        if self.watchdog:
+            self.watchdog.stopped.set()
+
+        usage = ResourceUsage(
+            command=self.command,
+            exit_code=self.process.returncode,
+            wall_seconds=round(wall, 3),
+            limit_exceeded=self.watchdog.exceeded if self.watchdog else None,
+        )
+        if rusage is not None:
+            usage.user_cpu_seconds = round(rusage.ru_utime, 3)
+            usage.sys_cpu_seconds = round(rusage.ru_stime, 3)
+            # ru_maxrss is in KB on Linux
+            usage.max_rss_mb = round(rusage.ru_maxrss / 1024, 1)
+            usage.block_input = rusage.ru_inblock
+            usage.block_output = rusage.ru_oublock
+        record_usage(usage)
+        return usage
+
+
+class StopGroup:
+    """Children started by several threads that can be stopped together."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._children: List[AccountedProcess] = []
+        self.stopped = False
+
+    @contextmanager
+    def member(self) -> Iterator[None]:
+        """Children this thread spawns inside the block belong to the group."""
+        previous = getattr(_local, "group", None)
+        _local.group = self
+        try:
+            yield
+        finally:
+            _local.group = previous
+
+    def add(self, child: AccountedProcess) -> None:
+        with self._lock:
+            self._children.append(child)
+            stopped = self.stopped
+        if stopped:
+            _signal_tree(child.pid, signal.SIGTERM)
+
+    def stop(self) -> None:
+        """SIGTERM every running child's process tree (SIGKILL after KILL_GRACE_SECONDS)."""
+        with self._lock:
+            self.stopped = True
+            children = list(self._children)
+        for child in children:
+            if child.process.returncode is None:
+                _signal_tree(child.pid, signal.SIGTERM)
+
+        def kill() -> None:
+            for child in children:
+                if child.process.returncode is None:
+                    _signal_tree(child.pid, signal.SIGKILL)
+
+        timer = threading.Timer(KILL_GRACE_SECONDS, kill)
+        timer.daemon = True
+        timer.start()
+
+
+def spawn(
+    cmd: List[str],
+    command: str,
+    limits: Optional[ResourceLimits] = None,
+    **popen_kwargs: Any,
+) -> AccountedProcess:
+    """Start a child process with resource accounting (and optional limits).
+
+    Args:
+        cmd: Command line
+        command: Short label for metrics and state (claude, gh, run_task, ...)
+        limits: Limits enforced by a watchdog (default: none)
+        popen_kwargs: Passed to subprocess.Popen; use files rather than
+            pipes for output that is only read after the child exits
+
+    Returns:
+        AccountedProcess; call wait() to reap it and get its ResourceUsage
+    """
+    process = subprocess.Popen(cmd, **popen_kwargs)
+    get_metrics().inc("adws_subprocess_spawns_total", command=command)
+    child = AccountedProcess(process, command, limits)
+    group = getattr(_local, "group", None)
+    if group:
+        group.add(child)
+    return child
+
+
+def run_accounted(
+    cmd: List[str],
+    command: str,
+    limits: Optional[ResourceLimits] = None,
+    capture_output: bool = False,
+    text: bool = False,
+    **popen_kwargs: Any,
+) -> Tuple[subprocess.CompletedProcess, ResourceUsage]:
+    """subprocess.run() with resource accounting.
+
+    Captured output goes through temporary files rather than pipes, since
+    the child is reaped with wait4() instead of communicate().
+    """
+    if not capture_output:
+        usage = spawn(cmd, command, limits, text=text, **popen_kwargs).wait()
+        return subprocess.CompletedProcess(cmd, usage.exit_code), usage
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        usage = spawn(cmd, command, limits, stdout=out, stderr=err, **popen_kwargs).wait()
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read(), err.read()
+    if text:
+        stdout = stdout.decode("utf-8", errors="replace")
+        stderr = stderr.decode("utf-8", errors="replace")
+    return subprocess.CompletedProcess(cmd, usage.exit_code, stdout, stderr), usage
+
+
+def record_usage(usage: ResourceUsage) -> None:
+    """Count a child's usage in the metrics registry."""
+    metrics = get_metrics()
+    metrics.inc("adws_subprocess_cpu_seconds_total", usage.user_cpu_seconds,
+                command=usage.command, mode="user")
+    metrics.inc("adws_subprocess_cpu_seconds_total", usage.sys_cpu_seconds,
+                command=usage.command, mode="sys")
+    metrics.observe("adws_subprocess_peak_rss_megabytes", usage.max_rss_mb, command=usage.command)
+    metrics.inc("adws_subprocess_block_io_total", usage.block_input, command=usage.command, direction="in")
+    metrics.inc("adws_subprocess_block_io_total", usage.block_output, command=usage.command, direction="out")
+    if usage.limit_exceeded:
+        metrics.inc("adws_subprocess_limit_kills_total", command=usage.command, limit=usage.limit_exceeded)
+
+
+def describe_usage(usage: ResourceUsage) -> str:
+    """One-line summary, e.g. 'claude: 312.4s wall, 41.2s user, 3.1s sys, 612 MB peak'."""
+    text = (f"{usage.command}: {usage.wall_seconds:.1f}s wall, {usage.user_cpu_seconds:.1f}s user, "
+            f"{usage.sys_cpu_seconds:.1f}s sys, {usage.max_rss_mb:.0f} MB peak, "
+            f"{usage.block_input}/{usage.block_output} blocks in/out")
+    if usage.limit_exceeded:
+        text += f" (killed: {usage.limit_exceeded} limit exceeded)"
+    return text
@@ -0,0 +1,371 @@
+"""Adaptive model routing for /implement runs.
+
+Instead of sending every plan to the strongest model, the router picks the
+cheapest model on MODEL_LADDER that is likely to implement the plan:
+
+1. history: the cheapest model with MIN_SAMPLES+ runs of similar plans
+   (the same task, or a similar step count and plan size) and a success
+   rate of at least MIN_SUCCESS_RATE
+2. complexity: the tier the plan's size points to (steps, files touched,
+   plan bytes), skipping tiers whose similar runs keep failing
+
+While a cheaper model has too little history, a fraction of runs
+(ADWS_ROUTING_EXPLORE, default 0.1) try it first to find out.
+
+An attempt that fails, or whose validation commands fail, is retried on
+the next model up the ladder. Every attempt is recorded in the routing
+table of agents/history/durations.db (next to the duration history it
+learns from), so the policy can be evaluated with routing_report.py.
+
+ADWS_MODEL pins one model (no routing, no escalation); ADWS_ROUTING=static
+restores the fixed SLASH_COMMAND_MODEL_MAP choice.
+"""
+
+import logging
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+from .agent import execute_template, get_model_for_slash_command
+from .data_types import (
+    AgentPromptResponse,
+    AgentTemplateRequest,
+    RoutingDecision,
+    ValidationResult,
+)
+from .durations import DurationHistory, plan_features, record_run, task_key
+from .metrics import get_metrics
+from .state import ADWState
+from .utils import get_project_root
+from .validation import run_validation
+
+# Models in order of cost (and speed); escalation moves right
+MODEL_LADDER: Final[List[str]] = ["haiku", "sonnet", "opus"]
+
+# Largest plan each tier takes; bigger plans go to the next tier
+TIER_LIMITS: Final[Dict[str, Dict[str, int]]] = {
+    "haiku": {"total_steps": 2, "files": 2, "plan_bytes": 6000},
+    "sonnet": {"total_steps": 5, "files": 6, "plan_bytes": 20000},
+}
+
+# History needed before it overrides the complexity tier
+MIN_SAMPLES = 3
+
+# Success rate a model needs on similar plans to be chosen from history
+MIN_SUCCESS_RATE = 0.8
+
+# Recent runs per model considered when computing a success rate
+LOOKBACK_RUNS = 50
+
+# Plans count as similar within this many steps and a factor of two in size
+SIMILAR_STEPS = 1
+
+# Share of runs that try the next cheaper model while its history is thin
+DEFAULT_EXPLORE_RATE = 0.1
+
+ROUTING_MODES = ("adaptive", "static")
+
+# Project files mentioned in a plan, e.g. supabase/functions/rules/index.ts
+FILE_PATTERN = re.compile(
+    r"(?<![\w/.@:-])((?:[A-Za-z_][\w.-]*/)+[\w.-]+\.(?:tsx?|jsx?|vue|sql|py|json|toml|ya?ml|sh|css|html))\b"
+)
+
+ROUTING_SCHEMA = """
+CREATE TABLE IF NOT EXISTS routing (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    adw_id        TEXT,
+    task_key      TEXT NOT NULL,
+    attempt       INTEGER NOT NULL,
+    model         TEXT NOT NULL,
+    tier          TEXT NOT NULL,
+    reason        TEXT NOT NULL,
+    success_rate  REAL,
+    samples       INTEGER NOT NULL DEFAULT 0,
+    total_steps   INTEGER NOT NULL DEFAULT 0,
+    files         INTEGER NOT NULL DEFAULT 0,
+    plan_bytes    INTEGER NOT NULL DEFAULT 0,
+    outcome       TEXT,
+    duration      REAL,
+    cost_usd      REAL,
+    decided_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_routing_task ON routing(task_key);
+"""
+
+
+def get_routing_mode() -> str:
+    """adaptive (default) or static (ADWS_ROUTING)."""
+    mode = os.getenv("ADWS_ROUTING", "adaptive").lower()
+    return mode if mode in ROUTING_MODES else "adaptive"
+
+
+def get_explore_rate() -> float:
+    """Exploration rate (ADWS_ROUTING_EXPLORE, 0 disables, invalid = default)."""
+    try:
+        return float(os.getenv("ADWS_ROUTING_EXPLORE", DEFAULT_EXPLORE_RATE))
+    except ValueError:
+        return DEFAULT_EXPLORE_RATE
+
+
+def plan_complexity(plan_file: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Plan features used for routing: plan_features() plus files touched."""
+    features = plan_features(plan_file, metadata)
+    path = plan_file if os.path.isabs(plan_file) else os.path.join(get_project_root(), plan_file)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            features["files"] = len(set(FILE_PATTERN.findall(f.read())))
+    except OSError:
+        features["files"] = 0
+    return features
+
+
+def complexity_tier(features: Dict[str, int]) -> str:
+    """The cheapest model whose TIER_LIMITS the plan fits in."""
+    for model, limits in TIER_LIMITS.items():
+        if all(features.get(name, 0) <= limit for name, limit in limits.items()):
+            return model
+    return MODEL_LADDER[-1]
+
+
+def escalate(model: str) -> Optional[str]:
+    """The next stronger model, or None at the top of the ladder."""
+    if model not in MODEL_LADDER:
+        return None
+    index = MODEL_LADDER.index(model)
+    return MODEL_LADDER[index + 1] if index + 1 < len(MODEL_LADDER) else None
+
+
+def describe_decision(decision: RoutingDecision) -> str:
+    """One line, e.g. 'sonnet (history: 9/10 similar runs succeeded)'."""
+    if decision.reason == "history" and decision.success_rate is not None:
+        succeeded = round(decision.success_rate * decision.samples)
+        why = f"history: {succeeded}/{decision.samples} similar runs succeeded"
+    elif decision.reason == "history":
+        why = f"history: cheaper models keep failing similar plans, {decision.tier} tier"
+    elif decision.reason == "complexity":
+        f = decision.features
+        why = (f"complexity: {f.get('total_steps', 0)} steps, {f.get('files', 0)} files, "
+               f"{f.get('plan_bytes', 0) // 1024}KB plan")
+    elif decision.reason == "escalation":
+        why = f"escalation, attempt {decision.attempt}"
+    elif decision.reason == "explore":
+        why = f"exploring, {decision.samples} similar runs so far"
+    else:
+        why = decision.reason
+    return f"{decision.model} ({why})"
+
+
+class ModelRouter:
+    """Routing policy over the duration history, with a log of its decisions."""
+
+    def __init__(self, history: Optional[DurationHistory] = None):
+        self._own = history is None
+        self.history = history or DurationHistory()
+        self.conn = self.history.conn
+        self.conn.executescript(ROUTING_SCHEMA)
+
+    def close(self) -> None:
+        """Close the history if this router opened it."""
+        if self._own:
+            self.history.close()
+
+    def success_rate(self, model: str, key: str, features: Dict[str, int]) -> Tuple[Optional[float], int]:
+        """(success rate, samples) of recent similar runs on this model."""
+        steps = features.get("total_steps", 0)
+        size = features.get("plan_bytes", 0)
+        rows = self.conn.execute(
+            """SELECT status FROM runs
+               WHERE model = ? AND status IN ('completed', 'failed', 'validation_failed')
+                 AND (task_key = ? OR (ABS(total_steps - ?) <= ? AND plan_bytes BETWEEN ? AND ?))
+               ORDER BY id DESC LIMIT ?""",
+            (model, key, steps, SIMILAR_STEPS, size // 2, size * 2, LOOKBACK_RUNS),
+        ).fetchall()
+        if not rows:
+            return None, 0
+        return sum(1 for r in rows if r["status"] == "completed") / len(rows), len(rows)
+
+    def choose(self, key: str, features: Dict[str, int]) -> RoutingDecision:
+        """The cheapest model likely to succeed on this plan."""
+        tier = complexity_tier(features)
+        stats = {model: self.success_rate(model, key, features) for model in MODEL_LADDER}
+        for index, model in enumerate(MODEL_LADDER):
+            rate, samples = stats[model]
+            if samples >= MIN_SAMPLES and rate >= MIN_SUCCESS_RATE:
+                decision = RoutingDecision(model=model, reason="history", tier=tier, features=features,
+                                           success_rate=rate, samples=samples)
+                break
+            # From the tier up, take the first model that hasn't been failing
+            if index >= MODEL_LADDER.index(tier) and (samples < MIN_SAMPLES or index == len(MODEL_LADDER) - 1):
+                decision = RoutingDecision(model=model, reason="complexity" if model == tier else "history",
+                                           tier=tier, features=features, success_rate=rate, samples=samples)
+                break
+
+        # Escalation caps the cost of a wrong guess, so occasionally learn about a cheaper model
+        index = MODEL_LADDER.index(decision.model)
+        if index > 0:
+            cheaper = MODEL_LADDER[index - 1]
+            rate, samples = stats[cheaper]
+            if samples < MIN_SAMPLES and random.random() < get_explore_rate():
+                decision = RoutingDecision(model=cheaper, reason="explore", tier=tier, features=features,
+                                           success_rate=rate, samples=samples)
+        return decision
+
+    def record_decision(self, decision: RoutingDecision, key: str, adw_id: Optional[str]) -> RoutingDecision:
+        """Log a decision; returns it with decision_id set."""
+        f = decision.features
+        cursor = self.conn.execute(
+            """INSERT INTO routing
+               (adw_id, task_key, attempt, model, tier, reason, success_rate, samples,
+                total_steps, files, plan_bytes, decided_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (adw_id, key, decision.attempt, decision.model, decision.tier, decision.reason,
+             decision.success_rate, decision.samples, f.get("total_steps", 0), f.get("files", 0),
+             f.get("plan_bytes", 0), time.time()),
+        )
+        return decision.model_copy(update={"decision_id": cursor.lastrowid})
+
+    def record_outcome(self, decision: RoutingDecision, outcome: str, duration: float,
+                       cost_usd: Optional[float]) -> None:
+        """Store how an attempt ended: completed, failed or validation_failed."""
+        if decision.decision_id is None:
+            return
+        self.conn.execute(
+            "UPDATE routing SET outcome = ?, duration = ?, cost_usd = ? WHERE id = ?",
+            (outcome, duration, cost_usd, decision.decision_id),
+        )
+
+    def decisions(self, since: Optional[float] = None) -> List[sqlite3.Row]:
+        """Logged decisions, oldest first."""
+        return self.conn.execute(
+            "SELECT * FROM routing WHERE decided_at >= ? ORDER BY id", (since or 0,)
+        ).fetchall()
+
+
+def route_plan(
+    task_id: Optional[str],
+    plan_file: str,
+    metadata: Optional[Dict[str, Any]],
+    model: Optional[str] = None,
+    router: Optional[ModelRouter] = None,
+) -> RoutingDecision:
+    """Pick the first /implement model for a plan (opens the history if no router is given)."""
+    features = plan_complexity(plan_file, metadata)
+    tier = complexity_tier(features)
+    pinned = (model or os.getenv("ADWS_MODEL") or "").strip().lower()
+    if pinned and pinned not in MODEL_LADDER:
+        print(f"Warning: Ignoring unknown model '{pinned}' (expected one of {', '.join(MODEL_LADDER)}); "
+              "routing instead", file=sys.stderr)
+        pinned = ""
+    if pinned:
+        return RoutingDecision(model=pinned, reason="pinned", tier=tier, features=features)
+    if get_routing_mode() == "static":
+        return RoutingDecision(model=get_model_for_slash_command("/implement"), reason="static",
+                               tier=tier, features=features)
+    try:
+        own = router is None
+        router = router or ModelRouter()
+        try:
+            return router.choose(task_key(task_id, plan_file), features)
+        finally:
+            if own:
+                router.close()
+    except sqlite3.Error as e:
+        print(f"Warning: Could not read routing history: {e}")
+        return RoutingDecision(model=tier, reason="complexity", tier=tier, features=features)
+
+
+def _validation_error(results: List[ValidationResult]) -> str:
+    failed = next(r for r in results if not r.passed)
+    return f"Validation failed: {failed.command}\n{failed.error or failed.output or ''}".rstrip()
+
+
+def implement_plan(
+    adw_id: str,
+    plan_file: str,
+    task_id: Optional[str],
+    metadata: Dict[str, Any],
+    state: ADWState,
+    logger: logging.Logger,
+    model: Optional[str] = None,
+    validate: bool = True,
+    cwd: Optional[str] = None,
+) -> Tuple[AgentPromptResponse, RoutingDecision]:
+    """Run /implement on the routed model, escalating on failure.
+
+    Each attempt is recorded in the duration history and the routing log;
+    the response of the last attempt is returned (unsuccessful if its
+    validation failed). cwd runs the agent and the validation in another
+    tree (a worktree) instead of the project root.
+    """
+    key = task_key(task_id, plan_file)
+    decision = route_plan(task_id, plan_file, metadata, model=model)
+    try:
+        router: Optional[ModelRouter] = ModelRouter()
+    except sqlite3.Error as e:
+        print(f"Warning: Could not open routing log: {e}")
+        router = None
+    commands = (metadata.get("validation_commands") or []) if validate else []
+
+    try:
+        while True:
+            if router:
+                decision = router.record_decision(decision, key, adw_id)
+            agent_name = "implementor" if decision.attempt == 1 else f"implementor_{decision.model}"
+            logger.info(f"Executing /implement on {describe_decision(decision)}...")
+
+            request = AgentTemplateRequest(
+                agent_name=agent_name,
+                slash_command="/implement",
+                args=[plan_file],
+                adw_id=adw_id,
+                model=decision.model,
+                cwd=cwd,
+            )
+            started = time.monotonic()
+            response = execute_template(request)
+            if response.resource_usage:
+                state.add_resource_usage(agent_name, response.resource_usage.model_dump())
+
+            outcome = "completed" if response.success else "failed"
+            if response.success and commands:
+                if cwd is None:
+                    # Dependents may start from this tree while it validates
+                    from .speculation import publish_base
+                    publish_base(state, logger)
+                logger.info(f"Running {len(commands)} validation command(s)...")
+                results = run_validation(commands, cwd=cwd)
+                state.update(validation_results=[])
+                for result in results:
+                    state.add_validation_result(**result.model_dump())
+                if not all(r.passed for r in results):
+                    outcome = "validation_failed"
+                    response = response.model_copy(
+                        update={"success": False, "output": _validation_error(results)}
+                    )
+            duration = time.monotonic() - started
+
+            record_run(task_id, plan_file, metadata, decision.model, duration, outcome, adw_id)
+            if router:
+                router.record_outcome(decision, outcome, duration, response.cost_usd)
+            get_metrics().inc("adws_routing_attempts_total", model=decision.model,
+                              reason=decision.reason, outcome=outcome)
+            state.update(model=decision.model)
+
+            stronger = escalate(decision.model)
+            if (outcome == "completed" or decision.reason in ("pinned", "static") or not stronger
+                    or (response.resource_usage and response.resource_usage.limit_exceeded)):
+                return response, decision
+
+            logger.warning(f"Attempt {decision.attempt} on {decision.model} ended {outcome}; "
+                           f"escalating to {stronger}")
+            decision = decision.model_copy(update={
+                "model": stronger, "reason": "escalation", "attempt": decision.attempt + 1,
+                "success_rate": None, "samples": 0, "decision_id": None,
+            })
+    finally:
+        if router:
+            router.close()
@@ -0,0 +1,368 @@
+"""Full-text search over agent transcripts and logs.
+
+agents/index/search.db (override with ADWS_SEARCH_DB) is a SQLite FTS5
+index of what happened in every run, one entry per:
+
+    text         assistant message text
+    tool_use     tool call: tool name and input (commands, file paths, edits)
+    tool_result  tool output
+    error        failed tool results, error results, ERROR/CRITICAL log lines
+    result       the final result message
+    log          any other execution.log entry
+
+Each entry carries adw_id, task_id, agent, model and a timestamp, plus the
+byte offset and length of its line in the uncompressed file, so a hit can
+be read back from raw_output.jsonl.gz with read_line().
+
+Indexing is incremental. Per file the index keeps how many bytes it has
+read, a fingerprint of the first bytes and the file's identity (inode,
+size, mtime): unchanged files are skipped without being opened, a growing
+file is read from where the last pass stopped, a transcript that was
+compressed since is not re-indexed, and a replaced one (a resumed run) is.
+prompt_claude_code indexes every transcript when Claude Code exits;
+index_all() (search_agents.py) catches up on logs and older runs.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .artifacts import COMPRESSED_SUFFIX, open_artifact, resolve_artifact, run_dirs
+from .data_types import SearchHit
+from .utils import get_project_root
+
+# Bytes hashed to recognise a file after it was compressed or replaced
+FINGERPRINT_BYTES = 4096
+
+# Long tool output (mostly file reads) is indexed by its head and tail; errors
+# tend to be at the end. Keeps the index well below the transcripts in size
+MAX_TEXT_CHARS = 4000
+
+# Lines per write transaction; progress is saved after each batch
+BATCH_LINES = 2000
+
+INDEXED_FILES = ("raw_output.jsonl", "execution.log")
+
+LOG_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (\w+) - (.*)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id       INTEGER PRIMARY KEY,
+    text     TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    adw_id   TEXT NOT NULL,
+    task_id  TEXT,
+    agent    TEXT NOT NULL,
+    model    TEXT,
+    ts       REAL NOT NULL,
+    path     TEXT NOT NULL,
+    offset   INTEGER NOT NULL,
+    length   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_path ON entries(path);
+CREATE INDEX IF NOT EXISTS idx_entries_adw ON entries(adw_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    text, content='entries', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TABLE IF NOT EXISTS files (
+    path          TEXT PRIMARY KEY,
+    indexed_bytes INTEGER NOT NULL,
+    fingerprint   TEXT NOT NULL,
+    identity      TEXT NOT NULL,
+    model         TEXT,
+    updated_at    REAL
+);
+"""
+
+
+def get_index_path() -> str:
+    """Get the search index path (override with ADWS_SEARCH_DB)."""
+    return os.getenv(
+        "ADWS_SEARCH_DB",
+        os.path.join(get_project_root(), "agents", "index", "search.db"),
+    )
+
+
+def _clip(text: str) -> str:
+    if len(text) <= MAX_TEXT_CHARS:
+        return text
+    half = MAX_TEXT_CHARS // 2
+    return f"{text[:half]}\n...\n{text[-half:]}"
+
+
+def _content_text(content: Any) -> str:
+    """Text of a tool_result content (a string or a list of blocks)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "") for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+    return ""
+
+
+def transcript_entries(message: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(kind, text) entries of one stream-json message."""
+    entries = []
+    kind = message.get("type")
+    if kind == "result":
+        is_error = message.get("is_error") or message.get("subtype") == "error_during_execution"
+        text = message.get("result") or message.get("subtype") or ""
+        entries.append(("error" if is_error else "result", text))
+    elif kind in ("assistant", "user"):
+        content = (message.get("message") or {}).get("content") or []
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            block_type = block.get("type")
+            if block_type == "text" and block.get("text"):
+                entries.append(("text", block["text"]))
+            elif block_type == "tool_use":
+                tool_input = json.dumps(block.get("input") or {}, ensure_ascii=False)
+                entries.append(("tool_use", f"{block.get('name', '')} {tool_input}"))
+            elif block_type == "tool_result":
+                text = _content_text(block.get("content"))
+                entries.append(("error" if block.get("is_error") else "tool_result", text))
+    return [(kind, _clip(text)) for kind, text in entries if text.strip()]
+
+
+def log_entry(line: str) -> Tuple[str, str, Optional[float]]:
+    """(kind, text, ts) of one execution.log line."""
+    match = LOG_LINE.match(line)
+    if not match:
+        return "log", line, None
+    stamp, level, text = match.groups()
+    ts = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp()
+    return ("error" if level in ("ERROR", "CRITICAL") else "log"), text, ts
+
+
+def _identity(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def read_line(path: str, offset: int, length: int) -> str:
+    """Read one indexed line back from a (possibly compressed) file."""
+    with open_artifact(os.path.join(get_project_root(), path), binary=True) as f:
+        # Seeking a gzip file decompresses up to offset
+        f.seek(offset)
+        return f.read(length).decode("utf-8", errors="replace")
+
+
+class SearchIndex:
+    """SQLite FTS5 index of transcripts and logs under agents/."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or get_index_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA busy_timeout = 30000")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._run_meta: Dict[str, Optional[str]] = {}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def _task_id(self, adw_id: str) -> Optional[str]:
+        if adw_id not in self._run_meta:
+            from .state import ADWState
+            state = ADWState.load(adw_id)
+            self._run_meta[adw_id] = state.get("task_id") if state else None
+        return self._run_meta[adw_id]
+
+    def index_file(self, path: str, known: Optional[sqlite3.Row] = None) -> int:
+        """Index what is new in a transcript or log since the last pass.
+
+        Args:
+            path: Logical path (raw_output.jsonl / execution.log, with or
+                without a compressed form on disk)
+            known: The file's row from the files table, if already fetched
+
+        Returns:
+            Number of entries added
+        """
+        actual = resolve_artifact(path)
+        if actual is None:
+            return 0
+        rel = os.path.relpath(path, get_project_root())
+        if rel.endswith(COMPRESSED_SUFFIX):
+            rel = rel[:-len(COMPRESSED_SUFFIX)]
+        parts = rel.split(os.sep)
+        if len(parts) < 4:
+            return 0
+        adw_id, agent = parts[1], parts[2]
+
+        if known is None:
+            known = self.conn.execute("SELECT * FROM files WHERE path = ?", (rel,)).fetchone()
+        identity = _identity(actual)
+        if known and known["identity"] == identity:
+            return 0
+
+        is_log = os.path.basename(rel).endswith(".log")
+        task_id = self._task_id(adw_id)
+        last_ts = os.path.getmtime(actual)
+        added = 0
+
+        with open_artifact(actual, binary=True) as f:
+            fingerprint = hashlib.sha1(f.read(FINGERPRINT_BYTES)).hexdigest()
+            offset, model = 0, None
+            if known and known["fingerprint"] == fingerprint:
+                offset, model = known["indexed_bytes"], known["model"]
+            else:
+                self._save(rel, [], 0, fingerprint, identity, None, replace=True)
+            f.seek(offset)
+
+            rows, lines = [], 0
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Incomplete last line: picked up by the next pass
+                    break
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if is_log:
+                    kind, text, ts = log_entry(line)
+                    last_ts = ts or last_ts
+                    entries = [(kind, _clip(text))] if text.strip() else []
+                else:
+                    try:
+                        message = json.loads(line) if line.strip() else {}
+                    except json.JSONDecodeError:
+                        message = {}
+                    if message.get("type") == "system" and message.get("model"):
+                        model = message["model"]
+                    entries = transcript_entries(message)
+                for kind, text in entries:
+                    rows.append((text, kind, adw_id, task_id, agent, model,
+                                 last_ts, rel, offset, len(raw)))
+                offset += len(raw)
+                lines += 1
+                if lines % BATCH_LINES == 0:
+                    added += self._save(rel, rows, offset, fingerprint, identity, model)
+                    rows = []
+        added += self._save(rel, rows, offset, fingerprint, identity, model)
+        return added
+
+    def _save(
+        self,
+        rel: str,
+        rows: List[tuple],
+        indexed_bytes: int,
+        fingerprint: str,
+        identity: str,
+        model: Optional[str],
+        replace: bool = False,
+    ) -> int:
+        """Write a batch of entries and the file's progress in one transaction."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if replace:
+                self.conn.execute("DELETE FROM entries WHERE path = ?", (rel,))
+            self.conn.executemany(
+                """INSERT INTO entries (text, kind, adw_id, task_id, agent, model, ts, path, offset, length)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            self.conn.execute(
+                """INSERT OR REPLACE INTO files (path, indexed_bytes, fingerprint, identity, model, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (rel, indexed_bytes, fingerprint, identity, model, time.time()),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def _candidate_files(self) -> Iterator[str]:
+        for run_dir in run_dirs():
+            for agent in sorted(os.listdir(run_dir)):
+                agent_dir = os.path.join(run_dir, agent)
+                if not os.path.isdir(agent_dir):
+                    continue
+                for name in INDEXED_FILES:
+                    path = os.path.join(agent_dir, name)
+                    if resolve_artifact(path):
+                        yield path
+
+    def index_all(self) -> Dict[str, int]:
+        """Catch up on every run under agents/; returns files and entries indexed."""
+        known = {row["path"]: row for row in self.conn.execute("SELECT * FROM files")}
+        root = get_project_root()
+        stats = {"files": 0, "entries": 0}
+        for path in self._candidate_files():
+            added = self.index_file(path, known.get(os.path.relpath(path, root)))
+            if added:
+                stats["files"] += 1
+                stats["entries"] += added
+        return stats
+
+    def forget_runs(self, adw_ids: List[str]) -> None:
+        """Drop the entries of deleted runs."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        for adw_id in adw_ids:
+            self.conn.execute("DELETE FROM entries WHERE adw_id = ?", (adw_id,))
+            self.conn.execute("DELETE FROM files WHERE path LIKE ?", (f"agents{os.sep}{adw_id}{os.sep}%",))
+        self.conn.execute("COMMIT")
+
+    def search(
+        self,
+        query: str,
+        adw_id: Optional[str] = None,
+        task_id: Optional[str] = None,
+        kind: Optional[str] = None,
+        model: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 20,
+        raw: bool = False,
+    ) -> List[SearchHit]:
+        """Best matches first.
+
+        The query is a list of words that must all occur; with raw=True it
+        is passed to FTS5 as-is (phrases, OR, NOT, prefix*).
+        """
+        match = query if raw else " ".join(
+            '"' + word.replace('"', '""') + '"' for word in query.split()
+        )
+        sql = """SELECT e.*, snippet(entries_fts, 0, '[', ']', '...', 16) AS snippet,
+                        bm25(entries_fts) AS rank
+                 FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid
+                 WHERE entries_fts MATCH ?"""
+        params: List[Any] = [match]
+        for column, value in (("adw_id", adw_id), ("task_id", task_id), ("kind", kind), ("model", model)):
+            if value:
+                sql += f" AND e.{column} = ?"
+                params.append(value)
+        if since:
+            sql += " AND e.ts >= ?"
+            params.append(since)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        return [
+            SearchHit(**{key: row[key] for key in row.keys() if key not in ("id", "text")})
+            for row in self.conn.execute(sql, params)
+        ]
+
+    def count(self) -> Dict[str, int]:
+        """Indexed files and entries."""
+        return {
+            "files": self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            "entries": self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+        }
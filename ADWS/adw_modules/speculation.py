@@ -0,0 +1,224 @@
+"""Speculative execution of dependent tasks while their parent validates.
+
+With run_phase.py --speculate, a task whose /implement succeeded publishes
+a snapshot of the tree it is about to validate (speculation_base in its
+state). If the parent's plan usually succeeds (SPECULATION_MIN_SUCCESS of
+similar runs in the routing history), run_phase.py starts the tasks that
+only wait for that parent right away: run_task.py --speculate-from runs
+their /implement in a worktree checked out from the snapshot and keeps the
+resulting patch (agents/{adw_id}/speculative.patch).
+
+When the scheduler reaches a speculated task, land_speculation() takes the
+patch into the project tree:
+
+- applied: the tree still matches the snapshot (the parent landed unchanged)
+- rebased: the tree moved on (escalation, other tasks), but the patch merges
+  onto it with git apply --3way in a scratch worktree
+- discarded: it doesn't merge; the task is implemented as usual
+
+Then the task's validation commands run as for any other run. Speculative
+work whose parent fails is discarded. The cost of discarded work counts
+against the phase's speculation budget (ADWS_SPECULATION_BUDGET_USD);
+once it is spent, run_phase.py stops speculating.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agent import execute_template
+from .data_types import AgentPromptResponse, AgentTemplateRequest
+from .durations import record_run, task_key
+from .metrics import get_metrics
+from .routing import MIN_SAMPLES, ModelRouter, plan_complexity, route_plan
+from .state import ADWState
+from .utils import atomic_write, get_project_root
+from .validation import run_validation
+from .worktrees import (
+    apply_patch,
+    changes_since,
+    create_worktree,
+    remove_worktree,
+    snapshot_commit,
+    tree_id,
+)
+
+# Success rate the parent's plan needs before dependents start early
+SPECULATION_MIN_SUCCESS = 0.9
+
+# USD of discarded speculative work a phase run may waste
+DEFAULT_SPECULATION_BUDGET_USD = 5.0
+
+# Speculative tasks in flight when --speculate is given without a number
+DEFAULT_MAX_SPECULATIVE = 1
+
+
+def speculation_enabled() -> bool:
+    """True when run_phase.py --speculate asked tasks to publish their base (ADWS_SPECULATE)."""
+    return os.getenv("ADWS_SPECULATE") == "1"
+
+
+def get_min_success() -> float:
+    """Parent success rate needed to speculate (ADWS_SPECULATION_MIN_SUCCESS, invalid = default)."""
+    try:
+        return float(os.getenv("ADWS_SPECULATION_MIN_SUCCESS", SPECULATION_MIN_SUCCESS))
+    except ValueError:
+        return SPECULATION_MIN_SUCCESS
+
+
+def get_speculation_budget() -> float:
+    """USD of discarded speculative work allowed per phase run (ADWS_SPECULATION_BUDGET_USD, invalid = default)."""
+    try:
+        return float(os.getenv("ADWS_SPECULATION_BUDGET_USD", DEFAULT_SPECULATION_BUDGET_USD))
+    except ValueError:
+        return DEFAULT_SPECULATION_BUDGET_USD
+
+
+def publish_base(state: ADWState, logger: logging.Logger) -> None:
+    """Record the tree about to be validated, so dependents can start from it."""
+    if not speculation_enabled():
+        return
+    try:
+        state.update(speculation_base=snapshot_commit())
+        state.save("speculation_base")
+    except RuntimeError as e:
+        logger.warning(f"Could not snapshot the tree for speculation: {e}")
+
+
+def parent_success_rate(task: Dict[str, Any]) -> Tuple[Optional[float], int]:
+    """(success rate, samples) of plans like the parent's on the model it routes to."""
+    decision = route_plan(task["task_id"], task["plan_file"], task)
+    router = ModelRouter()
+    try:
+        return router.success_rate(decision.model, task_key(task["task_id"], task["plan_file"]),
+                                   plan_complexity(task["plan_file"], task))
+    finally:
+        router.close()
+
+
+def worth_speculating(task: Dict[str, Any]) -> bool:
+    """True if the parent's plan has enough history and usually succeeds."""
+    rate, samples = parent_success_rate(task)
+    return samples >= MIN_SAMPLES and rate is not None and rate >= get_min_success()
+
+
+def speculation_candidates(
+    parent_id: str,
+    tasks: List[Dict[str, Any]],
+    completed: List[str],
+    dep_map: Dict[str, List[str]],
+) -> List[Dict[str, Any]]:
+    """Tasks that wait for parent_id and for nothing else."""
+    done = set(completed) | {parent_id}
+    candidates = []
+    for task in tasks:
+        deps = set(dep_map.get(task["task_id"], [])) | set(task.get("depends_on", []))
+        if parent_id in deps and deps <= done:
+            candidates.append(task)
+    return candidates
+
+
+def speculate(
+    adw_id: str,
+    plan_file: str,
+    task_id: Optional[str],
+    metadata: Dict[str, Any],
+    state: ADWState,
+    logger: logging.Logger,
+    base: str,
+    parent: Optional[str] = None,
+    model: Optional[str] = None,
+) -> AgentPromptResponse:
+    """Implement a task in a worktree from base and keep its patch for later."""
+    decision = route_plan(task_id, plan_file, metadata, model=model)
+    logger.info(f"Speculating on {task_id} ({decision.model}) from {base[:10]} while {parent} validates")
+    started = time.monotonic()
+    worktree = create_worktree(f"{adw_id}-speculative", base)
+    try:
+        response = execute_template(AgentTemplateRequest(
+            agent_name="speculative_implementor",
+            slash_command="/implement",
+            args=[plan_file],
+            adw_id=adw_id,
+            model=decision.model,
+            cwd=worktree,
+        ))
+        if response.resource_usage:
+            state.add_resource_usage("speculative_implementor", response.resource_usage.model_dump())
+        speculation = {"base": base, "parent": parent, "model": decision.model,
+                       "cost_usd": response.cost_usd, "status": "failed", "patch": None,
+                       "duration": round(time.monotonic() - started, 3)}
+        if response.success:
+            path = os.path.join(get_project_root(), "agents", adw_id, "speculative.patch")
+            atomic_write(path, changes_since(worktree, base))
+            speculation.update(status="ready", patch=path)
+        else:
+            record_run(task_id, plan_file, metadata, decision.model, speculation["duration"], "failed", adw_id)
+        state.update(speculation=speculation, model=decision.model)
+        state.save("speculated")
+        get_metrics().inc("adws_speculations_total", outcome=speculation["status"])
+        return response
+    finally:
+        remove_worktree(worktree)
+
+
+def land_speculation(
+    adw_id: str,
+    plan_file: str,
+    task_id: Optional[str],
+    metadata: Dict[str, Any],
+    state: ADWState,
+    logger: logging.Logger,
+    validate: bool = True,
+) -> Optional[AgentPromptResponse]:
+    """Take a ready speculative patch into the project tree and validate it.
+
+    Returns None if the patch was discarded (the task has to be implemented),
+    else a response that is unsuccessful if validation failed.
+    """
+    speculation = dict(state.get("speculation") or {})
+    started = time.monotonic()
+    repo = get_project_root()
+    with open(speculation["patch"], "r", encoding="utf-8") as f:
+        patch = f.read()
+
+    current = snapshot_commit(repo)
+    if tree_id(current, repo) == tree_id(speculation["base"], repo):
+        outcome = "applied" if apply_patch(repo, patch) is None else "discarded"
+    else:
+        # Replay the patch on the tree as it is now
+        worktree = create_worktree(f"{adw_id}-rebase", current, repo)
+        try:
+            error = apply_patch(worktree, patch, three_way=True)
+            rebased = changes_since(worktree, current) if error is None else None
+        finally:
+            remove_worktree(worktree, repo)
+        outcome = "rebased" if rebased is not None and apply_patch(repo, rebased) is None else "discarded"
+
+    speculation["status"] = outcome
+    state.update(speculation=speculation)
+    state.save(f"speculation_{outcome}")
+    get_metrics().inc("adws_speculations_total", outcome=outcome)
+    if outcome == "discarded":
+        logger.warning(f"Speculative work for {task_id} does not fit the current tree; discarded")
+        return None
+    logger.info(f"Speculative work for {task_id} {outcome} (parent {speculation.get('parent')})")
+
+    commands = (metadata.get("validation_commands") or []) if validate else []
+    status, output = "completed", f"Speculative work {outcome}"
+    if commands:
+        logger.info(f"Running {len(commands)} validation command(s)...")
+        results = run_validation(commands)
+        state.update(validation_results=[])
+        for result in results:
+            state.add_validation_result(**result.model_dump())
+        failed = next((r for r in results if not r.passed), None)
+        if failed:
+            status = "validation_failed"
+            output = f"Validation failed: {failed.command}\n{failed.error or failed.output or ''}".rstrip()
+    # The agent's time was spent earlier, while the parent validated
+    duration = speculation.get("duration", 0.0) + time.monotonic() - started
+    record_run(task_id, plan_file, metadata, speculation["model"], duration, status, adw_id)
+    return AgentPromptResponse(output=output, success=status == "completed", session_id=None,
+                               cost_usd=speculation.get("cost_usd"))
@@ -1,21 +1,60 @@
 """State management for SecureDealAI ADW workflows.
 
 Provides persistent state management via file storage.
+
+Each save appends the changed fields to an append-only journal
+(agents/{adw_id}/adw_state.events.jsonl). Every SNAPSHOT_EVERY events the
+journal is compacted into adw_state.snapshot.json; load() replays the
+snapshot plus the journal tail. adw_state.json is kept as a derived view,
+rewritten atomically on compaction and on status changes.
 """
 
+import atexit
 import json
 import os
 import sys
+import time
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from .data_types import ADWStateData, ValidationResult, TaskStatus
+from .utils import atomic_write
+from .tracing import traced
+
+# Journal entries between compacted snapshots
+SNAPSHOT_EVERY = 50
+
+# Maximum seconds between fsyncs of the journal (terminal states always fsync)
+FSYNC_INTERVAL = 1.0
+
+# Open journals with unsynced writes, fsynced at interpreter exit
+_unsynced_journals: Dict[str, float] = {}
+
+
+def _fsync_path(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@atexit.register
+def _fsync_pending_journals() -> None:
+    for path in list(_unsynced_journals):
+        _fsync_path(path)
+    _unsynced_journals.clear()
 
 
 class ADWState:
     """Container for ADW workflow state with file persistence."""
 
     STATE_FILENAME = "adw_state.json"
+    JOURNAL_FILENAME = "adw_state.events.jsonl"
+    SNAPSHOT_FILENAME = "adw_state.snapshot.json"
 
     def __init__(self, adw_id: str):
         """Initialize ADWState with a required ADW ID."""
@@ -26,6 +65,13 @@ class ADWState:
         self.data: Dict[str, Any] = {"adw_id": self.adw_id}
         self.logger = logging.getLogger(__name__)
 
+        # Journal bookkeeping: last persisted values and sequence number
+        self._persisted: Dict[str, str] = {}
+        self._seq: Optional[int] = None
+        self._events_since_snapshot = 0
+        self._last_fsync = 0.0
+        self._journal_checked = False
+
     def update(self, **kwargs):
         """Update state with new key-value pairs."""
         valid_fields = {
@@ -33,7 +79,9 @@ class ADWState:
             "status", "current_step", "total_steps", "started_at",
             "completed_at", "issue_number", "issue_url", "repo_path",
             "validation_results", "dependencies", "dependencies_met",
-            "error_message"
+            "error_message", "github_quota", "batch_id", "resource_usage",
+            "model", "batch_session", "speculation_base", "speculation",
+            "pipeline_stage", "branch",
         }
         for key, value in kwargs.items():
             if key in valid_fields:
@@ -62,50 +110,189 @@ class ADWState:
         })
         self.data["validation_results"] = results
 
-    def get_state_path(self) -> str:
-        """Get path to state file."""
+    def add_resource_usage(self, name: str, usage: Dict[str, Any]):
+        """Record the resource usage of a child process (keyed by agent name)."""
+        usages = dict(self.data.get("resource_usage") or {})
+        usages[name] = usage
+        self.data["resource_usage"] = usages
+
+    @classmethod
+    def _state_dir(cls, adw_id: str) -> str:
         from .utils import get_project_root
-        project_root = get_project_root()
-        return os.path.join(project_root, "agents", self.adw_id, self.STATE_FILENAME)
+        return os.path.join(get_project_root(), "agents", adw_id)
+
+    def get_state_path(self) -> str:
+        """Get path to state file (the derived JSON view)."""
+        return os.path.join(self._state_dir(self.adw_id), self.STATE_FILENAME)
+
+    def get_journal_path(self) -> str:
+        """Get path to the append-only event journal."""
+        return os.path.join(self._state_dir(self.adw_id), self.JOURNAL_FILENAME)
+
+    def get_snapshot_path(self) -> str:
+        """Get path to the compacted snapshot."""
+        return os.path.join(self._state_dir(self.adw_id), self.SNAPSHOT_FILENAME)
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        return json.dumps(value, sort_keys=True, default=str)
+
+    @classmethod
+    def _replay(cls, adw_id: str) -> Tuple[Optional[Dict[str, Any]], int, int]:
+        """Rebuild state from snapshot + journal tail.
+
+        Returns (data or None if no journal/snapshot exists, last seq,
+        journal entries after the snapshot). A torn last line from a crash
+        mid-append is ignored.
+        """
+        state_dir = cls._state_dir(adw_id)
+        snapshot_path = os.path.join(state_dir, cls.SNAPSHOT_FILENAME)
+        journal_path = os.path.join(state_dir, cls.JOURNAL_FILENAME)
+
+        if not os.path.exists(snapshot_path) and not os.path.exists(journal_path):
+            return None, 0, 0
+
+        data: Dict[str, Any] = {}
+        seq = 0
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            data = snapshot.get("data", {})
+            seq = snapshot.get("seq", 0)
+
+        tail = 0
+        if os.path.exists(journal_path):
+            with open(journal_path, "r") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if event.get("seq", 0) <= seq:
+                        continue
+                    data.update(event.get("set", {}))
+                    seq = event["seq"]
+                    tail += 1
+
+        return data, seq, tail
+
+    def _compact(self) -> None:
+        """Write a snapshot + derived view, then truncate the journal."""
+        atomic_write(
+            self.get_snapshot_path(),
+            json.dumps({"seq": self._seq, "data": self.data}, default=str),
+        )
+        self._write_view()
+        # The snapshot covers every journal entry; a crash before this truncate
+        # is harmless because replay skips entries with seq <= snapshot seq.
+        with open(self.get_journal_path(), "w"):
+            pass
+        _unsynced_journals.pop(self.get_journal_path(), None)
+        self._events_since_snapshot = 0
+
+    def _trim_torn_tail(self, journal_path: str) -> None:
+        """Drop a partial last line so the next append starts on a fresh line."""
+        if not os.path.exists(journal_path):
+            return
+        with open(journal_path, "rb+") as f:
+            content = f.read()
+            if content and not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+                self.logger.warning(f"Dropped torn last entry of {journal_path}")
+
+    def _write_view(self) -> None:
+        atomic_write(self.get_state_path(), json.dumps(self.data, indent=2, default=str))
 
+    @traced("state.save")
     def save(self, workflow_step: Optional[str] = None) -> None:
-        """Save state to file in agents/{adw_id}/adw_state.json."""
-        state_path = self.get_state_path()
-        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        """Append changed fields to the state journal in agents/{adw_id}/.
 
-        # Save as JSON
-        with open(state_path, "w") as f:
-            json.dump(self.data, f, indent=2, default=str)
+        The journal is fsynced at most every FSYNC_INTERVAL seconds, and
+        always when the status changes, so frequent checkpoints stay cheap.
+        """
+        journal_path = self.get_journal_path()
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
 
-        self.logger.info(f"Saved state to {state_path}")
+        if self._seq is None:
+            # Continue the existing journal of this ADW ID, if any
+            _, self._seq, self._events_since_snapshot = self._replay(self.adw_id)
+        if not self._journal_checked:
+            self._trim_torn_tail(journal_path)
+            self._journal_checked = True
+
+        changes = {
+            key: value for key, value in self.data.items()
+            if self._persisted.get(key) != self._encode(value)
+        }
+        if not changes and not workflow_step:
+            return
+
+        self._seq += 1
+        event = {
+            "seq": self._seq,
+            "ts": datetime.now().isoformat(),
+            "step": workflow_step,
+            "set": changes,
+        }
+        with open(journal_path, "a") as f:
+            f.write(json.dumps(event, default=str) + "\n")
+            f.flush()
+            now = time.monotonic()
+            status_changed = "status" in changes
+            if status_changed or now - self._last_fsync >= FSYNC_INTERVAL:
+                os.fsync(f.fileno())
+                self._last_fsync = now
+                _unsynced_journals.pop(journal_path, None)
+            else:
+                _unsynced_journals[journal_path] = now
+
+        for key, value in changes.items():
+            self._persisted[key] = self._encode(value)
+        self._events_since_snapshot += 1
+
+        if self._events_since_snapshot >= SNAPSHOT_EVERY:
+            self._compact()
+        elif "status" in changes or not os.path.exists(self.get_state_path()):
+            self._write_view()
+
+        self.logger.info(f"Saved state to {journal_path}")
         if workflow_step:
             self.logger.info(f"State updated by: {workflow_step}")
 
     @classmethod
     def load(cls, adw_id: str, logger: Optional[logging.Logger] = None) -> Optional["ADWState"]:
-        """Load state from file if it exists."""
-        from .utils import get_project_root
-        project_root = get_project_root()
-        state_path = os.path.join(project_root, "agents", adw_id, cls.STATE_FILENAME)
-
-        if not os.path.exists(state_path):
-            return None
+        """Load state by replaying snapshot + journal (or the legacy JSON file)."""
+        state_path = os.path.join(cls._state_dir(adw_id), cls.STATE_FILENAME)
 
         try:
-            with open(state_path, "r") as f:
-                data = json.load(f)
+            data, seq, tail = cls._replay(adw_id)
+        except Exception as e:
+            if logger:
+                logger.error(f"Failed to replay state journal for {adw_id}: {e}")
+            data, seq, tail = None, 0, 0
 
-            state = cls(data.get("adw_id", adw_id))
-            state.data = data
+        if data is None:
+            if not os.path.exists(state_path):
+                return None
+            try:
+                with open(state_path, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                if logger:
+                    logger.error(f"Failed to load state from {state_path}: {e}")
+                return None
 
-            if logger:
-                logger.info(f"Found existing state from {state_path}")
+        state = cls(data.get("adw_id", adw_id))
+        state.data = data
+        state._persisted = {key: cls._encode(value) for key, value in data.items()}
+        if seq:
+            state._seq = seq
+            state._events_since_snapshot = tail
 
-            return state
-        except Exception as e:
-            if logger:
-                logger.error(f"Failed to load state from {state_path}: {e}")
-            return None
+        if logger:
+            logger.info(f"Found existing state for {adw_id} (seq {seq})")
+
+        return state
 
     @classmethod
     def find_by_task_id(cls, task_id: str, logger: Optional[logging.Logger] = None) -> Optional["ADWState"]:
@@ -117,7 +304,7 @@ class ADWState:
         if not os.path.exists(agents_dir):
             return None
 
-        # Find all states with matching task_id
+        # Find all states with matching task_id (the JSON view always carries task_id)
         matching_states = []
         for adw_id in os.listdir(agents_dir):
             state_path = os.path.join(agents_dir, adw_id, cls.STATE_FILENAME)
@@ -126,20 +313,19 @@ class ADWState:
                     with open(state_path, "r") as f:
                         data = json.load(f)
                     if data.get("task_id") == task_id:
-                        matching_states.append((adw_id, data, os.path.getmtime(state_path)))
+                        matching_states.append((adw_id, os.path.getmtime(state_path)))
                 except Exception:
                     continue
 
         if not matching_states:
             return None
 
-        # Return most recent
-        matching_states.sort(key=lambda x: x[2], reverse=True)
-        adw_id, data, _ = matching_states[0]
+        # Return most recent, replayed from its journal
+        matching_states.sort(key=lambda x: x[1], reverse=True)
+        adw_id, _ = matching_states[0]
 
-        state = cls(adw_id)
-        state.data = data
-        if logger:
+        state = cls.load(adw_id)
+        if state and logger:
             logger.info(f"Found existing state for task {task_id}: {adw_id}")
         return state
 
@@ -8,10 +8,14 @@ import re
 from typing import Optional, Dict, List, Any
 from glob import glob
 
+from .tracing import traced
+
 
 def get_project_root() -> str:
-    """Get the project root directory (SecureDealAI)."""
-    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    """Get the project root directory (SecureDealAI), or ADWS_PROJECT_ROOT."""
+    return os.getenv("ADWS_PROJECT_ROOT") or os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
 
 
 def find_plan_file(task_id: str) -> Optional[str]:
@@ -35,6 +39,7 @@ def find_plan_file(task_id: str) -> Optional[str]:
     return None
 
 
+@traced("parse_plan_metadata")
 def parse_plan_metadata(plan_file: str) -> Dict[str, Any]:
     """Parse metadata from an implementation plan file.
 
@@ -203,6 +208,7 @@ def check_dependencies(task_id: str, completed_tasks: List[str] = None) -> Dict[
     }
 
 
+@traced("tracker.read")
 def get_completed_tasks_from_tracker() -> List[str]:
     """Read all implementation trackers and return list of completed task IDs.
 
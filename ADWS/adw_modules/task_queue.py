@@ -0,0 +1,268 @@
+"""Multi-worker task queue for SecureDealAI ADW phases.
+
+Backed by SQLite in agents/queue/tasks.db so any number of worker processes
+(on one host, or several hosts sharing the agents/ directory) can claim
+tasks. Claims are leases: a worker must heartbeat before the lease expires,
+otherwise the task is re-queued for another worker.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Optional, List, Dict, Any
+
+from .utils import get_project_root
+
+# Seconds a claim stays valid without a heartbeat
+DEFAULT_LEASE_SECONDS = 300
+
+# Attempts (including re-queues after a dead worker) before a task is failed
+DEFAULT_MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id       TEXT PRIMARY KEY,
+    phase         INTEGER,
+    plan_file     TEXT,
+    depends_on    TEXT NOT NULL DEFAULT '[]',
+    status        TEXT NOT NULL DEFAULT 'pending',
+    worker_id     TEXT,
+    adw_id        TEXT,
+    lease_expires REAL,
+    heartbeat_at  REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    enqueued_at   REAL,
+    started_at    REAL,
+    finished_at   REAL,
+    error         TEXT,
+    priority      REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+"""
+
+
+def get_queue_path() -> str:
+    """Get the default queue database path (override with ADWS_QUEUE_DB)."""
+    return os.getenv(
+        "ADWS_QUEUE_DB",
+        os.path.join(get_project_root(), "agents", "queue", "tasks.db"),
+    )
+
+
+def make_worker_id() -> str:
+    """Identify a worker by host and PID."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class TaskQueue:
+    """SQLite-backed task queue with leases, heartbeats and re-queuing.
+
+    Args:
+        db_path: Database file (default: agents/queue/tasks.db)
+        shared_fs: Use rollback journaling instead of WAL. WAL needs shared
+            memory and is only safe when all workers run on the same host;
+            set this (or ADWS_QUEUE_SHARED_FS=1) for workers on several hosts.
+            The journal mode is chosen when the database is created; opening
+            an existing queue never turns WAL on, only off (shared_fs).
+    """
+
+    def __init__(self, db_path: Optional[str] = None, shared_fs: Optional[bool] = None):
+        self.db_path = db_path or get_queue_path()
+        if shared_fs is None:
+            shared_fs = os.getenv("ADWS_QUEUE_SHARED_FS") == "1"
+        self.shared_fs = shared_fs
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        created = not os.path.exists(self.db_path) or os.path.getsize(self.db_path) == 0
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA busy_timeout = 30000")
+        if created or shared_fs:
+            self.conn.execute(f"PRAGMA journal_mode = {'DELETE' if shared_fs else 'WAL'}")
+        self.conn.executescript(SCHEMA)
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(tasks)")}
+        if "priority" not in columns:
+            # Queues created before priorities existed
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def _write(self):
+        """Start an immediate (write-locked) transaction."""
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, tasks: List[Dict[str, Any]], max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Add tasks (parse_plan_metadata dicts) to the queue.
+
+        A task's optional "priority" (e.g. its predicted duration) orders
+        claims among ready tasks, highest first. Tasks already queued are left untouched unless they failed, in which
+        case they are reset to pending. Returns the number of tasks (re)queued.
+        """
+        now = time.time()
+        added = 0
+        self._write()
+        try:
+            for task in tasks:
+                row = self.conn.execute(
+                    "SELECT status FROM tasks WHERE task_id = ?", (task["task_id"],)
+                ).fetchone()
+                if row and row["status"] != "failed":
+                    continue
+                self.conn.execute(
+                    """INSERT OR REPLACE INTO tasks
+                       (task_id, phase, plan_file, depends_on, status, attempts,
+                        max_attempts, enqueued_at, priority)
+                       VALUES (?, ?, ?, ?, 'pending', 0, ?, ?, ?)""",
+                    (
+                        task["task_id"],
+                        task.get("phase"),
+                        task.get("plan_file"),
+                        json.dumps(task.get("depends_on", [])),
+                        max_attempts,
+                        now,
+                        task.get("priority", 0),
+                    ),
+                )
+                added += 1
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def _requeue_expired(self, now: float) -> None:
+        """Return tasks whose worker stopped heartbeating to the pending pool."""
+        self.conn.execute(
+            """UPDATE tasks
+               SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                   error = 'Lease expired (worker ' || worker_id || ' stopped heartbeating)',
+                   worker_id = NULL, lease_expires = NULL
+               WHERE status = 'claimed' AND lease_expires < ?""",
+            (now,),
+        )
+
+    def claim(
+        self,
+        worker_id: str,
+        completed_external: Optional[List[str]] = None,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    ) -> Optional[Dict[str, Any]]:
+        """Claim the next ready task.
+
+        A task is ready when every dependency is completed in the queue, or
+        is not queued at all and listed in completed_external (the tracker).
+
+        Returns the claimed task row as a dict, or None if nothing is ready.
+        """
+        completed_external = set(completed_external or [])
+        now = time.time()
+        self._write()
+        try:
+            self._requeue_expired(now)
+            rows = self.conn.execute(
+                "SELECT task_id, status, depends_on, priority FROM tasks"
+            ).fetchall()
+            queued = {r["task_id"]: r["status"] for r in rows}
+
+            for row in sorted(rows, key=lambda r: (-r["priority"], r["task_id"])):
+                if row["status"] != "pending":
+                    continue
+                deps = json.loads(row["depends_on"])
+                failed_deps = [dep for dep in deps if queued.get(dep) == "failed"]
+                if failed_deps:
+                    # Cascade so workers don't wait forever on a dead branch
+                    self.conn.execute(
+                        "UPDATE tasks SET status = 'failed', error = ? WHERE task_id = ?",
+                        (f"Dependency failed: {', '.join(failed_deps)}", row["task_id"]),
+                    )
+                    queued[row["task_id"]] = "failed"
+                    continue
+                if all(
+                    queued.get(dep) == "completed"
+                    or (dep not in queued and dep in completed_external)
+                    for dep in deps
+                ):
+                    self.conn.execute(
+                        """UPDATE tasks
+                           SET status = 'claimed', worker_id = ?, lease_expires = ?,
+                               heartbeat_at = ?, started_at = ?, attempts = attempts + 1,
+                               error = NULL
+                           WHERE task_id = ?""",
+                        (worker_id, now + lease_seconds, now, now, row["task_id"]),
+                    )
+                    claimed = self.conn.execute(
+                        "SELECT * FROM tasks WHERE task_id = ?", (row["task_id"],)
+                    ).fetchone()
+                    self.conn.execute("COMMIT")
+                    return dict(claimed)
+
+            self.conn.execute("COMMIT")
+            return None
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def heartbeat(
+        self,
+        task_id: str,
+        worker_id: str,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        adw_id: Optional[str] = None,
+    ) -> bool:
+        """Extend a lease. Returns False if the worker no longer owns the task."""
+        now = time.time()
+        cursor = self.conn.execute(
+            """UPDATE tasks
+               SET lease_expires = ?, heartbeat_at = ?, adw_id = COALESCE(?, adw_id)
+               WHERE task_id = ? AND worker_id = ? AND status = 'claimed'""",
+            (now + lease_seconds, now, adw_id, task_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str, adw_id: Optional[str] = None) -> bool:
+        """Mark a claimed task completed."""
+        cursor = self.conn.execute(
+            """UPDATE tasks
+               SET status = 'completed', finished_at = ?, lease_expires = NULL,
+                   adw_id = COALESCE(?, adw_id)
+               WHERE task_id = ? AND worker_id = ? AND status = 'claimed'""",
+            (time.time(), adw_id, task_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry: bool = False) -> bool:
+        """Mark a claimed task failed, or put it back in the pool if retry is set."""
+        cursor = self.conn.execute(
+            """UPDATE tasks
+               SET status = CASE WHEN ? AND attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                   finished_at = ?, lease_expires = NULL, worker_id = NULL, error = ?
+               WHERE task_id = ? AND worker_id = ? AND status = 'claimed'""",
+            (1 if retry else 0, time.time(), error[:1000], task_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of tasks per status."""
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) AS n FROM tasks GROUP BY status"
+        ).fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def has_open_work(self) -> bool:
+        """True while any task is pending or claimed."""
+        counts = self.counts()
+        return counts.get("pending", 0) + counts.get("claimed", 0) > 0
+
+    def has_inflight_work(self) -> bool:
+        """True while any task is claimed (and may unblock pending ones)."""
+        return self.counts().get("claimed", 0) > 0
+
+    def list_tasks(self) -> List[Dict[str, Any]]:
+        """Return all queued tasks ordered by task ID."""
+        rows = self.conn.execute("SELECT * FROM tasks ORDER BY task_id").fetchall()
+        return [dict(r) for r in rows]
@@ -0,0 +1,387 @@
+"""Timeline reports for SecureDealAI ADW phase runs.
+
+Builds one row per task from the run records under agents/ (the phase
+journal of a run_phase.py run, or the queue database used by
+run_worker.py), splits each task's time into segments using its tracing
+spans, and derives the realized critical path, worker idle time and
+GitHub/IO stalls. Rendered as a text Gantt chart or a standalone HTML page.
+"""
+
+import html
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils import get_project_root
+from .phase_journal import get_phase_journal_path
+
+# Segment kinds, lowest to highest drawing priority
+SEGMENT_KINDS = ["waiting", "queued", "running", "agent", "validating", "io"]
+
+SEGMENT_CHARS = {
+    "waiting": ".",
+    "queued": "-",
+    "running": "=",
+    "agent": "#",
+    "validating": "v",
+    "io": "!",
+}
+
+SEGMENT_COLORS = {
+    "waiting": "#e5e7eb",
+    "queued": "#fde68a",
+    "running": "#93c5fd",
+    "agent": "#2563eb",
+    "validating": "#a855f7",
+    "io": "#dc2626",
+}
+
+# Span name prefixes counted as GitHub/IO stalls
+IO_SPAN_PREFIXES = ("github.", "tracker.", "state.save", "convert_jsonl", "artifacts.", "search.")
+
+# Stalls shorter than this are left out of the stall list
+MIN_STALL_SECONDS = 0.5
+
+# Clock slack when matching a predecessor's finish to a task's start
+CRITICAL_PATH_SLACK_SECONDS = 0.05
+
+
+def _ts(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def load_phase_rows(phase_adw_id: str) -> List[Dict[str, Any]]:
+    """Build task rows from a run_phase.py journal.
+
+    run_phase.py runs tasks one at a time, so every row shares the worker
+    "run_phase". A task's attempts are merged: the row spans its last start
+    to its final outcome.
+    """
+    path = get_phase_journal_path(phase_adw_id)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No phase journal at {path}")
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    scheduled_at = None
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            ts = _ts(entry["ts"])
+            event = entry["event"]
+            if event == "scheduled" and scheduled_at is None:
+                scheduled_at = ts
+                for task_id in entry["order"]:
+                    rows[task_id] = _new_row(task_id, "run_phase", ts)
+            elif event == "task_started" and entry["task_id"] in rows:
+                row = rows[entry["task_id"]]
+                row.update(adw_id=entry["adw_id"], started_at=ts, status="running")
+            elif event == "task_finished" and entry["task_id"] in rows:
+                row = rows[entry["task_id"]]
+                row.update(finished_at=ts, status=entry["status"])
+                row["adw_id"] = entry.get("adw_id") or row["adw_id"]
+                if row["started_at"] is None:
+                    # Skipped without running (e.g. dependencies not met)
+                    row["started_at"] = ts
+
+    return list(rows.values())
+
+
+def load_queue_rows(db_path: str) -> List[Dict[str, Any]]:
+    """Build task rows from a run_worker.py queue database."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        tasks = conn.execute("SELECT * FROM tasks ORDER BY task_id").fetchall()
+    finally:
+        conn.close()
+
+    rows = []
+    for task in tasks:
+        row = _new_row(task["task_id"], task["worker_id"] or "-", task["enqueued_at"])
+        row.update(
+            adw_id=task["adw_id"],
+            started_at=task["started_at"],
+            finished_at=task["finished_at"],
+            status=task["status"],
+            depends_on=json.loads(task["depends_on"]),
+        )
+        rows.append(row)
+    return rows
+
+
+def _new_row(task_id: str, worker: str, queued_at: Optional[float]) -> Dict[str, Any]:
+    return {
+        "task_id": task_id,
+        "adw_id": None,
+        "worker": worker,
+        "queued_at": queued_at,
+        "ready_at": queued_at,
+        "started_at": None,
+        "finished_at": None,
+        "status": "pending",
+        "depends_on": None,
+        "segments": [],
+        "stalls": [],
+    }
+
+
+def load_task_spans(adw_id: str) -> List[Dict[str, Any]]:
+    """Read the spans a task's processes recorded under agents/{adw_id}/."""
+    task_dir = os.path.join(get_project_root(), "agents", adw_id)
+    spans = []
+    if not os.path.isdir(task_dir):
+        return spans
+    for name in sorted(os.listdir(task_dir)):
+        path = os.path.join(task_dir, name, "spans.jsonl")
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def _span_kind(name: str) -> Optional[str]:
+    if name == "claude_subprocess":
+        return "agent"
+    if name.startswith("validate"):
+        return "validating"
+    if name.startswith(IO_SPAN_PREFIXES):
+        return "io"
+    return None
+
+
+def build_timeline(rows: List[Dict[str, Any]], dep_map: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Fill in segments and derive critical path, idle time and stalls.
+
+    Args:
+        rows: Task rows from load_phase_rows() / load_queue_rows()
+        dep_map: Dependency map (task_parser.get_dependency_map())
+
+    Returns:
+        Dict with rows, start, end, critical_path, worker_idle and stalls
+    """
+    by_id = {row["task_id"]: row for row in rows}
+
+    for row in rows:
+        deps = row["depends_on"] if row["depends_on"] is not None else dep_map.get(row["task_id"], [])
+        row["depends_on"] = [d for d in deps if d in by_id]
+
+    # Dependencies resolved inside the run set when a task became ready
+    for row in rows:
+        finishes = [by_id[d]["finished_at"] for d in row["depends_on"] if by_id[d]["finished_at"]]
+        if finishes and row["queued_at"] is not None:
+            row["ready_at"] = max([row["queued_at"], *finishes])
+
+    for row in rows:
+        segments = []
+        if row["queued_at"] is not None and row["ready_at"] and row["ready_at"] > row["queued_at"]:
+            segments.append(("waiting", row["queued_at"], row["ready_at"]))
+        if row["started_at"] and row["ready_at"] and row["started_at"] > row["ready_at"]:
+            segments.append(("queued", row["ready_at"], row["started_at"]))
+        if row["started_at"] and row["finished_at"]:
+            segments.append(("running", row["started_at"], row["finished_at"]))
+
+        for s in load_task_spans(row["adw_id"]) if row["adw_id"] else []:
+            kind = _span_kind(s["name"])
+            if not kind:
+                continue
+            start, end = s["start"], s["start"] + s["duration_ms"] / 1000
+            segments.append((kind, start, end))
+            if kind == "io" and end - start >= MIN_STALL_SECONDS:
+                row["stalls"].append({"name": s["name"], "start": start, "seconds": end - start,
+                                      "attrs": s.get("attrs", {})})
+        row["segments"] = segments
+
+    times = [t for row in rows for _, a, b in row["segments"] for t in (a, b)]
+    start = min(times) if times else 0.0
+    end = max(times) if times else 0.0
+
+    return {
+        "rows": rows,
+        "start": start,
+        "end": end,
+        "critical_path": critical_path(rows),
+        "worker_idle": worker_idle(rows, start, end),
+        "stalls": sorted(
+            ({"task_id": row["task_id"], **stall} for row in rows for stall in row["stalls"]),
+            key=lambda s: s["seconds"],
+            reverse=True,
+        ),
+    }
+
+
+def critical_path(rows: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """Walk back from the last task to finish along what actually held it up.
+
+    A task's binding predecessor is whichever finished last before it
+    started: one of its dependencies ("dependency"), or the previous task
+    on the same worker ("worker"). Returns (task_id, reason) pairs in
+    execution order; the first task has reason "start".
+    """
+    finished = [r for r in rows if r["finished_at"] and r["started_at"]]
+    if not finished:
+        return []
+    by_id = {r["task_id"]: r for r in finished}
+
+    path = []
+    current = max(finished, key=lambda r: r["finished_at"])
+    reason = "end"
+    seen = set()
+    while current and current["task_id"] not in seen:
+        seen.add(current["task_id"])
+        path.append((current["task_id"], reason))
+        candidates = [(by_id[d], "dependency") for d in current["depends_on"] if d in by_id]
+        candidates += [
+            (r, "worker") for r in finished
+            if r["worker"] == current["worker"] and r is not current
+        ]
+        candidates = [
+            (r, why) for r, why in candidates
+            if r["task_id"] not in seen
+            and r["finished_at"] <= current["started_at"] + CRITICAL_PATH_SLACK_SECONDS
+        ]
+        if not candidates:
+            break
+        current, reason = max(candidates, key=lambda c: (c[0]["finished_at"], c[1] == "dependency"))
+
+    path.reverse()
+    # Each entry says why the *next* task waited for it; shift so the
+    # reason describes how a task was reached
+    return [(task_id, path[i - 1][1] if i else "start") for i, (task_id, _) in enumerate(path)]
+
+
+def worker_idle(rows: List[Dict[str, Any]], start: float, end: float) -> Dict[str, Dict[str, float]]:
+    """Busy and idle seconds per worker over the run window."""
+    busy: Dict[str, List[Tuple[float, float]]] = {}
+    for row in rows:
+        if row["started_at"] and row["finished_at"]:
+            busy.setdefault(row["worker"], []).append((row["started_at"], row["finished_at"]))
+
+    result = {}
+    window = max(end - start, 0.0)
+    for worker, intervals in busy.items():
+        total = 0.0
+        last = None
+        for a, b in sorted(intervals):
+            if last is not None and a < last:
+                a = last
+            if b > a:
+                total += b - a
+            last = max(last or b, b)
+        result[worker] = {"busy": total, "idle": max(window - total, 0.0)}
+    return result
+
+
+def _fmt_seconds(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}h"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds:.1f}s"
+
+
+def render_text(timeline: Dict[str, Any], width: int = 80) -> str:
+    """Render the timeline as a text Gantt chart with a summary."""
+    rows, start, end = timeline["rows"], timeline["start"], timeline["end"]
+    span = max(end - start, 1e-6)
+    critical = {task_id for task_id, _ in timeline["critical_path"]}
+    priority = {kind: i for i, kind in enumerate(SEGMENT_KINDS)}
+
+    lines = [f"Window: {_fmt_seconds(end - start)}   1 column = {_fmt_seconds(span / width)}", ""]
+    for row in rows:
+        cells = [" "] * width
+        ranks = [-1] * width
+        for kind, a, b in row["segments"]:
+            first = int((a - start) / span * width)
+            last = max(first, min(width - 1, int((b - start) / span * width)))
+            for col in range(max(first, 0), last + 1):
+                if priority[kind] > ranks[col]:
+                    cells[col], ranks[col] = SEGMENT_CHARS[kind], priority[kind]
+        mark = "*" if row["task_id"] in critical else " "
+        duration = (row["finished_at"] - row["started_at"]) if row["finished_at"] and row["started_at"] else 0.0
+        lines.append(f"{mark}{row['task_id']:<7}|{''.join(cells)}| {_fmt_seconds(duration):>6} {row['status']}")
+
+    legend = "  ".join(f"{SEGMENT_CHARS[k]} {k}" for k in SEGMENT_KINDS)
+    lines += ["", f"Legend: {legend}   * critical path", ""]
+    lines += _summary_lines(timeline)
+    return "\n".join(lines)
+
+
+def _summary_lines(timeline: Dict[str, Any]) -> List[str]:
+    lines = ["Critical path:"]
+    if timeline["critical_path"]:
+        lines.append("  " + " -> ".join(
+            f"{task_id} ({reason})" if reason != "start" else task_id
+            for task_id, reason in timeline["critical_path"]
+        ))
+    else:
+        lines.append("  (no finished tasks)")
+
+    lines.append("Worker utilisation:")
+    for worker, usage in sorted(timeline["worker_idle"].items()):
+        lines.append(f"  {worker:<28} busy {_fmt_seconds(usage['busy']):>7}  idle {_fmt_seconds(usage['idle']):>7}")
+
+    stalls = timeline["stalls"]
+    lines.append(f"GitHub/IO stalls: {len(stalls)} totalling "
+                 f"{_fmt_seconds(sum(s['seconds'] for s in stalls))}")
+    for stall in stalls[:10]:
+        lines.append(f"  {stall['task_id']:<7} {stall['name']:<24} {_fmt_seconds(stall['seconds']):>7}")
+    return lines
+
+
+def render_html(timeline: Dict[str, Any], title: str) -> str:
+    """Render the timeline as a standalone HTML page."""
+    rows, start, end = timeline["rows"], timeline["start"], timeline["end"]
+    span = max(end - start, 1e-6)
+    critical = {task_id for task_id, _ in timeline["critical_path"]}
+    priority = {kind: i for i, kind in enumerate(SEGMENT_KINDS)}
+
+    def bar(kind: str, a: float, b: float) -> str:
+        left = (a - start) / span * 100
+        width = max((b - a) / span * 100, 0.15)
+        tip = f"{kind}: {_fmt_seconds(b - a)}"
+        return (f'<div class="seg" title="{html.escape(tip)}" style="left:{left:.3f}%;'
+                f'width:{width:.3f}%;background:{SEGMENT_COLORS[kind]};z-index:{priority[kind]}"></div>')
+
+    body = []
+    for row in rows:
+        segments = "".join(bar(k, a, b) for k, a, b in sorted(row["segments"], key=lambda s: priority[s[0]]))
+        cls = "row critical" if row["task_id"] in critical else "row"
+        body.append(f'<div class="{cls}"><div class="label">{html.escape(row["task_id"])} '
+                    f'<small>{html.escape(row["status"])}</small></div>'
+                    f'<div class="track">{segments}</div></div>')
+
+    legend = "".join(
+        f'<span><i style="background:{SEGMENT_COLORS[k]}"></i>{k}</span>' for k in SEGMENT_KINDS
+    )
+    summary = html.escape("\n".join(_summary_lines(timeline)))
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; margin: 24px; }}
+.row {{ display: flex; align-items: center; height: 22px; }}
+.row.critical .label {{ font-weight: bold; color: #b91c1c; }}
+.label {{ width: 120px; font-size: 13px; }}
+.track {{ position: relative; flex: 1; height: 16px; background: #f9fafb; }}
+.seg {{ position: absolute; top: 0; height: 16px; }}
+.legend span {{ margin-right: 14px; font-size: 13px; }}
+.legend i {{ display: inline-block; width: 12px; height: 12px; margin-right: 4px; vertical-align: middle; }}
+pre {{ background: #f3f4f6; padding: 12px; }}
+</style></head><body>
+<h2>{html.escape(title)}</h2>
+<p>Window: {_fmt_seconds(end - start)} &middot; critical path in bold red</p>
+<div class="legend">{legend}</div>
+{''.join(body)}
+<pre>{summary}</pre>
+</body></html>
+"""
@@ -0,0 +1,169 @@
+"""Lightweight tracing spans for SecureDealAI ADW workflows.
+
+Spans are written as JSON lines to spans.jsonl next to execution.log
+(setup_logger points the sink there). Nested spans record their parent,
+and child processes continue the same trace through the environment:
+
+    ADWS_TRACE_ID        Trace shared by every process of one run
+    ADWS_PARENT_SPAN_ID  Span that spawned this process
+    ADWS_SPAWN_TS        When the parent spawned us (records a "startup" span)
+
+so a run_phase run and all of its run_task children form a single trace.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACE_ID_ENV = "ADWS_TRACE_ID"
+PARENT_SPAN_ENV = "ADWS_PARENT_SPAN_ID"
+SPAWN_TS_ENV = "ADWS_SPAWN_TS"
+
+SPANS_FILENAME = "spans.jsonl"
+
+# Spans kept in memory until the first sink is configured
+MAX_PENDING_SPANS = 1000
+
+_trace_id: str = os.getenv(TRACE_ID_ENV) or uuid.uuid4().hex[:16]
+_root_parent: Optional[str] = os.getenv(PARENT_SPAN_ENV) or None
+
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "adws_current_span", default=None
+)
+_sink: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "adws_span_sink", default=None
+)
+_default_sink: Optional[str] = None
+_pending: List[str] = []
+_write_lock = threading.Lock()
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+def get_trace_id() -> str:
+    """Trace ID of this process (inherited from ADWS_TRACE_ID if set)."""
+    return _trace_id
+
+
+def current_span_id() -> Optional[str]:
+    """ID of the innermost open span, or the span that spawned this process."""
+    return _current_span.get() or _root_parent
+
+
+def get_default_log_dir() -> Optional[str]:
+    """Log directory of the first configured sink (None before setup_logger)."""
+    return os.path.dirname(_default_sink) if _default_sink else None
+
+
+def configure_tracing(log_dir: str) -> str:
+    """Write spans of the current context to log_dir/spans.jsonl.
+
+    The first call also becomes the process default, so threads that never
+    configure their own sink still record their spans, and receives the
+    spans recorded before any sink existed (plan parsing, tracker reads).
+    """
+    global _default_sink
+    path = os.path.join(log_dir, SPANS_FILENAME)
+    first = _default_sink is None
+    _sink.set(path)
+    if first:
+        _default_sink = path
+        with _write_lock:
+            if _pending:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.writelines(_pending)
+                _pending.clear()
+        spawn_ts = os.getenv(SPAWN_TS_ENV)
+        if spawn_ts:
+            # Time between the parent's spawn and tracing coming up: uv
+            # startup, imports and argument parsing
+            start = float(spawn_ts)
+            _write_span({
+                "name": "startup",
+                "span_id": _new_span_id(),
+                "parent_id": _root_parent,
+                "start": start,
+                "duration_ms": round((time.time() - start) * 1000, 3),
+                "attrs": {},
+                "status": "ok",
+            })
+    return path
+
+
+def _write_span(record: Dict[str, Any]) -> None:
+    path = _sink.get() or _default_sink
+    record = {"trace_id": _trace_id, "pid": os.getpid(), **record}
+    line = json.dumps(record, default=str) + "\n"
+    with _write_lock:
+        if not path:
+            if len(_pending) < MAX_PENDING_SPANS:
+                _pending.append(line)
+            return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Record a span around a block.
+
+    Yields the attribute dict, so the block can add attributes (e.g. exit
+    codes) that are only known once it has run.
+    """
+    span_id = _new_span_id()
+    parent_id = current_span_id()
+    token = _current_span.set(span_id)
+    start = time.time()
+    t0 = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield attrs
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        _current_span.reset(token)
+        record = {
+            "name": name,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "start": start,
+            "duration_ms": round((time.perf_counter() - t0) * 1000, 3),
+            "attrs": attrs,
+            "status": status,
+        }
+        if error:
+            record["error"] = error
+        _write_span(record)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span(); the span is named after the function by default."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_env(env: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment for a child process that continues the current trace."""
+    env = dict(os.environ if env is None else env)
+    env[TRACE_ID_ENV] = _trace_id
+    parent = current_span_id()
+    if parent:
+        env[PARENT_SPAN_ENV] = parent
+    env[SPAWN_TS_ENV] = repr(time.time())
+    return env
@@ -0,0 +1,196 @@
+"""Implementation tracker writer for SecureDealAI ADW workflows.
+
+Status changes are queued and applied in batches: each flush takes a file
+lock on the tracker, applies every pending change to one read of the file
+and writes it back atomically (temp file + rename). Concurrent tasks can
+no longer lose each other's updates, and a burst of completions costs a
+single rewrite. The markdown is edited in place with the same row patterns
+as before, so the table layout (and line endings) stay exactly as they are.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional, List, Dict, Tuple
+
+from .utils import get_project_root, file_lock, atomic_write
+from .tracing import span
+from .metrics import get_metrics
+
+# Seconds to wait for more updates before flushing a burst
+DEFAULT_COALESCE_SECONDS = 0.2
+
+# Seconds update() waits for the background flush before writing itself
+FLUSH_TIMEOUT_SECONDS = 30.0
+
+
+def get_tracker_path_for_task(task_id: str) -> str:
+    """Get the appropriate tracker file path for a given task ID.
+
+    Phase 5 and 6 use their own trackers, others use 00_IMPLEMENTATION_TRACKER.md.
+    """
+    project_root = get_project_root()
+    impl_dir = os.path.join(project_root, "docs", "implementation")
+
+    phase = int(task_id.split("_")[0])
+
+    if phase == 5:
+        return os.path.join(impl_dir, "PHASE5_IMPLEMENTATION_TRACKER.md")
+    elif phase == 6:
+        return os.path.join(impl_dir, "PHASE6_IMPLEMENTATION_TRACKER.md")
+    else:
+        return os.path.join(impl_dir, "00_IMPLEMENTATION_TRACKER.md")
+
+
+def apply_status_update(content: str, task_id: str, status: str, today: str) -> Tuple[str, int]:
+    """Apply one task status change to tracker markdown.
+
+    Returns the new content and the number of rows changed.
+    """
+    # Convert task_id format (02_06 -> 2.6)
+    phase, task = task_id.split("_")
+    display_id = f"{int(phase)}.{int(task)}"
+
+    # Find and update the task line - support both formats:
+    # Main tracker: | 2.6 | Task Name | [Doc] | [ ] Pending | Date |
+    # Phase tracker: | 5.1 | Task Name | [Doc] | [ ] Pending | Depends | Time |
+    pattern = rf"(\|\s*{re.escape(display_id)}\s*\|[^|]+\|[^|]+\|)\s*\[\s*\]\s*Pending\s*\|"
+
+    if status == "completed":
+        if int(phase) in (5, 6):
+            # Phase 5 and 6 trackers use "Complete" not "Implemented"
+            replacement = rf"\1 [x] Complete |"
+        else:
+            replacement = rf"\1 [x] Implemented | {today} |"
+    else:
+        replacement = rf"\1 [ ] {status.title()} |"
+
+    return re.subn(pattern, replacement, content)
+
+
+class _PendingUpdate:
+    """A queued status change and the flush result it waits for."""
+
+    def __init__(self, task_id: str, status: str):
+        self.task_id = task_id
+        self.status = status
+        self.done = threading.Event()
+        self.updated = False
+        # Set once its tracker was written (or has no tracker file)
+        self.written = False
+
+
+class TrackerWriter:
+    """Queue tracker status changes and apply them in locked, atomic batches.
+
+    Args:
+        coalesce_seconds: How long a flush waits for further updates
+    """
+
+    def __init__(self, coalesce_seconds: float = DEFAULT_COALESCE_SECONDS):
+        self.coalesce_seconds = coalesce_seconds
+        self._pending: List[_PendingUpdate] = []
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def submit(self, task_id: str, status: str = "completed") -> _PendingUpdate:
+        """Queue a status change; a background flush applies it shortly."""
+        update = _PendingUpdate(task_id, status)
+        with self._lock:
+            self._pending.append(update)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+        return update
+
+    def update(self, task_id: str, status: str = "completed") -> bool:
+        """Queue a status change and wait until it is written.
+
+        Returns True if the task row was found and updated.
+        """
+        update = self.submit(task_id, status)
+        if not update.done.wait(FLUSH_TIMEOUT_SECONDS) or not update.written:
+            # The background flush failed or is stuck: write this change directly
+            self._write_tracker(get_tracker_path_for_task(task_id), [update])
+        return update.updated
+
+    def _flush_loop(self) -> None:
+        try:
+            while True:
+                time.sleep(self.coalesce_seconds)
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Warning: Tracker flush failed: {e}", file=sys.stderr)
+                with self._lock:
+                    # Exit only when nothing arrived during the flush
+                    if not self._pending:
+                        return
+        finally:
+            with self._lock:
+                self._flusher = None
+                # Whatever is still queued is released; update() writes it directly
+                orphans, self._pending = self._pending, []
+            for update in orphans:
+                update.done.set()
+
+    def flush(self) -> None:
+        """Apply all queued changes, one locked read/write per tracker file."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            by_tracker: Dict[str, List[_PendingUpdate]] = {}
+            for update in batch:
+                by_tracker.setdefault(get_tracker_path_for_task(update.task_id), []).append(update)
+            for tracker_path, updates in by_tracker.items():
+                self._write_tracker(tracker_path, updates)
+                for update in updates:
+                    update.written = True
+        finally:
+            for update in batch:
+                update.done.set()
+
+    def _write_tracker(self, tracker_path: str, updates: List[_PendingUpdate]) -> None:
+        if not os.path.exists(tracker_path):
+            return
+
+        started = time.monotonic()
+        today = datetime.now().strftime("%Y-%m-%d")
+        lock_path = os.path.join(
+            get_project_root(), "agents", "locks", f"{os.path.basename(tracker_path)}.lock"
+        )
+        with span("tracker.write", tracker=os.path.basename(tracker_path), updates=len(updates)), \
+                file_lock(lock_path):
+            # newline="" keeps the file's line endings untouched
+            with open(tracker_path, "r", encoding="utf-8", newline="") as f:
+                content = f.read()
+
+            changed = 0
+            for update in updates:
+                content, count = apply_status_update(content, update.task_id, update.status, today)
+                update.updated = count > 0
+                changed += count
+
+            if changed:
+                atomic_write(tracker_path, content)
+
+        get_metrics().observe("adws_tracker_write_duration_seconds", time.monotonic() - started)
+
+
+_writer: Optional[TrackerWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_tracker_writer() -> TrackerWriter:
+    """Return the process-wide tracker writer."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TrackerWriter()
+        return _writer
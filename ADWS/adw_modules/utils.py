@@ -5,23 +5,84 @@ import logging
 import os
 import re
 import sys
+import time
 import uuid
-from typing import Any, TypeVar, Type, Union, Dict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, TypeVar, Type, Union, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 T = TypeVar('T')
 
+SINCE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
 
 def make_adw_id() -> str:
     """Generate a short 8-character UUID for ADW tracking."""
     return str(uuid.uuid4())[:8]
 
 
+def parse_since(value: str) -> float:
+    """'30m', '12h', '7d', '2w' or an ISO date -> epoch seconds."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([mhdw])", value.strip())
+    if match:
+        return time.time() - float(match.group(1)) * SINCE_UNITS[match.group(2)]
+    return datetime.fromisoformat(value).timestamp()
+
+
 def get_project_root() -> str:
-    """Get the project root directory (SecureDealAI)."""
+    """Get the project root directory (SecureDealAI).
+
+    ADWS_PROJECT_ROOT overrides it (benchmarks run against a sandbox copy).
+    """
+    override = os.getenv("ADWS_PROJECT_ROOT")
+    if override:
+        return override
     # __file__ is in ADWS/adw_modules/, so go up 2 levels
     return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+@contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """Hold an exclusive advisory lock on lock_path for the duration of the block.
+
+    Works across processes on the same host (and on shared filesystems that
+    honour flock). Degrades to a no-op where fcntl is unavailable.
+    """
+    lock_dir = os.path.dirname(lock_path)
+    if lock_dir:
+        os.makedirs(lock_dir, exist_ok=True)
+    with open(lock_path, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path: str, content: str, encoding: str = "utf-8") -> None:
+    """Write a file atomically (temp file + fsync + rename).
+
+    Readers see either the old or the new content, never a partial write.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # newline="" writes content verbatim (no line-ending translation)
+    with open(tmp_path, "w", encoding=encoding, newline="") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
 def setup_logger(adw_id: str, trigger_type: str = "run_task") -> logging.Logger:
     """Set up logger that writes to both console and file using adw_id.
 
@@ -38,6 +99,10 @@ def setup_logger(adw_id: str, trigger_type: str = "run_task") -> logging.Logger:
 
     log_file = os.path.join(log_dir, "execution.log")
 
+    # Spans go to spans.jsonl next to the log
+    from .tracing import configure_tracing
+    configure_tracing(log_dir)
+
     logger = logging.getLogger(f"adw_{adw_id}")
     logger.setLevel(logging.DEBUG)
 
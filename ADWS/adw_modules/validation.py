@@ -0,0 +1,62 @@
+"""Run a plan's validation commands after /implement.
+
+The commands come from the plan's "Validation Criteria", "Test Cases" or
+"Completion Checklist" code blocks (task_parser.parse_plan_metadata). They
+run one at a time from the project root and stop at the first failure:
+a failed validation is what makes routing.py escalate to a stronger model.
+"""
+
+import os
+from typing import List, Optional
+
+from .data_types import ResourceLimits, ValidationResult
+from .resources import run_accounted
+from .tracing import span, trace_env
+from .utils import get_project_root
+
+# Wall-clock limit per command (override with ADWS_VALIDATION_TIMEOUT)
+DEFAULT_TIMEOUT_SECONDS = 600.0
+
+# Output kept per command in the state (the tail, where errors usually are)
+OUTPUT_CHARS = 2000
+
+
+def get_validation_timeout() -> float:
+    """Seconds a single validation command may run."""
+    return float(os.getenv("ADWS_VALIDATION_TIMEOUT", DEFAULT_TIMEOUT_SECONDS))
+
+
+def _tail(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    return text[-OUTPUT_CHARS:]
+
+
+def run_validation(commands: List[str], cwd: Optional[str] = None) -> List[ValidationResult]:
+    """Run validation commands in order, stopping at the first failure."""
+    results: List[ValidationResult] = []
+    limits = ResourceLimits(max_wall_seconds=get_validation_timeout())
+    for command in commands:
+        with span("validate", command=command) as attrs:
+            try:
+                result, usage = run_accounted(
+                    ["bash", "-c", command], "validate", limits=limits, capture_output=True,
+                    text=True, cwd=cwd or get_project_root(), env=trace_env(),
+                )
+            except OSError as e:
+                attrs["passed"] = False
+                results.append(ValidationResult(command=command, passed=False, error=str(e)))
+                break
+            passed = result.returncode == 0 and not usage.limit_exceeded
+            attrs["passed"] = passed
+            attrs["returncode"] = result.returncode
+
+        error = _tail(result.stderr)
+        if usage.limit_exceeded:
+            error = f"Stopped after {usage.wall_seconds:.0f}s ({usage.limit_exceeded} limit)"
+        results.append(ValidationResult(
+            command=command, passed=passed, output=_tail(result.stdout), error=error,
+        ))
+        if not passed:
+            break
+    return results
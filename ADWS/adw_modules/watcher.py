@@ -0,0 +1,296 @@
+"""Issue watcher for comment-driven ADWS runs.
+
+Polls a set of issues (and/or labels) with conditional requests and a
+per-issue "last seen comment" cursor, and dispatches run_issue jobs into a
+bounded queue. Unchanged issues cost a 304 response, so API usage scales
+with new activity rather than with the total number of comments.
+"""
+
+import json
+import os
+import queue
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable, Tuple
+from urllib.parse import quote
+
+from .data_types import GitHubComment, GitHubIssue, GitHubUser, WatchJob
+from .github import (
+    ADWS_TRIGGER_KEYWORD,
+    gh_api,
+    comment_from_api,
+    find_keyword_in_comments,
+    parse_plan_from_comment,
+)
+from .utils import get_project_root, atomic_write
+from .tracing import trace_env
+from .resources import run_accounted
+
+# Default trigger keyword, e.g. "/adw docs/implementation/05_01_VERIFY_ACCESS_CODE.md"
+DEFAULT_TRIGGER_KEYWORD = ADWS_TRIGGER_KEYWORD
+
+# REST API page size for comment listing
+PAGE_SIZE = 100
+
+
+class WatcherCursors:
+    """Persistent per-issue cursors and ETags in agents/watcher/cursors.json."""
+
+    FILENAME = "cursors.json"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_project_root(), "agents", "watcher", self.FILENAME)
+        self.data: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self.data = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                self.data = {}
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """Return the cursor entry for a key, creating it if missing."""
+        return self.data.setdefault(key, {})
+
+    def save(self) -> None:
+        """Persist cursors atomically so a crash never truncates them."""
+        atomic_write(self.path, json.dumps(self.data, indent=2))
+
+
+class IssueWatcher:
+    """Poll GitHub issues for trigger comments and dispatch run_issue jobs.
+
+    Args:
+        repo_path: Repository path (owner/repo)
+        issues: Issue numbers to watch explicitly
+        labels: Labels whose open issues are watched
+        keyword: Trigger keyword to look for in comments
+        queue_size: Maximum number of pending jobs
+        api: REST call function (defaults to github.gh_api, swappable for fakes)
+        cursors: Cursor store (defaults to agents/watcher/cursors.json)
+        backfill: Trigger on comments that existed before the watcher first saw an issue
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        issues: Optional[List[int]] = None,
+        labels: Optional[List[str]] = None,
+        keyword: str = DEFAULT_TRIGGER_KEYWORD,
+        queue_size: int = 10,
+        api: Callable = gh_api,
+        cursors: Optional[WatcherCursors] = None,
+        backfill: bool = False,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.repo_path = repo_path
+        self.issues = list(issues or [])
+        self.labels = list(labels or [])
+        self.keyword = keyword
+        self.api = api
+        self.cursors = cursors or WatcherCursors()
+        self.backfill = backfill
+        self.logger = logger or logging.getLogger(__name__)
+        self.jobs: "queue.Queue[WatchJob]" = queue.Queue(maxsize=queue_size)
+        self.api_calls = 0
+        self.not_modified = 0
+        self._active: set = set()
+        self._active_lock = threading.Lock()
+
+    def _call(self, path: str, etag: Optional[str] = None):
+        self.api_calls += 1
+        response = self.api(path, etag=etag)
+        if response is not None and response.not_modified:
+            self.not_modified += 1
+        return response
+
+    def _issue_key(self, issue_number: int) -> str:
+        return f"{self.repo_path}#{issue_number}"
+
+    def _labelled_issues(self) -> Dict[int, str]:
+        """Return {issue_number: updated_at} for open issues carrying watched labels.
+
+        Issues whose updated_at did not move since the last poll are skipped
+        later, so a quiet label costs one 304 per poll.
+        """
+        found: Dict[int, str] = {}
+        for label in self.labels:
+            cursor = self.cursors.get(f"{self.repo_path}:label:{label}")
+            path = f"repos/{self.repo_path}/issues?labels={quote(label)}&state=open&per_page={PAGE_SIZE}"
+            response = self._call(path, cursor.get("etag"))
+            if response is None:
+                continue
+            if response.not_modified:
+                found.update({int(k): v for k, v in cursor.get("issues", {}).items()})
+                continue
+            if response.status != 200 or not isinstance(response.body, list):
+                self.logger.warning(f"Label poll failed for '{label}': HTTP {response.status}")
+                continue
+            issues = {
+                str(item["number"]): item.get("updated_at", "")
+                for item in response.body
+                if "pull_request" not in item
+            }
+            cursor["etag"] = response.etag
+            cursor["issues"] = issues
+            found.update({int(k): v for k, v in issues.items()})
+        return found
+
+    def _new_comments(
+        self, issue_number: int, cursor: Dict[str, Any]
+    ) -> Tuple[Optional[List[GitHubComment]], Optional[str]]:
+        """Fetch comments newer than the cursor and the first page's ETag.
+
+        Comments are None when nothing changed. The ETag is not stored here:
+        the caller keeps it only once the cursor moves past these comments,
+        otherwise the next poll's 304 would hide them for good.
+        """
+        since = cursor.get("last_comment_at")
+        base = f"repos/{self.repo_path}/issues/{issue_number}/comments?per_page={PAGE_SIZE}"
+        if since:
+            base += f"&since={since}"
+
+        comments: List[GitHubComment] = []
+        etag = None
+        page = 1
+        while True:
+            path = f"{base}&page={page}"
+            # Only the first page is conditional; later pages exist only when it changed
+            response = self._call(path, cursor.get("etag") if page == 1 else None)
+            if response is None:
+                cursor["deferred"] = True
+                return None, None
+            if response.not_modified:
+                return None, None
+            if response.status != 200 or not isinstance(response.body, list):
+                self.logger.warning(f"Comment poll failed for #{issue_number}: HTTP {response.status}")
+                cursor["deferred"] = True
+                return None, None
+            if page == 1:
+                etag = response.etag
+            comments.extend(comment_from_api(item) for item in response.body)
+            if len(response.body) < PAGE_SIZE:
+                break
+            page += 1
+
+        last_id = cursor.get("last_comment_id")
+        if last_id is not None:
+            comments = [c for c in comments if int(c.id) > int(last_id)]
+        return comments, etag
+
+    def poll_issue(self, issue_number: int) -> Optional[WatchJob]:
+        """Poll one issue and enqueue a job if a new trigger comment arrived."""
+        key = self._issue_key(issue_number)
+        cursor = self.cursors.get(key)
+        first_sight = "last_comment_id" not in cursor
+
+        comments, etag = self._new_comments(issue_number, cursor)
+        if comments is not None and not comments:
+            # Nothing new past the cursor, so the ETag can stand for it
+            cursor["etag"] = etag
+            if first_sight:
+                # Issue has no comments yet: everything from now on is new
+                cursor["last_comment_id"] = "0"
+        if not comments:
+            return None
+
+        newest = max(comments, key=lambda c: int(c.id))
+        advance = {
+            "last_comment_id": newest.id,
+            "last_comment_at": newest.created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "etag": etag,
+        }
+
+        if first_sight and not self.backfill:
+            # Start from "now" so historical trigger comments don't fire
+            cursor.update(advance)
+            return None
+
+        issue = GitHubIssue(
+            number=issue_number,
+            title="",
+            state="open",
+            author=GitHubUser(login="unknown"),
+            comments=comments,
+            createdAt=datetime.now(),
+            updatedAt=datetime.now(),
+            url=f"https://github.com/{self.repo_path}/issues/{issue_number}",
+        )
+        trigger = find_keyword_in_comments(self.keyword, issue)
+        if trigger is None:
+            cursor.update(advance)
+            return None
+
+        plan_file = parse_plan_from_comment(self.keyword, trigger.body)
+        if not plan_file:
+            self.logger.warning(
+                f"Issue #{issue_number}: '{self.keyword}' comment without a plan path, ignoring"
+            )
+            cursor.update(advance)
+            return None
+
+        job = WatchJob(
+            issue_url=issue.url,
+            issue_number=issue_number,
+            repo_path=self.repo_path,
+            plan_file=plan_file,
+            comment_id=trigger.id,
+            requested_by=trigger.author.login,
+        )
+
+        with self._active_lock:
+            if key in self._active:
+                self.logger.info(f"Issue #{issue_number} already queued or running, skipping trigger")
+                cursor.update(advance)
+                return None
+            try:
+                self.jobs.put_nowait(job)
+            except queue.Full:
+                # Leave the cursor (and its ETag) where it is so the trigger is picked up next poll
+                self.logger.warning(f"Job queue full, deferring issue #{issue_number}")
+                cursor["deferred"] = True
+                return None
+            self._active.add(key)
+
+        cursor.update(advance)
+        self.logger.info(f"Queued issue #{issue_number} with plan {plan_file}")
+        return job
+
+    def poll_once(self) -> List[WatchJob]:
+        """Run one polling pass over all watched issues and labels."""
+        dispatched: List[WatchJob] = []
+        targets: Dict[int, Optional[str]] = {n: None for n in self.issues}
+        targets.update(self._labelled_issues())
+
+        for issue_number, updated_at in sorted(targets.items()):
+            cursor = self.cursors.get(self._issue_key(issue_number))
+            if updated_at and cursor.get("issue_updated_at") == updated_at:
+                continue
+            job = self.poll_issue(issue_number)
+            if job:
+                dispatched.append(job)
+            # Deferred/failed polls must be retried even if the issue stays quiet
+            if not cursor.pop("deferred", False) and updated_at:
+                cursor["issue_updated_at"] = updated_at
+
+        self.cursors.save()
+        return dispatched
+
+    def job_done(self, job: WatchJob) -> None:
+        """Mark a job finished so its issue can be triggered again."""
+        with self._active_lock:
+            self._active.discard(self._issue_key(job.issue_number))
+
+
+def run_issue_job(job: WatchJob, dry_run: bool = False) -> bool:
+    """Run a watcher job via run_issue.py. Returns True if successful."""
+    script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    run_issue_script = os.path.join(script_dir, "run_issue.py")
+
+    cmd = ["uv", "run", run_issue_script, job.issue_url, job.plan_file]
+    if dry_run:
+        cmd.append("--dry-run")
+
+    result, _ = run_accounted(cmd, "run_issue", cwd=get_project_root(), env=trace_env())
+    return result.returncode == 0
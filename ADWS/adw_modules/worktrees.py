@@ -0,0 +1,196 @@
+"""Isolated git worktrees for agent runs that must not touch the main tree.
+
+Each worktree is a detached checkout of a commit under ADWS_WORKTREE_DIR
+(default: <tmp>/adws-worktrees), sharing the object database with the
+project repository, so creating one costs a checkout rather than a clone.
+
+Work that has not been committed yet (earlier tasks of a phase) reaches a
+worktree through snapshot_commit(); changes come back as binary patches
+(changes_since() / apply_patch()).
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+from .utils import get_project_root
+
+# Author of the commits ADWS makes in snapshots and its own worktrees
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "ADWS",
+    "GIT_AUTHOR_EMAIL": "adws@localhost",
+    "GIT_COMMITTER_NAME": "ADWS",
+    "GIT_COMMITTER_EMAIL": "adws@localhost",
+}
+
+# Run directories are never part of a snapshot
+SNAPSHOT_PATHSPEC = ["--", ".", ":(exclude)agents"]
+
+
+def get_worktree_root() -> str:
+    """Directory new worktrees are created in (override with ADWS_WORKTREE_DIR)."""
+    return os.getenv("ADWS_WORKTREE_DIR", os.path.join(tempfile.gettempdir(), "adws-worktrees"))
+
+
+def _git(args: List[str], cwd: str, env: Optional[Dict[str, str]] = None,
+         input: Optional[str] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True,
+                          env={**os.environ, **env} if env else None, input=input)
+
+
+def resolve_ref(ref: str = "HEAD", repo: Optional[str] = None) -> str:
+    """Commit hash of ref, so every worktree of a run starts from the same commit."""
+    result = _git(["rev-parse", "--verify", f"{ref}^{{commit}}"], repo or get_project_root())
+    if result.returncode != 0:
+        raise RuntimeError(f"Unknown git ref {ref}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def tree_id(commit: str, repo: Optional[str] = None) -> str:
+    """Tree hash of a commit: equal trees mean equal content, whatever the history."""
+    result = _git(["rev-parse", "--verify", f"{commit}^{{tree}}"], repo or get_project_root())
+    if result.returncode != 0:
+        raise RuntimeError(f"Unknown commit {commit}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def snapshot_commit(repo: Optional[str] = None) -> str:
+    """Commit the working tree as it is (untracked files included) without touching it.
+
+    Uses a throwaway index, so neither the working tree, the real index nor
+    any branch changes; the commit is only reachable by its hash.
+    """
+    repo = repo or get_project_root()
+    head = resolve_ref("HEAD", repo)
+    fd, index = tempfile.mkstemp(prefix="adws-index-")
+    os.close(fd)
+    env = {**GIT_IDENTITY, "GIT_INDEX_FILE": index}
+    try:
+        for args in (["read-tree", head], ["add", "-A", *SNAPSHOT_PATHSPEC]):
+            result = _git(args, repo, env)
+            if result.returncode != 0:
+                raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+        tree = _git(["write-tree"], repo, env).stdout.strip()
+        result = _git(["commit-tree", tree, "-p", head, "-m", "ADWS working tree snapshot"], repo, env)
+        if result.returncode != 0:
+            raise RuntimeError(f"git commit-tree failed: {result.stderr.strip()}")
+        return result.stdout.strip()
+    finally:
+        os.unlink(index)
+
+
+def branch_name(ref: str = "HEAD", repo: Optional[str] = None) -> str:
+    """Short branch name of ref (HEAD when it is detached)."""
+    result = _git(["rev-parse", "--abbrev-ref", ref], repo or get_project_root())
+    return result.stdout.strip() or ref
+
+
+def create_worktree(name: str, ref: str = "HEAD", repo: Optional[str] = None,
+                    branch: Optional[str] = None) -> str:
+    """Check out ref into a new worktree (detached, or on a new branch); returns its path."""
+    repo = repo or get_project_root()
+    path = os.path.join(get_worktree_root(), name)
+    os.makedirs(get_worktree_root(), exist_ok=True)
+    if os.path.exists(path):
+        remove_worktree(path, repo)
+    checkout = ["-B", branch] if branch else ["--detach"]
+    result = _git(["worktree", "add", *checkout, "--quiet", path, ref], repo)
+    if result.returncode != 0:
+        raise RuntimeError(f"git worktree add failed: {result.stderr.strip()}")
+    return path
+
+
+def remove_worktree(path: str, repo: Optional[str] = None) -> None:
+    """Delete a worktree and its administrative entry (never fails)."""
+    repo = repo or get_project_root()
+    _git(["worktree", "remove", "--force", path], repo)
+    if os.path.exists(path):
+        shutil.rmtree(path, ignore_errors=True)
+    _git(["worktree", "prune"], repo)
+
+
+def commit_all(path: str, message: str) -> str:
+    """Commit everything in a worktree (untracked files included); returns HEAD."""
+    _git(["add", "-A"], path)
+    result = _git(["commit", "--quiet", "--allow-empty", "-m", message], path, GIT_IDENTITY)
+    if result.returncode != 0:
+        raise RuntimeError(f"git commit failed in {path}: {result.stderr.strip()}")
+    return resolve_ref("HEAD", path)
+
+
+def merge_refs(path: str, refs: List[str]) -> Optional[str]:
+    """Merge refs into a worktree's branch; returns git's complaint (merge undone), or None."""
+    result = _git(["merge", "--no-edit", "--quiet", *refs], path, GIT_IDENTITY)
+    if result.returncode == 0:
+        return None
+    _git(["merge", "--abort"], path)
+    return (result.stderr or result.stdout).strip() or "git merge failed"
+
+
+def changes_since(path: str, base: str) -> str:
+    """Binary patch of everything changed in a worktree since base, new files included."""
+    _git(["add", "-A"], path)
+    return _git(["diff", "--cached", "--binary", base], path).stdout
+
+
+def changed_paths(path: str, base: str) -> List[str]:
+    """Files changed in a worktree since base, new files included."""
+    _git(["add", "-A"], path)
+    return _git(["diff", "--cached", "--name-only", base], path).stdout.splitlines()
+
+
+def restore_paths(path: str, commit: str, paths: List[str]) -> None:
+    """Put paths in a tree back as they are in commit (deleting those it doesn't have).
+
+    Only the working tree changes, not the index.
+    """
+    if not paths:
+        return
+    known = set(_git(["ls-tree", "-r", "--name-only", commit, "--", *paths], path).stdout.splitlines())
+    if known:
+        result = _git(["restore", f"--source={commit}", "--worktree", "--", *sorted(known)], path)
+        if result.returncode != 0:
+            raise RuntimeError(f"git restore failed: {result.stderr.strip()}")
+    for name in paths:
+        if name not in known and os.path.lexists(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+
+
+def apply_patch(path: str, patch: str, three_way: bool = False) -> Optional[str]:
+    """Apply a patch to a tree; returns git's complaint, or None if it applied.
+
+    three_way falls back to a merge for hunks that don't apply as they are
+    (it updates the index too, so only use it in ADWS's own worktrees).
+    """
+    if not patch.strip():
+        return None
+    result = _git(["apply", "--whitespace=nowarn", *(["--3way"] if three_way else []), "-"],
+                  path, input=patch)
+    return None if result.returncode == 0 else (result.stderr.strip() or "git apply failed")
+
+
+def diff_stats(path: str, exclude: Iterable[str] = ()) -> Dict[str, int]:
+    """Files changed (untracked included), lines added and deleted in a worktree."""
+    exclude = set(exclude)
+    result = _git(["diff", "--numstat", "HEAD"], path)
+    files = added = deleted = 0
+    for line in result.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) < 3 or parts[2] in exclude:
+            continue
+        files += 1
+        added += int(parts[0]) if parts[0].isdigit() else 0
+        deleted += int(parts[1]) if parts[1].isdigit() else 0
+    untracked = _git(["ls-files", "--others", "--exclude-standard"], path).stdout.splitlines()
+    for name in untracked:
+        if name in exclude:
+            continue
+        files += 1
+        try:
+            with open(os.path.join(path, name), "rb") as f:
+                added += sum(1 for _ in f)
+        except OSError:
+            pass
+    return {"files_changed": files, "lines_added": added, "lines_deleted": deleted}
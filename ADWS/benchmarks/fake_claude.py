@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Claude Code CLI used by the ADWS benchmarks.
+
+Accepts the flags prompt_claude_code() passes (-p, --model,
+--output-format stream-json, --verbose, --dangerously-skip-permissions)
+and writes a realistic stream-json transcript to stdout: a system init
+event, alternating assistant tool_use / user tool_result events and a
+final result event with usage and cost.
+
+Usage:
+    fake_claude.py -p "/implement plan.md" --model sonnet \\
+        --events 200 --bytes 1000000 --latency 2.0
+    fake_claude.py --events 50 --fail          # is_error result
+    fake_claude.py --generate out.jsonl --bytes 100000000   # write a transcript file
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from typing import Iterator
+
+
+def generate_stream(
+    events: int = 50,
+    total_bytes: int = 200_000,
+    prompt: str = "/implement plan.md",
+    model: str = "sonnet",
+    fail: bool = False,
+) -> Iterator[str]:
+    """Yield stream-json lines (without newlines) of a synthetic session.
+
+    The tool results are padded so the whole transcript is about
+    total_bytes long.
+    """
+    session_id = str(uuid.uuid4())
+    events = max(events, 2)
+    turns = max((events - 2) // 2, 1)
+    # Each turn carries 1.25x padding (edit strings plus tool result) and ~600 bytes of envelope
+    padding = max(int((total_bytes // turns - 600) / 1.25), 16)
+    line_of_code = "    const value = computeSomething(input, options); // synthetic output\n"
+    filler = (line_of_code * (padding // len(line_of_code) + 1))[:padding]
+
+    yield json.dumps({
+        "type": "system", "subtype": "init", "session_id": session_id,
+        "model": model, "tools": ["Read", "Edit", "Write", "Bash", "Grep", "Glob"],
+        "cwd": "/workspace",
+    })
+    for turn in range(turns):
+        tool_id = f"toolu_{turn:06d}"
+        yield json.dumps({
+            "type": "assistant", "session_id": session_id,
+            "message": {
+                "id": f"msg_{turn:06d}", "role": "assistant", "model": model,
+                "content": [
+                    {"type": "text", "text": f"Working on step {turn + 1} of {prompt}."},
+                    {"type": "tool_use", "id": tool_id, "name": "Edit",
+                     "input": {"file_path": f"src/module_{turn % 40}.ts",
+                               "old_string": filler[: padding // 4],
+                               "new_string": filler[: padding // 4]}},
+                ],
+                "usage": {"input_tokens": 1200, "output_tokens": 180},
+            },
+        })
+        yield json.dumps({
+            "type": "user", "session_id": session_id,
+            "message": {"role": "user", "content": [
+                {"type": "tool_result", "tool_use_id": tool_id,
+                 "content": filler[: padding - padding // 4]},
+            ]},
+        })
+    yield json.dumps({
+        "type": "result",
+        "subtype": "error_during_execution" if fail else "success",
+        "is_error": fail,
+        "duration_ms": 0,
+        "num_turns": turns,
+        "result": "Benchmark run failed" if fail else "Implementation complete (benchmark stand-in)",
+        "session_id": session_id,
+        "total_cost_usd": round(0.0004 * turns, 6),
+        "usage": {
+            "input_tokens": 1200 * turns,
+            "output_tokens": 180 * turns,
+            "cache_read_input_tokens": 9000 * turns,
+            "cache_creation_input_tokens": 2000,
+        },
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Claude Code stand-in for ADWS benchmarks")
+    parser.add_argument("-p", dest="prompt", default="/implement plan.md")
+    parser.add_argument("--model", default="sonnet")
+    parser.add_argument("--output-format", default="stream-json")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--dangerously-skip-permissions", action="store_true")
+    parser.add_argument("--version", action="version", version="1.0.0 (Claude Code benchmark stand-in)")
+    parser.add_argument("--events", type=int, default=50, help="Events to emit")
+    parser.add_argument("--bytes", type=int, default=200_000, help="Approximate transcript size")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Total seconds to spread across the events")
+    parser.add_argument("--fail", action="store_true", help="Emit an error result")
+    parser.add_argument("--generate", metavar="PATH",
+                        help="Write the transcript to PATH instead of stdout, without latency")
+    args = parser.parse_args()
+
+    lines = generate_stream(args.events, args.bytes, args.prompt, args.model, args.fail)
+
+    if args.generate:
+        with open(args.generate, "w") as f:
+            for line in lines:
+                f.write(line + "\n")
+        return
+
+    delay = args.latency / max(args.events, 1)
+    out = sys.stdout
+    for line in lines:
+        if delay:
+            time.sleep(delay)
+        out.write(line + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
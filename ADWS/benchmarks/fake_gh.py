@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the GitHub CLI used by the ADWS benchmarks.
+
+Answers the gh invocations made by adw_modules/github.py with canned
+responses and never touches the network:
+
+    gh --version / gh auth status
+    gh issue view N --json ...       -> a synthetic open issue
+    gh issue list --json ...         -> []
+    gh issue comment / edit / close  -> success
+    gh api --include ...             -> HTTP 200 with rate-limit headers and []
+
+Usage:
+    fake_gh.py issue view 4 -R owner/repo --json number,title
+    fake_gh.py --latency 0.2 --log calls.log issue comment 4 --body "..."
+
+--latency and --log must come before the gh arguments (the benchmark
+wrapper scripts put them there).
+"""
+
+import json
+import sys
+import time
+
+
+def issue_payload(number: int, repo: str) -> dict:
+    """A synthetic issue in the shape of `gh issue view --json`."""
+    return {
+        "number": number,
+        "title": f"Benchmark issue {number}",
+        "body": "Synthetic issue used by run_benchmarks.py",
+        "state": "OPEN",
+        "author": {"login": "adws-bench", "name": "ADWS Benchmark"},
+        "assignees": [],
+        "labels": [{"id": "LA_bench", "name": "adws-ready", "color": "0e8a16", "description": None}],
+        "comments": [],
+        "createdAt": "2024-01-01T00:00:00Z",
+        "updatedAt": "2024-01-01T00:00:00Z",
+        "url": f"https://github.com/{repo}/issues/{number}",
+    }
+
+
+def respond(args: list) -> int:
+    """Write the canned response for one gh invocation; returns the exit code."""
+    if not args or args[0] == "--version":
+        print("gh version 2.40.0 (benchmark stand-in)")
+        return 0
+
+    command = args[0]
+    sub = args[1] if len(args) > 1 else ""
+    repo = args[args.index("-R") + 1] if "-R" in args else "owner/repo"
+
+    if command == "auth":
+        print("Logged in to github.com as adws-bench (benchmark stand-in)", file=sys.stderr)
+        return 0
+
+    if command == "issue":
+        if sub == "view":
+            print(json.dumps(issue_payload(int(args[2]), repo)))
+        elif sub == "list":
+            print("[]")
+        elif sub == "comment":
+            print(f"https://github.com/{repo}/issues/{args[2]}#issuecomment-1")
+        return 0
+
+    if command == "api":
+        reset = int(time.time()) + 3600
+        sys.stdout.write(
+            "HTTP/2.0 200 OK\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            'Etag: W/"benchmark"\r\n'
+            "X-Ratelimit-Limit: 5000\r\n"
+            "X-Ratelimit-Remaining: 4999\r\n"
+            f"X-Ratelimit-Reset: {reset}\r\n"
+            "\r\n"
+            "[]\n"
+        )
+        return 0
+
+    print(f"fake_gh: unsupported command: {' '.join(args)}", file=sys.stderr)
+    return 1
+
+
+def main():
+    args = sys.argv[1:]
+    latency = 0.0
+    log_path = None
+    while args and args[0] in ("--latency", "--log"):
+        if args[0] == "--latency":
+            latency = float(args[1])
+        else:
+            log_path = args[1]
+        args = args[2:]
+
+    if log_path:
+        with open(log_path, "a") as f:
+            f.write(json.dumps({"ts": time.time(), "args": args[:3]}) + "\n")
+    if latency:
+        time.sleep(latency)
+    sys.exit(respond(args))
+
+
+if __name__ == "__main__":
+    main()
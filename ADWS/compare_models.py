@@ -0,0 +1,364 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Compare models on our own plans: wall time, API time, tokens, cost and
+validation pass rate.
+
+Every run gets its own git worktree (a detached checkout of --ref under
+ADWS_WORKTREE_DIR), so runs can go in parallel and never touch the main
+tree. The numbers come from the stream-json result message of each
+transcript; the plan's validation commands then run inside the worktree.
+Runs are appended to agents/benchmarks/models.jsonl and, for plans, to
+the duration history that model routing learns from.
+
+Usage:
+    uv run compare_models.py 07_01                          # opus, sonnet, haiku on one task
+    uv run compare_models.py 07_01 07_03 --models sonnet,opus --repeat 3
+    uv run compare_models.py --prompt-file agents/a1b2c3d4/implementor/prompts/implement.txt
+    uv run compare_models.py --report                       # Table of every recorded run
+
+Examples:
+    # Install dependencies in each worktree before the agent starts
+    uv run compare_models.py 06_03 --setup "npm ci --prefix apps/web" --parallel 3
+
+    # Keep the worktrees to inspect what each model changed
+    uv run compare_models.py 07_04 --keep-worktrees
+"""
+
+import sys
+import os
+import argparse
+import json
+import re
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+from adw_modules.agent import parse_jsonl_output, prompt_claude_code
+from adw_modules.data_types import AgentPromptRequest
+from adw_modules.durations import format_duration, record_run
+from adw_modules.resources import run_accounted
+from adw_modules.routing import MODEL_LADDER
+from adw_modules.task_parser import find_plan_file, parse_plan_metadata
+from adw_modules.tracing import trace_env
+from adw_modules.utils import atomic_write, get_project_root, make_adw_id, parse_since
+from adw_modules.validation import run_validation
+from adw_modules.worktrees import (
+    create_worktree,
+    diff_stats,
+    get_worktree_root,
+    remove_worktree,
+    resolve_ref,
+)
+
+
+def get_results_path() -> str:
+    return os.path.join(get_project_root(), "agents", "benchmarks", "models.jsonl")
+
+
+def resolve_target(value: str) -> Dict[str, Any]:
+    """A task ID or plan path -> target with its prompt and validation commands."""
+    root = get_project_root()
+    plan_file = None
+    if re.fullmatch(r"\d{1,2}[._]\d{1,2}", value):
+        phase, task = re.split(r"[._]", value)
+        plan_file = find_plan_file(f"{phase.zfill(2)}_{task.zfill(2)}")
+    elif os.path.exists(os.path.join(root, value)) or os.path.exists(value):
+        plan_file = value
+    if not plan_file:
+        raise ValueError(f"Plan not found: {value}")
+
+    path = plan_file if os.path.isabs(plan_file) else os.path.join(root, plan_file)
+    relative = os.path.relpath(os.path.abspath(path), root)
+    if relative.startswith(".."):
+        raise ValueError(f"Plan must be inside the project: {plan_file}")
+    metadata = parse_plan_metadata(path)
+    return {
+        "name": metadata.get("task_id") or os.path.splitext(os.path.basename(relative))[0],
+        "task_id": metadata.get("task_id"),
+        "plan_file": relative,
+        "plan_path": os.path.abspath(path),
+        "metadata": metadata,
+        "prompt": f"/implement {relative}",
+        "validation_commands": metadata.get("validation_commands") or [],
+    }
+
+
+def prompt_target(prompt_file: str) -> Dict[str, Any]:
+    """Target for a recorded prompt, named after the run it came from."""
+    with open(prompt_file, "r", encoding="utf-8") as f:
+        prompt = f.read().strip()
+    match = re.search(r"([0-9a-f]{8})[/\\]", os.path.abspath(prompt_file))
+    return {
+        "name": match.group(1) if match else os.path.splitext(os.path.basename(prompt_file))[0],
+        "task_id": None,
+        "plan_file": None,
+        "metadata": {},
+        "prompt": prompt,
+        "validation_commands": [],
+    }
+
+
+def result_metrics(output_file: str) -> Dict[str, Any]:
+    """Numbers from the stream-json result message of a transcript."""
+    _, result = parse_jsonl_output(output_file)
+    if not result:
+        return {"result": False}
+    usage = result.get("usage") or {}
+    return {
+        "result": True,
+        "is_error": bool(result.get("is_error")) or result.get("subtype") == "error_during_execution",
+        "duration_ms": result.get("duration_ms"),
+        "duration_api_ms": result.get("duration_api_ms"),
+        "num_turns": result.get("num_turns"),
+        "cost_usd": result.get("total_cost_usd"),
+        "input_tokens": (usage.get("input_tokens") or 0) + (usage.get("cache_read_input_tokens") or 0)
+                        + (usage.get("cache_creation_input_tokens") or 0),
+        "output_tokens": usage.get("output_tokens") or 0,
+    }
+
+
+def run_one(job: Dict[str, Any], args, bench_id: str, commit: str) -> Dict[str, Any]:
+    """One target on one model in a fresh worktree."""
+    target, model, repeat = job["target"], job["model"], job["repeat"]
+    label = f"{target['name']}_{model}_{repeat}"
+    record: Dict[str, Any] = {
+        "bench_id": bench_id,
+        "timestamp": datetime.now().isoformat(),
+        "commit": commit,
+        "target": target["name"],
+        "plan_file": target.get("plan_file"),
+        "model": model,
+        "repeat": repeat,
+        "status": "failed",
+    }
+    worktree = None
+    try:
+        worktree = create_worktree(f"{bench_id}-{label}", commit)
+        copied = []
+        plan_copy = target.get("plan_file") and os.path.join(worktree, target["plan_file"])
+        if plan_copy and not os.path.exists(plan_copy):
+            # Uncommitted plan: give the worktree the same file
+            os.makedirs(os.path.dirname(plan_copy), exist_ok=True)
+            with open(target["plan_path"], "r", encoding="utf-8") as src:
+                atomic_write(plan_copy, src.read())
+            copied.append(target["plan_file"])
+        if args.setup:
+            setup, _ = run_accounted(["bash", "-c", args.setup], "setup", capture_output=True,
+                                     text=True, cwd=worktree, env=trace_env())
+            if setup.returncode != 0:
+                record["error"] = f"Setup failed: {(setup.stderr or setup.stdout)[-500:]}"
+                return record
+
+        output_file = os.path.join(get_project_root(), "agents", bench_id, label, "raw_output.jsonl")
+        started = time.monotonic()
+        response = prompt_claude_code(AgentPromptRequest(
+            prompt=target["prompt"],
+            adw_id=bench_id,
+            agent_name=label,
+            model=model,
+            dangerously_skip_permissions=True,
+            output_file=output_file,
+            cwd=worktree,
+        ))
+        record["wall_seconds"] = round(time.monotonic() - started, 2)
+        record.update(result_metrics(output_file))
+        record["success"] = response.success
+        if not response.success:
+            record["error"] = response.output[:500]
+
+        validation = []
+        if response.success and target["validation_commands"] and not args.no_validate:
+            validation = run_validation(target["validation_commands"], cwd=worktree)
+            record["validation_passed"] = all(r.passed for r in validation)
+        record.update(diff_stats(worktree, exclude=copied))
+
+        if not response.success:
+            record["status"] = "failed"
+        elif validation and not record["validation_passed"]:
+            record["status"] = "validation_failed"
+        else:
+            record["status"] = "completed"
+        if target.get("plan_file") and not args.no_history:
+            record_run(target["task_id"], target["plan_file"], target["metadata"], model,
+                       record["wall_seconds"], record["status"], bench_id)
+    except RuntimeError as e:
+        record["error"] = str(e)
+    finally:
+        if worktree and not args.keep_worktrees:
+            remove_worktree(worktree)
+        elif worktree:
+            record["worktree"] = worktree
+    return record
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def _median(records: List[Dict[str, Any]], field: str) -> Optional[float]:
+    values = [r[field] for r in records if r.get(field) is not None]
+    return statistics.median(values) if values else None
+
+
+def _fmt(value: Optional[float], kind: str) -> str:
+    if value is None:
+        return "-"
+    if kind == "seconds":
+        return format_duration(value)
+    if kind == "cost":
+        return f"${value:.2f}"
+    if kind == "tokens":
+        return f"{value / 1000:.0f}k" if value >= 1000 else f"{value:.0f}"
+    return f"{value:.0f}"
+
+
+def render_table(records: List[Dict[str, Any]]) -> str:
+    """Comparison table: one row per target and model."""
+    groups: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+    for record in records:
+        groups[(record["target"], record["model"])].append(record)
+
+    lines = [f"{'TARGET':<12} {'MODEL':<7} {'RUNS':>4} {'OK':>4} {'VALID':>6} {'WALL':>7} {'API':>7} "
+             f"{'TURNS':>5} {'IN':>6} {'OUT':>6} {'COST':>7} {'$/OK':>7} {'FILES':>5}"]
+    order = {model: index for index, model in enumerate(MODEL_LADDER)}
+    for (target, model) in sorted(groups, key=lambda k: (k[0], order.get(k[1], 99), k[1])):
+        runs = groups[(target, model)]
+        ok = [r for r in runs if r["status"] == "completed"]
+        validated = [r for r in runs if r.get("validation_passed") is not None]
+        valid = (f"{sum(1 for r in validated if r['validation_passed']) / len(validated):.0%}"
+                 if validated else "-")
+        api = _median(runs, "duration_api_ms")
+        total_cost = sum(r.get("cost_usd") or 0.0 for r in runs)
+        lines.append(
+            f"{target[:12]:<12} {model:<7} {len(runs):>4} {len(ok):>4} {valid:>6} "
+            f"{_fmt(_median(runs, 'wall_seconds'), 'seconds'):>7} "
+            f"{_fmt(api / 1000 if api is not None else None, 'seconds'):>7} "
+            f"{_fmt(_median(runs, 'num_turns'), 'count'):>5} "
+            f"{_fmt(_median(runs, 'input_tokens'), 'tokens'):>6} "
+            f"{_fmt(_median(runs, 'output_tokens'), 'tokens'):>6} "
+            f"{_fmt(_median(runs, 'cost_usd'), 'cost'):>7} "
+            f"{_fmt(total_cost / len(ok) if ok else None, 'cost'):>7} "
+            f"{_fmt(_median(runs, 'files_changed'), 'count'):>5}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Compare models on the same plans in isolated worktrees",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run compare_models.py 07_01                         Every model on one task
+  uv run compare_models.py 07_01 07_03 --repeat 3        Three runs each
+  uv run compare_models.py --prompt-file prompt.txt --models haiku,sonnet
+  uv run compare_models.py --report --since 30d          Table of recorded runs
+        """
+    )
+    parser.add_argument("targets", nargs="*", metavar="TASK_OR_PLAN",
+                        help="Task IDs (07_01) or plan paths")
+    parser.add_argument("--prompt-file", action="append", default=[],
+                        help="Run a recorded prompt (e.g. agents/<id>/implementor/prompts/implement.txt)")
+    parser.add_argument("--models", default=",".join(reversed(MODEL_LADDER)),
+                        help=f"Models to compare (default: {','.join(reversed(MODEL_LADDER))})")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per target and model (default: 1)")
+    parser.add_argument("--parallel", type=int, default=2,
+                        help="Runs at the same time, each in its own worktree (default: 2)")
+    parser.add_argument("--ref", default="HEAD", help="Commit the worktrees start from (default: HEAD)")
+    parser.add_argument("--setup", help="Shell command run in each worktree before the agent (e.g. npm ci)")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Don't run the plans' validation commands")
+    parser.add_argument("--keep-worktrees", action="store_true",
+                        help="Leave the worktrees in place for inspection")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Don't add the runs to the duration history used for routing")
+    parser.add_argument("--report", action="store_true", help="Only print the table of recorded runs")
+    parser.add_argument("--since", help="With --report: only runs newer than 7d / ISO date")
+    args = parser.parse_args()
+
+    results_path = get_results_path()
+    if args.report:
+        records = load_records(results_path)
+        if args.since:
+            cutoff = parse_since(args.since)
+            records = [r for r in records if datetime.fromisoformat(r["timestamp"]).timestamp() >= cutoff]
+        if args.targets:
+            records = [r for r in records if r["target"] in args.targets or r.get("plan_file") in args.targets]
+        if not records:
+            print(f"No recorded runs in {results_path}")
+            return
+        print(render_table(records))
+        return
+
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    unknown = [m for m in models if m not in MODEL_LADDER]
+    if unknown:
+        parser.error(f"Unknown model(s): {', '.join(unknown)} (choose from {', '.join(MODEL_LADDER)})")
+    if not args.targets and not args.prompt_file:
+        parser.error("Specify task IDs, plan paths or --prompt-file")
+
+    targets = []
+    try:
+        targets.extend(resolve_target(value) for value in args.targets)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    try:
+        targets.extend(prompt_target(path) for path in args.prompt_file)
+    except OSError as e:
+        print(f"Error: Could not read prompt: {e}")
+        sys.exit(1)
+
+    try:
+        commit = resolve_ref(args.ref)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    bench_id = make_adw_id()
+    jobs = [{"target": t, "model": m, "repeat": n}
+            for n in range(1, args.repeat + 1) for t in targets for m in models]
+    print(f"Comparing {', '.join(models)} on {len(targets)} target(s), {len(jobs)} run(s), "
+          f"{args.parallel} at a time (bench {bench_id}, commit {commit[:8]})")
+
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as pool:
+        records = list(pool.map(lambda job: run_one(job, args, bench_id, commit), jobs))
+
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+    print()
+    print(render_table(records))
+    for record in records:
+        if record.get("error"):
+            print(f"  {record['target']} on {record['model']} #{record['repeat']}: {record['error'][:160]}")
+    print(f"\nResults appended to {results_path}; transcripts in agents/{bench_id}/")
+    if args.keep_worktrees:
+        print(f"Worktrees kept in {get_worktree_root()} (remove with `git worktree remove`)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Compare /implement runs with and without a context pack.
+
+Every /implement run logs its time to first edit, the tool calls it made
+before that edit, its tokens and its cost (see adw_modules/context_pack.py).
+This report puts runs with a pack (--context-pack) next to runs without
+one, overall, per model and, with --by-plan, per plan.
+
+Usage:
+    uv run context_report.py                 # All runs
+    uv run context_report.py --since 7d      # Last week
+    uv run context_report.py --by-plan       # Also per plan
+
+Examples:
+    # Run a phase once without and once with packs, then compare
+    uv run run_phase.py 6
+    uv run run_phase.py 6 --context-pack
+    uv run context_report.py --since 1d --by-plan
+"""
+
+import sys
+import os
+import argparse
+import statistics
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adw_modules.context_pack import context_runs
+from adw_modules.durations import format_duration, get_history_path
+from adw_modules.routing import MODEL_LADDER
+from adw_modules.utils import parse_since
+
+
+def tokens(row) -> int:
+    return (row["input_tokens"] + row["output_tokens"]
+            + row["cache_read_tokens"] + row["cache_creation_tokens"])
+
+
+def _median(values: List[float]) -> Optional[float]:
+    return statistics.median(values) if values else None
+
+
+def summarize(rows: List) -> Dict[str, float]:
+    """Runs, success rate and medians of one group of runs."""
+    edits = [r["first_edit_seconds"] for r in rows if r["first_edit_seconds"] is not None]
+    return {
+        "runs": len(rows),
+        "success_rate": sum(r["success"] for r in rows) / len(rows),
+        "first_edit": _median(edits),
+        "tools_before": _median([r["tool_calls_before_edit"] for r in rows
+                                 if r["first_edit_seconds"] is not None]),
+        "tokens": _median([tokens(r) for r in rows]),
+        "cost": _median([r["cost_usd"] or 0.0 for r in rows]),
+        "duration": _median([r["duration"] for r in rows]),
+        "pack_bytes": _median([r["pack_bytes"] for r in rows]),
+    }
+
+
+def print_table(title: str, rows: List, key) -> None:
+    print(f"\n{title:<24} {'PACK':<4} {'RUNS':>5} {'OK':>5} {'1ST EDIT':>8} {'TOOLS':>6} "
+          f"{'TOKENS':>9} {'COST':>7} {'MEDIAN':>7} {'PACK KB':>8}")
+    groups: Dict[tuple, List] = defaultdict(list)
+    for row in rows:
+        groups[(key(row), "on" if row["context_pack"] else "off")].append(row)
+    order = {m: i for i, m in enumerate(MODEL_LADDER)}
+    for name, pack in sorted(groups, key=lambda g: (order.get(g[0], len(order)), g[0], g[1] == "on")):
+        s = summarize(groups[(name, pack)])
+        first_edit = format_duration(s["first_edit"]) if s["first_edit"] is not None else "-"
+        tools = f"{s['tools_before']:.0f}" if s["tools_before"] is not None else "-"
+        print(f"{name[:24]:<24} {pack:<4} {s['runs']:>5} {s['success_rate']:>5.0%} {first_edit:>8} "
+              f"{tools:>6} {s['tokens']:>9,.0f} ${s['cost']:>6.2f} {format_duration(s['duration']):>7} "
+              f"{s['pack_bytes'] / 1024:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare /implement runs with and without a context pack",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run context_report.py                  All logged runs
+  uv run context_report.py --since 7d       Last week only
+  uv run context_report.py --by-plan        Also compare plan by plan
+        """
+    )
+    parser.add_argument("--since", help="Only runs newer than 30m / 12h / 7d / 2w or an ISO date")
+    parser.add_argument("--by-plan", action="store_true", help="Also compare per plan")
+    args = parser.parse_args()
+
+    rows = context_runs(since=parse_since(args.since) if args.since else None)
+    if not rows:
+        print(f"No /implement runs logged in {get_history_path()}")
+        return
+
+    with_pack = [r for r in rows if r["context_pack"]]
+    print(f"/implement runs in {get_history_path()}")
+    print(f"  Runs:               {len(rows)} ({len(with_pack)} with a context pack)")
+    print("  1ST EDIT is the median time to the first Edit / Write, TOOLS the tool calls before it,")
+    print("  TOKENS input + output + cache tokens per run")
+
+    print_table("ALL", rows, lambda r: "all")
+    print_table("MODEL", rows, lambda r: r["model"])
+    if args.by_plan:
+        print_table("PLAN", rows, lambda r: os.path.basename(r["plan_file"] or "-"))
+
+
+if __name__ == "__main__":
+    main()
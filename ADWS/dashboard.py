@@ -0,0 +1,164 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Live terminal dashboard of every ADW run in progress on this host.
+
+One row per run (run_task.py, run_issue.py, run_phase.py children,
+run_worker.py tasks): the tool call in flight, plan step N of M, tokens,
+cost so far and elapsed time. Transcripts are tailed incrementally and
+only read when inotify reports a change, so the dashboard stays cheap with
+many concurrent agents.
+
+Usage:
+    uv run dashboard.py                 # Live view (Ctrl-C to quit)
+    uv run dashboard.py --once          # Print a snapshot and exit
+    uv run dashboard.py --refresh 10    # Redraw up to 10 times a second
+
+Examples:
+    # Watch a phase run from a second terminal
+    uv run run_phase.py 2 --continue &
+    uv run dashboard.py
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import time
+from datetime import datetime
+from typing import List, Optional
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adw_modules.live import LiveRun, RunTracker
+
+# Alternate screen, hidden cursor / restore
+ENTER_SCREEN = "\x1b[?1049h\x1b[?25l"
+LEAVE_SCREEN = "\x1b[?25h\x1b[?1049l"
+HOME_CLEAR = "\x1b[H\x1b[J"
+
+PHASE_MARKS = {
+    "tool": "*",
+    "thinking": "~",
+    "starting": ".",
+    "stalled": "!",
+    "completed": "+",
+    "failed": "x",
+}
+
+
+def format_tokens(count: int) -> str:
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M"
+    if count >= 1000:
+        return f"{count / 1000:.0f}k"
+    return str(count)
+
+
+def format_elapsed(seconds: float) -> str:
+    seconds = max(int(seconds), 0)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def format_cost(run: LiveRun) -> str:
+    cost = run.estimated_cost()
+    if cost is None:
+        return "-"
+    return f"${cost:.2f}" if run.cost is not None else f"~${cost:.2f}"
+
+
+def render(runs: List[LiveRun], mode: str, width: int, now: Optional[float] = None) -> str:
+    """The dashboard as text, at most width columns wide."""
+    now = now or time.time()
+    running = sum(1 for run in runs if run.status == "in_progress")
+    lines = [
+        f"ADWS live - {running} running, {len(runs) - running} just finished "
+        f"({mode})".ljust(max(width - 9, 0)) + datetime.fromtimestamp(now).strftime("%H:%M:%S"),
+        "",
+        f"  {'RUN':<9} {'TASK':<8} {'MODEL':<7} {'STEP':>5} {'ELAPSED':>8} "
+        f"{'IN/OUT':>11} {'COST':>8}  {'TOOLS':>5}  NOW",
+    ]
+    total_cost = 0.0
+    for run in runs:
+        phase = run.phase(now)
+        step = f"{run.step}/{run.total_steps}" if run.total_steps else (str(run.step) if run.step else "-")
+        end = run.finished_at if run.finished_at else now
+        tokens = f"{format_tokens(run.tokens['input'] + run.tokens['cache_read'] + run.tokens['cache_creation'])}/" \
+                 f"{format_tokens(run.tokens['output'])}"
+        if phase == "tool":
+            activity = run.tool
+        elif phase == "stalled":
+            activity = f"no output for {format_elapsed(now - run.last_activity)}"
+        else:
+            activity = phase
+        row = (f"{PHASE_MARKS.get(phase, ' ')} {run.adw_id:<9} {run.label[:8]:<8} {(run.model or '-')[:7]:<7} "
+               f"{step:>5} {format_elapsed(end - run.started):>8} {tokens:>11} {format_cost(run):>8}  "
+               f"{run.tool_calls:>5}  {activity}")
+        lines.append(row[:width])
+        total_cost += run.estimated_cost() or 0.0
+
+    if not runs:
+        lines.append("  No runs in progress.")
+    lines.append("")
+    lines.append(f"  Total cost so far: ${total_cost:.2f}    "
+                 "* tool call  ~ thinking  ! stalled  + completed  x failed")
+    return "\n".join(line[:width] for line in lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Live dashboard of ADW runs in progress",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run dashboard.py                Live view
+  uv run dashboard.py --once         Snapshot (e.g. for scripts or CI logs)
+  uv run dashboard.py --poll         Stat files instead of using inotify
+        """
+    )
+    parser.add_argument("--once", action="store_true", help="Print a snapshot and exit")
+    parser.add_argument("--refresh", type=float, default=4.0,
+                        help="Maximum redraws per second (default: 4)")
+    parser.add_argument("--poll", action="store_true",
+                        help="Poll file sizes instead of inotify (e.g. on network filesystems)")
+    args = parser.parse_args()
+
+    tracker = RunTracker(use_inotify=not args.poll)
+    tracker.scan()
+
+    if args.once or not sys.stdout.isatty():
+        print(render(tracker.visible(), tracker.mode, shutil.get_terminal_size().columns))
+        tracker.close()
+        return
+
+    interval = 1.0 / max(args.refresh, 0.1)
+    sys.stdout.write(ENTER_SCREEN)
+    try:
+        dirty = True
+        last_render = 0.0
+        while True:
+            dirty |= tracker.update(timeout=interval)
+            now = time.time()
+            # Redraw on changes (rate-limited) and once a second for the clocks
+            if (dirty and now - last_render >= interval) or int(now) != int(last_render):
+                width = shutil.get_terminal_size().columns
+                sys.stdout.write(HOME_CLEAR + render(tracker.visible(), tracker.mode, width, now) + "\n")
+                sys.stdout.flush()
+                dirty = False
+                last_render = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sys.stdout.write(LEAVE_SCREEN)
+        sys.stdout.flush()
+        tracker.close()
+
+
+if __name__ == "__main__":
+    main()
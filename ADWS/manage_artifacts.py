@@ -0,0 +1,184 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Compact and prune the run artifacts under agents/.
+
+New runs already store transcripts compressed and prompts deduplicated
+(adw_modules/artifacts.py). This script brings older runs in line, applies
+a retention policy and shows where the space goes.
+
+Usage:
+    uv run manage_artifacts.py stats                       # Disk use by kind
+    uv run manage_artifacts.py compact                     # Compress runs idle for 1h+
+    uv run manage_artifacts.py prune --keep-days 30        # Delete runs older than 30 days
+    uv run manage_artifacts.py view a1b2c3d4               # Pretty-printed transcript(s)
+
+Examples:
+    # Keep a month of runs, but never fewer than the last 50
+    uv run manage_artifacts.py prune --keep-days 30 --keep-runs 50
+
+    # What would compaction free?
+    uv run manage_artifacts.py compact --dry-run
+"""
+
+import sys
+import os
+import argparse
+import glob
+import json
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adw_modules.agent import convert_jsonl_to_json, parse_jsonl_output
+from adw_modules.search_index import SearchIndex, get_index_path
+from adw_modules.artifacts import (
+    COMPRESSED_SUFFIX,
+    compact,
+    disk_usage,
+    gc,
+    get_agents_dir,
+    get_objects_dir,
+    prune,
+    run_dirs,
+)
+
+
+def format_bytes(size: float) -> str:
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ("KB", "MB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GB"
+
+
+def cmd_stats(args) -> None:
+    agents_dir = get_agents_dir()
+    if not os.path.isdir(agents_dir):
+        print(f"No artifacts yet ({agents_dir} does not exist)")
+        return
+    runs = run_dirs()
+    print(f"Artifacts in {agents_dir}")
+    print(f"  Runs:       {len(runs):>6}  {format_bytes(sum(disk_usage(d) for d in runs)):>10} "
+          "(shared objects counted per run)")
+    objects_dir = get_objects_dir()
+    if os.path.isdir(objects_dir):
+        count = sum(len(files) for _, _, files in os.walk(objects_dir))
+        print(f"  Objects:    {count:>6}  {format_bytes(disk_usage(objects_dir)):>10}")
+    print(f"  Total:              {format_bytes(disk_usage(agents_dir)):>10} (each file counted once)")
+
+    plain = glob.glob(os.path.join(agents_dir, "*", "*", "raw_output*.jsonl"))
+    views = glob.glob(os.path.join(agents_dir, "*", "*", "raw_output*.json"))
+    if plain or views:
+        print(f"\n{len(plain)} uncompressed transcript(s), {len(views)} JSON view(s): "
+              "run `manage_artifacts.py compact` to reclaim their space")
+
+
+def cmd_compact(args) -> None:
+    totals = compact(older_than_hours=args.older_than, dry_run=args.dry_run)
+    verb = "Would compact" if args.dry_run else "Compacted"
+    print(f"{verb} {totals['runs']} run(s): {totals['compressed']} compressed, "
+          f"{totals['deduplicated']} deduplicated, {totals['deleted']} JSON view(s) deleted")
+    if not args.dry_run:
+        print(f"Freed {format_bytes(totals['bytes_freed'])}")
+    elif totals["deleted"]:
+        print(f"JSON views alone would free {format_bytes(totals['bytes_freed'])}")
+
+
+def cmd_prune(args) -> None:
+    if args.keep_days is None and args.keep_runs is None:
+        print("Error: Specify --keep-days and/or --keep-runs")
+        sys.exit(1)
+    deleted = prune(keep_days=args.keep_days, keep_runs=args.keep_runs, dry_run=args.dry_run)
+    verb = "Would delete" if args.dry_run else "Deleted"
+    for run_dir in deleted:
+        print(f"  {os.path.basename(run_dir)}")
+    print(f"{verb} {len(deleted)} run(s)")
+    if deleted and not args.dry_run and os.path.exists(get_index_path()):
+        index = SearchIndex()
+        index.forget_runs([os.path.basename(run_dir) for run_dir in deleted])
+        index.close()
+    cmd_gc(args)
+
+
+def cmd_gc(args) -> None:
+    stats = gc(dry_run=args.dry_run)
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {stats['removed']} of {stats['objects']} object(s) "
+          f"({format_bytes(stats['bytes_freed'])})")
+
+
+def cmd_view(args) -> None:
+    run_dir = os.path.join(get_agents_dir(), args.adw_id)
+    if not os.path.isdir(run_dir):
+        print(f"Error: Run not found: {run_dir}")
+        sys.exit(1)
+    pattern = os.path.join(run_dir, args.agent or "*", "raw_output.jsonl")
+    transcripts = sorted(set(
+        path[:-len(COMPRESSED_SUFFIX)] if path.endswith(COMPRESSED_SUFFIX) else path
+        for path in glob.glob(pattern) + glob.glob(pattern + COMPRESSED_SUFFIX)
+    ))
+    if not transcripts:
+        print(f"Error: No transcripts in {run_dir}")
+        sys.exit(1)
+    for transcript in transcripts:
+        if args.write:
+            convert_jsonl_to_json(transcript)
+        else:
+            messages, _ = parse_jsonl_output(transcript)
+            print(f"# {os.path.relpath(transcript, run_dir)}")
+            print(json.dumps(messages, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compact, prune and inspect ADW artifacts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run manage_artifacts.py stats                          Disk use
+  uv run manage_artifacts.py compact                        Compress runs idle for 1h+
+  uv run manage_artifacts.py prune --keep-days 30           Retention
+  uv run manage_artifacts.py view a1b2c3d4 --write          Write raw_output.json views
+        """
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Disk use of runs and shared objects")
+
+    p = sub.add_parser("compact", help="Compress transcripts and logs, dedupe prompts, drop JSON views")
+    p.add_argument("--older-than", type=float, default=1.0, metavar="HOURS",
+                   help="Only runs idle for this long (default: 1)")
+    p.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+
+    p = sub.add_parser("prune", help="Delete old runs, then unreferenced objects")
+    p.add_argument("--keep-days", type=float, help="Delete runs idle for more than N days")
+    p.add_argument("--keep-runs", type=int, help="Always keep the N most recent runs")
+    p.add_argument("--dry-run", action="store_true", help="Report without deleting")
+
+    p = sub.add_parser("gc", help="Delete objects no run refers to")
+    p.add_argument("--dry-run", action="store_true", help="Report without deleting")
+
+    p = sub.add_parser("view", help="Print a run's transcripts as JSON")
+    p.add_argument("adw_id", help="ADW ID of the run")
+    p.add_argument("--agent", help="Only this agent (default: all)")
+    p.add_argument("--write", action="store_true",
+                   help="Write raw_output.json next to each transcript instead of printing")
+
+    args = parser.parse_args()
+    {
+        "stats": cmd_stats,
+        "compact": cmd_compact,
+        "prune": cmd_prune,
+        "gc": cmd_gc,
+        "view": cmd_view,
+    }[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Render a timeline of a phase run: one row per task with waiting, queued,
+running, agent, validating and GitHub/IO segments, plus the realized
+critical path, worker idle time and the longest IO stalls.
+
+Usage:
+    uv run phase_report.py a1b2c3d4              # Text timeline of a run_phase.py run
+    uv run phase_report.py a1b2c3d4 --html       # Also write agents/a1b2c3d4/timeline.html
+    uv run phase_report.py --queue               # Timeline of the run_worker.py queue
+
+Examples:
+    # Find where a four-hour phase run spent its time
+    uv run phase_report.py a1b2c3d4 --width 120
+"""
+
+import sys
+import os
+import argparse
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adw_modules.utils import get_project_root
+from adw_modules.task_parser import get_dependency_map
+from adw_modules.task_queue import get_queue_path
+from adw_modules.timeline import (
+    load_phase_rows,
+    load_queue_rows,
+    build_timeline,
+    render_text,
+    render_html,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Timeline report of a phase run",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run phase_report.py a1b2c3d4           Text timeline of a run_phase.py run
+  uv run phase_report.py a1b2c3d4 --html    Also write an HTML timeline
+  uv run phase_report.py --queue            Timeline of the worker queue
+        """
+    )
+    parser.add_argument("phase_adw_id", nargs="?", help="ADW ID of a run_phase.py run")
+    parser.add_argument("--queue", nargs="?", const="", metavar="DB",
+                        help="Report the run_worker.py queue (default: agents/queue/tasks.db)")
+    parser.add_argument("--html", nargs="?", const="", metavar="PATH",
+                        help="Write an HTML timeline (default: agents/<id>/timeline.html)")
+    parser.add_argument("--width", type=int, default=80,
+                        help="Chart width in columns (default: 80)")
+    args = parser.parse_args()
+
+    if args.queue is not None:
+        db_path = args.queue or get_queue_path()
+        if not os.path.exists(db_path):
+            print(f"Error: Queue database not found: {db_path}")
+            sys.exit(1)
+        rows = load_queue_rows(db_path)
+        title = f"Queue timeline ({db_path})"
+        report_dir = os.path.dirname(db_path)
+    elif args.phase_adw_id:
+        try:
+            rows = load_phase_rows(args.phase_adw_id)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        title = f"Phase run {args.phase_adw_id}"
+        report_dir = os.path.join(get_project_root(), "agents", args.phase_adw_id)
+    else:
+        parser.error("Specify a phase ADW ID or --queue")
+
+    if not rows:
+        print("No tasks recorded.")
+        sys.exit(0)
+
+    timeline = build_timeline(rows, get_dependency_map())
+    print(title)
+    print(render_text(timeline, width=args.width))
+
+    if args.html is not None:
+        html_path = args.html or os.path.join(report_dir, "timeline.html")
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(render_html(timeline, title))
+        print(f"\nHTML timeline: {html_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Evaluate the model routing policy from its decision log.
+
+Every /implement attempt made by run_task.py and run_issue.py is logged
+with the model picked, the reason (complexity, history, explore,
+escalation, pinned, static) and how it ended. This report shows success
+rates and cost per model and per reason, how often runs had to escalate,
+and what a finished run costs.
+
+Usage:
+    uv run routing_report.py                 # All decisions
+    uv run routing_report.py --since 7d      # Last week
+    uv run routing_report.py --recent 20     # Also list the last 20 decisions
+
+Examples:
+    # Is haiku worth routing to? Compare its success rate and cost
+    uv run routing_report.py --since 30d
+"""
+
+import sys
+import os
+import argparse
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adw_modules.durations import format_duration, get_history_path
+from adw_modules.routing import MODEL_LADDER, ModelRouter
+from adw_modules.utils import parse_since
+
+
+def summarize(rows: List, key: str) -> Dict[str, Dict[str, float]]:
+    """Attempts, outcomes, median duration and cost grouped by one column."""
+    groups: Dict[str, List] = defaultdict(list)
+    for row in rows:
+        groups[row[key]].append(row)
+    summary = {}
+    for name, group in groups.items():
+        finished = [r for r in group if r["outcome"]]
+        completed = sum(1 for r in finished if r["outcome"] == "completed")
+        summary[name] = {
+            "attempts": len(group),
+            "completed": completed,
+            "failed": sum(1 for r in finished if r["outcome"] == "failed"),
+            "validation_failed": sum(1 for r in finished if r["outcome"] == "validation_failed"),
+            "success_rate": completed / len(finished) if finished else 0.0,
+            "median_duration": statistics.median(r["duration"] for r in finished) if finished else 0.0,
+            "cost": sum(r["cost_usd"] or 0.0 for r in group),
+        }
+    return summary
+
+
+def print_table(title: str, summary: Dict[str, Dict[str, float]], order: List[str]) -> None:
+    print(f"\n{title:<12} {'ATTEMPTS':>8} {'OK':>5} {'FAIL':>5} {'VALID':>5} {'SUCCESS':>8} "
+          f"{'MEDIAN':>7} {'COST':>9}")
+    names = [n for n in order if n in summary] + sorted(n for n in summary if n not in order)
+    for name in names:
+        s = summary[name]
+        print(f"{name:<12} {s['attempts']:>8} {s['completed']:>5} {s['failed']:>5} "
+              f"{s['validation_failed']:>5} {s['success_rate']:>7.0%} "
+              f"{format_duration(s['median_duration']):>7} ${s['cost']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evaluate model routing decisions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run routing_report.py                  Whole decision log
+  uv run routing_report.py --since 7d       Last week only
+  uv run routing_report.py --recent 20      Also list recent decisions
+        """
+    )
+    parser.add_argument("--since", help="Only decisions newer than 30m / 12h / 7d / 2w or an ISO date")
+    parser.add_argument("--recent", type=int, default=0, metavar="N",
+                        help="List the last N decisions")
+    args = parser.parse_args()
+
+    if not os.path.exists(get_history_path()):
+        print(f"No routing decisions yet ({get_history_path()} does not exist)")
+        return
+
+    router = ModelRouter()
+    try:
+        rows = router.decisions(since=parse_since(args.since) if args.since else None)
+    finally:
+        router.close()
+    if not rows:
+        print("No routing decisions logged.")
+        return
+
+    # A run is a first attempt plus the escalations that followed it
+    runs: Dict[str, List] = {}
+    open_runs: Dict[str, str] = {}
+    for row in rows:
+        key = f"{row['adw_id']}:{row['task_key']}"
+        if row["attempt"] == 1 or key not in open_runs:
+            open_runs[key] = f"#{row['id']}"
+            runs[open_runs[key]] = []
+        runs[open_runs[key]].append(row)
+    finished = [attempts for attempts in runs.values() if attempts[-1]["outcome"]]
+    completed = [attempts for attempts in finished if attempts[-1]["outcome"] == "completed"]
+    first_try = sum(1 for attempts in finished if attempts[0]["outcome"] == "completed")
+    escalated = sum(1 for attempts in finished if len(attempts) > 1)
+    total_cost = sum(r["cost_usd"] or 0.0 for r in rows)
+
+    print(f"Routing decisions in {get_history_path()}")
+    print(f"  Runs:                {len(runs)} ({len(finished)} finished)")
+    if finished:
+        print(f"  Completed:           {len(completed)} ({len(completed) / len(finished):.0%})")
+        print(f"  First-attempt OK:    {first_try} ({first_try / len(finished):.0%})")
+        print(f"  Escalated:           {escalated} ({escalated / len(finished):.0%})")
+        print(f"  Attempts per run:    {sum(len(a) for a in finished) / len(finished):.2f}")
+    print(f"  Total cost:          ${total_cost:.2f}")
+    if completed:
+        print(f"  Cost per completion: ${total_cost / len(completed):.2f}")
+
+    print_table("MODEL", summarize(rows, "model"), MODEL_LADDER)
+    print_table("REASON", summarize(rows, "reason"),
+                ["complexity", "history", "explore", "escalation", "pinned", "static"])
+
+    if args.recent:
+        print(f"\n{'WHEN':<16} {'RUN':<9} {'TASK':<10} {'#':>2} {'MODEL':<7} {'TIER':<7} "
+              f"{'REASON':<11} OUTCOME")
+        for row in rows[-args.recent:]:
+            when = datetime.fromtimestamp(row["decided_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{when:<16} {row['adw_id'] or '-':<9} {os.path.basename(row['task_key'])[:10]:<10} "
+                  f"{row['attempt']:>2} {row['model']:<7} {row['tier']:<7} {row['reason']:<11} "
+                  f"{row['outcome'] or 'running'}")
+
+
+if __name__ == "__main__":
+    main()
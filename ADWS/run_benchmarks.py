@@ -0,0 +1,491 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Benchmark ADWS's own overhead without spending model time.
+
+Claude Code and gh are replaced by the stand-ins in benchmarks/ (through
+CLAUDE_CODE_PATH and ADWS_GH_PATH), and every run happens in a sandbox
+copy of docs/implementation (through ADWS_PROJECT_ROOT), so the real
+tracker, queue and history are never touched.
+
+Benchmarks:
+    overhead     Per-task orchestration overhead of run_issue.py
+                 (wall time minus the stand-in's simulated model latency)
+    throughput   Phase throughput with N run_worker.py workers
+    jsonl        parse_jsonl_output / convert_jsonl_to_json / store_artifact
+                 speed and peak memory on large transcripts
+
+Results are appended to agents/benchmarks/results.jsonl with the git
+commit, so regressions can be tracked over time.
+
+Usage:
+    uv run run_benchmarks.py                         # Run every benchmark
+    uv run run_benchmarks.py overhead jsonl          # Run selected benchmarks
+    uv run run_benchmarks.py --compare               # Flag regressions vs. recent runs
+    uv run run_benchmarks.py jsonl --sizes 1MB,1GB   # Opt in to 1 GB transcripts
+
+Examples:
+    # Throughput of Phase 7 with 1, 2 and 4 workers
+    uv run run_benchmarks.py throughput --workers 1,2,4
+
+    # CI gate: fail when a metric is more than 10% worse than the recent median
+    uv run run_benchmarks.py --compare
+"""
+
+import sys
+import os
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+from adw_modules.utils import get_project_root
+from adw_modules.task_queue import TaskQueue
+from benchmarks.fake_claude import generate_stream
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(SCRIPT_DIR, "benchmarks")
+
+BENCHMARKS = ("overhead", "throughput", "jsonl")
+
+# A metric this much worse than the median of recent runs is a regression
+REGRESSION_THRESHOLD = 0.10
+
+# Earlier runs (same benchmark and parameters) the comparison looks at
+COMPARE_WINDOW = 5
+
+# Metrics where a larger value is better; every other metric is a cost
+HIGHER_IS_BETTER = {"tasks_per_minute", "mb_per_second", "compression_ratio"}
+
+BENCH_PLAN = """# Benchmark Plan
+
+Synthetic plan used by run_benchmarks.py.
+
+## Implementation Steps
+
+### Step 1: Create the module
+Create `src/bench/module.ts`.
+
+### Step 2: Add tests
+Create `src/bench/module.test.ts`.
+
+### Step 3: Wire it up
+Update `src/bench/index.ts`.
+
+## Validation Commands
+
+```bash
+npm run lint
+```
+"""
+
+PARSE_SCRIPT = """
+import json, os, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+from adw_modules.agent import parse_jsonl_output, convert_jsonl_to_json
+from adw_modules.artifacts import store_artifact
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+messages, result = parse_jsonl_output(sys.argv[2])
+parsed = time.perf_counter()
+convert_jsonl_to_json(sys.argv[2])
+converted = time.perf_counter()
+stored_path = store_artifact(sys.argv[2])
+stored = time.perf_counter()
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"messages": len(messages), "has_result": result is not None,
+                  "parse": parsed - started, "convert": converted - parsed,
+                  "store": stored - converted, "stored_bytes": os.path.getsize(stored_path),
+                  "base_kb": base, "peak_kb": peak}))
+"""
+
+
+# ============================================================================
+# Sandbox
+# ============================================================================
+
+
+def parse_size(text: str) -> int:
+    """Parse '1MB', '500KB', '1GB' or a byte count."""
+    text = text.strip().upper()
+    for suffix, factor in (("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024), ("B", 1)):
+        if text.endswith(suffix):
+            return int(float(text[: -len(suffix)]) * factor)
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """Render a byte count the way --sizes accepts it."""
+    for suffix, factor in (("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return f"{size}B"
+
+
+def write_wrapper(path: str, script: str, flags: List[str]) -> str:
+    """Write an executable that runs a stand-in with fixed flags.
+
+    CLAUDE_CODE_PATH and ADWS_GH_PATH take a single executable, and the
+    Claude Code environment is whitelisted, so configuration is baked in.
+    """
+    quoted = " ".join(f"'{f}'" for f in [sys.executable, script, *flags])
+    with open(path, "w") as f:
+        f.write(f"#!/bin/sh\nexec {quoted} \"$@\"\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+def make_sandbox(
+    workdir: str,
+    latency: float,
+    events: int,
+    transcript_bytes: int,
+    gh_latency: float,
+) -> Dict[str, str]:
+    """Create a sandbox project root with stand-ins; returns its environment."""
+    root = os.path.join(workdir, "project")
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    shutil.copytree(
+        os.path.join(get_project_root(), "docs", "implementation"),
+        os.path.join(root, "docs", "implementation"),
+    )
+    os.makedirs(os.path.join(root, "specs"))
+    with open(os.path.join(root, "specs", "bench-plan.md"), "w") as f:
+        f.write(BENCH_PLAN)
+
+    claude = write_wrapper(
+        os.path.join(bin_dir, "claude"),
+        os.path.join(BENCH_DIR, "fake_claude.py"),
+        ["--events", str(events), "--bytes", str(transcript_bytes), "--latency", str(latency)],
+    )
+    gh = write_wrapper(
+        os.path.join(bin_dir, "gh"),
+        os.path.join(BENCH_DIR, "fake_gh.py"),
+        ["--latency", str(gh_latency), "--log", os.path.join(workdir, "gh_calls.jsonl")],
+    )
+    if not shutil.which("uv"):
+        # Workers start run_task.py via `uv run`; without uv, run it directly
+        with open(os.path.join(bin_dir, "uv"), "w") as f:
+            f.write(f"#!/bin/sh\nshift\nexec '{sys.executable}' \"$@\"\n")
+        os.chmod(os.path.join(bin_dir, "uv"), 0o755)
+
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("ADWS_METRICS_TEXTFILE_DIR", "ADWS_HISTORY_DB", "ADWS_QUEUE_DB",
+                        "GITHUB_API_URL", "ADWS_TRACE_ID", "ADWS_PARENT_SPAN_ID")}
+    env.update({
+        "ADWS_PROJECT_ROOT": root,
+        "CLAUDE_CODE_PATH": claude,
+        "ADWS_GH_PATH": gh,
+        "PATH": bin_dir + os.pathsep + env.get("PATH", ""),
+    })
+    return env
+
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+
+
+def bench_overhead(args) -> List[Dict[str, Any]]:
+    """Per-task orchestration overhead of run_issue.py."""
+    walls = []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory(prefix="adws-bench-") as workdir:
+            env = make_sandbox(workdir, args.latency, args.events, args.transcript_bytes,
+                               args.gh_latency)
+            started = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, os.path.join(SCRIPT_DIR, "run_issue.py"),
+                 "https://github.com/adws-bench/sandbox/issues/1", "specs/bench-plan.md"],
+                cwd=env["ADWS_PROJECT_ROOT"], env=env, capture_output=True, text=True,
+            )
+            walls.append(time.perf_counter() - started)
+            with open(os.path.join(workdir, "gh_calls.jsonl")) as f:
+                gh_calls = sum(1 for _ in f)
+        if result.returncode != 0:
+            raise RuntimeError(f"run_issue.py failed:\n{result.stdout[-2000:]}\n{result.stderr[-2000:]}")
+
+    wall = statistics.median(walls)
+    return [{
+        "benchmark": "overhead",
+        "params": {"latency": args.latency, "events": args.events,
+                   "transcript_bytes": args.transcript_bytes, "gh_latency": args.gh_latency},
+        "metrics": {
+            "wall_seconds": wall,
+            "overhead_seconds": wall - args.latency,
+            "gh_calls": gh_calls,
+        },
+        "samples": len(walls),
+    }]
+
+
+def bench_throughput(args) -> List[Dict[str, Any]]:
+    """Phase throughput with N queue workers."""
+    records = []
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory(prefix="adws-bench-") as workdir:
+            env = make_sandbox(workdir, args.latency, args.events, args.transcript_bytes,
+                               args.gh_latency)
+            root = env["ADWS_PROJECT_ROOT"]
+            db_path = os.path.join(root, "agents", "queue", "tasks.db")
+            env["ADWS_QUEUE_DB"] = db_path
+
+            enqueue = subprocess.run(
+                [sys.executable, os.path.join(SCRIPT_DIR, "run_phase.py"), str(args.phase),
+                 "--enqueue"],
+                cwd=root, env=env, capture_output=True, text=True,
+            )
+            if enqueue.returncode != 0 or not os.path.exists(db_path):
+                raise RuntimeError(f"Could not enqueue phase {args.phase}:\n{enqueue.stdout[-2000:]}")
+
+            started = time.perf_counter()
+            procs = [
+                subprocess.Popen(
+                    [sys.executable, os.path.join(SCRIPT_DIR, "run_worker.py"), "--poll", "1"],
+                    cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                for _ in range(workers)
+            ]
+            for proc in procs:
+                proc.wait()
+            wall = time.perf_counter() - started
+
+            queue = TaskQueue(db_path)
+            try:
+                counts = queue.counts()
+            finally:
+                queue.close()
+
+        completed = counts.get("completed", 0)
+        records.append({
+            "benchmark": "throughput",
+            "params": {"phase": args.phase, "workers": workers, "latency": args.latency,
+                       "events": args.events, "transcript_bytes": args.transcript_bytes},
+            "metrics": {
+                "wall_seconds": wall,
+                "tasks_completed": completed,
+                "tasks_failed": counts.get("failed", 0),
+                "tasks_per_minute": completed / wall * 60 if wall else 0.0,
+                "seconds_per_task": wall / completed if completed else None,
+            },
+            "samples": 1,
+        })
+    return records
+
+
+def bench_jsonl(args) -> List[Dict[str, Any]]:
+    """Transcript parse/convert speed and peak memory, each size in a fresh process."""
+    records = []
+    with tempfile.TemporaryDirectory(prefix="adws-bench-") as workdir:
+        for size in args.sizes:
+            path = os.path.join(workdir, f"raw_output_{format_size(size)}.jsonl")
+            # Roughly 4 KB per event, like a session dominated by file reads and edits
+            with open(path, "w") as f:
+                for line in generate_stream(max(size // 4096, 10), size):
+                    f.write(line + "\n")
+            actual = os.path.getsize(path)
+
+            # The object store goes to the workdir, not the real agents/
+            result = subprocess.run(
+                [sys.executable, "-c", PARSE_SCRIPT, SCRIPT_DIR, path],
+                capture_output=True, text=True, env={**os.environ, "ADWS_PROJECT_ROOT": workdir},
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"JSONL benchmark failed at {format_size(size)}:\n{result.stderr[-2000:]}")
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            os.remove(path.replace(".jsonl", ".json"))
+            for leftover in (path, path + ".gz"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            shutil.rmtree(os.path.join(workdir, "agents"), ignore_errors=True)
+
+            mb = actual / 1024 ** 2
+            records.append({
+                "benchmark": "jsonl",
+                "params": {"size": format_size(size)},
+                "metrics": {
+                    "bytes": actual,
+                    "parse_seconds": stats["parse"],
+                    "convert_seconds": stats["convert"],
+                    "store_seconds": stats["store"],
+                    "compression_ratio": actual / stats["stored_bytes"] if stats["stored_bytes"] else 0.0,
+                    "mb_per_second": mb / stats["parse"] if stats["parse"] else 0.0,
+                    "peak_rss_mb": stats["peak_kb"] / 1024,
+                    "rss_growth_mb": (stats["peak_kb"] - stats["base_kb"]) / 1024,
+                },
+                "samples": 1,
+            })
+    return records
+
+
+# ============================================================================
+# Results
+# ============================================================================
+
+
+def get_git_revision() -> Dict[str, Any]:
+    """Commit and dirty flag of the project checkout."""
+    root = get_project_root()
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--", "ADWS"], cwd=root,
+                                    capture_output=True, text=True).stdout.strip())
+    except FileNotFoundError:
+        return {"git_sha": None, "git_dirty": None}
+    return {"git_sha": sha or None, "git_dirty": dirty}
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    """Read earlier benchmark records (skips unreadable lines)."""
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def find_regressions(record: Dict[str, Any], history: List[Dict[str, Any]]) -> List[str]:
+    """Metrics of record worse than the median of recent comparable runs."""
+    previous = [
+        r for r in history
+        if r.get("benchmark") == record["benchmark"] and r.get("params") == record["params"]
+    ][-COMPARE_WINDOW:]
+    if not previous:
+        return []
+
+    regressions = []
+    for name, value in record["metrics"].items():
+        past = [r["metrics"][name] for r in previous if r["metrics"].get(name) is not None]
+        if value is None or not past or name in ("bytes", "gh_calls", "tasks_completed"):
+            continue
+        baseline = statistics.median(past)
+        if baseline <= 0:
+            continue
+        change = (value - baseline) / baseline
+        worse = -change if name in HIGHER_IS_BETTER else change
+        if worse > REGRESSION_THRESHOLD:
+            regressions.append(f"{name}: {value:.3f} vs median {baseline:.3f} ({worse:+.0%} worse)")
+    return regressions
+
+
+def describe(record: Dict[str, Any]) -> str:
+    """One-line summary of a benchmark record."""
+    params = " ".join(f"{k}={v}" for k, v in record["params"].items())
+    metrics = "  ".join(
+        f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+        for k, v in record["metrics"].items()
+    )
+    return f"{record['benchmark']:<10} {params}\n           {metrics}"
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark ADWS orchestration overhead with stand-in CLIs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run run_benchmarks.py                        Run every benchmark
+  uv run run_benchmarks.py throughput --workers 1,4
+  uv run run_benchmarks.py jsonl --sizes 1MB,1GB  Opt in to 1 GB transcripts
+  uv run run_benchmarks.py --compare              Exit 1 on a >10% regression
+        """
+    )
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help=f"Benchmarks to run ({', '.join(BENCHMARKS)}; default: all)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per overhead measurement, median reported (default: 3)")
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="Simulated model time per Claude Code run in seconds (default: 1.0)")
+    parser.add_argument("--events", type=int, default=200,
+                        help="Stream-json events per Claude Code run (default: 200)")
+    parser.add_argument("--transcript-size", default="1MB",
+                        help="Transcript size per Claude Code run (default: 1MB)")
+    parser.add_argument("--gh-latency", type=float, default=0.05,
+                        help="Simulated latency per gh call in seconds (default: 0.05)")
+    parser.add_argument("--workers", default="1,2,4",
+                        help="Worker counts for the throughput benchmark (default: 1,2,4)")
+    parser.add_argument("--phase", type=int, default=7,
+                        help="Phase enqueued for the throughput benchmark (default: 7)")
+    parser.add_argument("--sizes", default="1MB,10MB,100MB",
+                        help="Transcript sizes for the jsonl benchmark (default: 1MB,10MB,100MB)")
+    parser.add_argument("--results", help="Results file (default: agents/benchmarks/results.jsonl)")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare with recent runs; exit 1 on a regression")
+    parser.add_argument("--no-save", action="store_true", help="Do not append to the results file")
+    args = parser.parse_args()
+
+    unknown = [b for b in args.benchmarks if b not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+    args.transcript_bytes = parse_size(args.transcript_size)
+    args.sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    args.workers = [int(w) for w in args.workers.split(",") if w.strip()]
+    selected = args.benchmarks or list(BENCHMARKS)
+    results_path = args.results or os.path.join(get_project_root(), "agents", "benchmarks", "results.jsonl")
+
+    runners = {"overhead": bench_overhead, "throughput": bench_throughput, "jsonl": bench_jsonl}
+    context = {
+        "timestamp": datetime.now().isoformat(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        **get_git_revision(),
+    }
+    history = load_results(results_path)
+
+    records = []
+    regressions = []
+    for name in selected:
+        print(f"Running {name} benchmark...")
+        try:
+            new = runners[name](args)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        for record in new:
+            record = {**context, **record}
+            records.append(record)
+            print(describe(record))
+            if args.compare:
+                for regression in find_regressions(record, history):
+                    regressions.append(f"{record['benchmark']} {record['params']}: {regression}")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(results_path), exist_ok=True)
+        with open(results_path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        print(f"\nResults appended to {results_path}")
+
+    if args.compare:
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {REGRESSION_THRESHOLD:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against recent runs.")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,28 +15,44 @@ Usage:
     uv run run_issue.py <github_issue_url> <plan_file_path>
     uv run run_issue.py <url> <plan> --dry-run
     uv run run_issue.py <url> <plan> --no-comment
+    uv run run_issue.py --manifest issues.json --workers 3
+    uv run run_issue.py --label adws-ready --workers 2
 
 Examples:
     uv run run_issue.py https://github.com/owner/repo/issues/4 docs/implementation/02_06_OCR.md
     uv run run_issue.py https://github.com/owner/repo/issues/4 specs/feature-auth.md --dry-run
+
+Batch manifest formats:
+    JSON object:  {"https://github.com/owner/repo/issues/4": "docs/plan.md", ...}
+    JSON list:    [{"issue_url": "...", "plan_file": "..."}, ...]
+    Text:         one "<issue_url> <plan_file>" pair per line (# comments allowed)
 """
 
 import sys
 import os
 import argparse
+import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
 
 # Add ADWS directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from dotenv import load_dotenv
-from adw_modules.agent import execute_template
+from adw_modules.task_parser import parse_plan_metadata
+from adw_modules.durations import estimate_plan, format_eta
+from adw_modules.routing import MODEL_LADDER, describe_decision, implement_plan, route_plan
 from adw_modules.state import ADWState
-from adw_modules.data_types import AgentTemplateRequest
-from adw_modules.utils import make_adw_id, setup_logger
+from adw_modules.data_types import AgentPromptResponse, GitHubIssue
+from adw_modules.utils import make_adw_id, setup_logger, get_project_root, atomic_write
 from adw_modules.github import (
     parse_issue_url,
     fetch_issue,
+    fetch_issues_by_label,
+    find_plan_reference,
+    get_repo_url,
+    extract_repo_path,
     post_issue_comment,
     mark_issue_in_progress,
     update_issue_labels,
@@ -44,6 +60,16 @@ from adw_modules.github import (
     generate_completion_comment,
     generate_failure_comment,
 )
+from adw_modules.rate_limit import get_scheduler, get_github_usage
+from adw_modules.worktrees import (
+    apply_patch,
+    changed_paths,
+    changes_since,
+    create_worktree,
+    remove_worktree,
+    snapshot_commit,
+)
+from adw_modules.profiler import start_profiling, PROFILE_MODES, DEFAULT_TOP
 
 
 def get_changed_files() -> list:
@@ -62,59 +88,94 @@ def get_changed_files() -> list:
     return []
 
 
-def main():
-    load_dotenv()
-
-    parser = argparse.ArgumentParser(
-        description="Run implementation with GitHub issue tracking",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  uv run run_issue.py https://github.com/owner/repo/issues/4 docs/plan.md
-  uv run run_issue.py https://github.com/owner/repo/issues/4 specs/feature.md --dry-run
-  uv run run_issue.py https://github.com/owner/repo/issues/4 docs/plan.md --no-comment
-        """
-    )
-    parser.add_argument("issue_url", help="GitHub issue URL")
-    parser.add_argument("plan_file", help="Path to implementation plan")
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Show what would be done without executing"
-    )
-    parser.add_argument(
-        "--no-comment",
-        action="store_true",
-        help="Skip posting GitHub comments"
-    )
-    parser.add_argument(
-        "--resume",
-        metavar="ADW_ID",
-        help="Resume a previous workflow by ADW ID"
-    )
-    args = parser.parse_args()
+def resolve_plan_path(plan_file: str) -> Optional[str]:
+    """Resolve a plan file relative to the project root, or as an absolute path."""
+    plan_path = os.path.join(get_project_root(), plan_file)
+    if os.path.exists(plan_path):
+        return plan_path
+    if os.path.exists(plan_file):
+        return plan_file
+    return None
+
+
+def run_single_issue(
+    issue_url: str,
+    plan_file: str,
+    dry_run: bool = False,
+    no_comment: bool = False,
+    resume: Optional[str] = None,
+    issue: Optional[GitHubIssue] = None,
+    batch_id: Optional[str] = None,
+    validate: bool = True,
+    isolate: bool = False,
+) -> Dict[str, Any]:
+    """Run one plan against one GitHub issue.
+
+    Args:
+        issue_url: GitHub issue URL
+        plan_file: Plan path (relative to project root or absolute)
+        dry_run: Only show what would be done
+        no_comment: Skip posting GitHub comments
+        resume: ADW ID of a previous workflow to resume
+        issue: Pre-fetched issue (batch mode shares one fetch per issue)
+        batch_id: Batch run this issue belongs to
+        validate: Run the plan's validation commands after /implement
+        isolate: Implement in a worktree of its own and apply the result to
+            the project tree (batch workers share one checkout)
+
+    Returns:
+        Result summary with issue_url, plan_file, adw_id, status and error
+    """
+    # Only this issue's GitHub calls, also when batch workers share the scheduler
+    with get_scheduler().track_usage() as github_usage:
+        return _run_single_issue(issue_url, plan_file, dry_run, no_comment, resume, issue,
+                                 batch_id, validate, isolate, github_usage)
+
+
+def _run_single_issue(
+    issue_url: str,
+    plan_file: str,
+    dry_run: bool,
+    no_comment: bool,
+    resume: Optional[str],
+    issue: Optional[GitHubIssue],
+    batch_id: Optional[str],
+    validate: bool,
+    isolate: bool,
+    github_usage: Dict[str, Any],
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "issue_url": issue_url,
+        "plan_file": plan_file,
+        "adw_id": None,
+        "status": "failed",
+        "error": None,
+    }
 
     # Validate plan file exists
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    plan_path = os.path.join(project_root, args.plan_file)
-
-    if not os.path.exists(plan_path):
-        # Try as absolute path
-        if not os.path.exists(args.plan_file):
-            print(f"Error: Plan file not found: {args.plan_file}")
-            print(f"Tried: {plan_path}")
-            sys.exit(1)
-        plan_path = args.plan_file
+    plan_path = resolve_plan_path(plan_file)
+    if not plan_path:
+        print(f"Error: Plan file not found: {plan_file}")
+        print(f"Tried: {os.path.join(get_project_root(), plan_file)}")
+        result["error"] = f"Plan file not found: {plan_file}"
+        return result
+
+    # Plan features for duration history and the ETA
+    metadata = parse_plan_metadata(plan_path)
+    decision = route_plan(metadata.get("task_id"), plan_file, metadata)
+    eta = format_eta(estimate_plan(metadata.get("task_id"), plan_file, metadata, decision.model))
 
     # Parse issue URL
     try:
-        repo_path, issue_number = parse_issue_url(args.issue_url)
+        repo_path, issue_number = parse_issue_url(issue_url)
     except ValueError as e:
         print(f"Error: {e}")
-        sys.exit(1)
+        result["error"] = str(e)
+        return result
 
     # Fetch issue details
-    issue = fetch_issue(issue_number, repo_path)
+    if issue is None:
+        issue = fetch_issue(issue_number, repo_path)
     if issue:
         print(f"\n{'='*60}")
         print(f"Issue #{issue.number}: {issue.title}")
@@ -126,8 +187,8 @@ Examples:
         print("Continuing with limited issue tracking...\n")
 
     # Initialize or resume workflow
-    if args.resume:
-        adw_id = args.resume
+    if resume:
+        adw_id = resume
         state = ADWState.load(adw_id)
         if state:
             print(f"Resuming workflow: {adw_id}")
@@ -137,80 +198,85 @@ Examples:
     else:
         adw_id = make_adw_id()
         state = None
+    result["adw_id"] = adw_id
 
     logger = setup_logger(adw_id, "run_issue")
 
     logger.info(f"Starting issue-based implementation")
-    logger.info(f"Issue: {args.issue_url}")
-    logger.info(f"Plan: {args.plan_file}")
+    logger.info(f"Issue: {issue_url}")
+    logger.info(f"Plan: {plan_file}")
     logger.info(f"ADW ID: {adw_id}")
+    if batch_id:
+        logger.info(f"Batch ID: {batch_id}")
 
     # Dry run mode
-    if args.dry_run:
+    if dry_run:
         print("\n=== DRY RUN ===")
-        print(f"Issue URL: {args.issue_url}")
+        print(f"Issue URL: {issue_url}")
         print(f"Repo Path: {repo_path}")
         print(f"Issue #: {issue_number}")
         if issue:
             print(f"Issue Title: {issue.title}")
-        print(f"Plan File: {args.plan_file}")
+        print(f"Plan File: {plan_file}")
         print(f"ADW ID: {adw_id}")
-        print(f"Would execute: /implement {args.plan_file}")
+        print(f"Model: {describe_decision(decision)}")
+        print(f"Estimated duration: {eta}")
+        print(f"Would execute: /implement {plan_file}")
         print("================\n")
-        sys.exit(0)
+        result["status"] = "dry_run"
+        return result
 
     # Initialize state if not resumed
     if state is None:
         state = ADWState(adw_id)
         state.update(
-            plan_file=args.plan_file,
+            plan_file=plan_file,
             issue_number=issue_number,
-            issue_url=args.issue_url,
+            issue_url=issue_url,
             repo_path=repo_path,
+            batch_id=batch_id,
         )
 
     state.set_status("in_progress")
     state.save("init")
 
     # Post start comment and mark in-progress
-    if not args.no_comment:
+    if not no_comment:
         mark_issue_in_progress(issue_number, repo_path)
         post_issue_comment(
             issue_number,
             repo_path,
-            generate_start_comment(args.plan_file, adw_id)
+            generate_start_comment(plan_file, adw_id, eta=eta)
         )
 
     # Execute implementation via Claude Code
     logger.info("Executing /implement command...")
-    print(f"\nExecuting implementation for: {args.plan_file}")
+    print(f"\nExecuting implementation for: {plan_file}")
     print(f"ADW ID: {adw_id}")
     print("-" * 40)
 
-    request = AgentTemplateRequest(
-        agent_name="implementor",
-        slash_command="/implement",
-        args=[args.plan_file],
-        adw_id=adw_id,
-    )
-
-    response = execute_template(request)
+    files_changed = None
+    if isolate:
+        response, files_changed = implement_isolated(adw_id, plan_file, metadata, state, logger, validate)
+    else:
+        response, _ = implement_plan(adw_id, plan_file, metadata.get("task_id"), metadata, state, logger,
+                                     validate=validate)
 
     if not response.success:
         error_msg = response.output[:1000] if response.output else "Unknown error"
         logger.error(f"Implementation failed: {error_msg[:500]}")
 
-        state.update(error_message=error_msg)
+        state.update(error_message=error_msg, github_quota=dict(github_usage))
         state.set_status("failed")
         state.save("failed")
 
         # Post failure comment
-        if not args.no_comment:
+        if not no_comment:
             post_issue_comment(
                 issue_number,
                 repo_path,
                 generate_failure_comment(
-                    args.plan_file,
+                    plan_file,
                     adw_id,
                     error_msg,
                     last_step=state.get("current_step")
@@ -222,23 +288,25 @@ Examples:
         print(f"ADW ID: {adw_id}")
         print(f"Logs: agents/{adw_id}/run_issue/execution.log")
         print(f"{'='*60}")
-        sys.exit(1)
+        result["error"] = error_msg[:200]
+        return result
 
     logger.info("Implementation completed successfully")
 
     # Get changed files
-    files_changed = get_changed_files()
+    if files_changed is None:
+        files_changed = get_changed_files()
 
     # Post completion comment
-    if not args.no_comment:
+    if not no_comment:
         post_issue_comment(
             issue_number,
             repo_path,
             generate_completion_comment(
-                args.plan_file,
+                plan_file,
                 adw_id,
                 files_changed,
-                validation_passed=True  # TODO: Get from actual validation
+                validation_passed=all(r["passed"] for r in state.get("validation_results", []))
             )
         )
 
@@ -250,16 +318,287 @@ Examples:
             remove_labels=["in-progress"]
         )
 
+    state.update(github_quota=dict(github_usage))
     state.set_status("completed")
     state.save("completed")
 
     print(f"\n{'='*60}")
     print("IMPLEMENTATION COMPLETED")
-    print(f"Issue: {args.issue_url}")
+    print(f"Issue: {issue_url}")
     print(f"ADW ID: {adw_id}")
     print(f"Files Changed: {len(files_changed)}")
     print(f"{'='*60}")
 
+    result["status"] = "completed"
+    return result
+
+
+def implement_isolated(
+    adw_id: str,
+    plan_file: str,
+    metadata: Dict[str, Any],
+    state: ADWState,
+    logger,
+    validate: bool = True,
+) -> Tuple[AgentPromptResponse, List[str]]:
+    """Implement and validate a plan in its own worktree, then apply it to the project tree.
+
+    Returns the response and the files this issue changed; other issues of
+    the batch working at the same time don't show up in them.
+    """
+    repo = get_project_root()
+    base = snapshot_commit(repo)
+    worktree = create_worktree(f"{adw_id}-issue", base, repo)
+    try:
+        response, _ = implement_plan(adw_id, plan_file, metadata.get("task_id"), metadata, state, logger,
+                                     validate=validate, cwd=worktree)
+        if not response.success:
+            return response, []
+        files = changed_paths(worktree, base)
+        error = apply_patch(repo, changes_since(worktree, base))
+        if error:
+            return response.model_copy(update={
+                "success": False, "output": f"Changes do not apply to the project tree: {error}",
+            }), files
+        return response, files
+    finally:
+        remove_worktree(worktree, repo)
+
+
+def load_manifest(manifest_path: str) -> List[Tuple[str, str]]:
+    """Load (issue_url, plan_file) pairs from a JSON or text manifest."""
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = None
+
+    if isinstance(data, dict):
+        return list(data.items())
+    if isinstance(data, list):
+        return [(item["issue_url"], item["plan_file"]) for item in data]
+
+    entries = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        if len(parts) != 2:
+            raise ValueError(f"Invalid manifest line (expected '<issue_url> <plan_file>'): {line}")
+        entries.append((parts[0], parts[1]))
+    return entries
+
+
+def run_batch(
+    entries: List[Tuple[str, str]],
+    workers: int,
+    dry_run: bool = False,
+    no_comment: bool = False,
+    issues: Optional[Dict[str, GitHubIssue]] = None,
+    validate: bool = True,
+) -> int:
+    """Run many issues concurrently on a shared worker pool.
+
+    Issues are fetched at most once (label queries pre-fill the cache with a
+    single list call); the gh/claude availability checks and the GitHub
+    rate-limit scheduler are shared by all workers in this process.
+
+    Returns the process exit code.
+    """
+    batch_id = make_adw_id()
+    logger = setup_logger(batch_id, "run_issue_batch")
+    logger.info(f"Batch {batch_id}: {len(entries)} issues, {workers} workers")
+
+    # Concurrent issues would see each other's edits in the shared checkout
+    isolate = workers > 1 and len(entries) > 1 and not dry_run
+    if isolate:
+        logger.info("Each issue is implemented in its own worktree")
+
+    issue_cache: Dict[str, Optional[GitHubIssue]] = dict(issues or {})
+    for issue_url, _ in entries:
+        if issue_url in issue_cache:
+            continue
+        try:
+            repo_path, issue_number = parse_issue_url(issue_url)
+        except ValueError:
+            issue_cache[issue_url] = None
+            continue
+        issue_cache[issue_url] = fetch_issue(issue_number, repo_path)
+
+    def run_entry(entry: Tuple[str, str]) -> Dict[str, Any]:
+        issue_url, plan_file = entry
+        try:
+            return run_single_issue(
+                issue_url,
+                plan_file,
+                dry_run=dry_run,
+                no_comment=no_comment,
+                issue=issue_cache.get(issue_url),
+                batch_id=batch_id,
+                validate=validate,
+                isolate=isolate,
+            )
+        except Exception as e:
+            logger.error(f"{issue_url} crashed: {e}")
+            return {"issue_url": issue_url, "plan_file": plan_file, "adw_id": None,
+                    "status": "failed", "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(run_entry, entries))
+
+    summary = {
+        "batch_id": batch_id,
+        "total": len(results),
+        "completed": sum(1 for r in results if r["status"] == "completed"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "github_quota": get_github_usage(),
+        "results": results,
+    }
+    summary_path = os.path.join(get_project_root(), "agents", batch_id, "batch_summary.json")
+    atomic_write(summary_path, json.dumps(summary, indent=2))
+
+    print(f"\n{'='*60}")
+    print(f"Batch {batch_id} Summary")
+    print(f"{'='*60}")
+    for r in results:
+        print(f"  [{r['status']:>9}] {r['issue_url']}  {r['plan_file']}  (ADW {r['adw_id'] or '-'})")
+        if r["error"]:
+            print(f"              {r['error'][:120]}")
+    print(f"\nCompleted: {summary['completed']}  Failed: {summary['failed']}  Total: {summary['total']}")
+    print(f"Summary: agents/{batch_id}/batch_summary.json")
+
+    logger.info(f"Batch {batch_id} complete: {summary['completed']} completed, {summary['failed']} failed")
+    return 1 if summary["failed"] else 0
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Run implementation with GitHub issue tracking",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run run_issue.py https://github.com/owner/repo/issues/4 docs/plan.md
+  uv run run_issue.py https://github.com/owner/repo/issues/4 specs/feature.md --dry-run
+  uv run run_issue.py https://github.com/owner/repo/issues/4 docs/plan.md --no-comment
+  uv run run_issue.py --manifest issues.json --workers 3
+  uv run run_issue.py --label adws-ready --workers 2
+        """
+    )
+    parser.add_argument("issue_url", nargs="?", help="GitHub issue URL")
+    parser.add_argument("plan_file", nargs="?", help="Path to implementation plan")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be done without executing"
+    )
+    parser.add_argument(
+        "--no-comment",
+        action="store_true",
+        help="Skip posting GitHub comments"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="ADW_ID",
+        help="Resume a previous workflow by ADW ID"
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help="Batch mode: run every issue/plan pair listed in FILE"
+    )
+    parser.add_argument(
+        "--label",
+        help="Batch mode: run every open issue with this label (plan taken from the issue)"
+    )
+    parser.add_argument(
+        "--repo",
+        help="Repository for --label (default: git remote)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Concurrent issues in batch mode (default: 2)"
+    )
+    parser.add_argument(
+        "--model",
+        choices=MODEL_LADDER,
+        help="Use this model, without routing or escalation (ADWS_MODEL)"
+    )
+    parser.add_argument(
+        "--skip-validation",
+        action="store_true",
+        help="Don't run the plan's validation commands after /implement"
+    )
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile this process; saved under agents/<adw_id>/profile/")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="sample",
+                        help="How --profile profiles: sample (default) or cprofile")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP,
+                        help=f"Functions in the profile summary (default: {DEFAULT_TOP})")
+    args = parser.parse_args()
+
+    start_profiling(args.profile_mode if args.profile else None, "run_issue", args.profile_top)
+    if args.model:
+        os.environ["ADWS_MODEL"] = args.model
+
+    if args.manifest or args.label:
+        if args.issue_url or args.resume:
+            parser.error("--manifest/--label cannot be combined with an issue URL or --resume")
+
+        entries: List[Tuple[str, str]] = []
+        issues: Dict[str, GitHubIssue] = {}
+
+        if args.manifest:
+            try:
+                entries.extend(load_manifest(args.manifest))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error: Could not read manifest {args.manifest}: {e}")
+                sys.exit(1)
+
+        if args.label:
+            repo_path = args.repo
+            if not repo_path:
+                repo_url = get_repo_url()
+                if not repo_url:
+                    print("Error: Could not determine repository. Use --repo owner/repo.")
+                    sys.exit(1)
+                repo_path = extract_repo_path(repo_url)
+
+            for issue in fetch_issues_by_label(args.label, repo_path):
+                plan_file = find_plan_reference(issue)
+                if not plan_file:
+                    print(f"Skipping issue #{issue.number}: no plan file referenced")
+                    continue
+                issues[issue.url] = issue
+                entries.append((issue.url, plan_file))
+
+        if not entries:
+            print("No issues to run.")
+            sys.exit(0)
+
+        sys.exit(run_batch(entries, args.workers, args.dry_run, args.no_comment, issues,
+                           validate=not args.skip_validation))
+
+    if not args.issue_url or not args.plan_file:
+        parser.error("issue_url and plan_file are required (or use --manifest/--label)")
+
+    result = run_single_issue(
+        args.issue_url,
+        args.plan_file,
+        dry_run=args.dry_run,
+        no_comment=args.no_comment,
+        resume=args.resume,
+        validate=not args.skip_validation,
+    )
+    if result["status"] == "failed":
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -12,6 +12,10 @@ Usage:
     uv run run_phase.py 2 --continue   # Continue from last failed task
     uv run run_phase.py 3 --skip-completed  # Skip already completed tasks
     uv run run_phase.py 6 --issue 22   # Run Phase 6, report to GitHub issue #22
+    uv run run_phase.py 6 --enqueue    # Queue Phase 6 for run_worker.py workers
+    uv run run_phase.py --recover a1b2c3d4  # Resume an interrupted phase run
+    uv run run_phase.py 5 --batch      # Share /implement sessions between small plans
+    uv run run_phase.py 6 --speculate  # Start dependents while their parent validates
 
 Examples:
     # Run Phase 1 (Infrastructure) tasks
@@ -27,8 +31,8 @@ Examples:
 import sys
 import os
 import argparse
-from datetime import datetime
-import subprocess
+import threading
+import time
 
 # Add ADWS directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -48,10 +52,44 @@ from adw_modules.github import (
     mark_issue_in_progress,
     update_issue_labels,
 )
+from adw_modules.rate_limit import get_github_usage
+from adw_modules.task_queue import TaskQueue
+from adw_modules.state import ADWState
+from adw_modules.phase_journal import PhaseJournal, FINISHED_STATUSES, pid_alive
+from adw_modules.tracing import span, trace_env
+from adw_modules.profiler import start_profiling, PROFILE_MODES, DEFAULT_TOP
+from adw_modules.resources import spawn, describe_usage, set_limits_env
+from adw_modules.routing import MODEL_LADDER, ModelRouter, route_plan
+from adw_modules.batching import DEFAULT_BATCH_SIZE, get_batch_size, select_batch
+from adw_modules.plan_steps import DEFAULT_STEP_PARALLEL, get_step_parallel
+from adw_modules.context_pack import context_pack_enabled
+from adw_modules.metrics import get_metrics
+from adw_modules.speculation import (
+    DEFAULT_MAX_SPECULATIVE,
+    get_speculation_budget,
+    speculation_candidates,
+    worth_speculating,
+)
+from adw_modules.durations import (
+    DurationHistory,
+    plan_features,
+    combine_estimates,
+    format_duration,
+    format_eta,
+)
+
 
+# Seconds between looks at a running task's state for a speculation base
+SPECULATION_POLL_SECONDS = 2
 
-def topological_sort(tasks: list, dep_map: dict) -> list:
-    """Sort tasks by dependencies (tasks with fewer deps first)."""
+
+def topological_sort(tasks: list, dep_map: dict, priority: dict = None) -> list:
+    """Sort tasks by dependencies (tasks with fewer deps first).
+
+    Among tasks that are ready at the same time, higher priority (e.g. a
+    longer predicted duration) goes first; ties fall back to task ID.
+    """
+    priority = priority or {}
     # Build a set of task IDs we're working with
     task_ids = {t["task_id"] for t in tasks}
 
@@ -59,7 +97,8 @@ def topological_sort(tasks: list, dep_map: dict) -> list:
     filtered_deps = {}
     for task in tasks:
         tid = task["task_id"]
-        deps = dep_map.get(tid, [])
+        # Dependencies from the map plus those declared in the plan itself
+        deps = set(dep_map.get(tid, [])) | set(task.get("depends_on", []))
         # Only include deps that are in our task list
         filtered_deps[tid] = [d for d in deps if d in task_ids]
 
@@ -70,7 +109,7 @@ def topological_sort(tasks: list, dep_map: dict) -> list:
 
     while queue:
         # Sort queue to get consistent ordering
-        queue.sort()
+        queue.sort(key=lambda t: (-priority.get(t, 0), t))
         tid = queue.pop(0)
         result.append(tid)
 
@@ -86,7 +125,16 @@ def topological_sort(tasks: list, dep_map: dict) -> list:
     return [task_map[tid] for tid in result if tid in task_map]
 
 
-def run_task(task_id: str, dry_run: bool = False, skip_deps: bool = False, issue: int = None) -> bool:
+def run_task(
+    task_id: str,
+    dry_run: bool = False,
+    skip_deps: bool = False,
+    issue: int = None,
+    journal: PhaseJournal = None,
+    adw_id: str = None,
+    resume: bool = False,
+    while_running=None,
+) -> bool:
     """Run a single task using run_task.py.
 
     Args:
@@ -94,6 +142,10 @@ def run_task(task_id: str, dry_run: bool = False, skip_deps: bool = False, issue
         dry_run: If True, only print what would be done
         skip_deps: If True, skip dependency checks
         issue: GitHub issue number for progress reporting
+        journal: Phase journal to record the start (ADW ID, PID) and outcome in
+        adw_id: ADW ID for the task (default: a new one)
+        resume: Resume the task's previous state
+        while_running: Called every SPECULATION_POLL_SECONDS while the task runs
 
     Returns True if successful.
     """
@@ -110,12 +162,229 @@ def run_task(task_id: str, dry_run: bool = False, skip_deps: bool = False, issue
         print(f"  Would run: {' '.join(cmd)}")
         return True
 
+    adw_id = adw_id or make_adw_id()
+    cmd.extend(["--adw-id", adw_id])
+    if resume:
+        cmd.append("--resume")
+
     print(f"\n{'='*60}")
     print(f"Running task: {task_id}")
     print(f"{'='*60}")
 
-    result = subprocess.run(cmd, cwd=get_project_root())
-    return result.returncode == 0
+    # The child continues this trace under the run_task span
+    with span("run_task", task_id=task_id, adw_id=adw_id) as attrs:
+        child = spawn(cmd, "run_task", cwd=get_project_root(), env=trace_env())
+        if journal:
+            journal.task_started(task_id, adw_id, child.pid)
+        if while_running:
+            reaped = {}
+            waiter = threading.Thread(target=lambda: reaped.update(usage=child.wait()), daemon=True)
+            waiter.start()
+            while waiter.is_alive():
+                while_running()
+                waiter.join(SPECULATION_POLL_SECONDS)
+            usage = reaped["usage"]
+        else:
+            usage = child.wait()
+        attrs["returncode"] = usage.exit_code
+    success = usage.exit_code == 0
+    print(f"Resources: {describe_usage(usage)}")
+    if journal:
+        journal.task_finished(task_id, "completed" if success else "failed", adw_id=adw_id,
+                              reason=None if success else "Execution failed",
+                              usage=usage.model_dump())
+    return success
+
+
+def run_batch(
+    task_ids: list,
+    issue: int = None,
+    journal: PhaseJournal = None,
+) -> dict:
+    """Run small tasks in one /implement session (run_task.py with several IDs).
+
+    Returns {task_id: success}, taken from each task's own ADW state.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    adw_ids = {task_id: make_adw_id() for task_id in task_ids}
+    cmd = ["uv", "run", os.path.join(script_dir, "run_task.py"), *task_ids, "--skip-deps"]
+    for task_id in task_ids:
+        cmd.extend(["--adw-id", adw_ids[task_id]])
+    if issue:
+        cmd.extend(["--issue", str(issue)])
+
+    print(f"\n{'='*60}")
+    print(f"Running batch: {', '.join(task_ids)}")
+    print(f"{'='*60}")
+
+    with span("run_batch", task_ids=",".join(task_ids)) as attrs:
+        child = spawn(cmd, "run_task", cwd=get_project_root(), env=trace_env())
+        if journal:
+            for task_id in task_ids:
+                journal.task_started(task_id, adw_ids[task_id], child.pid)
+        usage = child.wait()
+        attrs["returncode"] = usage.exit_code
+    print(f"Resources: {describe_usage(usage)}")
+
+    results = {}
+    for task_id in task_ids:
+        results[task_id] = task_state_status(adw_ids[task_id]) == "completed"
+        if journal:
+            journal.task_finished(task_id, "completed" if results[task_id] else "failed",
+                                  adw_id=adw_ids[task_id],
+                                  reason=None if results[task_id] else "Execution failed")
+    return results
+
+
+class Speculator:
+    """Speculative runs of the tasks that wait for the one running now.
+
+    While a task validates (its state has a speculation_base), tasks that
+    only wait for it start as run_task.py --speculate-from children, up to
+    limit at a time. The phase loop later resumes them with their own ADW
+    ID, which lands the patch (see adw_modules/speculation.py). The cost of
+    work that is thrown away counts against budget (USD); once spent, no
+    more speculation.
+    """
+
+    def __init__(self, limit: int, budget: float, tasks: list, dep_map: dict,
+                 issue: int = None, journal: PhaseJournal = None, logger=None):
+        self.limit = limit
+        self.budget = budget
+        self.tasks = tasks
+        self.dep_map = dep_map
+        self.issue = issue
+        self.journal = journal
+        self.logger = logger
+        self.wasted = 0.0
+        # task_id -> {"adw_id", "parent", "child", "thread"}
+        self.runs = {}
+        self._worth = {}
+
+    def in_flight(self) -> int:
+        return sum(1 for run in self.runs.values() if run["thread"].is_alive())
+
+    def watch(self, parent: dict, parent_adw_id: str, completed: list):
+        """while_running callback for run_task(): speculate once the parent validates."""
+        def poll():
+            if self.wasted >= self.budget or self.in_flight() >= self.limit:
+                return
+            state = ADWState.load(parent_adw_id)
+            base = state.get("speculation_base") if state else None
+            if not base:
+                return
+            parent_id = parent["task_id"]
+            if parent_id not in self._worth:
+                self._worth[parent_id] = worth_speculating(parent)
+                if not self._worth[parent_id]:
+                    self.logger.info(f"Not speculating on dependents of {parent_id}: not enough successful history")
+            if not self._worth[parent_id]:
+                return
+            for task in speculation_candidates(parent_id, self.tasks, completed, self.dep_map):
+                if self.in_flight() >= self.limit:
+                    break
+                if task["task_id"] not in self.runs and task["task_id"] not in completed:
+                    self.start(task["task_id"], parent_id, base)
+        return poll
+
+    def start(self, task_id: str, parent_id: str, base: str) -> None:
+        """Start run_task.py --speculate-from for task_id; reaped in a thread."""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        adw_id = make_adw_id()
+        cmd = ["uv", "run", os.path.join(script_dir, "run_task.py"), task_id, "--skip-deps",
+               "--adw-id", adw_id, "--speculate-from", base, "--speculation-parent", parent_id]
+        if self.issue:
+            cmd.extend(["--issue", str(self.issue)])
+        self.logger.info(f"Speculating on {task_id} while {parent_id} validates (ADW ID {adw_id})")
+        print(f"\nSpeculating on {task_id} while {parent_id} validates (ADW ID {adw_id})")
+        child = spawn(cmd, "run_task", cwd=get_project_root(), env=trace_env())
+        run = {"adw_id": adw_id, "parent": parent_id, "child": child, "usage": None}
+        run["thread"] = threading.Thread(target=lambda: run.update(usage=child.wait()), daemon=True)
+        run["thread"].start()
+        self.runs[task_id] = run
+        if self.journal:
+            self.journal.record("speculation_started", task_id=task_id, adw_id=adw_id,
+                                parent=parent_id, pid=child.pid)
+
+    def _speculation(self, task_id: str) -> dict:
+        state = ADWState.load(self.runs[task_id]["adw_id"])
+        return (state.get("speculation") if state else None) or {}
+
+    def take(self, task_id: str):
+        """ADW ID of task_id's speculative run (waiting for it), or None if there was none."""
+        run = self.runs.get(task_id)
+        if not run:
+            return None
+        run["thread"].join()
+        speculation = self._speculation(task_id)
+        if speculation.get("status") != "ready":
+            self.wasted += speculation.get("cost_usd") or 0.0
+        if self.journal:
+            self.journal.record("speculation_finished", task_id=task_id, adw_id=run["adw_id"],
+                                status=speculation.get("status", "failed"),
+                                cost_usd=speculation.get("cost_usd"))
+        return run["adw_id"]
+
+    def settled(self, task_id: str) -> None:
+        """After task_id ran: its speculative work was wasted if it was discarded."""
+        if task_id in self.runs and self._speculation(task_id).get("status") == "discarded":
+            self.wasted += self._speculation(task_id).get("cost_usd") or 0.0
+
+    def parent_failed(self, parent_id: str) -> None:
+        """Stop and discard the speculative runs that built on a failed task."""
+        for task_id, run in self.runs.items():
+            if run["parent"] != parent_id:
+                continue
+            if run["thread"].is_alive():
+                run["child"].process.terminate()
+                run["thread"].join()
+            state = ADWState.load(run["adw_id"])
+            speculation = dict((state.get("speculation") if state else None) or {})
+            if speculation.get("status") == "ready" or not speculation:
+                speculation["status"] = "discarded"
+                get_metrics().inc("adws_speculations_total", outcome="discarded")
+            if state:
+                state.update(speculation=speculation)
+                state.save("speculation_discarded")
+            self.wasted += speculation.get("cost_usd") or 0.0
+            self.logger.info(f"Discarded speculative work on {task_id}: {parent_id} failed")
+
+    def close(self) -> None:
+        """Stop speculative runs nobody is going to use."""
+        for run in self.runs.values():
+            if run["thread"].is_alive():
+                run["child"].process.terminate()
+                run["thread"].join()
+        if self.runs:
+            self.logger.info(f"Speculation: {len(self.runs)} run(s), ${self.wasted:.2f} of work discarded")
+
+
+def task_state_status(adw_id: str) -> str:
+    """Status recorded in a task's ADW state (None if it never saved any)."""
+    state = ADWState.load(adw_id) if adw_id else None
+    return state.get("status") if state else None
+
+
+def recover_in_flight(task_id: str, entry: dict, journal: PhaseJournal, logger, poll: int = 5) -> bool:
+    """Settle a task that was running when the phase run died.
+
+    If its run_task.py process is still alive, wait for it and take the
+    outcome from its ADW state. Returns True if the task completed, False if
+    it has to be run again.
+    """
+    adw_id, pid = entry.get("adw_id"), entry.get("pid")
+
+    if pid_alive(pid) and task_state_status(adw_id) not in ("completed", "failed"):
+        logger.info(f"Reattaching to {task_id} (PID {pid}, ADW ID {adw_id})")
+        print(f"Waiting for running task {task_id} (PID {pid})...")
+        while pid_alive(pid) and task_state_status(adw_id) not in ("completed", "failed"):
+            time.sleep(poll)
+
+    if task_state_status(adw_id) == "completed":
+        journal.task_finished(task_id, "completed", adw_id=adw_id)
+        logger.info(f"Task {task_id} finished while unattended")
+        return True
+    return False
 
 
 def main():
@@ -131,9 +400,14 @@ Examples:
   uv run run_phase.py 2 --skip-completed  Skip completed tasks
   uv run run_phase.py 3 --continue    Continue after failure
   uv run run_phase.py 5 --issue 42    Run with GitHub issue tracking
+  uv run run_phase.py 6 --enqueue     Queue tasks for run_worker.py
+  uv run run_phase.py --recover a1b2c3d4  Resume an interrupted phase run
+  uv run run_phase.py 5 --batch 3     Up to 3 small ready plans per session
+  uv run run_phase.py 6 --speculate   Implement dependents while their parent validates
+  uv run run_phase.py 6 --context-pack  Give agents the files their plans name
         """
     )
-    parser.add_argument("phase", type=int, choices=[1, 2, 3, 4, 5, 6, 7],
+    parser.add_argument("phase", type=int, nargs="?", choices=[1, 2, 3, 4, 5, 6, 7],
                         help="Phase number (1-7)")
     parser.add_argument("--issue", type=int,
                         help="GitHub issue number for progress reporting")
@@ -145,10 +419,91 @@ Examples:
                         help="Continue running tasks after a failure")
     parser.add_argument("--skip-deps", action="store_true",
                         help="Skip dependency checks")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Add tasks to the shared queue for run_worker.py instead of running them")
+    parser.add_argument("--queue-db",
+                        help="Queue database for --enqueue (default: agents/queue/tasks.db)")
+    parser.add_argument("--shared-fs", action="store_true",
+                        help="Workers on several hosts share the queue (disables WAL; ADWS_QUEUE_SHARED_FS)")
+    parser.add_argument("--recover", metavar="PHASE_ADW_ID",
+                        help="Resume the unfinished work of an interrupted phase run")
+    parser.add_argument("--batch", type=int, nargs="?", const=DEFAULT_BATCH_SIZE, metavar="N",
+                        help=f"Run up to N small, ready plans in one /implement session "
+                             f"(default N: {DEFAULT_BATCH_SIZE}; ADWS_BATCH_SIZE)")
+    parser.add_argument("--parallel-steps", type=int, nargs="?", const=DEFAULT_STEP_PARALLEL, metavar="N",
+                        help="Run independent steps of each plan as up to N parallel sub-agents "
+                             "(ADWS_PARALLEL_STEPS)")
+    parser.add_argument("--speculate", type=int, nargs="?", const=DEFAULT_MAX_SPECULATIVE, metavar="N",
+                        help=f"While a task validates, implement up to N tasks that only wait for it "
+                             f"in worktrees (default N: {DEFAULT_MAX_SPECULATIVE})")
+    parser.add_argument("--speculation-budget", type=float, metavar="USD",
+                        help="Stop speculating once this much speculative work was discarded "
+                             "(ADWS_SPECULATION_BUDGET_USD)")
+    parser.add_argument("--model", choices=MODEL_LADDER,
+                        help="Run every task on this model, without routing or escalation (ADWS_MODEL)")
+    parser.add_argument("--context-pack", action="store_true",
+                        help="Read the files, symbols and tests each plan names into its /implement prompt (ADWS_CONTEXT_PACK)")
+    parser.add_argument("--max-rss-mb", type=float,
+                        help="Kill the agent if its process tree exceeds this RSS (ADWS_LIMIT_RSS_MB)")
+    parser.add_argument("--max-cpu-seconds", type=float,
+                        help="Kill the agent after this much CPU time (ADWS_LIMIT_CPU_SECONDS)")
+    parser.add_argument("--max-wall-seconds", type=float,
+                        help="Kill the agent after this long (ADWS_LIMIT_WALL_SECONDS)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile this process; saved under agents/<adw_id>/profile/")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="sample",
+                        help="How --profile profiles: sample (default) or cprofile")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP,
+                        help=f"Functions in the profile summary (default: {DEFAULT_TOP})")
     args = parser.parse_args()
 
+    start_profiling(args.profile_mode if args.profile else None, "run_phase", args.profile_top)
+    set_limits_env(args.max_rss_mb, args.max_cpu_seconds, args.max_wall_seconds)
+
+    # Recovery replays the phase journal instead of re-deriving the run
+    recovered = None
+    if args.recover:
+        journal = PhaseJournal(args.recover)
+        recovered = journal.replay()
+        if recovered["phase"] is None:
+            print(f"No phase journal found for ADW ID {args.recover}")
+            sys.exit(1)
+        options = recovered["options"]
+        args.phase = recovered["phase"]
+        args.issue = options.get("issue")
+        args.continue_on_error = options.get("continue_on_error", False)
+        args.skip_deps = options.get("skip_deps", False)
+        args.batch = options.get("batch")
+        args.speculate = options.get("speculate")
+        args.speculation_budget = options.get("speculation_budget")
+        # Journals written before these options were recorded keep the current settings
+        if "model" in options:
+            args.model = options["model"]
+            os.environ.pop("ADWS_MODEL", None)
+        if "parallel_steps" in options:
+            args.parallel_steps = options["parallel_steps"]
+        if "context_pack" in options:
+            args.context_pack = options["context_pack"]
+            os.environ.pop("ADWS_CONTEXT_PACK", None)
+    elif args.phase is None:
+        parser.error("phase is required unless --recover is given")
+
+    if args.model:
+        # Inherited by the run_task.py children
+        os.environ["ADWS_MODEL"] = args.model
+    if args.parallel_steps is not None:
+        os.environ["ADWS_PARALLEL_STEPS"] = str(args.parallel_steps)
+    if args.context_pack:
+        os.environ["ADWS_CONTEXT_PACK"] = "1"
+
     phase = args.phase
     issue_number = args.issue
+    batch_size = args.batch if args.batch is not None else get_batch_size()
+    if args.speculate:
+        # Tells the run_task.py children to publish the tree they validate
+        os.environ["ADWS_SPECULATE"] = "1"
+    speculation_budget = (args.speculation_budget if args.speculation_budget is not None
+                          else get_speculation_budget())
 
     # Setup GitHub integration if --issue provided
     repo_path = None
@@ -167,15 +522,38 @@ Examples:
         print(f"No tasks found for Phase {phase}")
         sys.exit(1)
 
-    # Sort by dependencies
     dep_map = get_dependency_map()
-    tasks = topological_sort(tasks, dep_map)
 
-    # Get completed tasks
-    completed = get_completed_tasks_from_tracker()
+    # Predicted durations from the run history, on the model each task is routed to
+    history = DurationHistory()
+    router = ModelRouter(history)
+    estimates = {
+        t["task_id"]: history.estimate(
+            t["task_id"], plan_features(t["plan_file"], t),
+            route_plan(t["task_id"], t["plan_file"], t, router=router).model,
+        ) for t in tasks
+    }
+    history.close()
+
+    if recovered:
+        # Keep the journaled order; completed tasks come from the journal
+        task_map = {t["task_id"]: t for t in tasks}
+        tasks = [task_map[tid] for tid in recovered["order"] if tid in task_map]
+        completed = [
+            tid for tid, entry in recovered["tasks"].items()
+            if entry["status"] in FINISHED_STATUSES
+        ]
+    else:
+        # Sort by dependencies, longest predicted task first among ready ones
+        tasks = topological_sort(
+            tasks, dep_map, priority={tid: e.seconds for tid, e in estimates.items()}
+        )
+
+        # Get completed tasks
+        completed = get_completed_tasks_from_tracker()
 
     # Filter if skip-completed
-    if args.skip_completed:
+    if args.skip_completed and not recovered:
         original_count = len(tasks)
         tasks = [t for t in tasks if t["task_id"] not in completed]
         skipped = original_count - len(tasks)
@@ -186,11 +564,15 @@ Examples:
         print(f"All tasks in Phase {phase} are already completed!")
         sys.exit(0)
 
-    # Generate phase ADW ID for logging
-    phase_adw_id = make_adw_id()
+    if recovered and all(t["task_id"] in completed for t in tasks):
+        print(f"Phase run {args.recover} has no unfinished tasks.")
+        sys.exit(0)
+
+    # Generate phase ADW ID for logging (a recovered run keeps its ID)
+    phase_adw_id = args.recover or make_adw_id()
     logger = setup_logger(phase_adw_id, f"run_phase_{phase}")
 
-    logger.info(f"Starting Phase {phase}")
+    logger.info(f"{'Recovering' if recovered else 'Starting'} Phase {phase}")
     logger.info(f"Tasks to run: {len(tasks)}")
     logger.info(f"Phase ADW ID: {phase_adw_id}")
 
@@ -213,9 +595,17 @@ Examples:
 
     for i, task in enumerate(tasks, 1):
         status = "COMPLETED" if task["task_id"] in completed else "PENDING"
+        if recovered and recovered["tasks"].get(task["task_id"], {}).get("status") == "running":
+            status = "IN FLIGHT"
         deps = dep_map.get(task["task_id"], [])
         deps_str = f" (deps: {', '.join(deps)})" if deps else ""
-        print(f"  {i}. {task['task_id']} - {task['task_name']} [{status}]{deps_str}")
+        eta_str = f" ~{format_duration(estimates[task['task_id']].seconds)}" if status != "COMPLETED" else ""
+        print(f"  {i}. {task['task_id']} - {task['task_name']} [{status}]{eta_str}{deps_str}")
+
+    phase_eta = combine_estimates([
+        estimates[t["task_id"]] for t in tasks if t["task_id"] not in completed
+    ])
+    logger.info(f"Estimated duration: {format_eta(phase_eta)}")
 
     if args.dry_run:
         print(f"\n{'='*60}")
@@ -226,6 +616,20 @@ Examples:
                 run_task(task["task_id"], dry_run=True, skip_deps=args.skip_deps)
         sys.exit(0)
 
+    if args.enqueue:
+        queue = TaskQueue(args.queue_db, shared_fs=args.shared_fs or None)
+        pending = [
+            {**t, "priority": estimates[t["task_id"]].seconds}
+            for t in tasks if t["task_id"] not in completed
+        ]
+        added = queue.enqueue(pending)
+        logger.info(f"Enqueued {added} tasks on {queue.db_path}")
+        print(f"\nEnqueued {added} tasks ({len(pending) - added} already queued).")
+        print(f"Queue: {queue.db_path}")
+        print("Start workers with: uv run ADWS/run_worker.py")
+        queue.close()
+        sys.exit(0)
+
     # Confirm before running
     print(f"\nThis will run {len(tasks)} tasks.")
     response = input("Continue? [y/N] ")
@@ -233,14 +637,37 @@ Examples:
         print("Aborted.")
         sys.exit(0)
 
+    if recovered:
+        journal.record("recovered", pid=os.getpid())
+    else:
+        journal = PhaseJournal(phase_adw_id)
+        journal.scheduled(
+            phase,
+            [t["task_id"] for t in tasks],
+            {
+                "issue": issue_number,
+                "continue_on_error": args.continue_on_error,
+                "skip_deps": args.skip_deps,
+                "batch": batch_size,
+                "speculate": args.speculate,
+                "speculation_budget": speculation_budget,
+                # Effective values, so --recover runs the rest with the same settings
+                "model": os.getenv("ADWS_MODEL"),
+                "parallel_steps": get_step_parallel(),
+                "context_pack": context_pack_enabled(),
+            },
+        )
+    print(f"If interrupted, resume with: uv run ADWS/run_phase.py --recover {phase_adw_id}")
+
     # Post start comment to GitHub issue
-    if issue_number and repo_path:
+    if issue_number and repo_path and not recovered:
         task_list = "\n".join(f"- [ ] `{t['task_id']}` - {t['task_name']}" for t in tasks)
         start_comment = f"""## 🚀 ADWS Phase {phase} Started
 
 **Phase**: {phase_names.get(phase, 'Unknown')}
 **ADW ID**: `{phase_adw_id}`
 **Tasks to execute**: {len(tasks)}
+**Estimated duration**: {format_eta(phase_eta)}
 
 ### Task Checklist
 {task_list}
@@ -252,9 +679,26 @@ _Progress will be reported as each task completes._"""
     # Run tasks
     failed_tasks = []
     successful_tasks = []
+    batched = set()
+    speculator = Speculator(args.speculate or 0, speculation_budget, tasks, dep_map,
+                            issue=issue_number, journal=journal, logger=logger)
 
     for i, task in enumerate(tasks, 1):
         task_id = task["task_id"]
+        if task_id in batched:
+            continue
+        entry = recovered["tasks"].get(task_id) if recovered else None
+        resume_adw_id = None
+        if entry:
+            if entry["status"] in FINISHED_STATUSES:
+                successful_tasks.append(task_id)
+                continue
+            if entry["status"] == "running" and recover_in_flight(task_id, entry, journal, logger):
+                successful_tasks.append(task_id)
+                continue
+            # Rerun with the same ADW ID so run_task.py resumes its state
+            resume_adw_id = entry.get("adw_id")
+
         logger.info(f"Running task {i}/{len(tasks)}: {task_id}")
 
         # Check dependencies (cross-phase)
@@ -267,15 +711,69 @@ _Progress will be reported as each task completes._"""
                 logger.warning(msg)
                 print(f"\nSkipping {task_id} - dependencies not met: {dep_check['missing']}")
                 failed_tasks.append((task_id, "Dependencies not met"))
+                journal.task_finished(task_id, "skipped", reason="Dependencies not met")
                 if not args.continue_on_error:
                     break
                 continue
 
-        success = run_task(task_id, skip_deps=True, issue=issue_number)  # Skip deps since we checked above
+        # A speculative run is resumed, which lands its patch if it still fits
+        speculated_adw_id = speculator.take(task_id)
+        if speculated_adw_id:
+            resume_adw_id = speculated_adw_id
+
+        # Small plans that are ready now share the session (not when resuming)
+        batch = []
+        if batch_size > 1 and not resume_adw_id:
+            candidates = [
+                t for t in tasks[i:]
+                if t["task_id"] not in batched and t["task_id"] not in speculator.runs
+                and not (recovered and t["task_id"] in recovered["tasks"])
+            ]
+            ready = completed if args.skip_deps else get_completed_tasks_from_tracker()
+            batch = select_batch(task, candidates, ready, dep_map, batch_size)
+
+        if len(batch) > 1:
+            results = run_batch([t["task_id"] for t in batch], issue=issue_number, journal=journal)
+            batched.update(results)
+            for other_id, other_success in results.items():
+                if other_id == task_id:
+                    continue
+                if other_success:
+                    successful_tasks.append(other_id)
+                    logger.info(f"Task {other_id} completed successfully (batched with {task_id})")
+                else:
+                    failed_tasks.append((other_id, "Execution failed"))
+                    logger.error(f"Task {other_id} failed (batched with {task_id})")
+            success = results[task_id]
+        else:
+            adw_id = resume_adw_id or make_adw_id()
+            success = run_task(  # Skip deps since we checked above
+                task_id,
+                skip_deps=True,
+                issue=issue_number,
+                journal=journal,
+                adw_id=adw_id,
+                resume=bool(resume_adw_id),
+                while_running=speculator.watch(task, adw_id, completed + successful_tasks)
+                if args.speculate else None,
+            )
+            speculator.settled(task_id)
+            if not success:
+                speculator.parent_failed(task_id)
 
         if success:
             successful_tasks.append(task_id)
             logger.info(f"Task {task_id} completed successfully")
+            remaining = combine_estimates([
+                estimates[t["task_id"]] for t in tasks[i:]
+                if t["task_id"] not in completed and t["task_id"] not in batched
+            ])
+            if remaining.seconds:
+                logger.info(f"Remaining: {format_eta(remaining)}")
+            if len(batch) > 1 and not all(results.values()) and not args.continue_on_error:
+                print(f"\nA task batched with {task_id} failed. Stopping phase execution.")
+                print("Use --continue to continue running remaining tasks.")
+                break
         else:
             failed_tasks.append((task_id, "Execution failed"))
             logger.error(f"Task {task_id} failed")
@@ -285,6 +783,9 @@ _Progress will be reported as each task completes._"""
                 print("Use --continue to continue running remaining tasks.")
                 break
 
+    speculator.close()
+    journal.phase_finished(len(successful_tasks), len(failed_tasks))
+
     # Summary
     print(f"\n{'='*60}")
     print(f"Phase {phase} Summary")
@@ -339,6 +840,8 @@ _Phase execution complete._"""
         post_issue_comment(issue_number, repo_path, completion_comment)
 
     logger.info(f"Phase {phase} complete: {len(successful_tasks)} successful, {len(failed_tasks)} failed")
+    if issue_number:
+        logger.info(f"GitHub usage: {get_github_usage()}")
 
     # Exit with error if any failures
     if failed_tasks:
@@ -0,0 +1,159 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Run the tasks of a phase through the stage pipeline:
+/implement → validate → /commit → /pull_request.
+
+Each task works on its own branch in its own git worktree, so different
+tasks occupy different stages at once (one validating while another
+implements). Every stage has its own concurrency limit and model; a failed
+stage sends the task back to an earlier stage. See adw_modules/pipeline.py.
+
+Usage:
+    uv run run_pipeline.py 6                      # Phase 6 through all four stages
+    uv run run_pipeline.py 6 --dry-run            # Show stages and task order
+    uv run run_pipeline.py 6 --stages implement,validate,commit
+    uv run run_pipeline.py 6 --concurrency implement=3 --stage-model commit=haiku
+
+Examples:
+    # Stacked pull requests for Phase 7, two agents implementing at a time
+    uv run run_pipeline.py 7 --issue 31 --concurrency implement=2,pull_request=2
+"""
+
+import sys
+import os
+import argparse
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+from adw_modules.utils import make_adw_id, setup_logger
+from adw_modules.task_parser import (
+    get_tasks_for_phase,
+    get_completed_tasks_from_tracker,
+    get_dependency_map,
+)
+from adw_modules.routing import MODEL_LADDER
+from adw_modules.pipeline import (
+    Pipeline,
+    STAGES,
+    configure_stages,
+    parse_stage_values,
+    task_deps,
+    task_waves,
+)
+from adw_modules.profiler import start_profiling, PROFILE_MODES, DEFAULT_TOP
+
+
+def main():
+    load_dotenv()
+
+    stage_names = [s.name for s in STAGES]
+    parser = argparse.ArgumentParser(
+        description="Run a phase through the implement / validate / commit / pull_request pipeline",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run run_pipeline.py 6                     All four stages
+  uv run run_pipeline.py 6 --dry-run           Show stages and task order
+  uv run run_pipeline.py 6 --stages implement,validate,commit  No pull requests
+  uv run run_pipeline.py 6 --concurrency implement=3,validate=2
+  uv run run_pipeline.py 6 --stage-model validate=haiku,commit=haiku
+  uv run run_pipeline.py 6 --context-pack      Give implement agents the files their plans name
+        """
+    )
+    parser.add_argument("phase", type=int, choices=[1, 2, 3, 4, 5, 6, 7], help="Phase number (1-7)")
+    parser.add_argument("--stages", default=",".join(stage_names),
+                        help=f"Stages to run, in pipeline order (default: {','.join(stage_names)})")
+    parser.add_argument("--concurrency", metavar="STAGE=N,...",
+                        help="Tasks per stage at a time (default: "
+                             + ",".join(f"{s.name}={s.concurrency}" for s in STAGES) + ")")
+    parser.add_argument("--stage-model", metavar="STAGE=MODEL,...",
+                        help=f"Model per stage, one of {', '.join(MODEL_LADDER)} (default: routed for "
+                             f"implement, the slash command's default for the others)")
+    parser.add_argument("--base", default="HEAD",
+                        help="Ref that tasks without dependencies in the run start from (default: HEAD)")
+    parser.add_argument("--issue", type=int, help="GitHub issue the pull requests refer to")
+    parser.add_argument("--dry-run", action="store_true", help="Show stages and task order")
+    parser.add_argument("--context-pack", action="store_true",
+                        help="Read the files, symbols and tests each plan names into its /implement prompt (ADWS_CONTEXT_PACK)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile this process; saved under agents/<adw_id>/profile/")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="sample",
+                        help="How --profile profiles: sample (default) or cprofile")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP,
+                        help=f"Functions in the profile summary (default: {DEFAULT_TOP})")
+    args = parser.parse_args()
+
+    start_profiling(args.profile_mode if args.profile else None, "run_pipeline", args.profile_top)
+    if args.context_pack:
+        os.environ["ADWS_CONTEXT_PACK"] = "1"
+
+    try:
+        models = parse_stage_values(args.stage_model)
+        bad = [m for m in models.values() if m not in MODEL_LADDER]
+        if bad:
+            raise ValueError(f"Unknown model(s): {', '.join(bad)}")
+        stages = configure_stages(
+            [n.strip() for n in args.stages.split(",") if n.strip()],
+            parse_stage_values(args.concurrency, int),
+            models,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    completed = get_completed_tasks_from_tracker()
+    dep_map = get_dependency_map()
+    tasks = [t for t in get_tasks_for_phase(args.phase) if t["task_id"] not in completed]
+    if not tasks:
+        print(f"All tasks in Phase {args.phase} are already completed!")
+        sys.exit(0)
+
+    print(f"\n{'='*60}")
+    print(f"Phase {args.phase} pipeline - {len(tasks)} tasks")
+    print(f"{'='*60}")
+    print("\nStages:")
+    for stage in stages:
+        back = f", on failure back to {stage.on_failure}" if stage.on_failure else ""
+        print(f"  {stage.name:<13} {stage.slash_command:<14} {stage.concurrency} at a time, "
+              f"model {stage.model or 'default'}{back}")
+    print(f"\nOrder: {' → '.join(','.join(wave) for wave in task_waves(tasks, dep_map))}")
+    for task in tasks:
+        deps = task_deps(task, dep_map)
+        deps_str = f" (deps: {', '.join(deps)})" if deps else ""
+        print(f"  {task['task_id']} - {task['task_name']}{deps_str}")
+
+    if args.dry_run:
+        print(f"\n{'='*60}")
+        print("DRY RUN - No tasks will be executed")
+        print(f"{'='*60}")
+        sys.exit(0)
+
+    pipeline_adw_id = make_adw_id()
+    logger = setup_logger(pipeline_adw_id, f"run_pipeline_{args.phase}")
+    logger.info(f"Starting Phase {args.phase} pipeline: {', '.join(s.name for s in stages)}")
+    logger.info(f"Pipeline ADW ID: {pipeline_adw_id}")
+
+    pipeline = Pipeline(stages, tasks, dep_map, completed, logger, base=args.base, issue=args.issue)
+    results = pipeline.run()
+
+    print(f"\n{'='*60}")
+    print(f"Phase {args.phase} Pipeline Summary")
+    print(f"{'='*60}")
+    for task_id, status in results.items():
+        task_run = pipeline.runs.get(task_id)
+        where = f"  {task_run.branch} (ADW ID {task_run.adw_id})" if task_run else ""
+        print(f"  {task_id}: {status}{where}")
+
+    failed = [tid for tid, status in results.items() if status != "completed"]
+    logger.info(f"Pipeline complete: {len(results) - len(failed)} completed, {len(failed)} not")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
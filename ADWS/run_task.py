@@ -11,6 +11,9 @@ Usage:
     uv run run_task.py 02_06 --issue 5    # Run with GitHub issue tracking
     uv run run_task.py 02_06 --resume     # Resume from last state
     uv run run_task.py 02_06 --dry-run    # Show what would be done
+    uv run run_task.py 05_05 06_01        # Small plans in one /implement session
+    uv run run_task.py 06_02 --parallel-steps  # Independent steps as parallel sub-agents
+    uv run run_task.py 06_03 --speculate-from 1a2b3c4d  # Implement ahead, from a snapshot
 
 Examples:
     # Run the OCR Extract task
@@ -23,41 +26,35 @@ Examples:
 import sys
 import os
 import argparse
-from datetime import datetime
 
 # Add ADWS directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from dotenv import load_dotenv
-from adw_modules.agent import execute_template
 from adw_modules.state import ADWState
-from adw_modules.data_types import AgentTemplateRequest
 from adw_modules.utils import make_adw_id, setup_logger
+from adw_modules.tracker import get_tracker_writer
 from adw_modules.task_parser import (
     find_plan_file,
     parse_plan_metadata,
     check_dependencies,
     get_completed_tasks_from_tracker,
 )
-
-
-def get_tracker_path_for_task(task_id: str) -> str:
-    """Get the appropriate tracker file path for a given task ID.
-
-    Phase 5 and 6 use their own trackers, others use 00_IMPLEMENTATION_TRACKER.md.
-    """
-    from adw_modules.utils import get_project_root
-    project_root = get_project_root()
-    impl_dir = os.path.join(project_root, "docs", "implementation")
-
-    phase = int(task_id.split("_")[0])
-
-    if phase == 5:
-        return os.path.join(impl_dir, "PHASE5_IMPLEMENTATION_TRACKER.md")
-    elif phase == 6:
-        return os.path.join(impl_dir, "PHASE6_IMPLEMENTATION_TRACKER.md")
-    else:
-        return os.path.join(impl_dir, "00_IMPLEMENTATION_TRACKER.md")
+from adw_modules.durations import estimate_plan, format_eta
+from adw_modules.routing import MODEL_LADDER, describe_decision, implement_plan, route_plan
+from adw_modules.batching import implement_batch
+from adw_modules.plan_steps import (
+    DEFAULT_STEP_PARALLEL,
+    describe_waves,
+    get_step_parallel,
+    implement_steps,
+    infer_dependencies,
+    split_plan,
+    step_waves,
+)
+from adw_modules.speculation import land_speculation, speculate
+from adw_modules.profiler import start_profiling, PROFILE_MODES, DEFAULT_TOP
+from adw_modules.resources import set_limits_env
 
 
 def update_tracker(task_id: str, status: str = "completed") -> bool:
@@ -65,48 +62,110 @@ def update_tracker(task_id: str, status: str = "completed") -> bool:
 
     Returns True if successful.
     Supports both main tracker (00_IMPLEMENTATION_TRACKER.md) and phase-specific trackers.
+    Writes go through the shared TrackerWriter (file lock + atomic rewrite).
     """
-    import re
-    tracker_path = get_tracker_path_for_task(task_id)
-
-    if not os.path.exists(tracker_path):
-        return False
+    return get_tracker_writer().update(task_id, status)
 
-    with open(tracker_path, "r", encoding="utf-8") as f:
-        content = f.read()
 
-    # Convert task_id format (02_06 -> 2.6)
-    phase, task = task_id.split("_")
-    display_id = f"{int(phase)}.{int(task)}"
+def normalize_task_id(task_id: str) -> str:
+    """02_06, 2.6 and 2_6 all become 02_06."""
+    task_id = task_id.replace(".", "_")
+    if len(task_id.split("_")[0]) == 1:
+        parts = task_id.split("_")
+        task_id = f"{parts[0].zfill(2)}_{parts[1].zfill(2)}"
+    return task_id
 
-    # Find and update the task line - support both formats:
-    # Main tracker: | 2.6 | Task Name | [Doc] | [ ] Pending | Date |
-    # Phase tracker: | 5.1 | Task Name | [Doc] | [ ] Pending | Depends | Time |
 
-    # Pattern for main tracker (Phases 1-4): matches "[ ] Pending |" or "[ ] Implemented |"
-    pattern_main = rf"(\|\s*{re.escape(display_id)}\s*\|[^|]+\|[^|]+\|)\s*\[\s*\]\s*Pending\s*\|"
+def run_batch(task_ids: list, adw_ids: list, args) -> None:
+    """Implement several small plans in one /implement session (see batching.py).
 
-    # Pattern for Phase 5 tracker: matches "[ ] Pending |" in different column structure
-    pattern_phase5 = rf"(\|\s*{re.escape(display_id)}\s*\|[^|]+\|[^|]+\|)\s*\[\s*\]\s*Pending\s*\|"
+    Each task still gets its own ADW ID, state, log and tracker entry; the
+    session itself logs under a separate batch ADW ID.
+    """
+    completed = get_completed_tasks_from_tracker()
+    tasks, states, loggers = [], {}, {}
+    for task_id, adw_id in zip(task_ids, adw_ids):
+        plan_file = find_plan_file(task_id)
+        if not plan_file:
+            print(f"Error: Plan file not found for task {task_id}")
+            sys.exit(1)
+        if task_id in completed:
+            print(f"Task {task_id} is already completed; leaving it out of the batch.")
+            if not args.dry_run:
+                # run_phase.py reads each task's outcome from its ADW ID's state
+                state = ADWState(adw_id)
+                state.update(task_id=task_id, plan_file=plan_file)
+                state.set_status("completed")
+                state.save("already_completed")
+            continue
+        metadata = parse_plan_metadata(plan_file)
+        metadata["plan_file"] = plan_file
+        if not args.skip_deps:
+            dep_check = check_dependencies(task_id, completed)
+            if not dep_check["met"]:
+                print(f"Error: Dependencies not met for task {task_id}")
+                print(f"Missing: {', '.join(dep_check['missing'])}")
+                sys.exit(1)
 
-    if status == "completed":
-        today = datetime.now().strftime("%Y-%m-%d")
-        if int(phase) in (5, 6):
-            # Phase 5 and 6 trackers use "Complete" not "Implemented"
-            replacement = rf"\1 [x] Complete |"
-        else:
-            replacement = rf"\1 [x] Implemented | {today} |"
-    else:
-        replacement = rf"\1 [ ] {status.title()} |"
+        state = ADWState(adw_id)
+        state.update(
+            task_id=task_id,
+            task_name=metadata["task_name"],
+            phase=metadata["phase"],
+            plan_file=plan_file,
+            issue_number=args.issue,
+            total_steps=metadata["total_steps"],
+            dependencies=metadata["depends_on"],
+            dependencies_met=True,
+        )
+        tasks.append(metadata)
+        states[task_id] = state
 
-    new_content, count = re.subn(pattern_main, replacement, content)
+    if not tasks:
+        sys.exit(0)
 
-    if count > 0:
-        with open(tracker_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
-        return True
+    if args.dry_run:
+        print("\n=== DRY RUN ===")
+        for task in tasks:
+            decision = route_plan(task["task_id"], task["plan_file"], task, model=args.model)
+            print(f"{task['task_id']} ({task['task_name']}): {describe_decision(decision)}, "
+                  f"ADW ID {states[task['task_id']].adw_id}")
+        print(f"\nWould execute: /implement {' '.join(t['plan_file'] for t in tasks)}")
+        print("===============")
+        sys.exit(0)
 
-    return False
+    for task in tasks:
+        state = states[task["task_id"]]
+        loggers[task["task_id"]] = setup_logger(state.adw_id, "run_task")
+        loggers[task["task_id"]].info(f"Starting task: {task['task_id']} ({task['task_name']}) in a batch")
+        state.set_status("in_progress")
+        state.save("init")
+    batch_id = make_adw_id()
+    logger = setup_logger(batch_id, "run_task_batch")
+    logger.info(f"Batch ADW ID: {batch_id}")
+
+    results = implement_batch(batch_id, tasks, states, loggers, logger,
+                              model=args.model, validate=not args.skip_validation)
+
+    failed = []
+    for task in tasks:
+        task_id, state, response = task["task_id"], states[task["task_id"]], results[task["task_id"]]
+        if response.success:
+            if not update_tracker(task_id, "completed"):
+                loggers[task_id].warning(f"Could not update tracker for task {task_id}")
+            state.set_status("completed")
+            state.save("completed")
+            print(f"Task {task_id} completed (ADW ID {state.adw_id})")
+        else:
+            loggers[task_id].error(f"Implementation failed: {response.output[:500]}")
+            state.update(error_message=response.output[:1000])
+            state.set_status("failed")
+            state.save("failed")
+            failed.append(task_id)
+            print(f"Task {task_id} failed. See logs at: agents/{state.adw_id}/run_task/execution.log")
+    print(f"Batch log: agents/{batch_id}/run_task_batch/execution.log")
+    if failed:
+        sys.exit(1)
 
 
 def main():
@@ -121,20 +180,66 @@ Examples:
   uv run run_task.py 01_01 --issue 1 Run with GitHub issue tracking
   uv run run_task.py 02_06 --resume  Resume an interrupted task
   uv run run_task.py 02_06 --dry-run Show what would be done
+  uv run run_task.py 02_06 --model opus  Skip model routing
+  uv run run_task.py 05_05 06_01     Two small plans in one session
+  uv run run_task.py 06_02 --parallel-steps 4  Up to 4 steps at a time
+  uv run run_task.py 02_06 --context-pack  Give the agent the files the plan names
         """
     )
-    parser.add_argument("task_id", help="Task ID (e.g., 02_06, 1.1)")
+    parser.add_argument("task_id", nargs="+",
+                        help="Task ID (e.g., 02_06, 1.1); several IDs share one /implement session")
     parser.add_argument("--issue", type=int, help="GitHub issue number")
     parser.add_argument("--resume", action="store_true", help="Resume from last state")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done")
     parser.add_argument("--skip-deps", action="store_true", help="Skip dependency check")
+    parser.add_argument("--adw-id", action="append",
+                        help="Use this ADW ID (assigned by run_phase / workers); once per task ID")
+    parser.add_argument("--model", choices=MODEL_LADDER,
+                        help="Use this model, without routing or escalation (ADWS_MODEL)")
+    parser.add_argument("--skip-validation", action="store_true",
+                        help="Don't run the plan's validation commands after /implement")
+    parser.add_argument("--parallel-steps", type=int, nargs="?", const=DEFAULT_STEP_PARALLEL, metavar="N",
+                        help=f"Run independent plan steps as up to N parallel sub-agents in worktrees "
+                             f"(default N: {DEFAULT_STEP_PARALLEL}; ADWS_PARALLEL_STEPS)")
+    parser.add_argument("--context-pack", action="store_true",
+                        help="Read the files, symbols and tests the plan names into the /implement prompt (ADWS_CONTEXT_PACK)")
+    parser.add_argument("--speculate-from", metavar="COMMIT",
+                        help="Implement in a worktree from this snapshot and keep the patch for later "
+                             "(started by run_phase.py --speculate; leaves the tracker alone)")
+    parser.add_argument("--speculation-parent", metavar="TASK_ID",
+                        help="Task whose validation the speculative run overlaps")
+    parser.add_argument("--max-rss-mb", type=float,
+                        help="Kill the agent if its process tree exceeds this RSS (ADWS_LIMIT_RSS_MB)")
+    parser.add_argument("--max-cpu-seconds", type=float,
+                        help="Kill the agent after this much CPU time (ADWS_LIMIT_CPU_SECONDS)")
+    parser.add_argument("--max-wall-seconds", type=float,
+                        help="Kill the agent after this long (ADWS_LIMIT_WALL_SECONDS)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile this process; saved under agents/<adw_id>/profile/")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="sample",
+                        help="How --profile profiles: sample (default) or cprofile")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP,
+                        help=f"Functions in the profile summary (default: {DEFAULT_TOP})")
     args = parser.parse_args()
 
-    # Normalize task_id format
-    task_id = args.task_id.replace(".", "_")
-    if len(task_id.split("_")[0]) == 1:
-        parts = task_id.split("_")
-        task_id = f"{parts[0].zfill(2)}_{parts[1].zfill(2)}"
+    start_profiling(args.profile_mode if args.profile else None, "run_task", args.profile_top)
+    set_limits_env(args.max_rss_mb, args.max_cpu_seconds, args.max_wall_seconds)
+    if args.context_pack:
+        os.environ["ADWS_CONTEXT_PACK"] = "1"
+
+    parallel_steps = args.parallel_steps if args.parallel_steps is not None else get_step_parallel()
+    task_ids = [normalize_task_id(t) for t in args.task_id]
+    adw_ids = args.adw_id or []
+    if len(adw_ids) not in (0, len(task_ids)):
+        parser.error("give --adw-id once per task ID, or not at all")
+    if len(task_ids) > 1:
+        if args.resume:
+            parser.error("--resume takes a single task ID")
+        run_batch(task_ids, adw_ids or [make_adw_id() for _ in task_ids], args)
+        return
+
+    task_id = task_ids[0]
+    adw_id_arg = adw_ids[0] if adw_ids else None
 
     # Find plan file
     plan_file = find_plan_file(task_id)
@@ -146,8 +251,8 @@ Examples:
     # Parse metadata
     metadata = parse_plan_metadata(plan_file)
 
-    # Check dependencies
-    if not args.skip_deps:
+    # Check dependencies (a speculative run starts before its parent is done)
+    if not args.skip_deps and not args.speculate_from:
         completed = get_completed_tasks_from_tracker()
         dep_check = check_dependencies(task_id, completed)
 
@@ -166,16 +271,19 @@ Examples:
 
     # Initialize or resume state
     if args.resume:
-        state = ADWState.find_by_task_id(task_id)
+        if adw_id_arg:
+            state = ADWState.load(adw_id_arg)
+        else:
+            state = ADWState.find_by_task_id(task_id)
         if state:
             adw_id = state.adw_id
             print(f"Resuming task {task_id} with ADW ID: {adw_id}")
         else:
             print(f"No previous state found for task {task_id}, starting fresh.")
-            adw_id = make_adw_id()
+            adw_id = adw_id_arg or make_adw_id()
             state = None
     else:
-        adw_id = make_adw_id()
+        adw_id = adw_id_arg or make_adw_id()
         state = None
 
     logger = setup_logger(adw_id, "run_task")
@@ -202,6 +310,14 @@ Examples:
         print(f"Plan File: {plan_file}")
         print(f"Dependencies: {metadata['depends_on']}")
         print(f"ADW ID: {adw_id}")
+        decision = route_plan(task_id, plan_file, metadata, model=args.model)
+        eta = estimate_plan(task_id, plan_file, metadata, decision.model)
+        print(f"Model: {describe_decision(decision)}")
+        print(f"Estimated duration: {format_eta(eta)}")
+        if parallel_steps > 1:
+            with open(plan_file, "r", encoding="utf-8") as f:
+                steps = infer_dependencies(split_plan(f.read())[1])
+            print(f"Steps: {describe_waves(step_waves(steps))} (up to {parallel_steps} at a time)")
         print("\nWould execute: /implement {plan_file}")
         print("===============")
         sys.exit(0)
@@ -211,21 +327,43 @@ Examples:
     logger.info(f"ADW ID: {adw_id}")
     logger.info(f"Plan file: {plan_file}")
 
+    # Speculative run: only keep the patch, the task is run for real later
+    if args.speculate_from:
+        state.save("init")
+        response = speculate(adw_id, plan_file, task_id, metadata, state, logger, args.speculate_from,
+                             parent=args.speculation_parent, model=args.model)
+        if not response.success:
+            logger.warning(f"Speculative implementation failed: {response.output[:500]}")
+            sys.exit(1)
+        print(f"\nSpeculative patch for {task_id}: {state.get('speculation')['patch']}")
+        sys.exit(0)
+
     # Update state
     state.set_status("in_progress")
     state.save("init")
 
-    # Execute implementation
-    logger.info("Executing /implement command...")
-
-    request = AgentTemplateRequest(
-        agent_name="implementor",
-        slash_command="/implement",
-        args=[plan_file],
-        adw_id=adw_id,
-    )
-
-    response = execute_template(request)
+    # Work done ahead while the parent validated first, if it still fits the tree
+    response = None
+    if (state.get("speculation") or {}).get("status") == "ready":
+        response = land_speculation(adw_id, plan_file, task_id, metadata, state, logger,
+                                    validate=not args.skip_validation)
+        if response is not None and not response.success:
+            logger.warning(f"Speculative work failed validation; implementing {task_id} again")
+            response = None
+
+    # Independent steps in parallel first; the whole plan in one session if that fails
+    if response is None and parallel_steps > 1:
+        response = implement_steps(adw_id, plan_file, task_id, metadata, state, logger,
+                                   model=args.model, parallel=parallel_steps,
+                                   validate=not args.skip_validation)
+        if response is not None and not response.success:
+            logger.warning("Step-level run failed; implementing the plan in one session")
+            response = None
+
+    # Execute implementation (routed model, escalating on failure)
+    if response is None:
+        response, _ = implement_plan(adw_id, plan_file, task_id, metadata, state, logger,
+                                     model=args.model, validate=not args.skip_validation)
 
     if not response.success:
         logger.error(f"Implementation failed: {response.output[:500]}")
@@ -0,0 +1,197 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Run a queue worker that claims phase tasks and executes them with run_task.py.
+
+Any number of workers (on one host, or on several hosts sharing agents/)
+can work the same queue. Each claim is a lease kept alive by heartbeats;
+tasks of a worker that dies are re-queued once the lease expires.
+
+Usage:
+    uv run run_phase.py 6 --enqueue          # Put Phase 6 tasks on the queue
+    uv run run_worker.py                     # Work until the queue is drained
+    uv run run_worker.py --forever           # Keep polling for new work
+    uv run run_worker.py --status            # Show queue contents
+
+Examples:
+    # Three local workers draining Phase 6
+    uv run run_phase.py 6 --enqueue
+    for i in 1 2 3; do uv run run_worker.py & done; wait
+"""
+
+import sys
+import os
+import argparse
+import subprocess
+import threading
+import time
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+from adw_modules.utils import make_adw_id, setup_logger, get_project_root
+from adw_modules.task_parser import get_completed_tasks_from_tracker
+from adw_modules.tracing import span, trace_env
+from adw_modules.metrics import serve_metrics
+from adw_modules.resources import spawn, describe_usage
+from adw_modules.task_queue import (
+    TaskQueue,
+    make_worker_id,
+    DEFAULT_LEASE_SECONDS,
+)
+
+
+def heartbeat_loop(
+    db_path: str,
+    shared_fs: bool,
+    task_id: str,
+    worker_id: str,
+    adw_id: str,
+    lease_seconds: int,
+    process: subprocess.Popen,
+    stop: threading.Event,
+    logger,
+) -> None:
+    """Extend the lease while the task runs; kill the task if the lease is lost."""
+    queue = TaskQueue(db_path, shared_fs=shared_fs)  # sqlite connections are per-thread
+    try:
+        while not stop.wait(max(1, lease_seconds // 3)):
+            if not queue.heartbeat(task_id, worker_id, lease_seconds, adw_id=adw_id):
+                logger.error(f"Lost lease on {task_id}; stopping task")
+                process.terminate()
+                return
+    finally:
+        queue.close()
+
+
+def run_claimed_task(queue: TaskQueue, task: dict, worker_id: str, lease_seconds: int, logger) -> bool:
+    """Run one claimed task with heartbeats. Returns True if successful."""
+    task_id = task["task_id"]
+    adw_id = task["adw_id"] if task["attempts"] > 1 and task["adw_id"] else make_adw_id()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    cmd = ["uv", "run", os.path.join(script_dir, "run_task.py"), task_id,
+           "--skip-deps", "--adw-id", adw_id]
+    if task["attempts"] > 1:
+        cmd.append("--resume")
+
+    logger.info(f"Claimed {task_id} (attempt {task['attempts']}, ADW ID {adw_id})")
+    queue.heartbeat(task_id, worker_id, lease_seconds, adw_id=adw_id)
+
+    with span("run_task", task_id=task_id, adw_id=adw_id, attempt=task["attempts"]) as attrs:
+        child = spawn(cmd, "run_task", cwd=get_project_root(), env=trace_env())
+        stop = threading.Event()
+        beat = threading.Thread(
+            target=heartbeat_loop,
+            args=(queue.db_path, queue.shared_fs, task_id, worker_id, adw_id, lease_seconds, child.process, stop, logger),
+            daemon=True,
+        )
+        beat.start()
+        try:
+            usage = child.wait()
+        finally:
+            stop.set()
+            beat.join()
+        returncode = usage.exit_code
+        attrs["returncode"] = returncode
+    logger.info(f"Resources: {describe_usage(usage)}")
+
+    if returncode == 0:
+        queue.complete(task_id, worker_id, adw_id=adw_id)
+        logger.info(f"Task {task_id} completed")
+        return True
+
+    queue.fail(task_id, worker_id, f"run_task.py exited with {returncode}")
+    logger.error(f"Task {task_id} failed (exit {returncode})")
+    return False
+
+
+def print_status(queue: TaskQueue) -> None:
+    """Print every queued task with its status and owner."""
+    tasks = queue.list_tasks()
+    if not tasks:
+        print("Queue is empty.")
+        return
+    now = time.time()
+    print(f"{'Task':<7} {'Status':<10} {'Att':>3}  {'Worker':<28} {'ADW ID':<9} Lease")
+    for t in tasks:
+        lease = f"{t['lease_expires'] - now:.0f}s" if t["lease_expires"] else "-"
+        print(f"{t['task_id']:<7} {t['status']:<10} {t['attempts']:>3}  "
+              f"{(t['worker_id'] or '-'):<28} {(t['adw_id'] or '-'):<9} {lease}")
+        if t["error"] and t["status"] != "completed":
+            print(f"        {t['error'][:100]}")
+    print(f"\n{queue.counts()}")
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Claim and run queued phase tasks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run run_worker.py             Work until the queue is drained
+  uv run run_worker.py --forever   Keep polling for new work
+  uv run run_worker.py --status    Show queue contents
+        """
+    )
+    parser.add_argument("--queue-db", help="Queue database (default: agents/queue/tasks.db)")
+    parser.add_argument("--shared-fs", action="store_true",
+                        help="Workers on several hosts share the queue (disables WAL)")
+    parser.add_argument("--lease", type=int, default=DEFAULT_LEASE_SECONDS,
+                        help=f"Lease length in seconds (default: {DEFAULT_LEASE_SECONDS})")
+    parser.add_argument("--poll", type=int, default=10,
+                        help="Seconds between claims when nothing is ready (default: 10)")
+    parser.add_argument("--forever", action="store_true",
+                        help="Keep polling after the queue is drained")
+    parser.add_argument("--status", action="store_true",
+                        help="Show queue contents and exit")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+
+    queue = TaskQueue(args.queue_db, shared_fs=args.shared_fs or None)
+
+    if args.status:
+        print_status(queue)
+        return
+
+    worker_id = make_worker_id()
+    worker_adw_id = make_adw_id()
+    logger = setup_logger(worker_adw_id, "run_worker")
+    logger.info(f"Worker {worker_id} started on {queue.db_path}")
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+        logger.info(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+
+    succeeded = failed = 0
+    try:
+        while True:
+            task = queue.claim(worker_id, get_completed_tasks_from_tracker(), args.lease)
+            if task is None:
+                if not args.forever and not queue.has_inflight_work():
+                    break
+                time.sleep(args.poll)
+                continue
+
+            if run_claimed_task(queue, task, worker_id, args.lease, logger):
+                succeeded += 1
+            else:
+                failed += 1
+    except KeyboardInterrupt:
+        logger.info("Worker interrupted; claimed task will be re-queued when its lease expires")
+    finally:
+        queue.close()
+
+    logger.info(f"Worker {worker_id} done: {succeeded} succeeded, {failed} failed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Search agent transcripts and logs of every run under agents/.
+
+Transcripts are indexed as each Claude Code run finishes; logs and runs
+from before the index existed are picked up incrementally on each search
+(skip that with --no-update). Hits show the run, task, model, kind and a
+snippet, and a PATH@OFFSET reference that --show prints in full.
+
+Usage:
+    uv run search_agents.py "row-level security"               # Search everything
+    uv run search_agents.py "RLS policy" --kind error          # Only errors
+    uv run search_agents.py "supabase" --task 02_06 --since 7d # One task, last week
+    uv run search_agents.py --show agents/a1b2c3d4/implementor/raw_output.jsonl@48213
+
+Examples:
+    # Which run hit this Supabase RLS error?
+    uv run search_agents.py "violates row-level security" --kind error
+
+    # FTS5 syntax: phrases, OR, NOT, prefix*
+    uv run search_agents.py --raw '"deno test" AND (fail* OR panic)'
+
+    # Keep the index current while runs are in progress
+    uv run search_agents.py --index --follow 10
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+from datetime import datetime
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adw_modules.search_index import SearchIndex, get_index_path, read_line
+from adw_modules.utils import parse_since
+
+KINDS = ("text", "tool_use", "tool_result", "error", "result", "log")
+
+def show(index_ref: str) -> None:
+    """Print the full line behind a PATH@OFFSET reference."""
+    path, _, offset = index_ref.rpartition("@")
+    if not path or not offset.isdigit():
+        print(f"Error: Expected PATH@OFFSET, got {index_ref}")
+        sys.exit(1)
+    index = SearchIndex()
+    row = index.conn.execute(
+        "SELECT length FROM entries WHERE path = ? AND offset = ? LIMIT 1", (path, int(offset))
+    ).fetchone()
+    index.close()
+    if not row:
+        print(f"Error: {index_ref} is not in the index")
+        sys.exit(1)
+    line = read_line(path, int(offset), row["length"])
+    try:
+        print(json.dumps(json.loads(line), indent=2, ensure_ascii=False))
+    except json.JSONDecodeError:
+        print(line.rstrip("\n"))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Full-text search over agent transcripts and logs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run search_agents.py "row-level security" --kind error
+  uv run search_agents.py "deno test" --task 02_06 --since 7d
+  uv run search_agents.py --show agents/a1b2c3d4/implementor/raw_output.jsonl@48213
+  uv run search_agents.py --index --follow 10
+        """
+    )
+    parser.add_argument("query", nargs="?", help="Words that must all occur (FTS5 syntax with --raw)")
+    parser.add_argument("--adw-id", help="Only this run")
+    parser.add_argument("--task", help="Only runs of this task ID")
+    parser.add_argument("--kind", choices=KINDS, help="Only this kind of entry")
+    parser.add_argument("--model", help="Only this model (opus, sonnet, ...)")
+    parser.add_argument("--since", help="Only entries newer than 30m / 12h / 7d / 2w or an ISO date")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum hits (default: 20)")
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 unchanged")
+    parser.add_argument("--json", action="store_true", help="Print hits as JSON lines")
+    parser.add_argument("--no-update", action="store_true",
+                        help="Search the index as it is, without indexing new logs first")
+    parser.add_argument("--index", action="store_true", help="Only update the index")
+    parser.add_argument("--follow", type=float, metavar="SECONDS",
+                        help="With --index: keep indexing every SECONDS")
+    parser.add_argument("--show", metavar="PATH@OFFSET", help="Print the full entry behind a hit")
+    args = parser.parse_args()
+
+    if args.show:
+        show(args.show)
+        return
+    if not args.index and not args.query:
+        parser.error("Specify a query, --index or --show")
+
+    index = SearchIndex()
+    try:
+        if args.index:
+            while True:
+                started = time.perf_counter()
+                stats = index.index_all()
+                counts = index.count()
+                print(f"Indexed {stats['entries']} new entries from {stats['files']} file(s) "
+                      f"in {time.perf_counter() - started:.2f}s; "
+                      f"{counts['entries']} entries in {counts['files']} file(s) ({get_index_path()})")
+                if not args.follow:
+                    return
+                try:
+                    time.sleep(args.follow)
+                except KeyboardInterrupt:
+                    return
+
+        if not args.no_update:
+            index.index_all()
+        started = time.perf_counter()
+        hits = index.search(
+            args.query,
+            adw_id=args.adw_id,
+            task_id=args.task,
+            kind=args.kind,
+            model=args.model,
+            since=parse_since(args.since) if args.since else None,
+            limit=args.limit,
+            raw=args.raw,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+    finally:
+        index.close()
+
+    if args.json:
+        for hit in hits:
+            print(hit.model_dump_json())
+        return
+
+    for hit in hits:
+        when = datetime.fromtimestamp(hit.ts).strftime("%Y-%m-%d %H:%M")
+        print(f"{hit.adw_id}  {hit.task_id or '-':<6} {hit.model or '-':<7} {when}  {hit.kind:<11} "
+              f"{hit.path}@{hit.offset}")
+        print(f"    {' '.join(hit.snippet.split())}")
+    print(f"\n{len(hits)} hit(s) in {elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = ["python-dotenv", "pydantic"]
+# ///
+
+"""
+Watch GitHub issues for trigger comments and run the requested plans.
+
+A comment like "/adw docs/implementation/05_01_VERIFY_ACCESS_CODE.md" on a
+watched issue queues a run_issue.py job for that issue and plan.
+
+Usage:
+    uv run watch_issues.py --issue 4 --issue 7        # Watch specific issues
+    uv run watch_issues.py --label adws               # Watch all open issues with a label
+    uv run watch_issues.py --label adws --once        # Single polling pass
+    uv run watch_issues.py --label adws --dry-run     # Dispatch jobs with --dry-run
+
+Set ADWS_GITHUB_API_URL to poll a local fake API instead of api.github.com.
+"""
+
+import sys
+import os
+import argparse
+import threading
+import time
+
+# Add ADWS directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+from adw_modules.utils import make_adw_id, setup_logger
+from adw_modules.github import get_repo_url, extract_repo_path
+from adw_modules.watcher import IssueWatcher, DEFAULT_TRIGGER_KEYWORD, run_issue_job
+from adw_modules.metrics import serve_metrics
+
+
+def worker_loop(watcher: IssueWatcher, dry_run: bool, logger) -> None:
+    """Consume jobs from the watcher queue until the process exits."""
+    while True:
+        job = watcher.jobs.get()
+        try:
+            logger.info(f"Running issue #{job.issue_number}: {job.plan_file} "
+                        f"(requested by {job.requested_by})")
+            success = run_issue_job(job, dry_run=dry_run)
+            logger.info(f"Issue #{job.issue_number} finished: {'success' if success else 'failed'}")
+        finally:
+            watcher.job_done(job)
+            watcher.jobs.task_done()
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Watch GitHub issues for trigger comments",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  uv run watch_issues.py --issue 4            Watch issue #4
+  uv run watch_issues.py --label adws         Watch open issues labelled 'adws'
+  uv run watch_issues.py --label adws --once  Poll once and exit after jobs finish
+        """
+    )
+    parser.add_argument("--repo", help="Repository path owner/repo (default: git remote)")
+    parser.add_argument("--issue", type=int, action="append", default=[],
+                        help="Issue number to watch (repeatable)")
+    parser.add_argument("--label", action="append", default=[],
+                        help="Watch open issues with this label (repeatable)")
+    parser.add_argument("--keyword", default=DEFAULT_TRIGGER_KEYWORD,
+                        help=f"Trigger keyword (default: {DEFAULT_TRIGGER_KEYWORD})")
+    parser.add_argument("--interval", type=int, default=60,
+                        help="Seconds between polling passes (default: 60)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Concurrent run_issue jobs (default: 1)")
+    parser.add_argument("--queue-size", type=int, default=10,
+                        help="Maximum pending jobs (default: 10)")
+    parser.add_argument("--backfill", action="store_true",
+                        help="Trigger on comments posted before the watcher started")
+    parser.add_argument("--once", action="store_true",
+                        help="Run a single polling pass")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Dispatch jobs to run_issue.py with --dry-run")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+
+    if not args.issue and not args.label:
+        parser.error("Specify at least one --issue or --label")
+
+    repo_path = args.repo
+    if not repo_path:
+        repo_url = get_repo_url()
+        if not repo_url:
+            print("Error: Could not determine repository. Use --repo owner/repo.")
+            sys.exit(1)
+        repo_path = extract_repo_path(repo_url)
+
+    watcher_id = make_adw_id()
+    logger = setup_logger(watcher_id, "watch_issues")
+    logger.info(f"Watching {repo_path}: issues={args.issue} labels={args.label}")
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+        logger.info(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+
+    watcher = IssueWatcher(
+        repo_path=repo_path,
+        issues=args.issue,
+        labels=args.label,
+        keyword=args.keyword,
+        queue_size=args.queue_size,
+        backfill=args.backfill,
+        logger=logger,
+    )
+
+    for _ in range(max(1, args.workers)):
+        threading.Thread(
+            target=worker_loop, args=(watcher, args.dry_run, logger), daemon=True
+        ).start()
+
+    try:
+        while True:
+            jobs = watcher.poll_once()
+            logger.debug(f"Poll done: {len(jobs)} queued, {watcher.api_calls} API calls "
+                         f"({watcher.not_modified} not modified)")
+            if args.once:
+                watcher.jobs.join()
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        logger.info("Watcher stopped")
+
+
+if __name__ == "__main__":
+    main()